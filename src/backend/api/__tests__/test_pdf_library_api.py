@@ -1,4 +1,6 @@
-﻿import pytest
+﻿import base64
+import hashlib
+import pytest
 import sys
 from pathlib import Path
 
@@ -93,6 +95,28 @@ def test_list_records_returns_frontend_schema(api):
     assert record["file_path"] == sample["json_data"]["filepath"]
 
 
+def test_list_records_page_and_iter_records_use_keyset_cursor(api):
+    for idx in range(5):
+        _insert_sample(api, uuid=f"{idx:012x}", title=f"Doc {idx}", created_at_ms=1730726400000 + idx * 1000)
+
+    first = api.list_records_page(page_size=2)
+    assert [r["id"] for r in first["records"]] == ["000000000004", "000000000003"]
+    assert first["has_more"] is True
+
+    second = api.list_records_page(first["next_cursor"], page_size=2)
+    assert [r["id"] for r in second["records"]] == ["000000000002", "000000000001"]
+
+    streamed = [r["id"] for r in api.iter_records(page_size=2)]
+    assert streamed == [f"{idx:012x}" for idx in reversed(range(5))]
+    last = api.list_records_page(second["next_cursor"], page_size=2)
+    assert last["has_more"] is False and last["next_cursor"] is None
+
+
+def test_list_records_page_rejects_invalid_cursor(api):
+    with pytest.raises(DatabaseValidationError):
+        api.list_records_page("not-a-cursor!!", page_size=10)
+
+
 def test_get_record_detail_includes_counts(api):
     pdf_uuid = "222222222222"
     sample = make_pdf_info_sample(uuid=pdf_uuid)
@@ -111,6 +135,60 @@ def test_get_record_detail_includes_counts(api):
     assert detail["bookmark_count"] == 1
 
 
+def test_get_record_detail_cache_invalidated_by_events(api):
+    pdf_uuid = "333333333333"
+    sample = make_pdf_info_sample(uuid=pdf_uuid)
+    sample["title"] = "Gamma"
+    api.create_record(sample)
+
+    assert api.get_record_detail(pdf_uuid)["annotation_count"] == 0
+    api.get_record_detail(pdf_uuid)
+    metrics = api.cache_metrics()
+    assert metrics["record"]["hits"] == 1
+
+    annotation = make_annotation_sample('text-highlight', pdf_uuid=pdf_uuid)
+    ann_id = api._annotation_plugin.insert(annotation)
+    assert api.get_record_detail(pdf_uuid)["annotation_count"] == 1
+
+    api.update_record(pdf_uuid, {"title": "Gamma 2"})
+    detail = api.get_record_detail(pdf_uuid)
+    assert detail["title"] == "Gamma 2"
+
+    # 返回副本：调用方修改不影响缓存
+    detail["tags"].append("mutated")
+    assert "mutated" not in api.get_record(pdf_uuid)["tags"]
+
+    api._annotation_plugin.delete(ann_id)
+    assert api.get_record_detail(pdf_uuid)["annotation_count"] == 0
+
+    api.delete_record(pdf_uuid)
+    assert api.get_record_detail(pdf_uuid) is None
+
+
+def test_counts_listed_sortable_and_filterable(api):
+    for index, pdf_uuid in enumerate(("444444444441", "444444444442", "444444444443")):
+        sample = make_pdf_info_sample(uuid=pdf_uuid)
+        sample["title"] = f"Count {index}"
+        api.create_record(sample)
+        for ann_index in range(index):
+            api._annotation_plugin.insert(make_annotation_sample(
+                'comment', pdf_uuid=pdf_uuid, ann_id=f"ann_17280000000{index}_00000{ann_index}"
+            ))
+    api._bookmark_plugin.insert(make_bookmark_sample('page', pdf_uuid="444444444441"))
+
+    listed = {record["id"]: record for record in api.list_records()}
+    assert listed["444444444443"]["annotation_count"] == 2
+    assert listed["444444444441"]["bookmark_count"] == 1
+
+    result = api.search_records({
+        "tokens": [],
+        "sort": [{"field": "annotation_count", "direction": "desc"}],
+        "filters": {"type": "field", "field": "annotation_count", "operator": "gte", "value": 1},
+        "pagination": {"limit": 0, "offset": 0, "need_total": True},
+    })
+    assert [record["id"] for record in result["records"]] == ["444444444443", "444444444442"]
+
+
 def test_delete_record_cascades_related_data(api):
     pdf_uuid = "333333333333"
     sample = make_pdf_info_sample(uuid=pdf_uuid)
@@ -128,6 +206,72 @@ def test_delete_record_cascades_related_data(api):
     assert api._bookmark_plugin.query_by_pdf(pdf_uuid) == []
 
 
+def test_delete_records_bulk_cascades_in_one_event(api):
+    uuids = ["555555555551", "555555555552"]
+    for index, pdf_uuid in enumerate(uuids):
+        sample = make_pdf_info_sample(uuid=pdf_uuid)
+        sample["title"] = f"Bulk {index}"
+        api.create_record(sample)
+        api._annotation_plugin.insert(make_annotation_sample(
+            'comment', pdf_uuid=pdf_uuid, ann_id=f"ann_172800000000_00000{index}"
+        ))
+    api.get_record(uuids[0])
+
+    png = b"\x89PNG\r\n\x1a\n" + b"bulk-delete-blob"
+    image_hash = hashlib.md5(png).hexdigest()
+    screenshot = make_annotation_sample('screenshot', pdf_uuid=uuids[1], ann_id="ann_172800000000_00000s")
+    screenshot["json_data"]["data"]["imageHash"] = image_hash
+    screenshot["json_data"]["data"]["imageData"] = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+    api._annotation_plugin.insert(screenshot)
+    blob_path = api._annotation_plugin.blob_store.blob_dir / f"{image_hash}.png"
+    assert blob_path.exists()
+
+    events = []
+    api._event_bus.on("table:pdf-info:delete:completed", events.append, "test-bulk")
+    result = api.delete_records(uuids + ["555555555559"])
+
+    assert result["removed"] == uuids
+    assert result["not_found"] == ["555555555559"]
+    assert result["failed"] == {}
+    assert len(events) == 1
+    for pdf_uuid in uuids:
+        assert api.get_record(pdf_uuid) is None
+        assert api._annotation_plugin.query_by_pdf(pdf_uuid) == []
+    # 批量删除不走逐条 delete_by_pdf，截图 blob 仍需被回收
+    assert not blob_path.exists()
+    assert api._annotation_plugin.blob_store.get_info(image_hash) is None
+
+
+def test_sync_since_returns_coalesced_deltas(api):
+    start = api.sync_since(0)["last_seq"]
+
+    sample = make_pdf_info_sample(uuid="666666666661")
+    sample["title"] = "Sync"
+    api.create_record(sample)
+    api.update_record("666666666661", {"title": "Synced"})
+    api._annotation_plugin.insert(make_annotation_sample(
+        'comment', pdf_uuid="666666666661", ann_id="ann_172800000000_000061"
+    ))
+
+    delta = api.sync_since(start)
+    changes = {(change["table"], change["pk"]): change for change in delta["changes"]}
+    assert set(changes) == {("pdf_info", "666666666661"), ("pdf_annotation", "ann_172800000000_000061")}
+    info_change = changes[("pdf_info", "666666666661")]
+    assert info_change["op"] == "upsert"
+    assert info_change["record"]["title"] == "Synced"
+    assert info_change["record"]["annotation_count"] == 1
+    assert changes[("pdf_annotation", "ann_172800000000_000061")]["pdf_uuid"] == "666666666661"
+    assert delta["reset_required"] is False
+
+    api.delete_record("666666666661")
+    after_delete = api.sync_since(delta["last_seq"])
+    assert {(c["table"], c["op"]) for c in after_delete["changes"]} == {
+        ("pdf_info", "delete"), ("pdf_annotation", "delete"),
+    }
+    assert "record" not in after_delete["changes"][0]
+    assert api.sync_since(after_delete["last_seq"])["changes"] == []
+
+
 def test_update_record_merges_fields(api):
     pdf_uuid = "444444444444"
     sample = make_pdf_info_sample(uuid=pdf_uuid)
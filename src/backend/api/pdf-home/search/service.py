@@ -110,7 +110,8 @@ class DefaultSearchService(SearchService):
         sql_orderable_fields = {
             'title', 'author', 'filename', 'modified_time', 'updated_at',
             'created_time', 'created_at', 'page_count', 'file_size', 'size',
-            'rating', 'review_count', 'total_reading_time', 'last_accessed_at', 'due_date', 'star'
+            'rating', 'review_count', 'total_reading_time', 'last_accessed_at', 'due_date', 'star',
+            'annotation_count', 'bookmark_count'
         }
 
         def needs_memory_sort(rules: List[Dict[str, Any]]) -> bool:
@@ -177,6 +178,7 @@ class DefaultSearchService(SearchService):
                     allowed_names = {
                         'updated_at','created_at','page_count','file_size','size',
                         'rating','review_count','total_reading_time','last_accessed_at','due_date','star',
+                        'annotation_count','bookmark_count',
                         'title','author','filename','modified_time','created_time'
                     }
                     node = ast.parse(formula, mode='eval')
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import base64
+import json
 import logging
+import operator
 import os
 import uuid as uuid_module
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 import importlib.util
 
@@ -16,6 +19,8 @@ import time
 from ..database.config import get_db_path, get_connection_options
 from ..database.connection import DatabaseConnectionManager
 from ..database.executor import SQLExecutor
+from ..database.maintenance import DatabaseMaintenanceScheduler
+from ..database.changelog import ChangeLog
 from ..database.exceptions import (
     DatabaseConstraintError,
     DatabaseError,
@@ -28,6 +33,7 @@ from ..database.plugins.pdf_annotation_plugin import PDFAnnotationTablePlugin
 from ..database.plugins.pdf_bookmark_plugin import PDFBookmarkTablePlugin
 from ..database.plugins.pdf_bookanchor_plugin import PDFBookanchorTablePlugin
 from ..database.plugins.search_condition_plugin import SearchConditionTablePlugin
+from .utils.lru_cache import LRUCache
 # Lazy imports for pdf_manager to avoid hard dependency during tests
 # 可选的服务注册表（在某些分支/环境中尚未提供时，采用本地降级桩）
 try:  # pragma: no cover - 动态兼容导入
@@ -58,10 +64,22 @@ except Exception:  # pragma: no cover - 兼容路径：提供最小桩以通过
 if TYPE_CHECKING:  # pragma: no cover - typing only
     from ..pdf_manager.standard_manager import StandardPDFManager
 
+# Comparison operators accepted by annotation_count / bookmark_count field filters
+_COUNTER_COMPARATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
 
 class PDFLibraryAPI:
     """Facade exposing database-backed PDF operations for frontend usage."""
 
+    MAX_LIST_PAGE_SIZE = 1000
+
     def __init__(
         self,
         db_path: Optional[str] = None,
@@ -70,12 +88,14 @@ class PDFLibraryAPI:
         event_bus: Optional[EventBus] = None,
         pdf_manager: Optional[StandardPDFManager] = None,
         service_registry: Optional[ServiceRegistry] = None,
+        record_cache_size: int = 512,
     ) -> None:
         self._logger = logger or logging.getLogger("pdf.library.api")
         self._db_path = db_path or str(get_db_path())
         options = get_connection_options()
 
         self._connection_manager = DatabaseConnectionManager(self._db_path, **options)
+        self._maintenance: Optional[DatabaseMaintenanceScheduler] = None
         self._executor = SQLExecutor(self._connection_manager.get_connection())
         self._event_bus = event_bus or EventBus()
 
@@ -89,6 +109,16 @@ class PDFLibraryAPI:
 
         self._register_plugins()
 
+        # Change-data-capture log (triggers on pdf_info / annotation / bookmark / bookanchor)
+        self._change_log = ChangeLog(self._executor, self._logger)
+        self._change_log.ensure_schema()
+
+        # Read-through cache for get_record / get_record_detail, invalidated by plugin events
+        self._record_cache = LRUCache(record_cache_size)
+        self._cache_subscriber_id = f"pdf-library-api-cache-{id(self)}"
+        self._cache_subscriptions: List[Tuple[str, Any]] = []
+        self._register_cache_invalidation()
+
         # API-level service registry (domain delegates)
         self._services = service_registry or ServiceRegistry()
         self._auto_register_default_services()
@@ -108,8 +138,72 @@ class PDFLibraryAPI:
     # Public API
     # ------------------------------------------------------------------
 
+    @property
+    def event_bus(self) -> EventBus:
+        """Plugin event bus (``table:<table>:<action>:completed`` events)."""
+        return self._event_bus
+
+    def worker_connection(self, timeout: Optional[float] = None) -> ContextManager[Any]:
+        """Borrow a pooled DB connection for the calling worker thread.
+
+        Inside the scope every plugin query issued from this thread runs on the
+        borrowed connection instead of the shared primary one.
+        """
+        return self._connection_manager.pooled_connection(timeout)
+
+    def start_maintenance(self, **options: Any) -> bool:
+        """Start the background maintenance scheduler (optimize/checkpoint/vacuum)."""
+        if self._maintenance is None:
+            self._maintenance = DatabaseMaintenanceScheduler(self._db_path, **options)
+        return self._maintenance.start()
+
+    def maintenance_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Timing metrics of maintenance tasks; empty when the scheduler never started."""
+        if self._maintenance is None:
+            return {}
+        return self._maintenance.metrics()
+
+    def sync_since(self, since: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Coalesced changes after ``since`` for incremental client sync.
+
+        pdf_info upserts carry the mapped frontend ``record`` so pdf-home can patch
+        its list without a round trip; child-table changes only carry keys and the
+        owning ``pdf_uuid``. When ``reset_required`` is true the client must reload
+        everything and continue from ``last_seq``.
+        """
+        delta = self._change_log.changes_since(since, limit)
+        upserted = [
+            change["pk"] for change in delta["changes"]
+            if change["table"] == "pdf_info" and change["op"] == "upsert"
+        ]
+        if upserted:
+            records = {
+                row["uuid"]: self._map_to_frontend(row)
+                for row in self._pdf_info_plugin.query_by_ids(upserted)
+            }
+            for change in delta["changes"]:
+                if change["table"] == "pdf_info" and change["pk"] in records:
+                    change["record"] = records[change["pk"]]
+        return delta
+
+    def cache_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss/eviction counters of the record cache."""
+        return {
+            "record": self._record_cache.metrics(),
+        }
+
     def shutdown(self) -> None:
         """Close active connections and reset plugin registry state."""
+        for event_name, handler in self._cache_subscriptions:
+            try:
+                self._event_bus.off(event_name, handler, self._cache_subscriber_id)
+            except Exception:  # pragma: no cover - defensive
+                pass
+        self._cache_subscriptions = []
+        self._record_cache.clear()
+        if self._maintenance is not None:
+            self._maintenance.stop()
+            self._maintenance = None
         try:
             self._connection_manager.close_all()
         except DatabaseError as exc:  # pragma: no cover - defensive
@@ -134,29 +228,67 @@ class PDFLibraryAPI:
                 self._logger.warning("remove_file failed for %s: %s", uuid, exc)
         return self._pdf_info_plugin.delete(uuid)
 
-    def get_record(self, uuid: str) -> Optional[Dict[str, Any]]:
-        row = self._pdf_info_plugin.query_by_id(uuid)
-        if not row:
-            return None
-        return self._map_to_frontend(row)
-
-    def get_record_detail(self, uuid: str) -> Optional[Dict[str, Any]]:
-        record = self.get_record(uuid)
-        if record is None:
-            return None
+    def delete_records(self, uuids: List[str], *, max_workers: int = 4) -> Dict[str, Any]:
+        """Bulk delete: one DB transaction (FK cascades), pooled file removal, one event.
 
+        Returns ``{"removed", "not_found", "failed"}``; a uuid counts as removed when
+        either its DB row or its managed copy was deleted.
+        """
+        ids = list(dict.fromkeys(u for u in uuids if isinstance(u, str) and u))
+        failed: Dict[str, str] = {}
         try:
-            record["annotation_count"] = self._annotation_plugin.count_by_pdf(uuid)
-        except DatabaseError:
-            record["annotation_count"] = 0
+            db_removed = set(self._pdf_info_plugin.delete_many(ids))
+        except DatabaseError as exc:
+            self._logger.warning("delete_many failed: %s", exc)
+            return {"removed": [], "not_found": [], "failed": {u: f"DB: {exc}" for u in ids}}
+        if db_removed:
+            # The cascade drops annotation rows via triggers (blob ref counts included) but skips
+            # the per-row delete_by_pdf path, so collect unreferenced screenshot blobs once here
+            try:
+                self._annotation_plugin.blob_store.collect_garbage()
+            except Exception as exc:  # pragma: no cover - filesystem errors
+                self._logger.warning("screenshot blob collection failed: %s", exc)
 
-        try:
-            record["bookmark_count"] = self._bookmark_plugin.count_by_pdf(uuid)
-        except DatabaseError:
-            record["bookmark_count"] = 0
+        fs_removed: set = set()
+        if self._pdf_manager is not None and ids:
+            try:
+                if hasattr(self._pdf_manager, "remove_files"):
+                    outcome = self._pdf_manager.remove_files(ids, max_workers=max_workers)
+                    fs_removed = set(outcome.get("removed") or [])
+                    for uuid, reason in (outcome.get("failed") or {}).items():
+                        if uuid not in db_removed:
+                            failed[uuid] = f"FS: {reason}"
+                else:  # managers without bulk removal
+                    for uuid in ids:
+                        ok = self._pdf_manager.remove_file(uuid)
+                        if (ok[0] if isinstance(ok, tuple) else ok):
+                            fs_removed.add(uuid)
+            except Exception as exc:  # pragma: no cover - filesystem errors
+                self._logger.warning("bulk remove_files failed: %s", exc)
+
+        removed = [u for u in ids if u in db_removed or u in fs_removed]
+        not_found = [u for u in ids if u not in removed and u not in failed]
+        return {"removed": removed, "not_found": not_found, "failed": failed}
 
+    def get_record(self, uuid: str) -> Optional[Dict[str, Any]]:
+        cached = self._record_cache.get(uuid)
+        if cached is None:
+            generation = self._record_cache.generation
+            row = self._pdf_info_plugin.query_by_id(uuid)
+            if not row:
+                return None
+            cached = self._map_to_frontend(row)
+            self._record_cache.put(uuid, cached, generation)
+        # Callers may mutate the returned record; hand out a copy
+        record = dict(cached)
+        record["tags"] = list(cached.get("tags") or [])
         return record
 
+    def get_record_detail(self, uuid: str) -> Optional[Dict[str, Any]]:
+        # annotation_count / bookmark_count are trigger-maintained pdf_info columns,
+        # already part of the mapped record
+        return self.get_record(uuid)
+
     def list_records(
         self,
         *,
@@ -172,6 +304,52 @@ class PDFLibraryAPI:
                 mapped.append(record)
         return mapped
 
+    def list_records_page(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 200,
+        *,
+        include_hidden: bool = True,
+    ) -> Dict[str, Any]:
+        """Return one keyset page ordered by (updated_at DESC, uuid DESC).
+
+        ``cursor`` is the opaque ``next_cursor`` of the previous page (None for the
+        first page). Hidden records are filtered after paging, so a page may hold
+        fewer than ``page_size`` records while ``has_more`` is still true.
+        """
+        if page_size is None or int(page_size) <= 0:
+            raise DatabaseValidationError("page_size must be > 0")
+        page_size = min(int(page_size), self.MAX_LIST_PAGE_SIZE)
+        after = self._decode_list_cursor(cursor)
+        rows = self._pdf_info_plugin.query_page_by_updated(after, limit=page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        records: List[Dict[str, Any]] = []
+        for row in rows:
+            record = self._map_to_frontend(row)
+            if include_hidden or record.get("is_visible", True):
+                records.append(record)
+        next_cursor = self._encode_list_cursor(rows[-1]) if has_more and rows else None
+        return {"records": records, "next_cursor": next_cursor, "has_more": has_more}
+
+    def count_records(self) -> int:
+        return self._pdf_info_plugin.count_all()
+
+    def iter_records(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 200,
+        *,
+        include_hidden: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream records page by page; at most one page is held in memory."""
+        while True:
+            page = self.list_records_page(cursor, page_size, include_hidden=include_hidden)
+            yield from page["records"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
     def search_records(
         self,
         payload: Dict[str, Any],
@@ -290,7 +468,8 @@ class PDFLibraryAPI:
         sql_orderable_fields = {
             'title', 'author', 'filename', 'modified_time', 'updated_at',
             'created_time', 'created_at', 'page_count', 'file_size', 'size',
-            'rating', 'review_count', 'total_reading_time', 'last_accessed_at', 'due_date', 'star'
+            'rating', 'review_count', 'total_reading_time', 'last_accessed_at', 'due_date', 'star',
+            'annotation_count', 'bookmark_count'
         }
 
         def needs_memory_sort(rules: List[Dict[str, Any]]) -> bool:  # type: ignore[name-defined]
@@ -356,6 +535,7 @@ class PDFLibraryAPI:
                     allowed_names = {
                         'updated_at','created_at','page_count','file_size','size',
                         'rating','review_count','total_reading_time','last_accessed_at','due_date','star',
+                        'annotation_count','bookmark_count',
                         'title','author','filename','modified_time','created_time'
                     }
                     node = ast.parse(formula, mode='eval')
@@ -714,6 +894,34 @@ class PDFLibraryAPI:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _register_cache_invalidation(self) -> None:
+        def on_pdf_changed(data: Any) -> None:
+            uuid = data.get("uuid") if isinstance(data, dict) else None
+            uuids = data.get("uuids") if isinstance(data, dict) else None
+            if uuid:
+                self._record_cache.invalidate(uuid)
+            elif isinstance(uuids, list):
+                for item in uuids:
+                    self._record_cache.invalidate(item)
+            else:
+                self._record_cache.clear()
+
+        # Child rows change pdf_info counters through triggers, which emit no pdf-info event
+        def on_child_changed(data: Any) -> None:
+            owners = [data.get(key) for key in ("pdf_uuid", "previous_pdf_uuid")] if isinstance(data, dict) else []
+            owners = [owner for owner in owners if owner]
+            if not owners:
+                self._record_cache.clear()
+            for owner in owners:
+                self._record_cache.invalidate(owner)
+
+        for action in ("create", "update", "delete"):
+            self._cache_subscriptions.append((f"table:pdf-info:{action}:completed", on_pdf_changed))
+            for table in ("pdf-annotation", "pdf-bookmark"):
+                self._cache_subscriptions.append((f"table:{table}:{action}:completed", on_child_changed))
+        for event_name, handler in self._cache_subscriptions:
+            self._event_bus.on(event_name, handler, self._cache_subscriber_id)
+
     def _register_plugins(self) -> None:
         for plugin in (
             self._pdf_info_plugin,
@@ -929,6 +1137,11 @@ class PDFLibraryAPI:
                 return bool(record_tags.intersection(target))
             if field == "total_reading_time" and operator == "gte":
                 return record.get("total_reading_time", 0) >= value
+            if field in ("annotation_count", "bookmark_count") and operator in _COUNTER_COMPARATORS:
+                try:
+                    return _COUNTER_COMPARATORS[operator](int(record.get(field, 0) or 0), int(value))
+                except (TypeError, ValueError):
+                    return True
             return True
         return True
 
@@ -1289,8 +1502,25 @@ class PDFLibraryAPI:
         }
         return payload
 
+    @staticmethod
+    def _encode_list_cursor(row: Dict[str, Any]) -> str:
+        raw = json.dumps([int(row.get("updated_at") or 0), row["uuid"]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_list_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str]]:
+        if not cursor:
+            return None
+        try:
+            padded = str(cursor) + "=" * (-len(str(cursor)) % 4)
+            updated_at, uuid = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return int(updated_at), str(uuid)
+        except (ValueError, TypeError, UnicodeError):
+            raise DatabaseValidationError("invalid cursor")
+
     def _map_to_frontend(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        json_data = deepcopy(row.get("json_data", {}))
+        # json_data 由 _parse_row 按行新解析，且下面只读取标量/重建 tags 列表，无需 deepcopy
+        json_data = row.get("json_data") or {}
         created_at = row.get("created_at", 0)
         last_accessed = json_data.get("last_accessed_at", row.get("visited_at", 0))
         due_date = json_data.get("due_date", 0)
@@ -1311,6 +1541,8 @@ class PDFLibraryAPI:
             "tags": self._normalize_tags(json_data.get("tags")),
             "is_visible": bool(json_data.get("is_visible", True)),
             "total_reading_time": json_data.get("total_reading_time", 0),
+            "annotation_count": row.get("annotation_count", 0),
+            "bookmark_count": row.get("bookmark_count", 0),
             "due_date": self._ensure_seconds(due_date),
             "notes": json_data.get("notes", ""),
             "subject": json_data.get("subject", ""),
@@ -29,6 +29,8 @@ def map_row_to_frontend(row: Dict[str, Any]) -> Dict[str, Any]:
         "tags": normalize_tags(json_data.get("tags")),
         "is_visible": bool(json_data.get("is_visible", True)),
         "total_reading_time": json_data.get("total_reading_time", 0),
+        "annotation_count": row.get("annotation_count", 0),
+        "bookmark_count": row.get("bookmark_count", 0),
         "due_date": ensure_seconds(due_date),
         "notes": json_data.get("notes", ""),
         "subject": json_data.get("subject", ""),
@@ -0,0 +1,17 @@
+"""
+数据层基准测试包
+
+以可复现的合成 PDF 库（1k/10k/100k）测量 PDFLibraryAPI 与表插件的关键路径，
+输出 p50/p95/p99 与峰值 RSS 的 JSON 报告，并支持与基线比较。
+
+主要模块:
+- generator: SyntheticLibraryGenerator 合成数据生成器
+- runner: run_benchmark 执行基准场景，compare_reports 与基线比较
+
+用法:
+    python -m src.backend.benchmarks --scale 10k --output bench-10k.json
+    python -m src.backend.benchmarks --scale 10k --compare bench-10k.json
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
@@ -0,0 +1,79 @@
+"""
+基准测试命令行入口
+
+示例:
+    python -m src.backend.benchmarks --scale 1k
+    python -m src.backend.benchmarks --scale 100k --scenario search --scenario sort --output report.json
+    python -m src.backend.benchmarks --scale 10k --compare baseline-10k.json --tolerance 0.25
+
+与基线比较出现回归时以退出码 1 结束，便于在 CI 中使用。
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .generator import DEFAULT_SEED, SCALES
+from .runner import SCENARIOS, compare_reports, run_benchmark
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.backend.benchmarks',
+        description='PDFLibraryAPI 数据层基准测试',
+    )
+    parser.add_argument('--scale', default='1k', help=f"数据规模：{'/'.join(SCALES)} 或 PDF 数量（默认 1k）")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), dest='scenarios',
+                        help='要执行的场景（可重复，默认全部）')
+    parser.add_argument('--iterations', type=int, default=50, help='每个场景计时次数（默认 50）')
+    parser.add_argument('--warmup', type=int, default=3, help='每个场景预热次数（默认 3）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    parser.add_argument('--db', help='数据库文件路径（默认使用临时目录）')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    parser.add_argument('--compare', help='基线报告路径，与之比较并报告回归')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='回归容差比例（默认 0.2 即 +20%%）')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='低于该差值（毫秒）不视为回归')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_arguments(argv)
+    report = run_benchmark(
+        args.scale,
+        scenarios=args.scenarios,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+        db_path=args.db,
+    )
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_reports(
+            report, baseline, tolerance=args.tolerance, min_delta_ms=args.min_delta_ms
+        )
+        report['comparison'] = comparison
+        if comparison['scale_mismatch']:
+            print('[WARN] 基线规模与本次不一致，比较结果仅供参考', file=sys.stderr)
+        for row in comparison['regressions']:
+            print(
+                f"[REGRESSION] {row['scenario']} {row['metric']}: "
+                f"{row['baseline']} -> {row['current']} ms (x{row['ratio']})",
+                file=sys.stderr,
+            )
+        if not comparison['ok']:
+            exit_code = 1
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
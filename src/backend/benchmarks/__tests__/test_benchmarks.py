@@ -0,0 +1,147 @@
+"""
+基准测试包测试
+
+使用极小规模验证生成器的可复现性与有效性、场景执行与报告/比较逻辑。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import json
+
+from src.backend.benchmarks.__main__ import main
+from src.backend.benchmarks.generator import SyntheticLibraryGenerator, resolve_scale
+from src.backend.benchmarks.runner import SCENARIOS, compare_reports, percentile, run_benchmark
+
+
+class TestSyntheticLibraryGenerator:
+    """合成数据生成器测试类"""
+
+    def test_same_seed_is_deterministic(self):
+        """测试：相同 seed 生成完全一致的数据"""
+        first = list(SyntheticLibraryGenerator(seed=7).iter_library(20))
+        second = list(SyntheticLibraryGenerator(seed=7).iter_library(20))
+        other = list(SyntheticLibraryGenerator(seed=8).iter_library(20))
+
+        assert first == second
+        assert first != other
+
+    def test_contains_cjk_titles_and_children(self):
+        """测试：生成的数据包含 CJK 标题与各类子记录"""
+        bundles = list(SyntheticLibraryGenerator().iter_library(50))
+
+        titles = [b['pdf_info'][0]['title'] for b in bundles]
+        assert any(any('一' <= ch <= '鿿' for ch in title) for title in titles)
+        for table in ('pdf_bookmark', 'pdf_annotation', 'pdf_bookanchor'):
+            assert sum(len(b[table]) for b in bundles) > 0
+
+    def test_resolve_scale(self):
+        """测试：规模名称解析"""
+        assert resolve_scale('10k') == 10_000
+        assert resolve_scale(250) == 250
+
+
+class TestBenchmarkRunner:
+    """基准场景与报告测试类"""
+
+    def test_run_all_scenarios_small_scale(self, tmp_path):
+        """测试：小规模执行全部场景并输出分位数与峰值内存"""
+        report = run_benchmark(60, iterations=3, warmup=1, db_path=str(tmp_path / 'bench.db'))
+
+        assert report['populate']['pdf_info'] == 60
+        assert set(report['scenarios']) == set(SCENARIOS)
+        for stats in report['scenarios'].values():
+            assert stats['iterations'] == 3
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+        json.dumps(report)
+
+    def test_percentile_interpolates(self):
+        """测试：分位数线性插值"""
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+        assert percentile([0.0, 10.0], 95) == 9.5
+
+    def test_compare_reports_flags_regressions(self):
+        """测试：超出容差且超过最小差值的分位数记为回归"""
+        baseline = {'meta': {'scale': 1000}, 'scenarios': {
+            'search': {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 30.0},
+            'sort': {'p50_ms': 0.1, 'p95_ms': 0.2, 'p99_ms': 0.3},
+        }}
+        current = {'meta': {'scale': 1000}, 'scenarios': {
+            'search': {'p50_ms': 10.5, 'p95_ms': 30.0, 'p99_ms': 20.0},
+            'sort': {'p50_ms': 0.3, 'p95_ms': 0.4, 'p99_ms': 0.5},
+        }}
+
+        result = compare_reports(current, baseline, tolerance=0.2, min_delta_ms=0.5)
+
+        assert result['ok'] is False
+        assert [(r['scenario'], r['metric']) for r in result['regressions']] == [('search', 'p95_ms')]
+        assert [(r['scenario'], r['metric']) for r in result['improvements']] == [('search', 'p99_ms')]
+        assert result['scale_mismatch'] is False
+
+    def test_cli_writes_report_and_compares(self, tmp_path):
+        """测试：命令行输出报告，并以自身为基线比较"""
+        output = tmp_path / 'report.json'
+        args = ['--scale', '30', '--iterations', '2', '--warmup', '0',
+                '--scenario', 'detail', '--output', str(output)]
+
+        assert main(args) == 0
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert list(report['scenarios']) == ['detail']
+
+        compared = tmp_path / 'compared.json'
+        exit_code = main(args[:-1] + [str(compared), '--compare', str(output), '--min-delta-ms', '1000'])
+        assert exit_code == 0
+        assert json.loads(compared.read_text(encoding='utf-8'))['comparison']['ok'] is True
+
+
+class TestTransportBenchmark:
+    """传输层基准测试类"""
+
+    def test_run_clients_against_in_process_server(self, tmp_path):
+        """测试：并发客户端压测进程内 asyncio 服务器，按消息类型汇总"""
+        import asyncio
+
+        from src.backend.benchmarks.transport import REQUEST_MIX, populate_library, run_clients
+        from src.backend.database.connection import DatabaseConnectionManager
+        from src.backend.database.plugin.plugin_registry import TablePluginRegistry
+        from src.backend.msgCenter_server.async_server import AsyncStandardServer
+
+        db_path = str(tmp_path / 'bench.db')
+        assert populate_library(db_path, 20)['pdf_info'] == 20
+
+        async def scenario():
+            server = AsyncStandardServer(port=0, max_workers=2, db_path=db_path)
+            port = await server.start()
+            try:
+                return await run_clients('127.0.0.1', port, clients=3, requests=4)
+            finally:
+                await server.stop()
+
+        try:
+            result = asyncio.run(scenario())
+        finally:
+            TablePluginRegistry.reset_instance()
+            DatabaseConnectionManager._instance = None
+
+        assert set(result['messages']) == {message_type for message_type, _ in REQUEST_MIX}
+        assert sum(stats['iterations'] for stats in result['messages'].values()) == 12
+        assert result['throughput_rps'] > 0
+
+
+class TestCodecBenchmark:
+    """线路编码基准测试类"""
+
+    def test_codec_benchmark_reports_sizes_and_throughput(self):
+        """测试：各编码对典型负载往返一致，deflate 压缩大负载、不压缩心跳"""
+        from src.backend.benchmarks.codec import run_codec_benchmark
+
+        report = run_codec_benchmark(records=30, iterations=2)
+
+        assert {'json', 'deflate-1', 'deflate-6'} <= set(report['codecs'])
+        deflate = report['codecs']['deflate-6']
+        assert deflate['heartbeat']['binary_frame'] is False
+        assert deflate['bookmark_tree']['binary_frame'] is True
+        assert deflate['bookmark_tree']['wire_bytes'] < report['codecs']['json']['bookmark_tree']['wire_bytes']
+        for stats in deflate.values():
+            assert stats['encode']['mb_per_s'] >= 0 and stats['decode']['iterations'] == 2
+        json.dumps(report)
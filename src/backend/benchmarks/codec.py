@@ -0,0 +1,186 @@
+"""
+线路编码基准
+
+以合成库生成贴近实际的消息负载（库列表分页、书签树、标注列表与心跳），对每种可协商
+的线路编码测量完整的编码（dict -> 线路负载）与解码（线路负载 -> dict）耗时、吞吐量
+（按 JSON 文本字节计的 MB/s）与线路字节数，用于选择压缩阈值与编码。
+
+示例:
+    python -m src.backend.benchmarks.codec
+    python -m src.backend.benchmarks.codec --records 500 --iterations 50 --output codec.json
+
+创建日期: 2025-10-23
+版本: v1.0
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..msgCenter_server.standard_protocol import MessageType, StandardMessageHandler
+from ..msgCenter_server.wire_codec import (
+    CODEC_DEFLATE, DEFAULT_COMPRESS_THRESHOLD, WireCodec, available_codecs, dumps,
+)
+from .generator import DEFAULT_SEED, SyntheticLibraryGenerator
+from .runner import REPORT_FORMAT_VERSION, summarize
+
+
+def build_payloads(records: int = 200, seed: int = DEFAULT_SEED) -> Dict[str, Dict[str, Any]]:
+    """由合成库构造各类典型消息（records 为每类负载包含的 PDF 数）"""
+    bundles = list(SyntheticLibraryGenerator(seed).iter_library(records))
+
+    def response(message_type: MessageType, data: Dict[str, Any]) -> Dict[str, Any]:
+        return StandardMessageHandler.build_response(
+            message_type, 'bench-codec', status='success', code=200, message='ok', data=data,
+        )
+
+    files = [b['pdf_info'][0] for b in bundles]
+    bookmarks = [row for b in bundles for row in b['pdf_bookmark']]
+    annotations = [row for b in bundles for row in b['pdf_annotation']]
+    return {
+        'heartbeat': response(MessageType.HEARTBEAT_COMPLETED, {'status': 'alive'}),
+        'library_page': response(MessageType.PDF_LIBRARY_LIST_COMPLETED, {
+            'files': files, 'pagination': {'limit': records, 'has_more': True, 'next_cursor': 'c'},
+        }),
+        'bookmark_tree': response(MessageType.BOOKMARK_LIST_COMPLETED, {
+            'bookmarks': bookmarks, 'count': len(bookmarks),
+        }),
+        'annotation_list': response(MessageType.ANNOTATION_LIST_COMPLETED, {
+            'annotations': annotations, 'count': len(annotations),
+        }),
+    }
+
+
+def codec_variants(threshold: int = DEFAULT_COMPRESS_THRESHOLD) -> Dict[str, WireCodec]:
+    """待比较的编码配置：json、deflate（快速/默认压缩级别）与已安装时的 msgpack"""
+    variants: Dict[str, WireCodec] = {}
+    for name in available_codecs():
+        if name == CODEC_DEFLATE:
+            variants['deflate-1'] = WireCodec(name, threshold=threshold, level=1)
+            variants['deflate-6'] = WireCodec(name, threshold=threshold, level=6)
+        else:
+            variants[name] = WireCodec(name, threshold=threshold)
+    return variants
+
+
+def _time_ms(fn: Callable[[], Any], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def measure(codec: WireCodec, message: Dict[str, Any], iterations: int) -> Dict[str, Any]:
+    """单个编码 x 单个负载：编码/解码分位数、吞吐量与线路字节数"""
+    text = dumps(message)
+    json_bytes = len(text.encode('utf-8'))
+    wire = codec.encode(text, message)
+    binary = isinstance(wire, bytes)
+
+    def encode() -> Any:
+        return codec.encode(dumps(message), message)
+
+    def decode() -> Any:
+        return codec.decode(wire) if binary else json.loads(wire)
+
+    assert decode() == json.loads(text)
+    encode_stats = summarize(_time_ms(encode, iterations))
+    decode_stats = summarize(_time_ms(decode, iterations))
+    wire_bytes = len(wire) if binary else json_bytes
+
+    def throughput(stats: Dict[str, Any]) -> float:
+        return round(json_bytes / 1024 / 1024 / (stats['mean_ms'] / 1000), 1) if stats['mean_ms'] else 0.0
+
+    return {
+        'json_bytes': json_bytes,
+        'wire_bytes': wire_bytes,
+        'ratio': round(wire_bytes / json_bytes, 3) if json_bytes else 1.0,
+        'binary_frame': binary,
+        'encode': {**encode_stats, 'mb_per_s': throughput(encode_stats)},
+        'decode': {**decode_stats, 'mb_per_s': throughput(decode_stats)},
+    }
+
+
+def run_codec_benchmark(
+    *,
+    records: int = 200,
+    iterations: int = 30,
+    threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    codecs: Optional[Sequence[str]] = None,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    """
+    对各编码与负载执行编码/解码基准
+
+    Returns:
+        Dict[str, Any]: 报告（meta / payloads / codecs[codec][payload]）
+    """
+    payloads = build_payloads(records, seed)
+    variants = codec_variants(threshold)
+    if codecs:
+        unknown = [name for name in codecs if name not in variants]
+        if unknown:
+            raise ValueError(f"未知编码: {', '.join(unknown)}（可选 {', '.join(variants)}）")
+        variants = {name: variants[name] for name in codecs}
+
+    results = {
+        name: {payload: measure(codec, message, iterations) for payload, message in payloads.items()}
+        for name, codec in variants.items()
+    }
+    return {
+        'format_version': REPORT_FORMAT_VERSION,
+        'meta': {
+            'records': records,
+            'iterations': iterations,
+            'threshold': threshold,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'codecs': results,
+    }
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.backend.benchmarks.codec',
+        description='消息中心线路编码（json / deflate / msgpack）编解码基准',
+    )
+    parser.add_argument('--codec', action='append', dest='codecs',
+                        help='要测量的编码配置（可重复，默认全部可用编码）')
+    parser.add_argument('--records', type=int, default=200, help='每类负载包含的 PDF 数（默认 200）')
+    parser.add_argument('--iterations', type=int, default=30, help='每项计时次数（默认 30）')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_COMPRESS_THRESHOLD,
+                        help=f'deflate 压缩阈值（默认 {DEFAULT_COMPRESS_THRESHOLD}）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_arguments(argv)
+    report = run_codec_benchmark(
+        records=args.records,
+        iterations=args.iterations,
+        threshold=args.threshold,
+        codecs=args.codecs,
+        seed=args.seed,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
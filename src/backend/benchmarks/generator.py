@@ -0,0 +1,319 @@
+"""
+合成 PDF 库数据生成器
+
+按固定随机种子生成可复现的合成数据（同一 seed 与规模每次生成的行完全一致）：
+- pdf_info：中英混合标题（含 CJK）、作者、标签、评分、阅读统计、可见性
+- pdf_bookmark：每本 PDF 若干根书签及少量子书签
+- pdf_annotation：text-highlight / comment 两类标注
+- pdf_bookanchor：少量锚点
+
+每行先经对应插件的 validate_data 校验，再用 executemany 分批写入，
+避免 10 万级数据逐行 insert（每行一次提交 + 事件发射）拖慢准备阶段。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import hashlib
+import json
+import random
+import string
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+SCALES: Dict[str, int] = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+}
+
+DEFAULT_SEED = 20251018
+BASE_TIMESTAMP_MS = 1730726400000  # 2024-11-04 00:00:00 UTC
+_DAY_MS = 86_400_000
+
+TITLE_WORDS_CJK = [
+    '机器学习', '深度学习', '线性代数', '概率论', '数据库系统', '操作系统', '编译原理',
+    '计算机网络', '算法导论', '数值分析', '量子力学', '有机化学', '细胞生物学', '宏观经济学',
+    '日本語入門', '韓國語', '古代汉语', '现代文学', '心理学', '统计学习',
+]
+TITLE_WORDS_LATIN = [
+    'Introduction', 'Advanced', 'Handbook', 'Principles', 'Systems', 'Analysis', 'Design',
+    'Patterns', 'Networks', 'Learning', 'Theory', 'Practice', 'Methods', 'Guide', 'Notes',
+    'SQLite', 'Python', 'Rust', 'Distributed', 'Graph',
+]
+AUTHORS = [
+    '张三', '李四', '王五', '赵六', '周树人', '钱钟书', 'Donald Knuth', 'Ian Goodfellow',
+    'Andrew Ng', 'Martin Kleppmann', 'Bjarne Stroustrup', '山田太郎', '김철수',
+]
+TAGS = [
+    '数学', '物理', '化学', '生物', '计算机', '经济', '文学', '历史', '哲学', '语言',
+    '待读', '已读', '精读', '复习', '考试', '论文', '教材', '参考',
+    'math', 'cs', 'ml', 'db', 'os', 'network', 'review', 'todo', 'paper', 'book',
+]
+HIGHLIGHT_COLORS = ['#ffeb3b', '#8bc34a', '#03a9f4', '#ff9800', '#e91e63']
+
+_ID_ALPHABET = string.ascii_letters + string.digits + '-_'
+
+
+@dataclass(frozen=True)
+class LibraryProfile:
+    """每本 PDF 的子记录数量范围（闭区间）"""
+
+    bookmarks: tuple = (0, 8)
+    child_bookmark_ratio: float = 0.3
+    annotations: tuple = (0, 6)
+    anchors: tuple = (0, 1)
+    max_tags: int = 4
+
+
+def resolve_scale(scale: Any) -> int:
+    """将 '1k'/'10k'/'100k' 或整数解析为 PDF 数量"""
+    if isinstance(scale, int):
+        return scale
+    key = str(scale).strip().lower()
+    if key in SCALES:
+        return SCALES[key]
+    try:
+        return int(key)
+    except ValueError:
+        raise ValueError(f"未知规模: {scale}（可选 {', '.join(SCALES)} 或整数）")
+
+
+class SyntheticLibraryGenerator:
+    """
+    可复现的合成 PDF 库生成器
+
+    Example:
+        >>> generator = SyntheticLibraryGenerator(seed=42)
+        >>> summary = generator.populate(api, '10k')
+        >>> print(summary['pdf_info'], summary['pdf_bookmark'])
+    """
+
+    def __init__(
+        self,
+        seed: int = DEFAULT_SEED,
+        *,
+        profile: Optional[LibraryProfile] = None,
+        base_timestamp: int = BASE_TIMESTAMP_MS,
+    ):
+        self._seed = seed
+        self._profile = profile or LibraryProfile()
+        self._base_ts = base_timestamp
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    # ==================== 行生成 ====================
+
+    def pdf_uuid(self, index: int) -> str:
+        """第 index 本 PDF 的 uuid（12 位 hex，由 seed 与序号确定）"""
+        return hashlib.md5(f"{self._seed}:{index}".encode('ascii')).hexdigest()[:12]
+
+    def iter_library(self, count: int) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        """
+        逐本生成 PDF 及其子记录
+
+        Yields:
+            Dict: {'pdf_info': [row], 'pdf_bookmark': [...], 'pdf_annotation': [...], 'pdf_bookanchor': [...]}
+        """
+        rng = random.Random(self._seed)
+        for index in range(count):
+            uuid = self.pdf_uuid(index)
+            yield {
+                'pdf_info': [self._make_pdf(rng, index, uuid)],
+                'pdf_bookmark': self._make_bookmarks(rng, index, uuid),
+                'pdf_annotation': self._make_annotations(rng, uuid),
+                'pdf_bookanchor': self._make_anchors(rng, uuid),
+            }
+
+    def _make_pdf(self, rng: random.Random, index: int, uuid: str) -> Dict[str, Any]:
+        created = self._base_ts + rng.randint(0, 365) * _DAY_MS + rng.randint(0, _DAY_MS - 1)
+        updated = created + rng.randint(0, 30) * _DAY_MS
+        visited = updated + rng.randint(0, 30) * _DAY_MS if rng.random() < 0.7 else 0
+        title_parts = [rng.choice(TITLE_WORDS_CJK), rng.choice(TITLE_WORDS_LATIN)]
+        if rng.random() < 0.5:
+            title_parts.append(rng.choice(TITLE_WORDS_CJK))
+        rng.shuffle(title_parts)
+        tags = rng.sample(TAGS, rng.randint(0, self._profile.max_tags))
+        return {
+            'uuid': uuid,
+            'title': f"{' '.join(title_parts)} 第{index % 12 + 1}版",
+            'author': rng.choice(AUTHORS),
+            'page_count': rng.randint(10, 1200),
+            'file_size': rng.randint(50_000, 80_000_000),
+            'created_at': created,
+            'updated_at': updated,
+            'visited_at': visited,
+            'version': 1,
+            'json_data': {
+                'filename': f"{uuid}.pdf",
+                'filepath': f"data/pdfs/{uuid}.pdf",
+                'subject': rng.choice(TITLE_WORDS_CJK),
+                'keywords': ','.join(rng.sample(TITLE_WORDS_LATIN, 2)),
+                'thumbnail_path': None,
+                'tags': tags,
+                'notes': rng.choice(['', '', '重点章节', 'revisit later', '考试范围']),
+                'last_accessed_at': visited,
+                'review_count': rng.randint(0, 20),
+                'rating': rng.randint(0, 5),
+                'is_visible': rng.random() > 0.05,
+                'total_reading_time': rng.randint(0, 36_000),
+                'due_date': 0,
+            },
+        }
+
+    def _make_bookmarks(self, rng: random.Random, index: int, uuid: str) -> List[Dict[str, Any]]:
+        low, high = self._profile.bookmarks
+        rows: List[Dict[str, Any]] = []
+        root_ids: List[str] = []
+        for order in range(rng.randint(low, high)):
+            parent_id = None
+            if root_ids and rng.random() < self._profile.child_bookmark_ratio:
+                parent_id = rng.choice(root_ids)
+            bookmark_id = f"bookmark-{self._base_ts + index}-{self._random_token(rng, 9, string.ascii_lowercase + string.digits)}"
+            ts = self._base_ts + index * 1000 + order
+            rows.append({
+                'bookmark_id': bookmark_id,
+                'pdf_uuid': uuid,
+                'created_at': ts,
+                'updated_at': ts,
+                'version': 1,
+                'json_data': {
+                    'name': f"第{order + 1}章 {rng.choice(TITLE_WORDS_CJK)}",
+                    'type': 'page',
+                    'pageNumber': rng.randint(1, 500),
+                    'region': None,
+                    'children': [],
+                    'parentId': parent_id,
+                    'order': order,
+                },
+            })
+            if parent_id is None:
+                root_ids.append(bookmark_id)
+        return rows
+
+    def _make_annotations(self, rng: random.Random, uuid: str) -> List[Dict[str, Any]]:
+        low, high = self._profile.annotations
+        rows: List[Dict[str, Any]] = []
+        for _ in range(rng.randint(low, high)):
+            ts = self._base_ts + rng.randint(0, 365) * _DAY_MS
+            if rng.random() < 0.7:
+                ann_type = 'text-highlight'
+                text = f"{rng.choice(TITLE_WORDS_CJK)} {rng.choice(TITLE_WORDS_LATIN)}"
+                data = {
+                    'selectedText': text,
+                    'textRanges': [{'start': 0, 'end': len(text)}],
+                    'highlightColor': rng.choice(HIGHLIGHT_COLORS),
+                }
+            else:
+                ann_type = 'comment'
+                data = {
+                    'position': {'x': rng.randint(0, 600), 'y': rng.randint(0, 800)},
+                    'content': f"批注：{rng.choice(TITLE_WORDS_CJK)}",
+                }
+            rows.append({
+                'ann_id': f"pdfannotation-{self._random_token(rng, 16, _ID_ALPHABET)}",
+                'pdf_uuid': uuid,
+                'page_number': rng.randint(1, 500),
+                'type': ann_type,
+                'created_at': ts,
+                'updated_at': ts,
+                'version': 1,
+                'json_data': {'data': data, 'comments': []},
+            })
+        return rows
+
+    def _make_anchors(self, rng: random.Random, uuid: str) -> List[Dict[str, Any]]:
+        low, high = self._profile.anchors
+        rows: List[Dict[str, Any]] = []
+        for seq in range(rng.randint(low, high)):
+            ts = self._base_ts + rng.randint(0, 365) * _DAY_MS
+            rows.append({
+                'uuid': f"pdfanchor-{self._random_token(rng, 12, '0123456789abcdef')}",
+                'pdf_uuid': uuid,
+                'page_at': rng.randint(1, 500),
+                'position': round(rng.random(), 4),
+                'visited_at': ts,
+                'created_at': ts,
+                'updated_at': ts,
+                'version': 1,
+                'json_data': {'name': f"锚点{seq + 1}", 'description': '', 'use_count': rng.randint(0, 9)},
+            })
+        return rows
+
+    @staticmethod
+    def _random_token(rng: random.Random, length: int, alphabet: str) -> str:
+        return ''.join(rng.choice(alphabet) for _ in range(length))
+
+    # ==================== 写入 ====================
+
+    def populate(self, api: Any, scale: Any, *, batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        生成数据并批量写入 PDFLibraryAPI 对应的数据库
+
+        Args:
+            api: PDFLibraryAPI 实例（已建表）
+            scale: '1k'/'10k'/'100k' 或 PDF 数量
+            batch_size: 每次 executemany 的行数
+
+        Returns:
+            Dict[str, Any]: 各表写入行数与耗时 duration_ms
+        """
+        count = resolve_scale(scale)
+        started = time.perf_counter()
+        # 顺序很重要：子表外键引用 pdf_info
+        tables = ('pdf_info', 'pdf_bookmark', 'pdf_annotation', 'pdf_bookanchor')
+        plugins = {
+            'pdf_info': api._pdf_info_plugin,
+            'pdf_bookmark': api._bookmark_plugin,
+            'pdf_annotation': api._annotation_plugin,
+            'pdf_bookanchor': api._bookanchor_plugin,
+        }
+        executor = api._executor
+        pending: Dict[str, List[tuple]] = {name: [] for name in tables}
+        counts: Dict[str, int] = {name: 0 for name in tables}
+
+        def flush() -> None:
+            for name in tables:
+                if pending[name]:
+                    executor.execute_batch(_INSERT_SQL[name], pending[name])
+                    counts[name] += len(pending[name])
+                    pending[name] = []
+
+        for bundle in self.iter_library(count):
+            for name in tables:
+                for row in bundle[name]:
+                    validated = plugins[name].validate_data(row)
+                    pending[name].append(_to_params(name, validated))
+            if len(pending['pdf_info']) >= batch_size:
+                flush()
+        flush()
+
+        summary: Dict[str, Any] = dict(counts)
+        summary['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return summary
+
+
+_COLUMNS: Dict[str, tuple] = {
+    'pdf_info': ('uuid', 'title', 'author', 'page_count', 'file_size',
+                 'created_at', 'updated_at', 'visited_at', 'version', 'json_data'),
+    'pdf_bookmark': ('bookmark_id', 'pdf_uuid', 'created_at', 'updated_at', 'version', 'json_data'),
+    'pdf_annotation': ('ann_id', 'pdf_uuid', 'page_number', 'type',
+                       'created_at', 'updated_at', 'version', 'json_data'),
+    'pdf_bookanchor': ('uuid', 'pdf_uuid', 'page_at', 'position', 'visited_at',
+                       'created_at', 'updated_at', 'version', 'json_data'),
+}
+
+_INSERT_SQL: Dict[str, str] = {
+    name: f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    for name, columns in _COLUMNS.items()
+}
+
+
+def _to_params(table: str, validated: Dict[str, Any]) -> tuple:
+    return tuple(
+        json.dumps(validated[column], ensure_ascii=False) if column == 'json_data' else validated[column]
+        for column in _COLUMNS[table]
+    )
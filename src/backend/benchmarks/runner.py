@@ -0,0 +1,342 @@
+"""
+数据层基准场景与报告
+
+场景（每个场景对同一合成库重复执行 iterations 次，记录单次耗时）：
+- search: 关键词搜索（中英文 token）+ need_total
+- search_filtered: 关键词 + 评分/标签筛选
+- sort: 无关键词，按评分、标题、文件大小等 SQL 可排序字段排序
+- paginate: list_records 与按 visited_at 排序的深分页
+- bulk_save: save_bookmarks 整树替换（20 个书签，含子书签）
+- detail: 详情页加载（get_record_detail + list_bookmarks + 标注列表）
+
+报告为 JSON：各场景 p50/p95/p99/mean/max（毫秒）与进程峰值 RSS；
+compare_reports() 将报告与基线比较，超出容差的分位数视为回归。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import gc
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..api.pdf_library_api import PDFLibraryAPI
+from ..database.connection import DatabaseConnectionManager
+from ..database.plugin.plugin_registry import TablePluginRegistry
+from .generator import (
+    DEFAULT_SEED,
+    TAGS,
+    TITLE_WORDS_CJK,
+    TITLE_WORDS_LATIN,
+    SyntheticLibraryGenerator,
+    resolve_scale,
+)
+
+REPORT_FORMAT_VERSION = 1
+PERCENTILES = (50, 95, 99)
+SORT_RULES = [
+    [{'field': 'rating', 'direction': 'desc'}, {'field': 'updated_at', 'direction': 'desc'}],
+    [{'field': 'title', 'direction': 'asc'}],
+    [{'field': 'file_size', 'direction': 'desc'}],
+    [{'field': 'total_reading_time', 'direction': 'desc'}],
+    [{'field': 'annotation_count', 'direction': 'desc'}],
+]
+
+Scenario = Callable[['BenchmarkContext', random.Random], Any]
+
+
+class BenchmarkContext:
+    """场景执行上下文：持有 API 实例与已生成的 PDF uuid 列表"""
+
+    def __init__(self, api: PDFLibraryAPI, pdf_uuids: Sequence[str]):
+        self.api = api
+        self.pdf_uuids = list(pdf_uuids)
+
+
+# ==================== 场景 ====================
+
+def _scenario_search(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    token = rng.choice(TITLE_WORDS_CJK + TITLE_WORDS_LATIN).lower()
+    return ctx.api.search_records({
+        'query': token,
+        'tokens': [token],
+        'pagination': {'limit': 50, 'offset': 0, 'need_total': True},
+    })
+
+
+def _scenario_search_filtered(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    token = rng.choice(TITLE_WORDS_CJK).lower()
+    return ctx.api.search_records({
+        'query': token,
+        'tokens': [token],
+        'filters': {
+            'type': 'composite',
+            'operator': 'AND',
+            'conditions': [
+                {'type': 'field', 'field': 'rating', 'operator': 'gte', 'value': rng.randint(1, 4)},
+                {'type': 'field', 'field': 'tags', 'operator': 'has_any', 'value': rng.sample(TAGS, 3)},
+            ],
+        },
+        'pagination': {'limit': 50, 'offset': 0, 'need_total': True},
+    })
+
+
+def _scenario_sort(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    return ctx.api.search_records({
+        'tokens': [],
+        'sort': rng.choice(SORT_RULES),
+        'pagination': {'limit': 50, 'offset': 0, 'need_total': True},
+    })
+
+
+def _scenario_paginate(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    pages = max(1, len(ctx.pdf_uuids) // 50)
+    offset = rng.randrange(pages) * 50
+    if rng.random() < 0.5:
+        return ctx.api.list_records(limit=50, offset=offset)
+    return ctx.api.search_records({
+        'tokens': [],
+        'sort': [{'field': 'visited_at', 'direction': 'desc'}],
+        'pagination': {'limit': 50, 'offset': offset, 'need_total': True},
+    })
+
+
+def _scenario_bulk_save(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    pdf_uuid = rng.choice(ctx.pdf_uuids)
+    stamp = rng.randrange(10 ** 12)
+    bookmarks: List[Dict[str, Any]] = []
+    for order in range(10):
+        children = [
+            {
+                'id': f"bookmark-{stamp}-c{order}x{child}",
+                'name': f"小节 {order + 1}.{child + 1}",
+                'type': 'page',
+                'pageNumber': rng.randint(1, 500),
+                'order': child,
+                'children': [],
+            }
+            for child in range(1 if order % 2 else 0)
+        ]
+        bookmarks.append({
+            'id': f"bookmark-{stamp}-r{order}",
+            'name': f"第{order + 1}章",
+            'type': 'page',
+            'pageNumber': rng.randint(1, 500),
+            'order': order,
+            'children': children,
+        })
+    # 补足 20 个节点：再追加 5 个无子节点的根书签
+    for order in range(10, 15):
+        bookmarks.append({
+            'id': f"bookmark-{stamp}-r{order}",
+            'name': f"附录 {order - 9}",
+            'type': 'page',
+            'pageNumber': rng.randint(1, 500),
+            'order': order,
+            'children': [],
+        })
+    return ctx.api.save_bookmarks(pdf_uuid, bookmarks)
+
+
+def _scenario_detail(ctx: BenchmarkContext, rng: random.Random) -> Any:
+    pdf_uuid = rng.choice(ctx.pdf_uuids)
+    detail = ctx.api.get_record_detail(pdf_uuid)
+    bookmarks = ctx.api.list_bookmarks(pdf_uuid)
+    annotations = ctx.api._annotation_plugin.query_by_pdf(pdf_uuid)
+    return detail, bookmarks, annotations
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'search': _scenario_search,
+    'search_filtered': _scenario_search_filtered,
+    'sort': _scenario_sort,
+    'paginate': _scenario_paginate,
+    'bulk_save': _scenario_bulk_save,
+    'detail': _scenario_detail,
+}
+
+
+# ==================== 统计 ====================
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """线性插值分位数（sorted_values 需已升序）"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return float(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower))
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, Any]:
+    """将单次耗时样本汇总为分位数统计"""
+    ordered = sorted(samples_ms)
+    summary: Dict[str, Any] = {'iterations': len(ordered)}
+    for pct in PERCENTILES:
+        summary[f'p{pct}_ms'] = round(percentile(ordered, pct), 3)
+    summary['mean_ms'] = round(sum(ordered) / len(ordered), 3) if ordered else 0.0
+    summary['max_ms'] = round(ordered[-1], 3) if ordered else 0.0
+    return summary
+
+
+def peak_rss_kb() -> Optional[int]:
+    """进程峰值常驻内存（KB）；平台不支持时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 返回字节，Linux 返回 KB
+        return int(peak // 1024) if sys.platform == 'darwin' else int(peak)
+    try:
+        import psutil  # type: ignore
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    peak = getattr(info, 'peak_wset', None) or info.rss
+    return int(peak // 1024)
+
+
+# ==================== 执行 ====================
+
+def run_benchmark(
+    scale: Any = '1k',
+    *,
+    scenarios: Optional[Sequence[str]] = None,
+    iterations: int = 50,
+    warmup: int = 3,
+    seed: int = DEFAULT_SEED,
+    db_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    生成合成库并执行基准场景
+
+    Args:
+        scale: '1k'/'10k'/'100k' 或 PDF 数量
+        scenarios: 要执行的场景名（默认全部）
+        iterations: 每个场景计时次数
+        warmup: 每个场景预热次数（不计时）
+        seed: 数据与场景参数的随机种子
+        db_path: 数据库文件路径（默认临时目录，结束后删除）
+
+    Returns:
+        Dict[str, Any]: 报告（meta / populate / scenarios / peak_rss_kb）
+    """
+    names = list(scenarios or SCENARIOS.keys())
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"未知场景: {', '.join(unknown)}（可选 {', '.join(SCENARIOS)}）")
+
+    count = resolve_scale(scale)
+    temp_dir = None
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix='pdf-library-bench-')
+        db_path = str(Path(temp_dir.name) / 'bench.db')
+
+    # DatabaseConnectionManager / TablePluginRegistry 为单例，需重置后才能指向基准库
+    DatabaseConnectionManager._instance = None
+    TablePluginRegistry.reset_instance()
+    api = PDFLibraryAPI(db_path=db_path)
+    try:
+        generator = SyntheticLibraryGenerator(seed)
+        populate = generator.populate(api, count)
+        ctx = BenchmarkContext(api, [generator.pdf_uuid(i) for i in range(count)])
+
+        results: Dict[str, Any] = {}
+        for name in names:
+            scenario = SCENARIOS[name]
+            rng = random.Random(f"{seed}:{name}")
+            for _ in range(warmup):
+                scenario(ctx, rng)
+            samples: List[float] = []
+            gc.collect()
+            for _ in range(iterations):
+                started = time.perf_counter()
+                scenario(ctx, rng)
+                samples.append((time.perf_counter() - started) * 1000)
+            results[name] = summarize(samples)
+    finally:
+        api.shutdown()
+        TablePluginRegistry.reset_instance()
+        DatabaseConnectionManager._instance = None
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    return {
+        'format_version': REPORT_FORMAT_VERSION,
+        'meta': {
+            'scale': count,
+            'seed': seed,
+            'iterations': iterations,
+            'warmup': warmup,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'populate': populate,
+        'scenarios': results,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    tolerance: float = 0.2,
+    min_delta_ms: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    与基线报告比较
+
+    某场景分位数满足 current > baseline * (1 + tolerance) 且差值超过 min_delta_ms
+    （过滤亚毫秒抖动）时记为回归。
+
+    Returns:
+        Dict[str, Any]: {'regressions': [...], 'improvements': [...], 'rows': [...], 'ok': bool}
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions: List[Dict[str, Any]] = []
+    improvements: List[Dict[str, Any]] = []
+    base_scenarios = baseline.get('scenarios', {})
+    for name, stats in current.get('scenarios', {}).items():
+        base = base_scenarios.get(name)
+        if not base:
+            continue
+        for pct in PERCENTILES:
+            key = f'p{pct}_ms'
+            cur_value = float(stats.get(key, 0.0))
+            base_value = float(base.get(key, 0.0))
+            delta = cur_value - base_value
+            ratio = cur_value / base_value if base_value > 0 else None
+            row = {
+                'scenario': name,
+                'metric': key,
+                'baseline': base_value,
+                'current': cur_value,
+                'delta_ms': round(delta, 3),
+                'ratio': round(ratio, 3) if ratio is not None else None,
+            }
+            rows.append(row)
+            if delta > min_delta_ms and cur_value > base_value * (1 + tolerance):
+                regressions.append(row)
+            elif -delta > min_delta_ms and cur_value < base_value * (1 - tolerance):
+                improvements.append(row)
+    return {
+        'ok': not regressions,
+        'scale_mismatch': baseline.get('meta', {}).get('scale') != current.get('meta', {}).get('scale'),
+        'regressions': regressions,
+        'improvements': improvements,
+        'rows': rows,
+    }
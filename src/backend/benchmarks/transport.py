@@ -0,0 +1,242 @@
+"""
+消息中心传输层基准
+
+分别以子进程启动 Qt（standard_server）与 asyncio（async_server）两种传输层，
+指向同一份合成库的副本，N 个并发客户端各自顺序发送心跳与 pdf-library:list 请求，
+记录往返耗时（发送到收到同 request_id 的响应）并按消息类型汇总 p50/p95/p99。
+
+示例:
+    python -m src.backend.benchmarks.transport --scale 1k --clients 8 --requests 50
+    python -m src.backend.benchmarks.transport --transport asyncio --workers 8 --output transport.json
+
+创建日期: 2025-10-22
+版本: v1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..api.pdf_library_api import PDFLibraryAPI
+from ..database.connection import DatabaseConnectionManager
+from ..database.plugin.plugin_registry import TablePluginRegistry
+from ..msgCenter_server.async_server import AsyncWebSocketClient
+from .generator import DEFAULT_SEED, SyntheticLibraryGenerator, resolve_scale
+from .runner import REPORT_FORMAT_VERSION, summarize
+
+TRANSPORT_MODULES = {
+    'qt': 'src.backend.msgCenter_server.standard_server',
+    'asyncio': 'src.backend.msgCenter_server.async_server',
+}
+
+# 每个客户端循环发送的请求（type, data）
+REQUEST_MIX = (
+    ('heartbeat', {}),
+    ('pdf-library:list:requested', {'pagination': {'limit': 50}}),
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def populate_library(db_path: str, scale: Any, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """在 db_path 生成合成库（各传输层复制同一份）"""
+    DatabaseConnectionManager._instance = None
+    TablePluginRegistry.reset_instance()
+    api = PDFLibraryAPI(db_path=db_path)
+    try:
+        return SyntheticLibraryGenerator(seed).populate(api, resolve_scale(scale))
+    finally:
+        api.shutdown()
+        TablePluginRegistry.reset_instance()
+        DatabaseConnectionManager._instance = None
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _client_session(host: str, port: int, client_index: int, requests: int,
+                          samples: Dict[str, List[float]]) -> None:
+    client = await AsyncWebSocketClient.connect(host, port)
+    try:
+        await client.recv()  # 欢迎消息
+        for i in range(requests):
+            message_type, data = REQUEST_MIX[i % len(REQUEST_MIX)]
+            request_id = f"bench-{client_index}-{i}"
+            started = time.perf_counter()
+            await client.send(json.dumps({
+                'type': message_type,
+                'request_id': request_id,
+                'timestamp': int(time.time() * 1000),
+                'data': data,
+            }))
+            # 跳过推送等其他消息，直到收到本请求的响应
+            while json.loads(await client.recv()).get('request_id') != request_id:
+                pass
+            samples.setdefault(message_type, []).append((time.perf_counter() - started) * 1000)
+    finally:
+        await client.close()
+
+
+async def run_clients(host: str, port: int, *, clients: int = 8, requests: int = 50) -> Dict[str, Any]:
+    """
+    并发客户端压测一个已启动的服务器
+
+    Returns:
+        Dict[str, Any]: {'messages': {type: 分位数统计}, 'wall_ms': 总耗时, 'throughput_rps': 每秒请求数}
+    """
+    samples: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client_session(host, port, index, requests, samples) for index in range(clients)
+    ))
+    wall_ms = (time.perf_counter() - started) * 1000
+    total = sum(len(values) for values in samples.values())
+    return {
+        'messages': {name: summarize(values) for name, values in sorted(samples.items())},
+        'wall_ms': round(wall_ms, 3),
+        'throughput_rps': round(total / (wall_ms / 1000), 1) if wall_ms else 0.0,
+    }
+
+
+async def _wait_until_listening(host: str, port: int, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务器进程提前退出（退出码 {process.returncode}）")
+        try:
+            client = await AsyncWebSocketClient.connect(host, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        await client.close()
+        return
+    raise RuntimeError(f"等待服务器监听超时: {host}:{port}")
+
+
+def run_transport(transport: str, db_path: str, *, clients: int, requests: int, workers: int,
+                  startup_timeout: float = 30.0) -> Dict[str, Any]:
+    """以子进程启动指定传输层并压测，结束后终止进程"""
+    host, port = '127.0.0.1', free_port()
+    cmd = [sys.executable, '-m', TRANSPORT_MODULES[transport],
+           '--port', str(port), '--workers', str(workers), '--db', db_path]
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    log_dir = Path(db_path).parent
+    with open(log_dir / f'{transport}.log', 'w', encoding='utf-8') as log_handle:
+        # 服务器在 cwd 下写 logs/；放到临时目录避免覆盖正在运行的服务日志
+        process = subprocess.Popen(
+            cmd, cwd=str(log_dir), env={**env, 'PYTHONPATH': str(PROJECT_ROOT)},
+            stdout=log_handle, stderr=subprocess.STDOUT,
+        )
+        try:
+            async def scenario():
+                await _wait_until_listening(host, port, process, startup_timeout)
+                return await run_clients(host, port, clients=clients, requests=requests)
+            return asyncio.run(scenario())
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def run_transport_benchmark(
+    transports: Sequence[str] = ('qt', 'asyncio'),
+    *,
+    scale: Any = '1k',
+    clients: int = 8,
+    requests: int = 50,
+    workers: int = 4,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    """
+    生成合成库并依次压测各传输层
+
+    Returns:
+        Dict[str, Any]: 报告（meta / populate / transports）
+    """
+    unknown = [name for name in transports if name not in TRANSPORT_MODULES]
+    if unknown:
+        raise ValueError(f"未知传输层: {', '.join(unknown)}（可选 {', '.join(TRANSPORT_MODULES)}）")
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix='msgcenter-transport-bench-') as temp_dir:
+        seed_db = str(Path(temp_dir) / 'seed.db')
+        populate = populate_library(seed_db, scale, seed)
+        for name in transports:
+            # 每个传输层使用独立副本，避免前一轮写入的 WAL/统计影响后一轮
+            run_dir = Path(temp_dir) / name
+            run_dir.mkdir()
+            db_path = str(run_dir / 'bench.db')
+            shutil.copyfile(seed_db, db_path)
+            results[name] = run_transport(name, db_path, clients=clients, requests=requests, workers=workers)
+
+    return {
+        'format_version': REPORT_FORMAT_VERSION,
+        'meta': {
+            'scale': resolve_scale(scale),
+            'seed': seed,
+            'clients': clients,
+            'requests_per_client': requests,
+            'workers': workers,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'populate': populate,
+        'transports': results,
+    }
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.backend.benchmarks.transport',
+        description='消息中心 Qt / asyncio 传输层对比基准',
+    )
+    parser.add_argument('--transport', action='append', choices=sorted(TRANSPORT_MODULES), dest='transports',
+                        help='要压测的传输层（可重复，默认全部）')
+    parser.add_argument('--scale', default='1k', help='合成库规模（默认 1k）')
+    parser.add_argument('--clients', type=int, default=8, help='并发客户端数（默认 8）')
+    parser.add_argument('--requests', type=int, default=50, help='每个客户端的请求数（默认 50）')
+    parser.add_argument('--workers', type=int, default=4, help='服务器阻塞处理线程数（默认 4）')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='随机种子')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_arguments(argv)
+    report = run_transport_benchmark(
+        args.transports or list(TRANSPORT_MODULES),
+        scale=args.scale,
+        clients=args.clients,
+        requests=args.requests,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,9 @@ from .exceptions import (
 from .connection import DatabaseConnectionManager
 from .transaction import TransactionManager
 from .executor import SQLExecutor
+from .backup import DatabaseBackupManager
+from .maintenance import DatabaseMaintenanceScheduler
+from .changelog import ChangeLog, compact_change_log
 
 __all__ = [
     # 配置
@@ -52,4 +55,8 @@ __all__ = [
     'DatabaseConnectionManager',
     'TransactionManager',
     'SQLExecutor',
+    'DatabaseBackupManager',
+    'DatabaseMaintenanceScheduler',
+    'ChangeLog',
+    'compact_change_log',
 ]
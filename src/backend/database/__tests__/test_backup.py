@@ -0,0 +1,103 @@
+"""
+在线备份测试
+
+测试 DatabaseBackupManager 的快照、校验、轮转与状态持久化。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import sqlite3
+
+import pytest
+
+from ..backup import DatabaseBackupManager
+from ..exceptions import DatabaseError
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    """提供包含数据的 WAL 模式源数据库"""
+    db_path = tmp_path / "library.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+    conn.executemany(
+        "INSERT INTO item (payload) VALUES (?)",
+        [("x" * 200,) for _ in range(2000)],
+    )
+    conn.commit()
+    yield db_path, conn
+    conn.close()
+
+
+class TestDatabaseBackupManager:
+    """在线备份管理器测试类"""
+
+    def test_snapshot_copies_data_and_verifies(self, source_db, tmp_path):
+        """测试：快照包含全部数据且通过完整性校验"""
+        db_path, _ = source_db
+        manager = DatabaseBackupManager(db_path, tmp_path / "backups", pages_per_step=8, step_sleep=0)
+
+        info = manager.create_snapshot()
+
+        assert info['integrity'] == 'ok'
+        snapshot = sqlite3.connect(info['path'])
+        try:
+            assert snapshot.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 2000
+        finally:
+            snapshot.close()
+        assert not list((tmp_path / "backups").glob("*.part"))
+
+    def test_snapshot_while_connection_open(self, source_db, tmp_path):
+        """测试：源连接存在未提交写入时仍可备份（只复制已提交数据）"""
+        db_path, conn = source_db
+        conn.execute("INSERT INTO item (payload) VALUES ('pending')")
+        manager = DatabaseBackupManager(db_path, tmp_path / "backups", step_sleep=0)
+
+        info = manager.create_snapshot()
+        conn.commit()
+
+        snapshot = sqlite3.connect(info['path'])
+        try:
+            assert snapshot.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 2000
+        finally:
+            snapshot.close()
+
+    def test_rotation_keeps_latest(self, source_db, tmp_path):
+        """测试：超过 keep 数量的旧快照被删除"""
+        db_path, _ = source_db
+        manager = DatabaseBackupManager(db_path, tmp_path / "backups", keep=2, step_sleep=0)
+
+        for _ in range(3):
+            manager.create_snapshot()
+
+        assert len(manager.list_snapshots()) == 2
+
+    def test_status_persisted(self, source_db, tmp_path):
+        """测试：完成后的状态可被新实例读取"""
+        db_path, _ = source_db
+        DatabaseBackupManager(db_path, tmp_path / "backups", step_sleep=0).create_snapshot()
+
+        status = DatabaseBackupManager(db_path, tmp_path / "backups").status()
+        assert status['state'] == 'completed'
+        assert status['last_snapshot']['integrity'] == 'ok'
+        assert len(status['snapshots']) == 1
+
+    def test_background_snapshot(self, source_db, tmp_path):
+        """测试：后台线程快照"""
+        db_path, _ = source_db
+        manager = DatabaseBackupManager(db_path, tmp_path / "backups", step_sleep=0)
+
+        assert manager.start_snapshot() is True
+        manager.wait(10)
+
+        assert manager.status()['state'] == 'completed'
+
+    def test_missing_database_fails(self, tmp_path):
+        """测试：源数据库不存在时抛出 DatabaseError 并记录失败状态"""
+        manager = DatabaseBackupManager(tmp_path / "missing.db", tmp_path / "backups")
+
+        with pytest.raises(DatabaseError):
+            manager.create_snapshot()
+        assert manager.status()['state'] == 'failed'
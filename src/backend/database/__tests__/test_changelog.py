@@ -0,0 +1,139 @@
+"""
+变更日志测试
+
+测试 ChangeLog 的触发器记录、增量合并、分页与 compact_change_log 的压缩水位。
+
+创建日期: 2025-10-20
+版本: v1.0
+"""
+
+import sqlite3
+
+import pytest
+
+from ..changelog import ChangeLog, compact_change_log
+from ..executor import SQLExecutor
+
+
+@pytest.fixture
+def changelog(tmp_db_path):
+    """提供带 pdf_info / pdf_annotation 简化表与变更日志的连接"""
+    conn = sqlite3.connect(str(tmp_db_path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript("""
+        CREATE TABLE pdf_info (
+            uuid TEXT PRIMARY KEY NOT NULL,
+            title TEXT,
+            version INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE TABLE pdf_annotation (
+            ann_id TEXT PRIMARY KEY NOT NULL,
+            pdf_uuid TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (pdf_uuid) REFERENCES pdf_info(uuid) ON DELETE CASCADE
+        );
+    """)
+    log = ChangeLog(SQLExecutor(conn))
+    assert log.ensure_schema() == ['pdf_info', 'pdf_annotation']
+    yield conn, log
+    conn.close()
+
+
+class TestChangeLog:
+    """变更日志测试类"""
+
+    def test_triggers_record_insert_update_delete(self, changelog):
+        """测试：三种写操作均追加日志，seq 单调递增"""
+        conn, log = changelog
+        conn.execute("INSERT INTO pdf_info (uuid, title) VALUES ('p1', 'A')")
+        conn.execute("UPDATE pdf_info SET title = 'B', version = version + 1 WHERE uuid = 'p1'")
+        conn.execute("INSERT INTO pdf_info (uuid, title) VALUES ('p2', 'C')")
+        conn.execute("DELETE FROM pdf_info WHERE uuid = 'p2'")
+        conn.commit()
+
+        rows = conn.execute("SELECT seq, table_name, pk, op, version FROM change_log ORDER BY seq").fetchall()
+        assert [(r['pk'], r['op'], r['version']) for r in rows] == [
+            ('p1', 'insert', 1), ('p1', 'update', 2), ('p2', 'insert', 1), ('p2', 'delete', 1),
+        ]
+        assert [r['seq'] for r in rows] == sorted(r['seq'] for r in rows)
+        assert log.latest_seq() == rows[-1]['seq']
+
+    def test_changes_since_coalesces_per_row(self, changelog):
+        """测试：同一行只返回最后一次变更，级联删除的子行同样记录"""
+        conn, log = changelog
+        conn.execute("INSERT INTO pdf_info (uuid, title) VALUES ('p1', 'A')")
+        conn.execute("INSERT INTO pdf_annotation (ann_id, pdf_uuid) VALUES ('a1', 'p1')")
+        conn.commit()
+        checkpoint = log.changes_since(0)['last_seq']
+
+        conn.execute("UPDATE pdf_info SET title = 'B', version = 2 WHERE uuid = 'p1'")
+        conn.execute("UPDATE pdf_info SET title = 'C', version = 3 WHERE uuid = 'p1'")
+        conn.execute("INSERT INTO pdf_info (uuid, title) VALUES ('p2', 'D')")
+        conn.execute("DELETE FROM pdf_info WHERE uuid = 'p2'")
+        conn.commit()
+
+        delta = log.changes_since(checkpoint)
+        assert [(c['table'], c['pk'], c['op']) for c in delta['changes']] == [
+            ('pdf_info', 'p1', 'upsert'), ('pdf_info', 'p2', 'delete'),
+        ]
+        assert delta['changes'][0]['version'] == 3
+        assert delta['last_seq'] == log.latest_seq()
+        assert delta['has_more'] is False
+        assert delta['reset_required'] is False
+
+        conn.execute("DELETE FROM pdf_info WHERE uuid = 'p1'")
+        conn.commit()
+        cascaded = log.changes_since(delta['last_seq'])['changes']
+        assert {(c['table'], c['pk'], c['op'], c['pdf_uuid']) for c in cascaded} == {
+            ('pdf_annotation', 'a1', 'delete', 'p1'), ('pdf_info', 'p1', 'delete', 'p1'),
+        }
+
+    def test_changes_since_pages_with_limit(self, changelog):
+        """测试：limit 截断时 has_more 为真，继续以 last_seq 拉取"""
+        conn, log = changelog
+        conn.executemany("INSERT INTO pdf_info (uuid) VALUES (?)", [(f"p{i}",) for i in range(5)])
+        conn.commit()
+
+        first = log.changes_since(0, limit=3)
+        assert [c['pk'] for c in first['changes']] == ['p0', 'p1', 'p2']
+        assert first['has_more'] is True
+        second = log.changes_since(first['last_seq'], limit=3)
+        assert [c['pk'] for c in second['changes']] == ['p3', 'p4']
+        assert second['has_more'] is False
+        assert log.changes_since(second['last_seq'])['changes'] == []
+
+    def test_compact_drops_superseded_and_expired(self, changelog):
+        """测试：压缩合并被覆盖条目，过期条目推进 purged_seq 并要求落后客户端重置"""
+        conn, log = changelog
+        conn.execute("INSERT INTO pdf_info (uuid) VALUES ('p1')")
+        conn.execute("UPDATE pdf_info SET version = 2 WHERE uuid = 'p1'")
+        conn.execute("INSERT INTO pdf_info (uuid) VALUES ('p2')")
+        conn.commit()
+        conn.execute("UPDATE change_log SET changed_at = 0 WHERE pk = 'p1'")
+        conn.commit()
+        latest = log.latest_seq()
+
+        result = compact_change_log(conn, retain_seconds=60)
+        assert result['superseded'] == 1
+        assert result['expired'] == 1
+        assert result['remaining'] == 1
+        assert log.purged_seq() == result['purged_seq']
+
+        assert log.changes_since(0)['reset_required'] is True
+        current = log.changes_since(result['purged_seq'])
+        assert current['reset_required'] is False
+        assert [c['pk'] for c in current['changes']] == ['p2']
+        # AUTOINCREMENT 不复用被删除的 seq
+        conn.execute("INSERT INTO pdf_info (uuid) VALUES ('p3')")
+        conn.commit()
+        assert log.latest_seq() == latest + 1
+
+    def test_compact_enforces_max_rows(self, changelog):
+        """测试：超出 max_rows 时只保留最新的条目"""
+        conn, log = changelog
+        conn.executemany("INSERT INTO pdf_info (uuid) VALUES (?)", [(f"p{i}",) for i in range(6)])
+        conn.commit()
+
+        result = compact_change_log(conn, max_rows=2)
+        assert result['remaining'] == 2
+        assert [c['pk'] for c in log.changes_since(result['purged_seq'])['changes']] == ['p4', 'p5']
@@ -155,3 +155,66 @@ class TestDatabaseConnectionManager:
         except DatabaseConnectionError:
             # 预期异常
             pass
+
+    def test_pooled_connection_routes_executor_in_worker_thread(self, tmp_db_path):
+        """测试：工作线程借用独立连接，SQLExecutor 自动改用，退出作用域后归还"""
+        import threading
+
+        from ..executor import SQLExecutor
+
+        DatabaseConnectionManager._instance = None
+        manager = DatabaseConnectionManager(str(tmp_db_path), pool_size=1)
+        primary = manager.get_connection()
+        executor = SQLExecutor(primary)
+        executor.execute_script("CREATE TABLE t (id INTEGER)")
+
+        seen = {}
+
+        def worker():
+            with manager.pooled_connection() as conn:
+                seen['conn'] = conn
+                seen['routed'] = executor._conn is conn
+                executor.execute_update("INSERT INTO t (id) VALUES (1)")
+                seen['rows'] = executor.execute_query("SELECT id FROM t")
+                # 嵌套作用域复用同一连接，不会因池满而阻塞
+                with manager.pooled_connection(timeout=0.1) as nested:
+                    seen['nested'] = nested is conn
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen['conn'] is not primary
+        assert seen['routed'] and seen['nested']
+        assert seen['rows'] == [{'id': 1}]
+        assert executor._conn is primary
+        assert manager.pool_stats() == {'size': 1, 'created': 1, 'idle': 1, 'in_use': 0}
+
+        manager.close_all()
+        DatabaseConnectionManager._instance = None
+
+    def test_pooled_connection_times_out_when_exhausted(self, tmp_db_path):
+        """测试：连接池借满时等待超时抛出 DatabaseConnectionError"""
+        import threading
+
+        DatabaseConnectionManager._instance = None
+        manager = DatabaseConnectionManager(str(tmp_db_path), pool_size=1)
+        manager.get_connection()
+        errors = []
+
+        with manager.pooled_connection():
+            def worker():
+                try:
+                    with manager.pooled_connection(timeout=0.05):
+                        pass
+                except DatabaseConnectionError as exc:
+                    errors.append(exc)
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        assert len(errors) == 1
+        manager.close_all()
+        assert manager.pool_stats()['created'] == 0
+        DatabaseConnectionManager._instance = None
@@ -302,3 +302,32 @@ class TestSQLExecutor:
         assert row['id'] == 1
         assert row['name'] == 'Alice'
         assert row['age'] == 30
+
+    def test_constraint_error_does_not_block_transaction(self, db_connection):
+        """测试：约束错误后回滚隐式事务，后续 transaction() 写入正常"""
+        executor = SQLExecutor(db_connection)
+        executor.execute_script("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+        executor.execute_update("INSERT INTO test VALUES (?, ?)", (1, 'Alice'))
+
+        with pytest.raises(DatabaseConstraintError):
+            executor.execute_update("INSERT INTO test VALUES (?, ?)", (1, 'Bob'))
+        assert not db_connection.in_transaction
+
+        with executor.transaction():
+            executor.execute_update("INSERT INTO test VALUES (?, ?)", (2, 'Carol'))
+            executor.execute_batch("INSERT INTO test VALUES (?, ?)", [(3, 'Dave')])
+
+        rows = executor.execute_query("SELECT name FROM test ORDER BY id")
+        assert [row['name'] for row in rows] == ['Alice', 'Carol', 'Dave']
+
+    def test_transaction_rolls_back_stale_implicit_transaction(self, db_connection):
+        """测试：连接上残留隐式事务时 transaction() 仍可开启"""
+        executor = SQLExecutor(db_connection)
+        executor.execute_script("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+        db_connection.execute("INSERT INTO test VALUES (1)")
+        assert db_connection.in_transaction
+
+        with executor.transaction():
+            executor.execute_update("INSERT INTO test VALUES (2)")
+
+        assert [row['id'] for row in executor.execute_query("SELECT id FROM test")] == [2]
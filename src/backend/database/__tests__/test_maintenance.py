@@ -0,0 +1,204 @@
+"""
+后台维护调度器测试
+
+测试 DatabaseMaintenanceScheduler 的空闲判定、检查点、增量回收与指标记录。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from ..maintenance import DatabaseMaintenanceScheduler
+
+
+class FakeClock:
+    """可手动推进的单调时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def writer(tmp_path):
+    """提供开启 WAL 与增量回收的写入连接"""
+    db_path = tmp_path / "maint.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+    conn.commit()
+    yield db_path, conn
+    conn.close()
+
+
+def _fill(conn, rows=2000):
+    conn.executemany("INSERT INTO item (payload) VALUES (?)", [("x" * 500,) for _ in range(rows)])
+    conn.commit()
+
+
+class TestDatabaseMaintenanceScheduler:
+    """维护调度器测试类"""
+
+    def test_checkpoint_truncates_wal_over_threshold(self, writer):
+        """测试：WAL 超过阈值时执行 PASSIVE 后 TRUNCATE"""
+        db_path, conn = writer
+        _fill(conn)
+        assert os.path.getsize(f"{db_path}-wal") > 0
+        scheduler = DatabaseMaintenanceScheduler(db_path, wal_threshold_bytes=1024, clock=FakeClock())
+        try:
+            executed = scheduler.run_pending()
+        finally:
+            scheduler.stop()
+
+        assert executed['checkpoint']['mode'] == 'TRUNCATE'
+        assert os.path.getsize(f"{db_path}-wal") == 0
+
+    def test_optimize_waits_for_idle(self, writer):
+        """测试：有写入时不执行 optimize，空闲后执行并记录指标"""
+        db_path, conn = writer
+        clock = FakeClock()
+        scheduler = DatabaseMaintenanceScheduler(
+            db_path, idle_seconds=60, wal_threshold_bytes=1 << 40, clock=clock
+        )
+        try:
+            scheduler.run_pending()
+            _fill(conn, rows=10)
+            clock.now += 30
+            assert 'optimize' not in scheduler.run_pending()
+
+            clock.now += 61
+            executed = scheduler.run_pending()
+            assert executed['optimize']['action'] == 'analyze'
+
+            clock.now += 10
+            assert 'optimize' not in scheduler.run_pending()
+        finally:
+            scheduler.stop()
+
+        metrics = scheduler.metrics()
+        assert metrics['optimize']['runs'] == 1
+        assert metrics['optimize']['last_ms'] is not None
+
+    def test_incremental_vacuum_after_large_delete(self, writer):
+        """测试：大量删除后回收空闲页"""
+        db_path, conn = writer
+        _fill(conn)
+        conn.execute("DELETE FROM item")
+        conn.commit()
+        clock = FakeClock()
+        scheduler = DatabaseMaintenanceScheduler(
+            db_path, idle_seconds=0, vacuum_free_pages=10, clock=clock
+        )
+        try:
+            executed = scheduler.run_pending()
+        finally:
+            scheduler.stop()
+
+        assert executed['incremental_vacuum']['freed_pages'] > 0
+        assert scheduler.metrics()['incremental_vacuum']['runs'] == 1
+
+    def test_vacuum_skipped_without_incremental_mode(self, tmp_path):
+        """测试：auto_vacuum 非 INCREMENTAL 时跳过回收"""
+        db_path = tmp_path / "plain.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+        _fill(conn)
+        conn.execute("DELETE FROM item")
+        conn.commit()
+        conn.close()
+        scheduler = DatabaseMaintenanceScheduler(db_path, idle_seconds=0, vacuum_free_pages=1, clock=FakeClock())
+        try:
+            assert 'incremental_vacuum' not in scheduler.run_pending()
+        finally:
+            scheduler.stop()
+
+    def test_existing_database_converted_to_incremental(self, tmp_path):
+        """测试：已有库空闲时一次性转换为 auto_vacuum = INCREMENTAL，之后可增量回收"""
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+        _fill(conn)
+        conn.execute("DELETE FROM item")
+        conn.commit()
+        scheduler = DatabaseMaintenanceScheduler(db_path, idle_seconds=0, vacuum_free_pages=10, clock=FakeClock())
+        try:
+            executed = scheduler.run_pending()
+            assert executed['auto_vacuum_convert']['from'] == 0
+            assert executed['auto_vacuum_convert']['auto_vacuum'] == 2
+            with sqlite3.connect(str(db_path)) as check:
+                assert check.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+            _fill(conn)
+            conn.execute("DELETE FROM item")
+            conn.commit()
+            executed = scheduler.run_pending()
+            assert 'auto_vacuum_convert' not in executed
+            assert executed['incremental_vacuum']['freed_pages'] > 0
+        finally:
+            scheduler.stop()
+            conn.close()
+
+    def test_vacuum_skip_reported_when_conversion_disabled(self, tmp_path):
+        """测试：禁用转换时在指标中报告跳过原因"""
+        db_path = tmp_path / "plain.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.commit()
+        conn.close()
+        scheduler = DatabaseMaintenanceScheduler(
+            db_path, idle_seconds=0, convert_auto_vacuum=False, clock=FakeClock()
+        )
+        try:
+            executed = scheduler.run_pending()
+        finally:
+            scheduler.stop()
+        assert 'auto_vacuum_convert' not in executed
+        result = scheduler.metrics()['incremental_vacuum']['last_result']
+        assert result == {'skipped': 'auto_vacuum is not INCREMENTAL', 'auto_vacuum': 0}
+
+    def test_changelog_compacted_when_idle(self, writer):
+        """测试：空闲时压缩变更日志，并按 changelog_interval 限频"""
+        db_path, conn = writer
+        conn.executescript("""
+            CREATE TABLE change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT NOT NULL, pk TEXT NOT NULL,
+                op TEXT NOT NULL, version INTEGER, pdf_uuid TEXT, changed_at INTEGER NOT NULL
+            );
+            CREATE TABLE change_log_state (key TEXT PRIMARY KEY NOT NULL, value INTEGER NOT NULL);
+        """)
+        conn.executemany(
+            "INSERT INTO change_log (table_name, pk, op, version, changed_at) VALUES ('pdf_info', 'p1', 'update', ?, 0)",
+            [(v,) for v in range(5)],
+        )
+        conn.commit()
+        clock = FakeClock()
+        scheduler = DatabaseMaintenanceScheduler(
+            db_path, idle_seconds=0, wal_threshold_bytes=1 << 40, changelog_interval=600, clock=clock
+        )
+        try:
+            executed = scheduler.run_pending()
+            clock.now += 10
+            assert 'changelog_compact' not in scheduler.run_pending()
+        finally:
+            scheduler.stop()
+
+        assert executed['changelog_compact']['superseded'] == 4
+        assert executed['changelog_compact']['remaining'] == 0
+        assert scheduler.metrics()['changelog_compact']['runs'] == 1
+
+    def test_start_and_stop_thread(self, writer):
+        """测试：后台线程启动与停止"""
+        db_path, _ = writer
+        scheduler = DatabaseMaintenanceScheduler(db_path, tick_interval=0.01)
+        assert scheduler.start() is True
+        assert scheduler.start() is False
+        scheduler.stop()
@@ -0,0 +1,246 @@
+"""
+数据库在线备份模块
+
+基于 sqlite3 备份 API（Connection.backup）对运行中的数据库做快照：
+- 按页分步复制（每步 pages_per_step 页，步间 sleep），不会长时间阻塞写入方
+- 快照先写入 *.part 临时文件，经 PRAGMA integrity_check 校验后再改名生效
+- 按数量轮转旧快照
+- 最近一次运行状态持久化到 backup-status.json，供消息接口与启动器读取
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .config import get_db_path
+from .exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseBackupManager:
+    """
+    数据库在线备份管理器
+
+    Example:
+        >>> manager = DatabaseBackupManager('data/anki_linkmaster.db', keep=5)
+        >>> info = manager.create_snapshot()
+        >>> print(info['path'], info['integrity'])
+        data/backups/anki_linkmaster-20251018-120000.db ok
+    """
+
+    STATUS_FILE_NAME = 'backup-status.json'
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        backup_dir: Optional[Union[str, Path]] = None,
+        *,
+        keep: int = 5,
+        pages_per_step: int = 256,
+        step_sleep: float = 0.01,
+    ):
+        """
+        初始化备份管理器
+
+        Args:
+            db_path: 源数据库路径（默认 get_db_path()）
+            backup_dir: 快照目录（默认与数据库同级的 backups/）
+            keep: 保留的快照数量
+            pages_per_step: 每步复制的页数
+            step_sleep: 步间休眠秒数（让出写锁）
+        """
+        self._db_path = Path(db_path) if db_path else get_db_path()
+        self._backup_dir = Path(backup_dir) if backup_dir else self._db_path.parent / 'backups'
+        self._keep = max(1, int(keep))
+        self._pages_per_step = max(1, int(pages_per_step))
+        self._step_sleep = max(0.0, float(step_sleep))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {'state': 'idle'}
+
+    @property
+    def backup_dir(self) -> Path:
+        return self._backup_dir
+
+    # ==================== 快照 ====================
+
+    def create_snapshot(self) -> Dict[str, Any]:
+        """
+        同步创建一次快照
+
+        Returns:
+            Dict[str, Any]: 快照信息（path/size/duration_ms/integrity/created_at）
+
+        Raises:
+            DatabaseError: 已有备份在进行，或复制/校验失败
+        """
+        if not self._lock.acquire(blocking=False):
+            raise DatabaseError('已有备份任务正在进行')
+        try:
+            return self._run_snapshot()
+        finally:
+            self._lock.release()
+
+    def start_snapshot(self) -> bool:
+        """
+        在后台线程中创建快照
+
+        Returns:
+            bool: 是否成功启动（已有任务在进行时返回 False）
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        def _worker():
+            try:
+                self._run_snapshot()
+            except Exception:
+                pass  # 错误已记录在状态中
+            finally:
+                self._lock.release()
+
+        self._thread = threading.Thread(target=_worker, name='db-backup', daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """等待后台快照线程结束（用于测试与退出流程）"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run_snapshot(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        created_at = datetime.now()
+        self._backup_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{self._db_path.stem}-{created_at.strftime('%Y%m%d-%H%M%S-%f')}.db"
+        target = self._backup_dir / name
+        part = target.with_name(target.name + '.part')
+        self._set_status(state='running', started_at=created_at.isoformat(),
+                         progress={'remaining': None, 'total': None}, error=None)
+
+        try:
+            if not self._db_path.exists():
+                raise DatabaseError(f"数据库文件不存在: {self._db_path}")
+            source = sqlite3.connect(str(self._db_path), timeout=10.0)
+            dest = sqlite3.connect(str(part))
+            try:
+                source.backup(
+                    dest,
+                    pages=self._pages_per_step,
+                    progress=self._on_progress,
+                    sleep=self._step_sleep,
+                )
+                self._set_status(state='verifying')
+                integrity = dest.execute('PRAGMA integrity_check').fetchone()[0]
+            finally:
+                dest.close()
+                source.close()
+
+            if integrity != 'ok':
+                raise DatabaseError(f"快照完整性校验失败: {integrity}")
+            os.replace(part, target)
+            removed = self._rotate()
+
+            info = {
+                'path': str(target),
+                'size': target.stat().st_size,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'integrity': integrity,
+                'created_at': created_at.isoformat(),
+                'rotated': removed,
+            }
+            self._set_status(state='completed', last_snapshot=info, finished_at=datetime.now().isoformat())
+            logger.info(f"数据库快照完成: {target} ({info['size']} bytes, {info['duration_ms']} ms)")
+            return info
+        except Exception as exc:
+            try:
+                part.unlink(missing_ok=True)
+            except OSError:
+                pass
+            self._set_status(state='failed', error=str(exc), finished_at=datetime.now().isoformat())
+            logger.error(f"数据库快照失败: {exc}")
+            if isinstance(exc, DatabaseError):
+                raise
+            raise DatabaseError(f"数据库快照失败: {exc}") from exc
+
+    def _on_progress(self, status: int, remaining: int, total: int) -> None:
+        with_progress = dict(self._status)
+        with_progress['progress'] = {'remaining': remaining, 'total': total}
+        self._status = with_progress
+
+    def _rotate(self) -> List[str]:
+        snapshots = self.list_snapshots()
+        removed: List[str] = []
+        for snapshot in snapshots[self._keep:]:
+            try:
+                Path(snapshot['path']).unlink()
+                removed.append(snapshot['path'])
+            except OSError as exc:
+                logger.warning(f"删除旧快照失败: {snapshot['path']}: {exc}")
+        return removed
+
+    # ==================== 状态 ====================
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """列出已有快照（新 → 旧）"""
+        if not self._backup_dir.is_dir():
+            return []
+        items = []
+        for path in self._backup_dir.glob(f"{self._db_path.stem}-*.db"):
+            stat = path.stat()
+            items.append({'path': str(path), 'size': stat.st_size, 'mtime': stat.st_mtime})
+        items.sort(key=lambda item: (item['mtime'], item['path']), reverse=True)
+        return items
+
+    def status(self) -> Dict[str, Any]:
+        """
+        获取备份状态
+
+        进程内无运行记录时回退读取持久化的 backup-status.json（如由启动器执行的备份）。
+        """
+        status = dict(self._status)
+        if status.get('state') == 'idle':
+            persisted = self._load_status_file()
+            if persisted:
+                status = persisted
+        status['snapshots'] = self.list_snapshots()
+        status['backup_dir'] = str(self._backup_dir)
+        return status
+
+    def _set_status(self, **changes: Any) -> None:
+        status = dict(self._status)
+        status.update(changes)
+        self._status = status
+        if status.get('state') in ('completed', 'failed'):
+            self._save_status_file(status)
+
+    def _save_status_file(self, status: Dict[str, Any]) -> None:
+        try:
+            self._backup_dir.mkdir(parents=True, exist_ok=True)
+            path = self._backup_dir / self.STATUS_FILE_NAME
+            tmp = path.with_name(path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(status, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning(f"写入备份状态失败: {exc}")
+
+    def _load_status_file(self) -> Optional[Dict[str, Any]]:
+        path = self._backup_dir / self.STATUS_FILE_NAME
+        if not path.is_file():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
@@ -0,0 +1,278 @@
+"""
+变更日志（CDC）模块
+
+pdf_info / pdf_annotation / pdf_bookmark / pdf_bookanchor 上的 AFTER INSERT /
+UPDATE / DELETE 触发器把每次行变更追加到 change_log（seq 由 AUTOINCREMENT 保证
+单调递增且不复用）。客户端记住最近一次同步到的 seq，之后只需拉取 seq 之后的
+增量（同一行多次变更合并为最后一次），流量与变更量成正比而不是与库大小成正比。
+
+压缩:
+- 被同一行后续变更覆盖的旧条目可随时删除（增量本就只返回最后一次变更）
+- 超过保留期或超出最大条数的条目删除后记录 purged_seq；since 早于 purged_seq
+  的客户端无法得到完整增量，需全量重新加载（reset_required）
+
+创建日期: 2025-10-20
+版本: v1.0
+"""
+
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+# 表名 → 主键列；pdf_uuid 列用于客户端按 PDF 过滤（pdf_info 取自身 uuid）
+CHANGE_LOG_TABLES: Dict[str, Dict[str, str]] = {
+    'pdf_info': {'pk': 'uuid', 'pdf_uuid': 'uuid'},
+    'pdf_annotation': {'pk': 'ann_id', 'pdf_uuid': 'pdf_uuid'},
+    'pdf_bookmark': {'pk': 'bookmark_id', 'pdf_uuid': 'pdf_uuid'},
+    'pdf_bookanchor': {'pk': 'uuid', 'pdf_uuid': 'pdf_uuid'},
+}
+
+_NOW_MS_SQL = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    pk TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    version INTEGER,
+    pdf_uuid TEXT,
+    changed_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log(table_name, pk, seq);
+CREATE INDEX IF NOT EXISTS idx_change_log_changed ON change_log(changed_at);
+
+CREATE TABLE IF NOT EXISTS change_log_state (
+    key TEXT PRIMARY KEY NOT NULL,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _trigger_sql(table: str, pk: str, pdf_uuid: str) -> str:
+    statements = []
+    for op, event, row in (('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD')):
+        statements.append(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_changelog_{op}
+    AFTER {event} ON {table}
+    BEGIN
+        INSERT INTO change_log (table_name, pk, op, version, pdf_uuid, changed_at)
+        VALUES ('{table}', {row}.{pk}, '{op}', {row}.version, {row}.{pdf_uuid}, {_NOW_MS_SQL});
+    END;
+""")
+    return ''.join(statements)
+
+
+def _scalar(row: Any) -> Any:
+    """兼容元组与 dict_factory 两种行格式，取首列"""
+    if row is None:
+        return None
+    if isinstance(row, dict):
+        return next(iter(row.values()), None)
+    return row[0]
+
+
+class ChangeLog:
+    """
+    变更日志读取器
+
+    Example:
+        >>> changelog = ChangeLog(executor)
+        >>> changelog.ensure_schema()
+        >>> delta = changelog.changes_since(0)
+        >>> print(delta['last_seq'], len(delta['changes']))
+    """
+
+    DEFAULT_LIMIT = 1000
+    MAX_LIMIT = 5000
+
+    def __init__(self, executor, logger=None):
+        """
+        初始化变更日志
+
+        Args:
+            executor: SQL 执行器
+            logger: 日志记录器（可选）
+        """
+        self._executor = executor
+        self._logger = logger
+
+    def ensure_schema(self) -> List[str]:
+        """
+        创建 change_log 表并为已存在的业务表安装触发器
+
+        Returns:
+            List[str]: 已安装（或已存在）触发器的表名
+        """
+        existing = {
+            row['name'] for row in self._executor.execute_query(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        tables = [name for name in CHANGE_LOG_TABLES if name in existing]
+        script = _SCHEMA_SQL + ''.join(
+            _trigger_sql(name, CHANGE_LOG_TABLES[name]['pk'], CHANGE_LOG_TABLES[name]['pdf_uuid'])
+            for name in tables
+        )
+        self._executor.execute_script(script)
+        if self._logger:
+            self._logger.info(f"change_log triggers ready on: {', '.join(tables)}")
+        return tables
+
+    def latest_seq(self) -> int:
+        """当前最大 seq（含已压缩掉的条目）；空日志时为 0"""
+        rows = self._executor.execute_query(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+        )
+        return int(rows[0]['seq']) if rows else 0
+
+    def purged_seq(self) -> int:
+        """压缩时丢弃的最大 seq；since 小于该值的增量不完整"""
+        rows = self._executor.execute_query(
+            "SELECT value FROM change_log_state WHERE key = 'purged_seq'"
+        )
+        return int(rows[0]['value']) if rows else 0
+
+    def changes_since(self, since: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        返回 seq > since 的合并增量（每行只保留最后一次变更，按 seq 升序）
+
+        op 归并为 'upsert' / 'delete'：客户端未见过插入时，后续的 update 同样
+        意味着需要写入本地缓存。
+
+        Args:
+            since: 客户端已同步到的 seq
+            limit: 本次最多返回的变更数（默认 1000，最大 5000）
+
+        Returns:
+            Dict[str, Any]: {changes, last_seq, has_more, reset_required}；
+            下一次请求以 last_seq 作为 since
+        """
+        since = max(int(since or 0), 0)
+        limit = min(int(limit or self.DEFAULT_LIMIT), self.MAX_LIMIT)
+        if limit <= 0:
+            limit = self.DEFAULT_LIMIT
+
+        latest = self.latest_seq()
+        # since 超出当前序列（数据库被替换或重建）或早于压缩水位时，增量无法还原完整状态
+        reset_required = since > latest or since < self.purged_seq()
+
+        rows = self._executor.execute_query(
+            """
+            SELECT c.seq, c.table_name, c.pk, c.op, c.version, c.pdf_uuid, c.changed_at
+            FROM change_log c
+            JOIN (
+                SELECT MAX(seq) AS seq FROM change_log
+                WHERE seq > ?
+                GROUP BY table_name, pk
+            ) latest ON latest.seq = c.seq
+            ORDER BY c.seq
+            LIMIT ?
+            """,
+            (since, limit + 1),
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = [
+            {
+                'seq': row['seq'],
+                'table': row['table_name'],
+                'pk': row['pk'],
+                'op': 'delete' if row['op'] == 'delete' else 'upsert',
+                'version': row['version'],
+                'pdf_uuid': row['pdf_uuid'],
+                'changed_at': row['changed_at'],
+            }
+            for row in rows
+        ]
+        # 未返回的 seq 均已被同一行更晚的变更覆盖，取完最后一页后直接推进到最新
+        last_seq = changes[-1]['seq'] if has_more else latest
+        return {
+            'changes': changes,
+            'last_seq': last_seq,
+            'has_more': has_more,
+            'reset_required': reset_required,
+        }
+
+
+def compact_change_log(
+    conn: sqlite3.Connection,
+    *,
+    retain_seconds: float = 7 * 24 * 3600,
+    max_rows: int = 100000,
+    now_ms: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    压缩变更日志
+
+    1. 删除被同一行后续变更覆盖的条目（不影响任何客户端的增量结果）
+    2. 删除早于保留期或超出 max_rows 的条目，并把 purged_seq 推进到被删的最大 seq
+
+    Args:
+        conn: 数据库连接（autocommit 或普通连接均可）
+        retain_seconds: 条目保留时长
+        max_rows: 合并后最多保留的条目数
+        now_ms: 当前时间（毫秒，测试可注入）
+
+    Returns:
+        Dict[str, Any]: {superseded, expired, purged_seq, remaining}
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'"
+    ).fetchone()
+    if not exists:
+        return {'superseded': 0, 'expired': 0, 'purged_seq': 0, 'remaining': 0}
+
+    now_ms = int(now_ms if now_ms is not None else time.time() * 1000)
+    cutoff_ms = now_ms - int(retain_seconds * 1000)
+
+    autocommit = conn.isolation_level is None
+    if autocommit:
+        conn.execute('BEGIN IMMEDIATE')
+    try:
+        superseded = conn.execute(
+            """
+            DELETE FROM change_log
+            WHERE seq NOT IN (SELECT MAX(seq) FROM change_log GROUP BY table_name, pk)
+            """
+        ).rowcount
+
+        boundary = _scalar(conn.execute(
+            """
+            SELECT MAX(seq) FROM change_log
+            WHERE changed_at < ?
+               OR seq <= (SELECT seq FROM change_log ORDER BY seq DESC LIMIT 1 OFFSET ?)
+            """,
+            (cutoff_ms, max(int(max_rows), 0)),
+        ).fetchone())
+        expired = 0
+        purged = _scalar(conn.execute(
+            "SELECT value FROM change_log_state WHERE key = 'purged_seq'"
+        ).fetchone()) or 0
+        if boundary is not None:
+            expired = conn.execute("DELETE FROM change_log WHERE seq <= ?", (boundary,)).rowcount
+            purged = max(int(purged), int(boundary))
+            conn.execute(
+                "INSERT INTO change_log_state (key, value) VALUES ('purged_seq', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (purged,),
+            )
+        remaining = _scalar(conn.execute("SELECT COUNT(*) FROM change_log").fetchone())
+        if autocommit:
+            conn.execute('COMMIT')
+        else:
+            conn.commit()
+    except sqlite3.Error:
+        if autocommit:
+            conn.execute('ROLLBACK')
+        else:
+            conn.rollback()
+        raise
+
+    return {
+        'superseded': superseded,
+        'expired': expired,
+        'purged_seq': int(purged),
+        'remaining': int(remaining or 0),
+    }
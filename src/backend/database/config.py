@@ -24,6 +24,7 @@ DATABASE_CONFIG: Dict[str, Any] = {
 
 # PRAGMA 优化配置
 PRAGMA_SETTINGS: Dict[str, str] = {
+    'auto_vacuum': 'INCREMENTAL',   # 增量回收（仅对新建数据库生效；已有库由 maintenance 空闲时转换）
     'foreign_keys': 'ON',           # 启用外键约束
     'journal_mode': 'WAL',          # 启用 WAL 模式（Write-Ahead Logging）
     'synchronous': 'NORMAL',        # 同步模式（平衡性能和安全）
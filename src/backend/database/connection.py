@@ -8,12 +8,31 @@
 """
 
 import sqlite3
-from typing import Optional, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Any, List
 from pathlib import Path
 
 from .config import PRAGMA_SETTINGS
 from .exceptions import DatabaseConnectionError
 
+# 线程 → {主连接: 借出的池化连接}；SQLExecutor 据此把主连接上的访问改走池化连接
+_thread_state = threading.local()
+
+
+def bound_connection(primary: sqlite3.Connection) -> Optional[sqlite3.Connection]:
+    """
+    返回当前线程为 primary 绑定的池化连接
+
+    Args:
+        primary: 主连接（get_connection 返回的连接）
+
+    Returns:
+        Optional[sqlite3.Connection]: 未处于 pooled_connection 作用域时为 None
+    """
+    bindings: Optional[Dict[sqlite3.Connection, sqlite3.Connection]] = getattr(_thread_state, 'bindings', None)
+    return bindings.get(primary) if bindings else None
+
 
 class DatabaseConnectionManager:
     """
@@ -23,7 +42,8 @@ class DatabaseConnectionManager:
     - 自动启用 WAL 模式（Write-Ahead Logging）
     - 自动启用外键约束
     - 自动启用 JSONB 支持
-    - 连接池管理（最多5个连接）
+    - 主连接供 Qt 线程复用；工作线程通过 pooled_connection 借用独立连接
+      （最多 pool_size 个，借满时等待归还）
     - 超时重试机制
 
     Example:
@@ -79,6 +99,11 @@ class DatabaseConnectionManager:
         self._isolation_level = options.get('isolation_level', 'DEFERRED')
         self._pool_size = options.get('pool_size', 5)
         self._connections: List[sqlite3.Connection] = []
+        # 工作线程连接池（与主连接分开计数）
+        self._pool_idle: List[sqlite3.Connection] = []
+        self._pool_created = 0
+        self._pool_generation = 0
+        self._pool_cond = threading.Condition()
         self._initialized = True
 
         # 确保数据库目录存在
@@ -114,6 +139,86 @@ class DatabaseConnectionManager:
                 f"无法连接到数据库 '{self._db_path}': {e}"
             ) from e
 
+    @contextmanager
+    def pooled_connection(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """
+        在当前线程借用一个池化连接
+
+        作用域内，基于主连接创建的 SQLExecutor 会自动改用该连接，
+        因此插件无需感知线程；同一线程嵌套调用复用已借出的连接。
+        退出时回滚未提交的事务并归还连接。
+
+        Args:
+            timeout: 连接池借满时的最长等待秒数（None 表示一直等待）
+
+        Raises:
+            DatabaseConnectionError: 等待超时或创建连接失败
+
+        Example:
+            >>> with manager.pooled_connection():
+            ...     plugin.query_all()  # 在工作线程中使用独立连接
+        """
+        primary = self.get_connection()
+        bindings = _thread_state.__dict__.setdefault('bindings', {})
+        if primary in bindings:
+            yield bindings[primary]
+            return
+
+        conn, generation = self._acquire_pooled(timeout)
+        bindings[primary] = conn
+        try:
+            yield conn
+        finally:
+            bindings.pop(primary, None)
+            self._release_pooled(conn, generation)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """工作线程连接池状态"""
+        with self._pool_cond:
+            return {
+                'size': self._pool_size,
+                'created': self._pool_created,
+                'idle': len(self._pool_idle),
+                'in_use': self._pool_created - len(self._pool_idle),
+            }
+
+    def _acquire_pooled(self, timeout: Optional[float]) -> tuple:
+        with self._pool_cond:
+            while not self._pool_idle and self._pool_created >= self._pool_size:
+                if not self._pool_cond.wait(timeout):
+                    raise DatabaseConnectionError(
+                        f"等待数据库连接超时（连接池大小 {self._pool_size}）"
+                    )
+            if self._pool_idle:
+                return self._pool_idle.pop(), self._pool_generation
+            self._pool_created += 1
+            generation = self._pool_generation
+        try:
+            return self._create_connection(), generation
+        except DatabaseConnectionError:
+            with self._pool_cond:
+                if generation == self._pool_generation:
+                    self._pool_created -= 1
+                self._pool_cond.notify()
+            raise
+
+    def _release_pooled(self, conn: sqlite3.Connection, generation: int) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            pass
+        with self._pool_cond:
+            if generation == self._pool_generation:
+                self._pool_idle.append(conn)
+                self._pool_cond.notify()
+                return
+        # close_all 之后归还的连接直接关闭
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
     def close_all(self) -> None:
         """
         关闭所有连接
@@ -133,6 +238,17 @@ class DatabaseConnectionManager:
                 pass  # 忽略关闭错误
         self._connections.clear()
 
+        with self._pool_cond:
+            idle, self._pool_idle = self._pool_idle, []
+            self._pool_created = 0
+            self._pool_generation += 1
+            self._pool_cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
     def execute_pragma(self, pragma: str) -> Any:
         """
         执行 PRAGMA 语句
@@ -10,7 +10,9 @@ SQL 执行器模块
 import sqlite3
 from typing import List, Dict, Optional, Union, Any
 
+from .connection import bound_connection
 from .exceptions import DatabaseQueryError, DatabaseConstraintError
+from .transaction import TransactionManager
 
 
 class SQLExecutor:
@@ -22,6 +24,8 @@ class SQLExecutor:
     - Row Factory（将结果转为字典）
     - 异常转换（SQLite 异常 → 自定义异常）
     - 查询日志（DEBUG 模式）
+    - 线程感知：处于 DatabaseConnectionManager.pooled_connection 作用域的
+      线程自动改用其借出的连接
 
     Example:
         >>> executor = SQLExecutor(conn)
@@ -49,10 +53,20 @@ class SQLExecutor:
             >>> executor = SQLExecutor(conn)
             >>> executor = SQLExecutor(conn, logger=my_logger)
         """
-        self._conn = connection
+        self._primary = connection
         self._logger = logger
         self._setup_row_factory()
 
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """当前线程应使用的连接（池化连接沿用主连接的 row_factory）"""
+        conn = bound_connection(self._primary)
+        if conn is None:
+            return self._primary
+        if conn.row_factory is not self._primary.row_factory:
+            conn.row_factory = self._primary.row_factory
+        return conn
+
     def execute_query(
         self,
         sql: str,
@@ -139,11 +153,12 @@ class SQLExecutor:
             else:
                 cursor.execute(sql)
 
-            self._conn.commit()
+            self._commit()
 
             return cursor.rowcount
 
         except sqlite3.IntegrityError as e:
+            self._rollback_failed()
             # 约束违反（主键冲突、外键违反等）
             if 'UNIQUE constraint failed' in str(e):
                 raise DatabaseConstraintError(
@@ -163,10 +178,70 @@ class SQLExecutor:
                 ) from e
 
         except sqlite3.OperationalError as e:
+            self._rollback_failed()
+            raise DatabaseQueryError(
+                f"SQL 执行失败: {sql}, 错误: {e}"
+            ) from e
+        except sqlite3.Error as e:
+            self._rollback_failed()
+            raise DatabaseQueryError(
+                f"更新失败: {e}"
+            ) from e
+
+    def execute_returning(
+        self,
+        sql: str,
+        params: Optional[Union[tuple, dict]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行带 RETURNING 子句的写语句并提交，返回被影响的行
+
+        Args:
+            sql: INSERT/UPDATE/DELETE ... RETURNING ... 语句
+            params: 参数
+
+        Returns:
+            RETURNING 返回的行（每行为字典）；未命中任何行时为空列表
+
+        Raises:
+            DatabaseQueryError: 执行失败
+            DatabaseConstraintError: 约束违反
+
+        Example:
+            >>> rows = executor.execute_returning(
+            ...     "UPDATE pdf_info SET version = version + 1 WHERE uuid = ? RETURNING version",
+            ...     ('abc123',)
+            ... )
+            >>> print(rows)  # [{'version': 2}]
+        """
+        try:
+            self._log_query(sql, params)
+
+            cursor = self._conn.cursor()
+
+            if params:
+                cursor.execute(sql, params)
+            else:
+                cursor.execute(sql)
+
+            # RETURNING 的结果需在提交前取出
+            results = cursor.fetchall()
+            self._commit()
+
+            return results
+
+        except sqlite3.IntegrityError as e:
+            self._rollback_failed()
+            raise DatabaseConstraintError(
+                f"约束违反: {e}"
+            ) from e
+        except sqlite3.OperationalError as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"SQL 执行失败: {sql}, 错误: {e}"
             ) from e
         except sqlite3.Error as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"更新失败: {e}"
             ) from e
@@ -206,21 +281,24 @@ class SQLExecutor:
 
             cursor = self._conn.cursor()
             cursor.executemany(sql, params_list)
-            self._conn.commit()
+            self._commit()
 
             return cursor.rowcount
 
         except sqlite3.IntegrityError as e:
+            self._rollback_failed()
             # 约束违反
             raise DatabaseConstraintError(
                 f"批量执行约束违反: {e}"
             ) from e
 
         except sqlite3.OperationalError as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"SQL 执行失败: {sql}, 错误: {e}"
             ) from e
         except sqlite3.Error as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"批量执行失败: {e}"
             ) from e
@@ -247,17 +325,47 @@ class SQLExecutor:
 
             cursor = self._conn.cursor()
             cursor.executescript(script)
-            self._conn.commit()
+            self._commit()
 
         except sqlite3.OperationalError as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"脚本执行失败: {e}"
             ) from e
         except sqlite3.Error as e:
+            self._rollback_failed()
             raise DatabaseQueryError(
                 f"脚本执行失败: {e}"
             ) from e
 
+    def transaction(self) -> TransactionManager:
+        """
+        在当前线程使用的连接上开启事务（上下文管理器）
+
+        事务内的 execute_* 不再逐条提交，退出时统一提交；异常时整体回滚。
+
+        Example:
+            >>> with executor.transaction():
+            ...     executor.execute_update("UPDATE ...")
+            ...     executor.execute_batch("INSERT ...", rows)
+        """
+        return TransactionManager(self._conn, self._logger)
+
+    def _commit(self) -> None:
+        """提交当前语句；处于 transaction() 作用域内时交由事务统一提交"""
+        conn = self._conn
+        if not TransactionManager.is_active(conn):
+            conn.commit()
+
+    def _rollback_failed(self) -> None:
+        """写语句失败后回滚其开启的隐式事务（transaction() 作用域内交由事务统一回滚）"""
+        conn = self._conn
+        if conn.in_transaction and not TransactionManager.is_active(conn):
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
     def _setup_row_factory(self) -> None:
         """
         设置 Row Factory（私有方法）
@@ -275,7 +383,7 @@ class SQLExecutor:
                 for idx, col in enumerate(cursor.description)
             }
 
-        self._conn.row_factory = dict_factory
+        self._primary.row_factory = dict_factory
 
     def _log_query(
         self,
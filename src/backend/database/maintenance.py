@@ -0,0 +1,301 @@
+"""
+数据库后台维护调度器
+
+WAL 模式下若从不做检查点，WAL 文件会随书签自动保存等高频写入持续增长；
+统计信息陈旧也会导致查询计划退化。本模块在后台线程中按空闲时机执行：
+
+- optimize: 空闲时执行 PRAGMA optimize（首次无统计信息时执行 ANALYZE）
+- checkpoint: WAL 超过阈值时先 PASSIVE 检查点，追平后再 TRUNCATE 截断 WAL
+- incremental_vacuum: 大量删除导致空闲页过多时回收（需 auto_vacuum = INCREMENTAL）
+- auto_vacuum_convert: auto_vacuum 只对新建库生效；已有库（auto_vacuum = NONE/FULL）
+  在空闲时一次性执行 PRAGMA auto_vacuum = INCREMENTAL + VACUUM 转换；
+  禁用转换时在 incremental_vacuum 的 last_result 中记录跳过原因
+- changelog_compact: 空闲时压缩变更日志（合并被覆盖条目，清理超出保留期的条目）
+
+每个任务记录运行次数、耗时（最近/累计/最大）与最近结果，可通过 metrics() 获取。
+调度器使用独立连接，不与主连接共享事务状态。
+
+创建日期: 2025-10-18
+版本: v1.0
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from .changelog import compact_change_log
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseMaintenanceScheduler:
+    """
+    数据库后台维护调度器
+
+    Example:
+        >>> scheduler = DatabaseMaintenanceScheduler('data/anki_linkmaster.db')
+        >>> scheduler.start()
+        >>> print(scheduler.metrics()['checkpoint']['runs'])
+        >>> scheduler.stop()
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        *,
+        tick_interval: float = 30.0,
+        idle_seconds: float = 60.0,
+        optimize_interval: float = 3600.0,
+        wal_threshold_bytes: int = 16 * 1024 * 1024,
+        vacuum_free_pages: int = 1024,
+        vacuum_free_ratio: float = 0.1,
+        vacuum_pages_per_run: int = 2048,
+        changelog_interval: float = 3600.0,
+        changelog_retain_seconds: float = 7 * 24 * 3600,
+        changelog_max_rows: int = 100000,
+        convert_auto_vacuum: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初始化维护调度器
+
+        Args:
+            db_path: 数据库文件路径
+            tick_interval: 调度检查间隔（秒）
+            idle_seconds: 距最近一次写入超过该时长视为空闲
+            optimize_interval: 两次 optimize 的最小间隔（秒）
+            wal_threshold_bytes: 触发检查点的 WAL 文件大小阈值
+            vacuum_free_pages: 触发增量回收的最小空闲页数
+            vacuum_free_ratio: 触发增量回收的最小空闲页占比
+            vacuum_pages_per_run: 每次增量回收的最大页数
+            changelog_interval: 两次变更日志压缩的最小间隔（秒）
+            changelog_retain_seconds: 变更日志条目保留时长（秒）
+            changelog_max_rows: 变更日志最多保留的条目数
+            convert_auto_vacuum: 是否在空闲时把非 INCREMENTAL 的库转换为增量回收（VACUUM 重建整库）
+            clock: 单调时钟（测试可注入）
+        """
+        self._db_path = Path(db_path)
+        self._tick_interval = tick_interval
+        self._idle_seconds = idle_seconds
+        self._optimize_interval = optimize_interval
+        self._wal_threshold_bytes = wal_threshold_bytes
+        self._vacuum_free_pages = vacuum_free_pages
+        self._vacuum_free_ratio = vacuum_free_ratio
+        self._vacuum_pages_per_run = vacuum_pages_per_run
+        self._changelog_interval = changelog_interval
+        self._changelog_retain_seconds = changelog_retain_seconds
+        self._changelog_max_rows = changelog_max_rows
+        self._convert_auto_vacuum = convert_auto_vacuum
+        self._clock = clock
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+        self._last_data_version: Optional[int] = None
+        self._last_write_at = self._clock()
+        self._last_optimize_at: Optional[float] = None
+        self._last_changelog_at: Optional[float] = None
+        self._last_convert_at: Optional[float] = None
+        self._vacuum_skip_logged = False
+        self._metrics: Dict[str, Dict[str, Any]] = {
+            name: {'runs': 0, 'errors': 0, 'last_ms': None, 'total_ms': 0.0,
+                   'max_ms': 0.0, 'last_run_at': None, 'last_result': None}
+            for name in ('optimize', 'checkpoint', 'incremental_vacuum', 'auto_vacuum_convert', 'changelog_compact')
+        }
+
+    # ==================== 生命周期 ====================
+
+    def start(self) -> bool:
+        """启动后台线程；已在运行时返回 False"""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='db-maintenance', daemon=True)
+        self._thread.start()
+        logger.info(f"数据库维护调度器已启动: {self._db_path}")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止后台线程并关闭连接"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+                self._conn = None
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self._tick_interval):
+            try:
+                self.run_pending()
+            except Exception as exc:  # pragma: no cover - 防御性日志
+                logger.error(f"数据库维护任务异常: {exc}")
+
+    # ==================== 调度 ====================
+
+    def run_pending(self) -> Dict[str, Any]:
+        """
+        执行一次调度检查，运行满足条件的任务
+
+        Returns:
+            Dict[str, Any]: 本次执行的任务及其结果
+        """
+        with self._lock:
+            conn = self._get_connection()
+            now = self._clock()
+            self._track_writes(conn, now)
+            idle = now - self._last_write_at >= self._idle_seconds
+
+            executed: Dict[str, Any] = {}
+            if self._wal_size() >= self._wal_threshold_bytes:
+                executed['checkpoint'] = self._timed('checkpoint', self._checkpoint, conn)
+            if idle and self._auto_vacuum_mode(conn) != 2:  # 2 = INCREMENTAL
+                # 转换失败（如其它连接占用）时按 optimize_interval 限频重试
+                if self._convert_auto_vacuum and (
+                        self._last_convert_at is None
+                        or now - self._last_convert_at >= self._optimize_interval):
+                    executed['auto_vacuum_convert'] = self._timed(
+                        'auto_vacuum_convert', self._convert_to_incremental, conn
+                    )
+                    self._last_convert_at = now
+                elif not self._convert_auto_vacuum:
+                    self._report_vacuum_skipped(conn)
+            elif idle and self._should_vacuum(conn):
+                executed['incremental_vacuum'] = self._timed(
+                    'incremental_vacuum', self._incremental_vacuum, conn
+                )
+            if idle and (self._last_optimize_at is None
+                         or now - self._last_optimize_at >= self._optimize_interval):
+                executed['optimize'] = self._timed('optimize', self._optimize, conn)
+                self._last_optimize_at = now
+            if idle and (self._last_changelog_at is None
+                         or now - self._last_changelog_at >= self._changelog_interval):
+                executed['changelog_compact'] = self._timed(
+                    'changelog_compact', self._compact_changelog, conn
+                )
+                self._last_changelog_at = now
+            return executed
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """获取各维护任务的计时指标"""
+        with self._lock:
+            return {name: dict(values) for name, values in self._metrics.items()}
+
+    def _track_writes(self, conn: sqlite3.Connection, now: float) -> None:
+        # data_version 在其它连接提交写入后变化，用于判断数据库是否空闲
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if self._last_data_version is not None and version != self._last_data_version:
+            self._last_write_at = now
+        self._last_data_version = version
+
+    def _timed(self, name: str, task: Callable[[sqlite3.Connection], Any], conn: sqlite3.Connection) -> Any:
+        started = time.perf_counter()
+        stats = self._metrics[name]
+        try:
+            result = task(conn)
+        except sqlite3.Error as exc:
+            stats['errors'] += 1
+            result = {'error': str(exc)}
+            logger.warning(f"数据库维护任务 {name} 失败: {exc}")
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        stats['runs'] += 1
+        stats['last_ms'] = elapsed_ms
+        stats['total_ms'] = round(stats['total_ms'] + elapsed_ms, 3)
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['last_run_at'] = time.time()
+        stats['last_result'] = result
+        logger.info(f"数据库维护任务 {name} 完成: {elapsed_ms} ms, 结果: {result}")
+        return result
+
+    # ==================== 任务 ====================
+
+    def _optimize(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        if not has_stats:
+            conn.execute('ANALYZE')
+            return {'action': 'analyze'}
+        # 限制单次分析的行数，避免大表上 optimize 耗时过长
+        conn.execute('PRAGMA analysis_limit = 400')
+        conn.execute('PRAGMA optimize')
+        return {'action': 'optimize'}
+
+    def _checkpoint(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        result = {'mode': 'PASSIVE', 'busy': busy, 'log': log_frames, 'checkpointed': checkpointed}
+        # PASSIVE 已追平全部帧时再 TRUNCATE，将 WAL 文件截断为 0
+        if busy == 0 and log_frames == checkpointed:
+            busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+            result.update({'mode': 'TRUNCATE', 'busy': busy, 'log': log_frames, 'checkpointed': checkpointed})
+        result['wal_bytes'] = self._wal_size()
+        return result
+
+    @staticmethod
+    def _auto_vacuum_mode(conn: sqlite3.Connection) -> int:
+        return conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+
+    def _convert_to_incremental(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        before = self._auto_vacuum_mode(conn)
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        # auto_vacuum 模式的变更需 VACUUM 重建数据库文件后才生效
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        return {'from': before, 'auto_vacuum': self._auto_vacuum_mode(conn), 'freed_pages': free_pages}
+
+    def _report_vacuum_skipped(self, conn: sqlite3.Connection) -> None:
+        mode = self._auto_vacuum_mode(conn)
+        self._metrics['incremental_vacuum']['last_result'] = {
+            'skipped': 'auto_vacuum is not INCREMENTAL', 'auto_vacuum': mode,
+        }
+        if not self._vacuum_skip_logged:
+            self._vacuum_skip_logged = True
+            logger.warning(f"数据库 auto_vacuum={mode}，未启用转换，增量回收不会执行: {self._db_path}")
+
+    def _should_vacuum(self, conn: sqlite3.Connection) -> bool:
+        if self._auto_vacuum_mode(conn) != 2:  # 2 = INCREMENTAL
+            return False
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0] or 1
+        return free_pages >= self._vacuum_free_pages or (
+            free_pages > 0 and free_pages / page_count >= self._vacuum_free_ratio
+        )
+
+    def _incremental_vacuum(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.execute(f'PRAGMA incremental_vacuum({int(self._vacuum_pages_per_run)})').fetchall()
+        after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return {'freed_pages': before - after, 'remaining_free_pages': after}
+
+    def _compact_changelog(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        return compact_change_log(
+            conn,
+            retain_seconds=self._changelog_retain_seconds,
+            max_rows=self._changelog_max_rows,
+        )
+
+    # ==================== 工具 ====================
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self._db_path), timeout=1.0, check_same_thread=False, isolation_level=None
+            )
+        return self._conn
+
+    def _wal_size(self) -> int:
+        try:
+            return os.path.getsize(f"{self._db_path}-wal")
+        except OSError:
+            return 0
@@ -7,9 +7,12 @@
 版本: v1.0
 """
 
+import json
+import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 
+from ..exceptions import DatabaseValidationError
 from .event_bus import EventBus, TableEvents, EventStatus
 
 
@@ -297,6 +300,110 @@ class TablePlugin(ABC):
         """
         pass
 
+    # ==================== 乐观并发（条件更新） ====================
+
+    # 主键列名
+    _PRIMARY_KEY_COLUMN = 'uuid'
+    # update_if_version 允许直接修改的标量列（json_data 通过 json_patch 合并）
+    _PATCHABLE_COLUMNS: frozenset = frozenset()
+    # 条件更新成功后随 update 事件一并发出的列（如子表的 pdf_uuid）
+    _EVENT_COLUMNS: tuple = ()
+
+    def update_if_version(
+        self,
+        primary_key: str,
+        expected_version: int,
+        patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        乐观并发的部分更新：单条 UPDATE ... WHERE version = ?，不做读-合并-写
+
+        Args:
+            primary_key: 主键值
+            expected_version: 调用方读取到的版本号
+            patch: 部分更新。标量列见 _PATCHABLE_COLUMNS；json_data 为 RFC 7396
+                merge patch，在 SQL 中以 json_patch() 合并（值为 None 表示删除该键）
+
+        Returns:
+            Dict: {'status': 'updated', 'version': 新版本}
+                  {'status': 'conflict', 'version': 当前版本, 'expected_version': ...}
+                  {'status': 'not_found', 'version': None}
+
+        Raises:
+            DatabaseValidationError: patch 含不可修改字段或值非法
+        """
+        if not isinstance(patch, dict) or not patch:
+            raise DatabaseValidationError('patch must be a non-empty dict')
+        unknown = set(patch) - set(self._PATCHABLE_COLUMNS) - {'json_data'}
+        if unknown:
+            raise DatabaseValidationError(
+                f"fields not patchable: {', '.join(sorted(unknown))}"
+            )
+        json_patch = patch.get('json_data')
+        if json_patch is not None and not isinstance(json_patch, dict):
+            raise DatabaseValidationError('json_data patch must be a dict')
+        try:
+            expected = int(expected_version)
+        except (TypeError, ValueError):
+            raise DatabaseValidationError('expected_version must be an integer')
+
+        columns = self._validate_patch(
+            {k: v for k, v in patch.items() if k != 'json_data'},
+            json_patch or {}
+        )
+
+        assignments = [f"{column} = ?" for column in columns]
+        params: List[Any] = list(columns.values())
+        if json_patch:
+            assignments.append("json_data = json_patch(json_data, ?)")
+            params.append(json.dumps(json_patch, ensure_ascii=False))
+        assignments.extend(["updated_at = ?", "version = version + 1"])
+        params.append(int(time.time() * 1000))
+
+        pk = self._PRIMARY_KEY_COLUMN
+        returning = ', '.join(('version',) + tuple(self._EVENT_COLUMNS))
+        sql = (
+            f"UPDATE {self.table_name} SET {', '.join(assignments)} "
+            f"WHERE {pk} = ? AND version = ? RETURNING {returning}"
+        )
+        rows = self._executor.execute_returning(sql, tuple(params + [primary_key, expected]))
+        if rows:
+            row = rows[0]
+            event_data = {pk: primary_key, 'version': row['version']}
+            event_data.update({column: row[column] for column in self._EVENT_COLUMNS})
+            self._emit_event('update', 'completed', event_data)
+            return {'status': 'updated', 'version': row['version']}
+
+        # 仅在未命中时多查一次，区分版本冲突与记录不存在
+        current = self._executor.execute_query(
+            f"SELECT version FROM {self.table_name} WHERE {pk} = ?",
+            (primary_key,)
+        )
+        if not current:
+            return {'status': 'not_found', 'version': None}
+        return {
+            'status': 'conflict',
+            'version': current[0]['version'],
+            'expected_version': expected,
+        }
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        校验 update_if_version 的补丁（子类按需覆盖）
+
+        Args:
+            columns: 标量列补丁
+            json_patch: json_data 的 merge patch
+
+        Returns:
+            Dict[str, Any]: 规范化后的标量列补丁
+        """
+        return dict(columns)
+
     # ==================== 可选实现的方法 ====================
 
     def migrate(self, from_version: str, to_version: str) -> None:
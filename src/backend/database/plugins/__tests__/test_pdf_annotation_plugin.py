@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import time
 from typing import Dict, List
@@ -379,6 +380,56 @@ def test_count_by_pdf(plugin, pdf_uuid):
     assert plugin.count_by_pdf(pdf_uuid) == 4
 
 
+def test_annotation_count_maintained_by_triggers(plugin, pdf_info_plugin, pdf_uuid, executor):
+    ann_ids = []
+    for record in make_multiple_annotations(3):
+        record['pdf_uuid'] = pdf_uuid
+        ann_ids.append(plugin.insert(record))
+    assert pdf_info_plugin.query_by_id(pdf_uuid)['annotation_count'] == 3
+
+    plugin.delete(ann_ids[0])
+    assert pdf_info_plugin.query_by_id(pdf_uuid)['annotation_count'] == 2
+
+    # 触发器丢失（旧库）时重新建表会按实际行数回填
+    executor.execute_script(
+        "DROP TRIGGER trg_pdf_annotation_count_insert;"
+        "UPDATE pdf_info SET annotation_count = 0;"
+    )
+    plugin.create_table()
+    assert pdf_info_plugin.query_by_id(pdf_uuid)['annotation_count'] == 2
+
+    other = make_pdf_info_sample(uuid='bbbbbbbbbbbb')
+    pdf_info_plugin.insert(other)
+    ordered = pdf_info_plugin.search_with_filters(
+        [],
+        filters={'type': 'field', 'field': 'annotation_count', 'operator': 'lt', 'value': 1},
+        sort_rules=[{'field': 'annotation_count', 'direction': 'desc'}],
+    )
+    assert [row['uuid'] for row in ordered] == ['bbbbbbbbbbbb']
+
+
+def test_update_if_version_merges_data_and_emits_owner(plugin, pdf_uuid, event_bus):
+    ann_id = plugin.insert(_make_sample('text-highlight', pdf_uuid))
+    before = plugin.query_by_id(ann_id)
+    events: List[Dict] = []
+    event_bus.on('table:pdf-annotation:update:completed', events.append, 'test-cas')
+
+    result = plugin.update_if_version(ann_id, before['version'], {
+        'page_number': 7,
+        'json_data': {'data': {'highlightColor': '#00ff00'}},
+    })
+
+    assert result['status'] == 'updated'
+    after = plugin.query_by_id(ann_id)
+    assert after['page_number'] == 7
+    assert after['data']['highlightColor'] == '#00ff00'
+    assert after['data']['selectedText'] == before['data']['selectedText']
+    assert events == [{'ann_id': ann_id, 'version': before['version'] + 1, 'pdf_uuid': pdf_uuid}]
+    assert plugin.update_if_version(ann_id, before['version'], {'page_number': 8})['status'] == 'conflict'
+    with pytest.raises(DatabaseValidationError):
+        plugin.update_if_version(ann_id, result['version'], {'json_data': {'data': {'imageHash': 'x'}}})
+
+
 def test_count_by_type(plugin, pdf_uuid):
     plugin.insert(_make_sample('comment', pdf_uuid))
     plugin.insert(_make_sample('comment', pdf_uuid, ann_id='ann_172800000099_888888'))
@@ -442,6 +493,142 @@ def test_multiple_comments(plugin, pdf_uuid):
     assert len(row['comments']) >= 2
 
 
+def test_comment_table_and_index_created(plugin, executor):
+    tables = executor.execute_query(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='pdf_annotation_comment'"
+    )
+    assert tables
+    indexes = executor.execute_query("PRAGMA index_list('pdf_annotation_comment')")
+    assert any(idx['name'] == 'idx_ann_comment_ann_id' for idx in indexes)
+
+
+def test_comments_stored_in_child_table(plugin, pdf_uuid, executor):
+    sample = _make_sample('screenshot', pdf_uuid)
+    ann_id = plugin.insert(sample)
+    raw = executor.execute_query(
+        "SELECT json_data FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+    )[0]
+    assert '"comments"' not in raw['json_data']
+    assert plugin.count_comments(ann_id) == len(sample['json_data']['comments'])
+
+
+def test_add_comment_does_not_bump_version(plugin, pdf_uuid):
+    ann_id = plugin.insert(_make_sample('comment', pdf_uuid))
+    before = plugin.query_by_id(ann_id)['version']
+    plugin.add_comment(ann_id, '评论')
+    assert plugin.query_by_id(ann_id)['version'] == before
+
+
+def test_comments_limit_and_count(plugin, pdf_uuid):
+    ann_id = plugin.insert(_make_sample('comment', pdf_uuid))
+    for index in range(5):
+        plugin.add_comment(ann_id, f'评论{index}')
+    row = plugin.query_by_id(ann_id, comments_limit=2)
+    assert [c['content'] for c in row['comments']] == ['评论0', '评论1']
+    assert row['comment_count'] == 5
+    page = plugin.query_comments(ann_id, limit=2, offset=2)
+    assert [c['content'] for c in page] == ['评论2', '评论3']
+
+
+def test_migrate_inline_comments(plugin, pdf_uuid, executor):
+    sample = _make_sample('screenshot', pdf_uuid)
+    ann_id = plugin.insert(sample)
+    legacy = {'data': sample['json_data']['data'], 'comments': [
+        {'id': 'comment_legacy_1', 'content': '旧评论', 'createdAt': '2025-01-01T00:00:00Z'},
+    ]}
+    executor.execute_update("DELETE FROM pdf_annotation_comment WHERE ann_id = ?", (ann_id,))
+    executor.execute_update(
+        "UPDATE pdf_annotation SET json_data = ? WHERE ann_id = ?",
+        (json.dumps(legacy, ensure_ascii=False), ann_id),
+    )
+    plugin.create_table()
+    row = plugin.query_by_id(ann_id)
+    assert [c['id'] for c in row['comments']] == ['comment_legacy_1']
+    raw = executor.execute_query(
+        "SELECT json_data FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+    )[0]
+    assert '"comments"' not in raw['json_data']
+
+
+
+def _write_legacy_comments(executor, ann_id, data, comments):
+    executor.execute_update("DELETE FROM pdf_annotation_comment WHERE ann_id = ?", (ann_id,))
+    executor.execute_update(
+        "UPDATE pdf_annotation SET json_data = ? WHERE ann_id = ?",
+        (json.dumps({'data': data, 'comments': comments}, ensure_ascii=False), ann_id),
+    )
+
+
+def test_migrate_inline_comments_skips_non_object_items(plugin, pdf_uuid, executor):
+    sample = _make_sample('screenshot', pdf_uuid)
+    ann_id = plugin.insert(sample)
+    _write_legacy_comments(executor, ann_id, sample['json_data']['data'], [
+        'not-an-object',
+        {'id': 'comment_legacy_1', 'content': '旧评论', 'createdAt': '2025-01-01T00:00:00Z'},
+    ])
+    plugin.create_table()
+    assert [c['id'] for c in plugin.query_by_id(ann_id)['comments']] == ['comment_legacy_1']
+    assert plugin.count_comments(ann_id) == 1
+
+
+def test_inline_comments_read_until_migration_succeeds(plugin, pdf_uuid, executor, monkeypatch):
+    sample = _make_sample('screenshot', pdf_uuid)
+    ann_id = plugin.insert(sample)
+    _write_legacy_comments(executor, ann_id, sample['json_data']['data'], [
+        {'id': 'comment_legacy_1', 'content': '旧评论1', 'createdAt': '2025-01-01T00:00:00Z'},
+        {'id': 'comment_legacy_2', 'content': '旧评论2', 'createdAt': '2025-01-02T00:00:00Z'},
+    ])
+
+    original = executor.execute_update
+
+    def failing_update(sql, params=None):
+        if 'json_remove' in sql and '$.comments' in sql:
+            raise RuntimeError('disk I/O error')
+        return original(sql, params)
+
+    monkeypatch.setattr(executor, 'execute_update', failing_update)
+    plugin.create_table()
+    monkeypatch.undo()
+
+    # 迁移失败整体回滚：子表没有写入，读取回退到 json_data.comments
+    stored = executor.execute_query(
+        "SELECT COUNT(*) AS count FROM pdf_annotation_comment WHERE ann_id = ?", (ann_id,)
+    )[0]
+    assert stored['count'] == 0
+    row = plugin.query_by_id(ann_id, comments_limit=1)
+    assert [c['id'] for c in row['comments']] == ['comment_legacy_1']
+    assert row['comment_count'] == 2
+    plugin.add_comment(ann_id, '新评论')
+    assert [c['content'] for c in plugin.query_comments(ann_id, limit=2, offset=1)] == ['旧评论2', '新评论']
+    assert plugin.count_comments(ann_id) == 3
+
+    # 改写 json_data 时内联评论随之转入子表，不会丢失
+    plugin.update(ann_id, {'data': {'description': '更新'}})
+    raw = executor.execute_query(
+        "SELECT json_data FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+    )[0]
+    assert '"comments"' not in raw['json_data']
+    assert [c['content'] for c in plugin.query_comments(ann_id)] == ['旧评论1', '旧评论2', '新评论']
+
+
+def test_update_rolls_back_when_comment_write_fails(plugin, pdf_uuid, monkeypatch):
+    ann_id = plugin.insert(_make_sample('comment', pdf_uuid))
+    plugin.add_comment(ann_id, '保留')
+    before = plugin.query_by_id(ann_id)
+
+    def failing_write(ann_id, comments):
+        raise RuntimeError('write failed')
+
+    monkeypatch.setattr(plugin, '_write_comments', failing_write)
+    with pytest.raises(RuntimeError):
+        plugin.update(ann_id, {'comments': [
+            {'id': 'comment_1728123456789_abcdef', 'content': '替换', 'createdAt': '2025-01-01T00:00:00Z'},
+        ]})
+    after = plugin.query_by_id(ann_id)
+    assert after['version'] == before['version']
+    assert [c['content'] for c in after['comments']] == ['保留']
+
+
 # ==================== 事件 ====================
 
 
@@ -471,6 +658,19 @@ def test_event_emission_on_update(plugin, pdf_uuid, event_bus):
     assert received[0]['ann_id'] == ann_id
 
 
+def test_comment_events_carry_pdf_uuid(plugin, pdf_uuid, event_bus):
+    ann_id = plugin.insert(_make_sample('comment', pdf_uuid))
+    received: List[Dict] = []
+    event_bus.on('table:pdf-annotation:update:completed', received.append, 'test-listener')
+    comment = plugin.add_comment(ann_id, '评论')
+    assert plugin.remove_comment(ann_id, comment['id']) is True
+    assert [(e['ann_id'], e['pdf_uuid'], e['comment_id']) for e in received] == [
+        (ann_id, pdf_uuid, comment['id']),
+        (ann_id, pdf_uuid, comment['id']),
+    ]
+    assert plugin.remove_comment('ann_1728123456789_zzzzzz', comment['id']) is False
+
+
 def test_event_emission_on_delete(plugin, pdf_uuid, event_bus):
     ann_id = plugin.insert(_make_sample('screenshot', pdf_uuid))
     received: List[Dict] = []
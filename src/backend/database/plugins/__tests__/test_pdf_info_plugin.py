@@ -205,6 +205,49 @@ def test_update_nonexistent_returns_false(plugin):
     assert plugin.update('ffffffffffff', {'title': 'Missing'}) is False
 
 
+def test_update_if_version_applies_json_patch(plugin, event_bus):
+    uuid, sample = insert_sample(plugin)
+    events: List[Dict] = []
+    event_bus.on('table:pdf-info:update:completed', events.append, 'test-cas')
+
+    result = plugin.update_if_version(uuid, 1, {
+        'title': 'Patched',
+        'json_data': {'rating': 4, 'notes': None},
+    })
+
+    assert result == {'status': 'updated', 'version': 2}
+    row = plugin.query_by_id(uuid)
+    assert row['title'] == 'Patched'
+    assert row['rating'] == 4
+    assert 'notes' not in row['json_data']
+    assert row['tags'] == sample['json_data']['tags']
+    assert events == [{'uuid': uuid, 'version': 2}]
+
+
+def test_update_if_version_reports_conflict(plugin):
+    uuid, _ = insert_sample(plugin)
+    assert plugin.update_if_version(uuid, 1, {'title': 'First'})['status'] == 'updated'
+
+    stale = plugin.update_if_version(uuid, 1, {'title': 'Stale'})
+
+    assert stale == {'status': 'conflict', 'version': 2, 'expected_version': 1}
+    assert plugin.query_by_id(uuid)['title'] == 'First'
+    assert plugin.update_if_version('ffffffffffff', 1, {'title': 'x'}) == {
+        'status': 'not_found', 'version': None
+    }
+
+
+def test_update_if_version_rejects_invalid_patch(plugin):
+    uuid, _ = insert_sample(plugin)
+    with pytest.raises(DatabaseValidationError):
+        plugin.update_if_version(uuid, 1, {'uuid': 'aaaaaaaaaaaa'})
+    with pytest.raises(DatabaseValidationError):
+        plugin.update_if_version(uuid, 1, {'json_data': {'rating': 9}})
+    with pytest.raises(DatabaseValidationError):
+        plugin.update_if_version(uuid, 1, {'json_data': {'filename': 'x.pdf'}})
+    assert plugin.query_by_id(uuid)['version'] == 1
+
+
 def test_delete_existing(plugin):
     uuid, _ = insert_sample(plugin)
     assert plugin.delete(uuid) is True
@@ -215,6 +258,23 @@ def test_delete_nonexistent_returns_false(plugin):
     assert plugin.delete('ffffffffffff') is False
 
 
+def test_delete_many_single_aggregated_event(plugin, event_bus):
+    samples = make_bulk_samples(3)
+    for sample in samples:
+        plugin.insert(sample)
+    events: List[Dict] = []
+    event_bus.on('table:pdf-info:delete:completed', events.append, 'test-bulk-delete')
+
+    uuids = [samples[2]['uuid'], 'ffffffffffff', samples[0]['uuid'], samples[0]['uuid']]
+    deleted = plugin.delete_many(uuids)
+
+    assert deleted == [samples[2]['uuid'], samples[0]['uuid']]
+    assert [row['uuid'] for row in plugin.query_all()] == [samples[1]['uuid']]
+    assert events == [{'uuids': deleted, 'count': 2}]
+    assert plugin.delete_many(['ffffffffffff']) == []
+    assert len(events) == 1
+
+
 def test_query_all_supports_limit_and_offset(plugin):
     for sample in make_bulk_samples(5):
         plugin.insert(sample)
@@ -342,6 +402,26 @@ def test_get_statistics(plugin):
     assert 'visible_count' in stats
 
 
+def test_query_page_by_updated_keyset(plugin):
+    samples = make_bulk_samples(5)
+    for idx, item in enumerate(samples):
+        # 两两相同的 updated_at，验证 uuid 作为并列决胜键
+        item['updated_at'] = 1730726400000 + (idx // 2) * 1000
+        plugin.insert(item)
+
+    seen: List[str] = []
+    after = None
+    while True:
+        page = plugin.query_page_by_updated(after, limit=2)
+        if not page:
+            break
+        seen.extend(row['uuid'] for row in page)
+        after = (page[-1]['updated_at'], page[-1]['uuid'])
+
+    expected = sorted(samples, key=lambda item: (item['updated_at'], item['uuid']), reverse=True)
+    assert seen == [item['uuid'] for item in expected]
+
+
 # ==================== 事件测试 ====================
 
 
@@ -0,0 +1,189 @@
+"""截图 blob 存储（ScreenshotBlobStore）行为测试"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+from typing import Dict
+
+import pytest
+
+from ...connection import DatabaseConnectionManager
+from ...executor import SQLExecutor
+from ...exceptions import DatabaseValidationError
+from ...plugin.event_bus import EventBus
+from ..pdf_annotation_plugin import PDFAnnotationTablePlugin
+from ..pdf_info_plugin import PDFInfoTablePlugin
+from .fixtures.pdf_annotation_samples import make_annotation_sample
+from .fixtures.pdf_info_samples import make_pdf_info_sample
+
+
+_PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'screenshot-blob-test'
+_PNG_HASH = hashlib.md5(_PNG_BYTES).hexdigest()
+_PNG_DATA_URI = 'data:image/png;base64,' + base64.b64encode(_PNG_BYTES).decode('ascii')
+
+
+@pytest.fixture
+def executor(tmp_path):
+    DatabaseConnectionManager._instance = None
+    manager = DatabaseConnectionManager(str(tmp_path / 'blob_test.db'))
+    yield SQLExecutor(manager.get_connection())
+    manager.close_all()
+    DatabaseConnectionManager._instance = None
+
+
+@pytest.fixture
+def event_bus():
+    return EventBus()
+
+
+@pytest.fixture
+def pdf_info_plugin(executor, event_bus):
+    plugin = PDFInfoTablePlugin(executor, event_bus, logging.getLogger('test.pdf_info'))
+    plugin.enable()
+    return plugin
+
+
+@pytest.fixture
+def screenshot_dir(tmp_path):
+    return tmp_path / 'screenshots'
+
+
+@pytest.fixture
+def plugin(executor, event_bus, pdf_info_plugin, screenshot_dir):
+    plugin = PDFAnnotationTablePlugin(
+        executor, event_bus, logging.getLogger('test.annotation'),
+        screenshot_dir=screenshot_dir,
+    )
+    plugin.enable()
+    return plugin
+
+
+@pytest.fixture
+def pdf_uuid(pdf_info_plugin):
+    sample = make_pdf_info_sample()
+    pdf_info_plugin.insert(sample)
+    return sample['uuid']
+
+
+def _screenshot(pdf_uuid: str, ann_id: str, with_data: bool = True) -> Dict:
+    sample = make_annotation_sample(ann_type='screenshot', ann_id=ann_id)
+    sample['pdf_uuid'] = pdf_uuid
+    sample['json_data']['data']['imageHash'] = _PNG_HASH
+    if with_data:
+        sample['json_data']['data']['imageData'] = _PNG_DATA_URI
+    return sample
+
+
+def test_insert_moves_image_data_to_blob(plugin, pdf_uuid, executor, screenshot_dir):
+    ann_id = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa'))
+
+    raw = executor.execute_query(
+        "SELECT json_data FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+    )[0]['json_data']
+    assert 'imageData' not in json.loads(raw)['data']
+
+    row = plugin.query_by_id(ann_id)
+    assert row['data']['imagePath'] == f'/data/screenshots/{_PNG_HASH}.png'
+    assert (screenshot_dir / f'{_PNG_HASH}.png').read_bytes() == _PNG_BYTES
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+
+
+def test_shared_blob_ref_count_and_gc(plugin, pdf_uuid, screenshot_dir):
+    first = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa'))
+    second = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_bbbbbb'))
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 2
+
+    plugin.delete(first)
+    assert (screenshot_dir / f'{_PNG_HASH}.png').exists()
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+
+    plugin.delete(second)
+    assert not (screenshot_dir / f'{_PNG_HASH}.png').exists()
+    assert plugin.blob_store.get_info(_PNG_HASH) is None
+
+
+def test_cascade_delete_collects_blob(plugin, pdf_info_plugin, pdf_uuid, screenshot_dir):
+    plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa'))
+    pdf_info_plugin.delete(pdf_uuid)
+    assert not (screenshot_dir / f'{_PNG_HASH}.png').exists()
+
+
+def test_gc_keeps_freshly_registered_blob(plugin, screenshot_dir):
+    """刚登记、标注尚未写入（计数为 0）的 blob 在宽限期内不被其它删除触发的回收误删"""
+    plugin.blob_store.put_data_uri(_PNG_HASH, _PNG_DATA_URI)
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 0
+
+    assert plugin.blob_store.collect_garbage() == []
+    assert (screenshot_dir / f'{_PNG_HASH}.png').exists()
+
+    assert plugin.blob_store.collect_garbage(grace_seconds=-1) == [_PNG_HASH]
+    assert not (screenshot_dir / f'{_PNG_HASH}.png').exists()
+
+
+def test_released_blob_reregistered_during_save_survives_gc(plugin, pdf_uuid, screenshot_dir):
+    ann_id = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa'))
+    plugin.delete(ann_id)
+    # 同一截图再次保存：登记之后、写入标注之前发生回收
+    plugin.blob_store.put_data_uri(_PNG_HASH, _PNG_DATA_URI)
+    assert plugin.blob_store.collect_garbage() == []
+    plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_bbbbbb', with_data=False))
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+    assert (screenshot_dir / f'{_PNG_HASH}.png').exists()
+
+
+def test_register_existing_file(plugin, pdf_uuid, screenshot_dir):
+    screenshot_dir.mkdir(parents=True, exist_ok=True)
+    (screenshot_dir / f'{_PNG_HASH}.png').write_bytes(_PNG_BYTES)
+    plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa', with_data=False))
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+
+
+def test_hash_mismatch_rejected(plugin, pdf_uuid):
+    sample = _screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa')
+    sample['json_data']['data']['imageHash'] = '0' * 32
+    with pytest.raises(DatabaseValidationError, match='imageHash does not match imageData'):
+        plugin.insert(sample)
+
+
+def test_migrate_inline_image_data(plugin, pdf_uuid, executor, screenshot_dir):
+    ann_id = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa', with_data=False))
+    legacy = plugin.query_by_id(ann_id)['data']
+    legacy['imageData'] = _PNG_DATA_URI
+    executor.execute_update(
+        "UPDATE pdf_annotation SET json_data = ? WHERE ann_id = ?",
+        (json.dumps({'data': legacy}), ann_id),
+    )
+
+    plugin.create_table()
+
+    row = plugin.query_by_id(ann_id)
+    assert 'imageData' not in row['data']
+    assert (screenshot_dir / f'{_PNG_HASH}.png').exists()
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+
+
+def test_upgrade_registers_existing_blob_references(plugin, pdf_uuid, executor, screenshot_dir):
+    screenshot_dir.mkdir(parents=True, exist_ok=True)
+    (screenshot_dir / f'{_PNG_HASH}.png').write_bytes(_PNG_BYTES)
+    plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_aaaaaa', with_data=False))
+    # 模拟 blob 表出现之前的数据库：标注只保存 imageHash，文件已在磁盘上
+    executor.execute_script(
+        """
+        DROP TRIGGER IF EXISTS trg_ann_blob_ref_insert;
+        DROP TRIGGER IF EXISTS trg_ann_blob_ref_delete;
+        DROP TRIGGER IF EXISTS trg_ann_blob_ref_update;
+        DROP TABLE pdf_annotation_blob;
+        """
+    )
+
+    plugin.create_table()
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
+
+    second = plugin.insert(_screenshot(pdf_uuid, 'ann_1728123456789_bbbbbb', with_data=False))
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 2
+    plugin.delete(second)
+    assert (screenshot_dir / f'{_PNG_HASH}.png').exists()
+    assert plugin.blob_store.get_info(_PNG_HASH)['ref_count'] == 1
@@ -4,13 +4,18 @@ from __future__ import annotations
 
 import json
 import re
+import secrets
+import string
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from ..exceptions import DatabaseValidationError
 from ..plugin.base_table_plugin import TablePlugin
 from ..plugin.event_bus import EventBus
+from .pdf_child_counters import ensure_pdf_child_counter
+from .screenshot_blob_store import ScreenshotBlobStore
 
 if TYPE_CHECKING:
     from ..executor import SQLExecutor
@@ -26,16 +31,21 @@ class PDFAnnotationTablePlugin(TablePlugin):
     _MD5_PATTERN = re.compile(r"^[a-f0-9]{32}$")
     _HEX_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{6}$")
     _ALLOWED_TYPES = {"screenshot", "text-highlight", "comment"}
+    _COMMENT_ID_ALPHABET = string.ascii_letters + string.digits
 
     def __init__(
         self,
         executor: 'SQLExecutor',
         event_bus: EventBus,
-        logger=None
+        logger=None,
+        screenshot_dir: Optional[Path] = None
     ) -> None:
         super().__init__(executor, event_bus, logger)
         self._events_registered = False
+        self._blob_store = ScreenshotBlobStore(executor, screenshot_dir, logger)
         self._subscriber_id = f"pdf-annotation-plugin-{id(self)}"
+        # 内联评论迁移成功前，读取时回退读取 json_data.comments
+        self._inline_comments_pending = True
 
     # ==================== 元信息 ====================
 
@@ -45,7 +55,7 @@ class PDFAnnotationTablePlugin(TablePlugin):
 
     @property
     def version(self) -> str:
-        return "1.0.0"
+        return "1.1.0"
 
     @property
     def dependencies(self) -> List[str]:
@@ -94,12 +104,90 @@ class PDFAnnotationTablePlugin(TablePlugin):
         CREATE INDEX IF NOT EXISTS idx_ann_created ON pdf_annotation(created_at DESC);
         CREATE INDEX IF NOT EXISTS idx_ann_pdf_page
             ON pdf_annotation(pdf_uuid, page_number);
+
+        -- 评论子表：评论的增删为单行操作，不再重写整条标注的 json_data.comments
+        CREATE TABLE IF NOT EXISTS pdf_annotation_comment (
+            ann_id TEXT NOT NULL,
+            comment_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            content TEXT NOT NULL,
+            PRIMARY KEY (ann_id, comment_id),
+            FOREIGN KEY (ann_id) REFERENCES pdf_annotation(ann_id) ON DELETE CASCADE
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ann_comment_ann_id
+            ON pdf_annotation_comment(ann_id);
         """
         self._executor.execute_script(script)
+        ensure_pdf_child_counter(self._executor, 'pdf_annotation', 'annotation_count', self._logger)
+        self._blob_store.ensure_schema()
+        self._migrate_inline_comments()
+        self._blob_store.migrate_inline_image_data()
         self._emit_event('create', 'completed')
         if self._logger:
             self._logger.info('pdf_annotation table ensured')
 
+    def _migrate_inline_comments(self) -> None:
+        """将历史数据中 json_data.comments 数组迁移到 pdf_annotation_comment 子表。
+
+        迁移在单个事务内完成（写入子表 + 移除 json_data.comments），失败时整体回滚，可重复执行；
+        非对象的数组元素被忽略。迁移成功前读取会回退到 json_data.comments。
+        """
+        insert_sql = """
+        INSERT OR IGNORE INTO pdf_annotation_comment (ann_id, comment_id, created_at, content)
+        SELECT
+            a.ann_id,
+            json_extract(c.value, '$.id'),
+            COALESCE(json_extract(c.value, '$.createdAt'), ''),
+            COALESCE(json_extract(c.value, '$.content'), '')
+        FROM pdf_annotation AS a, json_each(a.json_data, '$.comments') AS c
+        WHERE json_type(a.json_data, '$.comments') = 'array'
+          AND json_type(c.value) = 'object'
+          AND json_extract(c.value, '$.id') IS NOT NULL
+        ORDER BY a.ann_id, c.key
+        """
+        remove_sql = """
+        UPDATE pdf_annotation
+        SET json_data = json_remove(json_data, '$.comments')
+        WHERE json_type(json_data, '$.comments') IS NOT NULL
+        """
+        try:
+            # 上下文退出时提交；任一语句失败则 ROLLBACK，不会留下半迁移的数据
+            with self._executor.transaction():
+                self._executor.execute_update(insert_sql)
+                self._executor.execute_update(remove_sql)
+        except Exception as exc:
+            if self._logger:
+                self._logger.warning('migrate inline annotation comments failed: %s', exc)
+            self._inline_comments_pending = True
+            return
+        self._inline_comments_pending = False
+
+    # ==================== 条件更新 ====================
+
+    _PRIMARY_KEY_COLUMN = 'ann_id'
+    _PATCHABLE_COLUMNS = frozenset({'page_number'})
+    _EVENT_COLUMNS = ('pdf_uuid',)
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        normalized: Dict[str, Any] = {}
+        if 'page_number' in columns:
+            normalized['page_number'] = self._validate_positive_int(columns['page_number'], 'page_number')
+        if set(json_patch) - {'data'}:
+            raise DatabaseValidationError("json_data patch only supports the 'data' key")
+        data_patch = json_patch.get('data', {})
+        if not isinstance(data_patch, dict):
+            raise DatabaseValidationError('json_data.data patch must be a dict')
+        # 截图引用由 blob 引用计数维护，评论存放于子表，均不允许通过补丁修改
+        blocked = {'imageData', 'imageHash', 'imagePath', 'comments'} & set(data_patch)
+        if blocked:
+            raise DatabaseValidationError(f"fields not patchable: {', '.join(sorted(blocked))}")
+        return normalized
+
     # ==================== 验证 ====================
 
     def validate_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -333,6 +421,7 @@ class PDFAnnotationTablePlugin(TablePlugin):
 
     def insert(self, data: Dict[str, Any]) -> str:
         validated = self.validate_data(data)
+        self._absorb_image_data(validated)
 
         sql = """
         INSERT INTO pdf_annotation (
@@ -348,10 +437,12 @@ class PDFAnnotationTablePlugin(TablePlugin):
             validated['created_at'],
             validated['updated_at'],
             validated['version'],
-            json.dumps(validated['json_data'], ensure_ascii=False),
+            self._dump_json_data(validated['json_data']),
         )
 
-        self._executor.execute_update(sql, params)
+        with self._executor.transaction():
+            self._executor.execute_update(sql, params)
+            self._write_comments(validated['ann_id'], validated['json_data']['comments'])
         self._emit_event('create', 'completed', {
             'ann_id': validated['ann_id'],
             'pdf_uuid': validated['pdf_uuid']
@@ -361,7 +452,8 @@ class PDFAnnotationTablePlugin(TablePlugin):
         return validated['ann_id']
 
     def update(self, primary_key: str, data: Dict[str, Any]) -> bool:
-        existing = self.query_by_id(primary_key)
+        # 评论存放于子表：仅当调用方显式传入 comments 时才替换，否则不读取也不改写评论
+        existing = self._query_row(primary_key)
         if not existing:
             return False
 
@@ -375,9 +467,10 @@ class PDFAnnotationTablePlugin(TablePlugin):
             'version': existing.get('version', 1) + 1,
             'json_data': {
                 'data': json.loads(json.dumps(existing['data'])),
-                'comments': json.loads(json.dumps(existing.get('comments', [])))
+                'comments': []
             }
         }
+        replace_comments = False
 
         if 'pdf_uuid' in data:
             merged['pdf_uuid'] = self._validate_pdf_uuid(data['pdf_uuid'])
@@ -407,15 +500,18 @@ class PDFAnnotationTablePlugin(TablePlugin):
                 merged['json_data']['data'].update(payload['data'])
             if 'comments' in payload:
                 merged['json_data']['comments'] = payload['comments']
+                replace_comments = True
 
         if 'comments' in data:
             merged['json_data']['comments'] = data['comments']
+            replace_comments = True
         if 'data' in data:
             if not isinstance(data['data'], dict):
                 raise DatabaseValidationError('data must be a dict')
             merged['json_data']['data'].update(data['data'])
 
         normalized = self.validate_data(merged)
+        self._absorb_image_data(normalized)
 
         sql = """
         UPDATE pdf_annotation
@@ -436,31 +532,61 @@ class PDFAnnotationTablePlugin(TablePlugin):
             normalized['created_at'],
             normalized['updated_at'],
             normalized['version'],
-            json.dumps(normalized['json_data'], ensure_ascii=False),
+            self._dump_json_data(normalized['json_data']),
             primary_key,
         )
-        rows = self._executor.execute_update(sql, params)
+        # 主行与评论的改写在同一事务内提交，中途失败不会丢失评论
+        with self._executor.transaction():
+            rows = self._executor.execute_update(sql, params)
+            comments = None
+            if rows > 0 and replace_comments:
+                comments = normalized['json_data']['comments']
+            elif rows > 0 and existing['comments']:
+                # 迁移未完成时读到的内联评论：json_data 重写后不再保留，随本次更新转入子表（排在已有评论之前）
+                comments = existing['comments'] + self._query_stored_comments(primary_key)
+            if comments is not None:
+                self._executor.execute_update(
+                    "DELETE FROM pdf_annotation_comment WHERE ann_id = ?",
+                    (primary_key,)
+                )
+                self._write_comments(primary_key, comments)
         if rows > 0:
-            self._emit_event('update', 'completed', {'ann_id': primary_key})
+            if existing['data'].get('imageHash') != normalized['json_data']['data'].get('imageHash'):
+                self._blob_store.collect_garbage()
+            event_data = {'ann_id': primary_key, 'pdf_uuid': normalized['pdf_uuid']}
+            if existing['pdf_uuid'] != normalized['pdf_uuid']:
+                event_data['previous_pdf_uuid'] = existing['pdf_uuid']
+            self._emit_event('update', 'completed', event_data)
             if self._logger:
                 self._logger.info(f"Updated annotation: {primary_key}")
         return rows > 0
 
     def delete(self, primary_key: str) -> bool:
+        # 事件中附带 pdf_uuid，供订阅方（如计数缓存）按 PDF 失效
+        owner = self._executor.execute_query(
+            "SELECT pdf_uuid FROM pdf_annotation WHERE ann_id = ?", (primary_key,)
+        )
+        if not owner:
+            return False
         sql = "DELETE FROM pdf_annotation WHERE ann_id = ?"
         rows = self._executor.execute_update(sql, (primary_key,))
         if rows > 0:
-            self._emit_event('delete', 'completed', {'ann_id': primary_key})
+            self._blob_store.collect_garbage()
+            self._emit_event('delete', 'completed', {'ann_id': primary_key, 'pdf_uuid': owner[0]['pdf_uuid']})
             if self._logger:
                 self._logger.info(f"Deleted annotation: {primary_key}")
         return rows > 0
 
-    def query_by_id(self, primary_key: str) -> Optional[Dict[str, Any]]:
-        sql = "SELECT * FROM pdf_annotation WHERE ann_id = ?"
-        rows = self._executor.execute_query(sql, (primary_key,))
-        if not rows:
+    def query_by_id(
+        self,
+        primary_key: str,
+        *,
+        comments_limit: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        row = self._query_row(primary_key)
+        if not row:
             return None
-        return self._parse_row(rows[0])
+        return self._attach_comments([row], comments_limit)[0]
 
     def query_all(
         self,
@@ -476,13 +602,22 @@ class PDFAnnotationTablePlugin(TablePlugin):
             sql += " OFFSET ?"
             params.append(int(offset))
         rows = self._executor.execute_query(sql, tuple(params) if params else None)
-        return [self._parse_row(row) for row in rows]
+        return self._attach_comments([self._parse_row(row) for row in rows])
+
+    def _query_row(self, primary_key: str) -> Optional[Dict[str, Any]]:
+        """查询标注主行（不含评论）。"""
+        sql = "SELECT * FROM pdf_annotation WHERE ann_id = ?"
+        rows = self._executor.execute_query(sql, (primary_key,))
+        if not rows:
+            return None
+        return self._parse_row(rows[0])
 
     def _parse_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         try:
             json_data = json.loads(row.get('json_data', '{}'))
         except json.JSONDecodeError:
             json_data = {}
+        comments = self._inline_comments(json_data) if self._inline_comments_pending else []
         return {
             'ann_id': row['ann_id'],
             'pdf_uuid': row['pdf_uuid'],
@@ -492,19 +627,41 @@ class PDFAnnotationTablePlugin(TablePlugin):
             'updated_at': row['updated_at'],
             'version': row['version'],
             'data': json_data.get('data', {}),
-            'comments': json_data.get('comments', []),
+            'comments': comments,
+            'comment_count': len(comments),
         }
 
+    @staticmethod
+    def _inline_comments(json_data: Any) -> List[Dict[str, Any]]:
+        """旧格式 json_data.comments 中的评论（忽略非对象或缺少 id 的元素）。"""
+        comments = json_data.get('comments') if isinstance(json_data, dict) else None
+        if not isinstance(comments, list):
+            return []
+        return [
+            {
+                'id': item['id'],
+                'content': item.get('content') or '',
+                'createdAt': item.get('createdAt') or '',
+            }
+            for item in comments
+            if isinstance(item, dict) and item.get('id') is not None
+        ]
+
     # ==================== 扩展方法 ====================
 
-    def query_by_pdf(self, pdf_uuid: str) -> List[Dict[str, Any]]:
+    def query_by_pdf(
+        self,
+        pdf_uuid: str,
+        *,
+        comments_limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         sql = """
         SELECT * FROM pdf_annotation
         WHERE pdf_uuid = ?
         ORDER BY page_number, created_at
         """
         rows = self._executor.execute_query(sql, (pdf_uuid,))
-        return [self._parse_row(row) for row in rows]
+        return self._attach_comments([self._parse_row(row) for row in rows], comments_limit)
 
     def query_by_page(self, pdf_uuid: str, page_number: int) -> List[Dict[str, Any]]:
         sql = """
@@ -513,7 +670,7 @@ class PDFAnnotationTablePlugin(TablePlugin):
         ORDER BY created_at
         """
         rows = self._executor.execute_query(sql, (pdf_uuid, page_number))
-        return [self._parse_row(row) for row in rows]
+        return self._attach_comments([self._parse_row(row) for row in rows])
 
     def query_by_type(self, pdf_uuid: str, ann_type: str) -> List[Dict[str, Any]]:
         sql = """
@@ -522,7 +679,7 @@ class PDFAnnotationTablePlugin(TablePlugin):
         ORDER BY page_number, created_at
         """
         rows = self._executor.execute_query(sql, (pdf_uuid, ann_type))
-        return [self._parse_row(row) for row in rows]
+        return self._attach_comments([self._parse_row(row) for row in rows])
 
     def count_by_pdf(self, pdf_uuid: str) -> int:
         sql = "SELECT COUNT(*) as count FROM pdf_annotation WHERE pdf_uuid = ?"
@@ -540,6 +697,8 @@ class PDFAnnotationTablePlugin(TablePlugin):
     def delete_by_pdf(self, pdf_uuid: str) -> int:
         sql = "DELETE FROM pdf_annotation WHERE pdf_uuid = ?"
         rows = self._executor.execute_update(sql, (pdf_uuid,))
+        # pdf_info 级联删除时 rows 可能为 0，但触发器已扣减引用计数，仍需回收
+        self._blob_store.collect_garbage()
         if rows > 0:
             self._emit_event('delete', 'completed', {
                 'pdf_uuid': pdf_uuid,
@@ -549,37 +708,178 @@ class PDFAnnotationTablePlugin(TablePlugin):
                 self._logger.info(f"Deleted {rows} annotations for PDF {pdf_uuid}")
         return rows
 
+    # ==================== 评论（子表） ====================
+
+    def query_comments(
+        self,
+        ann_id: str,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """分页读取某条标注的评论（按写入顺序）。"""
+        inline = self._pending_inline_comments(ann_id)
+        if inline:
+            start = max(int(offset or 0), 0)
+            combined = inline + self._query_stored_comments(ann_id)
+            return combined[start:] if limit is None else combined[start:start + int(limit)]
+        return self._query_stored_comments(ann_id, limit, offset)
+
+    def _query_stored_comments(
+        self,
+        ann_id: str,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        sql = """
+        SELECT comment_id, created_at, content FROM pdf_annotation_comment
+        WHERE ann_id = ?
+        ORDER BY rowid
+        """
+        params: List[Any] = [ann_id]
+        if limit is not None or offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.append(int(limit) if limit is not None else -1)
+            params.append(int(offset) if offset is not None else 0)
+        rows = self._executor.execute_query(sql, tuple(params))
+        return [self._parse_comment_row(row) for row in rows]
+
+    def count_comments(self, ann_id: str) -> int:
+        sql = "SELECT COUNT(*) as count FROM pdf_annotation_comment WHERE ann_id = ?"
+        result = self._executor.execute_query(sql, (ann_id,))[0]
+        return result['count'] + len(self._pending_inline_comments(ann_id))
+
+    def _pending_inline_comments(self, ann_id: str) -> List[Dict[str, Any]]:
+        if not self._inline_comments_pending:
+            return []
+        row = self._query_row(ann_id)
+        return row['comments'] if row else []
+
     def add_comment(self, ann_id: str, comment_content: str) -> Optional[Dict[str, Any]]:
-        annotation = self.query_by_id(ann_id)
-        if not annotation:
-            return None
-        comment_id = self._generate_comment_id()
+        if not isinstance(comment_content, str) or not comment_content.strip():
+            raise DatabaseValidationError('comment.content must be a non-empty string')
         new_comment = {
-            'id': comment_id,
+            'id': self._generate_comment_id(),
             'content': comment_content,
             'createdAt': datetime.utcnow().isoformat() + 'Z',
         }
-        comments = list(annotation.get('comments', []))
-        comments.append(new_comment)
-        success = self.update(ann_id, {'comments': comments})
-        if success:
-            if self._logger:
-                self._logger.info(f"Added comment to annotation {ann_id}")
-            return new_comment
-        return None
+        # 事件中附带 pdf_uuid，供订阅方（如计数缓存、变更推送）按 PDF 定位
+        owner = self._executor.execute_query(
+            "SELECT pdf_uuid FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+        )
+        if not owner:
+            return None
+        # 仅当标注存在时插入（单条 INSERT ... SELECT，不读取/重写标注本身）
+        sql = """
+        INSERT INTO pdf_annotation_comment (ann_id, comment_id, created_at, content)
+        SELECT ann_id, ?, ?, ? FROM pdf_annotation WHERE ann_id = ?
+        """
+        rows = self._executor.execute_update(
+            sql,
+            (new_comment['id'], new_comment['createdAt'], new_comment['content'], ann_id)
+        )
+        if rows <= 0:
+            return None
+        self._emit_event('update', 'completed', {
+            'ann_id': ann_id,
+            'pdf_uuid': owner[0]['pdf_uuid'],
+            'comment_id': new_comment['id'],
+        })
+        if self._logger:
+            self._logger.info(f"Added comment to annotation {ann_id}")
+        return new_comment
 
     def remove_comment(self, ann_id: str, comment_id: str) -> bool:
-        annotation = self.query_by_id(ann_id)
-        if not annotation:
+        owner = self._executor.execute_query(
+            "SELECT pdf_uuid FROM pdf_annotation WHERE ann_id = ?", (ann_id,)
+        )
+        if not owner:
             return False
-        comments = annotation.get('comments', [])
-        filtered = [comment for comment in comments if comment.get('id') != comment_id]
-        if len(filtered) == len(comments):
+        sql = "DELETE FROM pdf_annotation_comment WHERE ann_id = ? AND comment_id = ?"
+        rows = self._executor.execute_update(sql, (ann_id, comment_id))
+        if rows <= 0:
             return False
-        success = self.update(ann_id, {'comments': filtered})
-        if success and self._logger:
+        self._emit_event('update', 'completed', {
+            'ann_id': ann_id,
+            'pdf_uuid': owner[0]['pdf_uuid'],
+            'comment_id': comment_id,
+        })
+        if self._logger:
             self._logger.info(f"Removed comment {comment_id} from annotation {ann_id}")
-        return success
+        return True
+
+    def _write_comments(self, ann_id: str, comments: List[Dict[str, Any]]) -> None:
+        if not comments:
+            return
+        sql = """
+        INSERT OR REPLACE INTO pdf_annotation_comment (ann_id, comment_id, created_at, content)
+        VALUES (?, ?, ?, ?)
+        """
+        self._executor.execute_batch(sql, [
+            (ann_id, item['id'], item['createdAt'], item['content'])
+            for item in comments
+        ])
+
+    def _attach_comments(
+        self,
+        annotations: List[Dict[str, Any]],
+        comments_limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """为一批标注批量挂载评论（一次查询，避免 N+1）。
+
+        comments_limit 为每条标注最多返回的评论数；comment_count 始终为评论总数。
+        内联评论迁移未完成时，_parse_row 回退读到的内联评论排在子表评论之前。
+        """
+        if not annotations:
+            return annotations
+        by_id = {item['ann_id']: item for item in annotations}
+        inline_counts = {item['ann_id']: item['comment_count'] for item in annotations}
+        if comments_limit is not None:
+            for item in annotations:
+                del item['comments'][int(comments_limit):]
+        ids = list(by_id.keys())
+        # SQLite 默认变量上限 999，分块查询
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            sql = f"""
+            SELECT ann_id, comment_id, created_at, content,
+                   COUNT(*) OVER (PARTITION BY ann_id) AS total
+            FROM pdf_annotation_comment
+            WHERE ann_id IN ({placeholders})
+            ORDER BY ann_id, rowid
+            """
+            for row in self._executor.execute_query(sql, tuple(chunk)):
+                target = by_id.get(row['ann_id'])
+                if target is None:
+                    continue
+                target['comment_count'] = inline_counts[row['ann_id']] + row['total']
+                if comments_limit is None or len(target['comments']) < int(comments_limit):
+                    target['comments'].append(self._parse_comment_row(row))
+        return annotations
+
+    @staticmethod
+    def _parse_comment_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': row['comment_id'],
+            'content': row['content'],
+            'createdAt': row['created_at'],
+        }
+
+    def _absorb_image_data(self, normalized: Dict[str, Any]) -> None:
+        """截图的 imageData 转存到 blob 存储，json_data 仅保留 imagePath/imageHash 引用。"""
+        if normalized['type'] != 'screenshot':
+            return
+        data = normalized['json_data']['data']
+        normalized['json_data']['data'] = self._blob_store.absorb(data)
+
+    @property
+    def blob_store(self) -> ScreenshotBlobStore:
+        return self._blob_store
+
+    @staticmethod
+    def _dump_json_data(json_data: Dict[str, Any]) -> str:
+        """序列化 json_data；评论存放于子表，不再写入 json_data.comments。"""
+        return json.dumps({'data': json_data['data']}, ensure_ascii=False)
 
     def register_events(self) -> None:
         self._event_bus.on(
@@ -613,7 +913,7 @@ class PDFAnnotationTablePlugin(TablePlugin):
 
     def _generate_comment_id(self) -> str:
         timestamp = int(time.time() * 1000)
-        random_part = str(timestamp)[-6:]
+        random_part = ''.join(secrets.choice(self._COMMENT_ID_ALPHABET) for _ in range(6))
         return f"comment_{timestamp}_{random_part}"
 
 
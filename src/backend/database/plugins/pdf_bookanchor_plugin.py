@@ -268,6 +268,34 @@ class PDFBookanchorTablePlugin(TablePlugin):
 
         return result
 
+    # ==================== 条件更新 ====================
+
+    _PATCHABLE_COLUMNS = frozenset({'page_at', 'position', 'visited_at'})
+    _EVENT_COLUMNS = ('pdf_uuid',)
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        normalized: Dict[str, Any] = {}
+        if 'page_at' in columns:
+            normalized['page_at'] = self._validate_page_at(columns['page_at'])
+        if 'position' in columns:
+            normalized['position'] = self._validate_position(columns['position'])
+        if 'visited_at' in columns:
+            normalized['visited_at'] = self._validate_non_negative_int(columns['visited_at'], 'visited_at')
+        # is_active 由 anchor_activate 专用接口维护（单活约束）
+        if 'is_active' in json_patch:
+            raise DatabaseValidationError('is_active cannot be patched')
+        if 'name' in json_patch:
+            name = json_patch['name']
+            if not isinstance(name, str) or not name.strip():
+                raise DatabaseValidationError('name must be a non-empty string')
+        if json_patch.get('use_count') is not None:
+            self._validate_non_negative_int(json_patch['use_count'], 'use_count')
+        return normalized
+
     # ==================== CRUD ====================
 
     def insert(self, data: Dict[str, Any]) -> str:
@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from ..exceptions import DatabaseValidationError
 from ..plugin.base_table_plugin import TablePlugin
 from ..plugin.event_bus import EventBus
+from .pdf_child_counters import ensure_pdf_child_counter
 
 if TYPE_CHECKING:
     from ..executor import SQLExecutor
@@ -86,10 +87,38 @@ class PDFBookmarkTablePlugin(TablePlugin):
             ON pdf_bookmark(json_extract(json_data, '$.pageNumber'));
         """
         self._executor.execute_script(script)
+        ensure_pdf_child_counter(self._executor, 'pdf_bookmark', 'bookmark_count', self._logger)
         self._emit_event('create', 'completed')
         if self._logger:
             self._logger.info('pdf_bookmark table ensured')
 
+    # ==================== 条件更新 ====================
+
+    _PRIMARY_KEY_COLUMN = 'bookmark_id'
+    _EVENT_COLUMNS = ('pdf_uuid',)
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        # 树结构（children/parentId）须整体保存，不接受部分补丁
+        blocked = {'children', 'parentId', 'type', 'region'} & set(json_patch)
+        if blocked:
+            raise DatabaseValidationError(f"fields not patchable: {', '.join(sorted(blocked))}")
+        if 'name' in json_patch:
+            name = json_patch['name']
+            if not isinstance(name, str) or not name.strip():
+                raise DatabaseValidationError('name must be a non-empty string')
+        if 'pageNumber' in json_patch:
+            if self._validate_positive_int(json_patch['pageNumber'], 'pageNumber') < 1:
+                raise DatabaseValidationError('pageNumber must be >= 1')
+        if 'order' in json_patch:
+            order_value = json_patch['order']
+            if not isinstance(order_value, int) or order_value < 0:
+                raise DatabaseValidationError('order must be a non-negative integer')
+        return dict(columns)
+
     # ==================== 验证 ====================
 
     def validate_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -375,16 +404,25 @@ class PDFBookmarkTablePlugin(TablePlugin):
         )
         rows = self._executor.execute_update(sql, params)
         if rows > 0:
-            self._emit_event('update', 'completed', {'bookmark_id': primary_key})
+            event_data = {'bookmark_id': primary_key, 'pdf_uuid': normalized['pdf_uuid']}
+            if existing['pdf_uuid'] != normalized['pdf_uuid']:
+                event_data['previous_pdf_uuid'] = existing['pdf_uuid']
+            self._emit_event('update', 'completed', event_data)
             if self._logger:
                 self._logger.info(f"Updated bookmark: {primary_key}")
         return rows > 0
 
     def delete(self, primary_key: str) -> bool:
+        # 事件中附带 pdf_uuid，供订阅方（如计数缓存）按 PDF 失效
+        owner = self._executor.execute_query(
+            "SELECT pdf_uuid FROM pdf_bookmark WHERE bookmark_id = ?", (primary_key,)
+        )
+        if not owner:
+            return False
         sql = "DELETE FROM pdf_bookmark WHERE bookmark_id = ?"
         rows = self._executor.execute_update(sql, (primary_key,))
         if rows > 0:
-            self._emit_event('delete', 'completed', {'bookmark_id': primary_key})
+            self._emit_event('delete', 'completed', {'bookmark_id': primary_key, 'pdf_uuid': owner[0]['pdf_uuid']})
             if self._logger:
                 self._logger.info(f"Deleted bookmark: {primary_key}")
         return rows > 0
@@ -0,0 +1,80 @@
+"""pdf_info 子表计数列维护
+
+pdf_info.annotation_count / bookmark_count 为反范式计数，由子表上的触发器在
+INSERT / DELETE / UPDATE OF pdf_uuid 时增减；ON DELETE CASCADE 删除的子行同样触发
+AFTER DELETE，因此无需在应用层维护。首次创建触发器时按子表实际行数回填一次。
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..executor import SQLExecutor
+
+
+def ensure_pdf_child_counter(
+    executor: 'SQLExecutor',
+    child_table: str,
+    count_column: str,
+    logger=None
+) -> bool:
+    """确保 child_table 上维护 pdf_info.<count_column> 的触发器存在。
+
+    Args:
+        executor: SQL 执行器
+        child_table: 带 pdf_uuid 列的子表名（如 pdf_annotation）
+        count_column: pdf_info 上的计数列名（如 annotation_count）
+
+    Returns:
+        bool: 本次是否新建了触发器并回填计数
+    """
+    columns = executor.execute_query("PRAGMA table_info(pdf_info)")
+    if not any(col.get('name') == count_column for col in columns):
+        if logger:
+            logger.warning('pdf_info.%s missing, skip %s counter triggers', count_column, child_table)
+        return False
+
+    insert_trigger = f"trg_{child_table}_count_insert"
+    existing = executor.execute_query(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+        (insert_trigger,)
+    )
+    if existing:
+        return False
+
+    script = f"""
+    BEGIN;
+    CREATE TRIGGER IF NOT EXISTS {insert_trigger}
+    AFTER INSERT ON {child_table}
+    BEGIN
+        UPDATE pdf_info SET {count_column} = {count_column} + 1
+        WHERE uuid = NEW.pdf_uuid;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{child_table}_count_delete
+    AFTER DELETE ON {child_table}
+    BEGIN
+        UPDATE pdf_info SET {count_column} = MAX({count_column} - 1, 0)
+        WHERE uuid = OLD.pdf_uuid;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{child_table}_count_move
+    AFTER UPDATE OF pdf_uuid ON {child_table}
+    WHEN OLD.pdf_uuid IS NOT NEW.pdf_uuid
+    BEGIN
+        UPDATE pdf_info SET {count_column} = MAX({count_column} - 1, 0)
+        WHERE uuid = OLD.pdf_uuid;
+        UPDATE pdf_info SET {count_column} = {count_column} + 1
+        WHERE uuid = NEW.pdf_uuid;
+    END;
+
+    UPDATE pdf_info SET {count_column} = (
+        SELECT COUNT(*) FROM {child_table} WHERE {child_table}.pdf_uuid = pdf_info.uuid
+    );
+    COMMIT;
+    """
+    executor.execute_script(script)
+    if logger:
+        logger.info('%s counter triggers created, pdf_info.%s backfilled', child_table, count_column)
+    return True
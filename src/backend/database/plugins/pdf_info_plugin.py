@@ -38,7 +38,7 @@ class PDFInfoTablePlugin(TablePlugin):
 
     @property
     def version(self) -> str:
-        return "1.0.0"
+        return "1.1.0"
 
     # ==================== 建表 ====================
 
@@ -54,13 +54,16 @@ class PDFInfoTablePlugin(TablePlugin):
             updated_at INTEGER NOT NULL DEFAULT 0,
             visited_at INTEGER DEFAULT 0,
             version INTEGER NOT NULL DEFAULT 1,
-            json_data TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(json_data))
+            json_data TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(json_data)),
+            annotation_count INTEGER NOT NULL DEFAULT 0,
+            bookmark_count INTEGER NOT NULL DEFAULT 0
         );
 
         CREATE INDEX IF NOT EXISTS idx_pdf_title ON pdf_info(title);
         CREATE INDEX IF NOT EXISTS idx_pdf_author ON pdf_info(author);
         CREATE INDEX IF NOT EXISTS idx_pdf_created ON pdf_info(created_at DESC);
         CREATE INDEX IF NOT EXISTS idx_pdf_visited ON pdf_info(visited_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_pdf_updated_uuid ON pdf_info(updated_at DESC, uuid DESC);
         CREATE INDEX IF NOT EXISTS idx_pdf_rating
             ON pdf_info(json_extract(json_data, '$.rating'));
         CREATE INDEX IF NOT EXISTS idx_pdf_visible
@@ -68,11 +71,39 @@ class PDFInfoTablePlugin(TablePlugin):
         """
 
         self._executor.execute_script(script)
+        self._ensure_counter_columns()
         self._emit_event("create", "completed")
 
         if self._logger:
             self._logger.info("pdf_info table ensured")
 
+    # 子表计数列：由 pdf_annotation / pdf_bookmark 插件创建的触发器维护（见 pdf_child_counters）
+    _COUNTER_COLUMNS = ("annotation_count", "bookmark_count")
+    _COUNTER_OPERATORS = {"eq": "=", "ne": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+    def _ensure_counter_columns(self) -> None:
+        """为旧库补齐计数列及其索引（新库已在 CREATE TABLE 中包含）。"""
+        rows = self._executor.execute_query("PRAGMA table_info(pdf_info)")
+        existing = {row.get("name") for row in rows}
+        statements = [
+            f"ALTER TABLE pdf_info ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0;"
+            for column in self._COUNTER_COLUMNS
+            if column not in existing
+        ]
+        statements.extend(
+            f"CREATE INDEX IF NOT EXISTS idx_pdf_{column} ON pdf_info({column} DESC);"
+            for column in self._COUNTER_COLUMNS
+        )
+        self._executor.execute_script("\n".join(statements))
+
+    def migrate(self, from_version: str, to_version: str) -> None:
+        if from_version == "1.0.0" and to_version == "1.1.0":
+            self._ensure_counter_columns()
+            return
+        raise NotImplementedError(
+            f"Migration from {from_version} to {to_version} not supported"
+        )
+
     # ==================== 验证 ====================
 
     def validate_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -269,6 +300,31 @@ class PDFInfoTablePlugin(TablePlugin):
 
         return validated
 
+    # ==================== 条件更新 ====================
+
+    _PATCHABLE_COLUMNS = frozenset({"title", "author", "page_count", "file_size", "visited_at"})
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        normalized: Dict[str, Any] = {}
+        for column, value in columns.items():
+            if column in ("title", "author"):
+                normalized[column] = self._validate_string(
+                    value, column, allow_empty=(column == "author")
+                )
+            else:
+                normalized[column] = self._validate_non_negative_int(value, column)
+        if "filename" in json_patch:
+            raise DatabaseValidationError("filename cannot be patched")
+        if json_patch.get("rating") is not None:
+            self._validate_rating(json_patch["rating"])
+        if json_patch.get("tags") is not None:
+            self._validate_tags(json_patch["tags"])
+        return normalized
+
     # ==================== CRUD ====================
 
     def insert(self, data: Dict[str, Any]) -> str:
@@ -378,6 +434,43 @@ class PDFInfoTablePlugin(TablePlugin):
                 self._logger.info(f"Deleted PDFInfo: {primary_key}")
         return rows > 0
 
+    # 单条 SQL 的参数个数上限（SQLITE_MAX_VARIABLE_NUMBER 旧版本默认 999）
+    _IN_CHUNK_SIZE = 500
+
+    def delete_many(self, primary_keys: List[str]) -> List[str]:
+        """在单个事务内批量删除，返回实际删除的 uuid（保持传入顺序）。
+
+        子表数据由 ON DELETE CASCADE 清理；仅发出一次聚合的删除事件
+        （data 含 uuids/count，不含 uuid），子表插件不会再逐条执行 delete_by_pdf。
+        """
+        keys = list(dict.fromkeys(k for k in primary_keys if isinstance(k, str) and k))
+        if not keys:
+            return []
+
+        existing = set()
+        for start in range(0, len(keys), self._IN_CHUNK_SIZE):
+            chunk = keys[start:start + self._IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._executor.execute_query(
+                f"SELECT uuid FROM pdf_info WHERE uuid IN ({placeholders})",
+                tuple(chunk)
+            )
+            existing.update(row["uuid"] for row in rows)
+
+        deleted = [key for key in keys if key in existing]
+        if not deleted:
+            return []
+
+        # executemany 在同一事务内执行，末尾统一提交一次
+        self._executor.execute_batch(
+            "DELETE FROM pdf_info WHERE uuid = ?",
+            [(key,) for key in deleted]
+        )
+        self._emit_event("delete", "completed", {"uuids": deleted, "count": len(deleted)})
+        if self._logger:
+            self._logger.info(f"Deleted {len(deleted)} PDFInfo records in one transaction")
+        return deleted
+
     def query_by_id(self, primary_key: str) -> Optional[Dict[str, Any]]:
         sql = "SELECT * FROM pdf_info WHERE uuid = ?"
         rows = self._executor.execute_query(sql, (primary_key,))
@@ -385,6 +478,21 @@ class PDFInfoTablePlugin(TablePlugin):
             return None
         return self._parse_row(rows[0])
 
+    def query_by_ids(self, primary_keys: List[str]) -> List[Dict[str, Any]]:
+        """按 uuid 批量查询（IN 分块），结果顺序与传入顺序一致，不存在的 uuid 被跳过。"""
+        keys = list(dict.fromkeys(k for k in primary_keys if isinstance(k, str) and k))
+        found: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(keys), self._IN_CHUNK_SIZE):
+            chunk = keys[start:start + self._IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._executor.execute_query(
+                f"SELECT * FROM pdf_info WHERE uuid IN ({placeholders})",
+                tuple(chunk)
+            )
+            for row in rows:
+                found[row["uuid"]] = self._parse_row(row)
+        return [found[key] for key in keys if key in found]
+
     def query_all(
         self,
         limit: Optional[int] = None,
@@ -445,6 +553,28 @@ class PDFInfoTablePlugin(TablePlugin):
         rows = self._executor.execute_query(sql, tuple(params) if params else None)
         return [self._parse_row(row) for row in rows]
 
+    def query_page_by_updated(
+        self,
+        after: Optional[Tuple[int, str]] = None,
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """按 (updated_at DESC, uuid DESC) 键集分页返回一页记录。
+
+        after 为上一页最后一行的 (updated_at, uuid)；借助 idx_pdf_updated_uuid
+        直接定位到起点，翻页成本与页码无关（OFFSET 需要先扫描并丢弃前面的所有行）。
+        """
+        if after is None:
+            sql = "SELECT * FROM pdf_info ORDER BY updated_at DESC, uuid DESC LIMIT ?"
+            params: Tuple[Any, ...] = (int(limit),)
+        else:
+            sql = (
+                "SELECT * FROM pdf_info WHERE (updated_at, uuid) < (?, ?) "
+                "ORDER BY updated_at DESC, uuid DESC LIMIT ?"
+            )
+            params = (int(after[0]), str(after[1]), int(limit))
+        rows = self._executor.execute_query(sql, params)
+        return [self._parse_row(row) for row in rows]
+
     def count_all(self) -> int:
         """返回 pdf_info 总记录数。"""
         rows = self._executor.execute_query("SELECT COUNT(*) AS c FROM pdf_info")
@@ -470,6 +600,8 @@ class PDFInfoTablePlugin(TablePlugin):
             "updated_at": row["updated_at"],
             "visited_at": row["visited_at"],
             "version": row["version"],
+            "annotation_count": row.get("annotation_count", 0) or 0,
+            "bookmark_count": row.get("bookmark_count", 0) or 0,
             "json_data": json_data,
         }
         parsed.update(json_data)
@@ -818,6 +950,12 @@ class PDFInfoTablePlugin(TablePlugin):
                         return f"NOT {eq_sql}", p
                 if field == 'total_reading_time' and operator == 'gte':
                     return "CAST(json_extract(json_data, '$.total_reading_time') AS INTEGER) >= ?", [int(value)]
+                # 子表计数列（触发器维护的真实列，可走索引）
+                if field in self._COUNTER_COLUMNS and operator in self._COUNTER_OPERATORS:
+                    try:
+                        return f"{field} {self._COUNTER_OPERATORS[operator]} ?", [int(value)]
+                    except (TypeError, ValueError):
+                        return "1=1", []
                 # 默认透传为真，避免误杀
                 return "1=1", []
             return "1=1", []
@@ -845,7 +983,8 @@ class PDFInfoTablePlugin(TablePlugin):
     def _build_order_by(self, sort_rules: Optional[List[Dict[str, Any]]]) -> Tuple[str, List[Any]]:
         """根据 sort_rules 生成安全的 ORDER BY 片段（含参数）。
 
-        支持字段：title/author/filename/created_at/updated_at/page_count/file_size 等
+        支持字段：title/author/filename/created_at/updated_at/page_count/file_size、
+        annotation_count/bookmark_count 等
         以及 weighted(formula) 公式（使用 SQL 内置表达式和 JSON1）。
         未提供规则时，默认按 title ASC。
         """
@@ -898,6 +1037,8 @@ class PDFInfoTablePlugin(TablePlugin):
                 parts.append(f"CAST(json_extract(json_data, '$.due_date') AS INTEGER) {direction.upper()}")
             elif field == "star":
                 parts.append(f"CAST(json_extract(json_data, '$.star') AS INTEGER) {direction.upper()}")
+            elif field in self._COUNTER_COLUMNS:
+                parts.append(f"{field} {direction.upper()}")
             else:
                 continue
 
@@ -969,6 +1110,8 @@ class PDFInfoTablePlugin(TablePlugin):
                 'last_accessed_at': "CAST(json_extract(json_data, '$.last_accessed_at') AS INTEGER)",
                 'due_date': "CAST(json_extract(json_data, '$.due_date') AS INTEGER)",
                 'star': "CAST(json_extract(json_data, '$.star') AS INTEGER)",
+                'annotation_count': 'annotation_count',
+                'bookmark_count': 'bookmark_count',
                 'title': 'title',
                 'author': 'author',
                 'filename': "json_extract(json_data, '$.filename')",
@@ -1097,6 +1240,8 @@ class PDFInfoTablePlugin(TablePlugin):
             'last_accessed_at': "CAST(json_extract(json_data, '$.last_accessed_at') AS INTEGER)",
             'due_date': "CAST(json_extract(json_data, '$.due_date') AS INTEGER)",
             'star': "CAST(json_extract(json_data, '$.star') AS INTEGER)",
+            'annotation_count': 'annotation_count',
+            'bookmark_count': 'bookmark_count',
             'title': 'title',
             'author': 'author',
             'filename': "json_extract(json_data, '$.filename')",
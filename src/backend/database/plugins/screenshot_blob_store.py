@@ -0,0 +1,319 @@
+"""截图 Blob 存储（内容寻址）
+
+截图标注的图片按 imageHash（图片字节的 MD5）落盘到 data/screenshots/<hash>.<ext>，
+标注 json_data 中只保存引用（imagePath + imageHash），不再内嵌 base64 imageData。
+
+引用计数保存在 pdf_annotation_blob 表中，由 pdf_annotation 上的触发器维护
+（包括 pdf_info 级联删除），计数归零的 blob 由 collect_garbage() 删除文件与记录。
+刚登记、尚未写入标注的 blob 计数同样为 0：created_at 记录其登记时间，回收时跳过宽限期内的
+未引用 blob，避免并发保存时被其它删除触发的回收误删；引用被释放（计数减到 0）时触发器把
+created_at 置 0，使其可被立即回收。
+图片通过 pdfFile_server 的 /data/screenshots/ 路由按需读取。
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from ..config import PROJECT_ROOT
+from ..exceptions import DatabaseValidationError
+
+if TYPE_CHECKING:
+    from ..executor import SQLExecutor
+
+
+SCREENSHOT_URL_PREFIX = '/data/screenshots/'
+
+_DATA_URI_PATTERN = re.compile(r'^data:(image/[A-Za-z0-9.+-]+);base64,(.*)$', re.DOTALL)
+_MIME_EXTENSIONS = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+}
+_EXTENSION_MIMES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'webp': 'image/webp',
+    'gif': 'image/gif',
+}
+
+
+class ScreenshotBlobStore:
+    """管理截图 blob 文件及其引用计数。"""
+
+    def __init__(
+        self,
+        executor: 'SQLExecutor',
+        blob_dir: Optional[Path] = None,
+        logger=None,
+        gc_grace_seconds: float = 300.0
+    ) -> None:
+        self._executor = executor
+        self._logger = logger
+        self._gc_grace_seconds = gc_grace_seconds
+        self._blob_dir = Path(blob_dir) if blob_dir else self._default_blob_dir()
+
+    @property
+    def blob_dir(self) -> Path:
+        return self._blob_dir
+
+    def _default_blob_dir(self) -> Path:
+        """默认与数据库文件同级的 screenshots 目录（生产环境即 data/screenshots）。"""
+        try:
+            for row in self._executor.execute_query("PRAGMA database_list"):
+                if row.get('name') == 'main' and row.get('file'):
+                    return Path(row['file']).parent / 'screenshots'
+        except Exception:
+            pass
+        return PROJECT_ROOT / 'data' / 'screenshots'
+
+    # ==================== 表结构 ====================
+
+    def ensure_schema(self) -> None:
+        """创建引用计数表与 pdf_annotation 上的维护触发器（需在 pdf_annotation 建表之后调用）。
+
+        首次建表时（从没有 blob 表的版本升级）登记已有标注引用的截图文件并重算引用计数，
+        否则这些 blob 的计数从 0 开始，删除同 hash 的新标注后会被误回收。
+        """
+        existed = bool(self._executor.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pdf_annotation_blob'"
+        ))
+        # 减计数触发器在旧版本中不重置 created_at，每次启动重建以保持最新定义
+        script = """
+        DROP TRIGGER IF EXISTS trg_ann_blob_ref_delete;
+        DROP TRIGGER IF EXISTS trg_ann_blob_ref_update;
+
+        CREATE TABLE IF NOT EXISTS pdf_annotation_blob (
+            image_hash TEXT PRIMARY KEY NOT NULL,
+            mime_type TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            byte_size INTEGER NOT NULL DEFAULT 0,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ann_blob_ref_count
+            ON pdf_annotation_blob(ref_count);
+
+        CREATE TRIGGER IF NOT EXISTS trg_ann_blob_ref_insert
+        AFTER INSERT ON pdf_annotation
+        WHEN json_extract(NEW.json_data, '$.data.imageHash') IS NOT NULL
+        BEGIN
+            UPDATE pdf_annotation_blob SET ref_count = ref_count + 1
+            WHERE image_hash = json_extract(NEW.json_data, '$.data.imageHash');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_ann_blob_ref_delete
+        AFTER DELETE ON pdf_annotation
+        WHEN json_extract(OLD.json_data, '$.data.imageHash') IS NOT NULL
+        BEGIN
+            UPDATE pdf_annotation_blob SET ref_count = MAX(ref_count - 1, 0),
+                created_at = CASE WHEN ref_count <= 1 THEN 0 ELSE created_at END
+            WHERE image_hash = json_extract(OLD.json_data, '$.data.imageHash');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_ann_blob_ref_update
+        AFTER UPDATE OF json_data ON pdf_annotation
+        WHEN json_extract(OLD.json_data, '$.data.imageHash')
+             IS NOT json_extract(NEW.json_data, '$.data.imageHash')
+        BEGIN
+            UPDATE pdf_annotation_blob SET ref_count = MAX(ref_count - 1, 0),
+                created_at = CASE WHEN ref_count <= 1 THEN 0 ELSE created_at END
+            WHERE image_hash = json_extract(OLD.json_data, '$.data.imageHash');
+            UPDATE pdf_annotation_blob SET ref_count = ref_count + 1
+            WHERE image_hash = json_extract(NEW.json_data, '$.data.imageHash');
+        END;
+        """
+        self._executor.execute_script(script)
+        if not existed:
+            self._backfill_existing_refs()
+
+    def _backfill_existing_refs(self) -> None:
+        rows = self._executor.execute_query(
+            """
+            SELECT DISTINCT json_extract(json_data, '$.data.imageHash') AS image_hash
+            FROM pdf_annotation
+            WHERE json_extract(json_data, '$.data.imageHash') IS NOT NULL
+            """
+        )
+        registered = sum(1 for row in rows if self.register_existing(row['image_hash']))
+        self._recount_refs()
+        if registered and self._logger:
+            self._logger.info(f"Registered {registered} existing screenshot blobs")
+
+    # ==================== 写入 ====================
+
+    def absorb(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """将截图 payload 中的 imageData 落盘并登记，返回仅含引用的 payload。
+
+        必须在写入 pdf_annotation 之前调用，触发器才能为新引用计数。
+        """
+        image_hash = payload.get('imageHash')
+        if not image_hash:
+            return payload
+        result = dict(payload)
+        image_data = result.pop('imageData', None)
+        if image_data is not None:
+            file_name = self.put_data_uri(image_hash, image_data)
+            result['imagePath'] = SCREENSHOT_URL_PREFIX + file_name
+        else:
+            self.register_existing(image_hash)
+        return result
+
+    def put_data_uri(self, image_hash: str, data_uri: str) -> str:
+        """写入 data URI 图片（同 hash 已存在则跳过写盘），返回文件名。"""
+        match = _DATA_URI_PATTERN.match(data_uri or '')
+        if not match:
+            raise DatabaseValidationError('imageData must be base64 data URI')
+        mime_type = match.group(1).lower()
+        try:
+            raw = base64.b64decode(match.group(2), validate=False)
+        except (binascii.Error, ValueError) as exc:
+            raise DatabaseValidationError('imageData must be base64 data URI') from exc
+        if hashlib.md5(raw).hexdigest() != image_hash.lower():
+            raise DatabaseValidationError('imageHash does not match imageData')
+
+        file_name = f"{image_hash}.{_MIME_EXTENSIONS.get(mime_type, 'png')}"
+        target = self._blob_dir / file_name
+        if not target.is_file():
+            self._blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_suffix(target.suffix + '.tmp')
+            with open(tmp_path, 'wb') as fh:
+                fh.write(raw)
+            os.replace(tmp_path, target)
+        self._register(image_hash, mime_type, file_name, len(raw))
+        return file_name
+
+    def register_existing(self, image_hash: str) -> bool:
+        """登记已由其它途径落盘的截图（如 ScreenshotHandler 写入的 <hash>.png）。"""
+        path = self.find_file(image_hash)
+        if path is None:
+            return False
+        ext = path.suffix.lstrip('.').lower()
+        self._register(
+            image_hash,
+            _EXTENSION_MIMES.get(ext, 'application/octet-stream'),
+            path.name,
+            path.stat().st_size,
+        )
+        return True
+
+    def _register(self, image_hash: str, mime_type: str, file_name: str, size: int) -> None:
+        # 未被引用的已有记录刷新登记时间，重新进入回收宽限期
+        sql = """
+        INSERT INTO pdf_annotation_blob (
+            image_hash, mime_type, file_name, byte_size, ref_count, created_at
+        ) VALUES (?, ?, ?, ?, 0, ?)
+        ON CONFLICT(image_hash) DO UPDATE SET created_at = excluded.created_at
+        WHERE pdf_annotation_blob.ref_count <= 0
+        """
+        self._executor.execute_update(
+            sql,
+            (image_hash, mime_type, file_name, size, int(time.time() * 1000))
+        )
+
+    # ==================== 查询 ====================
+
+    def find_file(self, image_hash: str) -> Optional[Path]:
+        if not image_hash or not self._blob_dir.is_dir():
+            return None
+        for ext in _EXTENSION_MIMES:
+            candidate = self._blob_dir / f"{image_hash}.{ext}"
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def get_info(self, image_hash: str) -> Optional[Dict[str, Any]]:
+        rows = self._executor.execute_query(
+            "SELECT * FROM pdf_annotation_blob WHERE image_hash = ?",
+            (image_hash,)
+        )
+        return rows[0] if rows else None
+
+    # ==================== 回收 ====================
+
+    def collect_garbage(self, grace_seconds: Optional[float] = None) -> List[str]:
+        """删除引用计数为 0 的 blob 文件及记录，返回被回收的 hash 列表。
+
+        登记时间在宽限期内（默认 gc_grace_seconds）的未引用 blob 视为保存进行中，本次不回收。
+        """
+        grace = self._gc_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = int((time.time() - grace) * 1000)
+        rows = self._executor.execute_query(
+            "SELECT image_hash, file_name FROM pdf_annotation_blob WHERE ref_count <= 0 AND created_at <= ?",
+            (cutoff,)
+        )
+        if not rows:
+            return []
+        removed: List[str] = []
+        for row in rows:
+            try:
+                (self._blob_dir / row['file_name']).unlink(missing_ok=True)
+            except OSError as exc:
+                if self._logger:
+                    self._logger.warning('remove screenshot blob %s failed: %s', row['file_name'], exc)
+                continue
+            removed.append(row['image_hash'])
+        if removed:
+            self._executor.execute_batch(
+                "DELETE FROM pdf_annotation_blob WHERE image_hash = ? AND ref_count <= 0 AND created_at <= ?",
+                [(image_hash, cutoff) for image_hash in removed]
+            )
+            if self._logger:
+                self._logger.info(f"Collected {len(removed)} screenshot blobs")
+        return removed
+
+    # ==================== 迁移 ====================
+
+    def migrate_inline_image_data(self) -> int:
+        """把历史标注中内嵌的 imageData 外置到 blob 存储，并重算引用计数。"""
+        rows = self._executor.execute_query(
+            """
+            SELECT ann_id, json_extract(json_data, '$.data.imageHash') AS image_hash,
+                   json_extract(json_data, '$.data.imageData') AS image_data
+            FROM pdf_annotation
+            WHERE json_type(json_data, '$.data.imageData') IS NOT NULL
+            """
+        )
+        migrated = 0
+        for row in rows:
+            try:
+                file_name = self.put_data_uri(row['image_hash'] or '', row['image_data'])
+            except DatabaseValidationError as exc:
+                if self._logger:
+                    self._logger.warning('skip screenshot blob migration for %s: %s', row['ann_id'], exc)
+                continue
+            self._executor.execute_update(
+                """
+                UPDATE pdf_annotation
+                SET json_data = json_set(json_remove(json_data, '$.data.imageData'),
+                                         '$.data.imagePath', ?)
+                WHERE ann_id = ?
+                """,
+                (SCREENSHOT_URL_PREFIX + file_name, row['ann_id'])
+            )
+            migrated += 1
+        self._recount_refs()
+        if migrated and self._logger:
+            self._logger.info(f"Migrated {migrated} inline screenshot images to blob store")
+        return migrated
+
+    def _recount_refs(self) -> None:
+        """按 pdf_annotation 中的实际引用重算全部 blob 的 ref_count。"""
+        self._executor.execute_update(
+            """
+            UPDATE pdf_annotation_blob SET ref_count = (
+                SELECT COUNT(*) FROM pdf_annotation
+                WHERE json_extract(json_data, '$.data.imageHash') = pdf_annotation_blob.image_hash
+            )
+            """
+        )
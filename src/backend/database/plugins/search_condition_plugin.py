@@ -218,6 +218,34 @@ class SearchConditionTablePlugin(TablePlugin):
             result['weighted_sort'] = {'formula': formula}
         return result
 
+    # update_if_version 允许修改的列
+    _PATCHABLE_COLUMNS = frozenset({'name'})
+
+    def _validate_patch(
+        self,
+        columns: Dict[str, Any],
+        json_patch: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        normalized: Dict[str, Any] = {}
+        if 'name' in columns:
+            normalized['name'] = self._validate_string(columns['name'], 'name')
+        # condition/sort_config 为结构化对象，merge patch 会与旧结构混合，须通过 update 整体替换
+        blocked = {'condition', 'sort_config'} & set(json_patch)
+        if blocked:
+            raise DatabaseValidationError(f"fields not patchable: {', '.join(sorted(blocked))}")
+        description = json_patch.get('description')
+        if description is not None and not isinstance(description, str):
+            raise DatabaseValidationError('description must be a string')
+        if 'enabled' in json_patch and not isinstance(json_patch['enabled'], bool):
+            raise DatabaseValidationError('enabled must be a boolean')
+        tags = json_patch.get('tags')
+        if tags is not None and (not isinstance(tags, list) or any(not isinstance(tag, str) for tag in tags)):
+            raise DatabaseValidationError('tags must be a list of strings')
+        for field in ('use_count', 'last_used_at'):
+            if json_patch.get(field) is not None:
+                self._validate_non_negative_int(json_patch[field], field)
+        return normalized
+
     def insert(self, data: Dict[str, Any]) -> str:
         validated = self.validate_data(data)
         sql = '''
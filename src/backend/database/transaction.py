@@ -65,6 +65,11 @@ class TransactionManager:
         if conn_id not in TransactionManager._transaction_depth:
             TransactionManager._transaction_depth[conn_id] = 0
 
+    @classmethod
+    def is_active(cls, connection: sqlite3.Connection) -> bool:
+        """连接上是否有经由 TransactionManager 开启、尚未结束的事务"""
+        return cls._transaction_depth.get(id(connection), 0) > 0
+
     def begin(self) -> None:
         """
         开启事务
@@ -83,6 +88,11 @@ class TransactionManager:
             depth = TransactionManager._transaction_depth[conn_id]
 
             if depth == 0:
+                if self._conn.in_transaction:
+                    # 残留的隐式事务（如失败语句未回滚）会使 BEGIN 报错，先回滚
+                    if self._logger:
+                        self._logger.warning("Rolling back stale implicit transaction before BEGIN")
+                    self._conn.rollback()
                 # 主事务：BEGIN
                 self._conn.execute("BEGIN")
                 if self._logger:
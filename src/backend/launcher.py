@@ -45,6 +45,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger('backend-launcher')
 
+# 消息中心传输层 → 启动模块（两者共用同一套处理函数与消息契约）
+MSG_CENTER_TRANSPORTS = {
+    'qt': 'src.backend.msgCenter_server.standard_server',
+    'asyncio': 'src.backend.msgCenter_server.async_server',
+}
+
 
 class BackendPortManager:
     """后端服务端口管理器"""
@@ -302,15 +308,21 @@ class BackendProcessManager:
         """终止进程"""
         return kill_process_tree(pid)
 
-    def start_service(self, service_name: str, port: int) -> bool:
+    def start_service(self, service_name: str, port: int, transport: str = 'qt') -> bool:
         """启动服务
 
         注意: 调用此方法前应确保没有同名服务在运行
+
+        Args:
+            transport: 消息中心传输层，qt（QWebSocketServer）或 asyncio（无头）
         """
         # 构建启动命令
         if service_name == 'msgCenter_server':
-            cmd = [sys.executable, '-m', 'src.backend.msgCenter_server.standard_server',
-                   '--port', str(port)]
+            module = MSG_CENTER_TRANSPORTS.get(transport)
+            if module is None:
+                logger.error(f"❌ 未知消息中心传输层: {transport}")
+                return False
+            cmd = [sys.executable, '-m', module, '--port', str(port)]
         elif service_name == 'pdfFile-server':
             cmd = [sys.executable, '-m', 'src.backend.pdfFile_server',
                    '--port', str(port)]
@@ -415,6 +427,7 @@ class BackendLauncher:
         ports = self.port_manager.resolve_ports(args)
 
         # 第三步: 启动服务
+        transport = getattr(args, 'msgCenter_transport', None) or 'qt'
         success_count = 0
         for service in services:
             # 映射服务名到端口键
@@ -426,7 +439,7 @@ class BackendLauncher:
                 port_key = f"{service}_port"
             port = ports.get(port_key)
 
-            if port and self.process_manager.start_service(service, port):
+            if port and self.process_manager.start_service(service, port, transport):
                 success_count += 1
             else:
                 # 对 pdfFile-server 增强：若启动失败，自动尝试切换到下一个可用端口
@@ -548,8 +561,11 @@ def parse_arguments() -> argparse.Namespace:
   python launcher.py start                                    # 启动所有后端服务
   python launcher.py start --msgCenter-port 8766            # 指定消息中心服务器端口
   python launcher.py start --pdfFileServer-port 8080         # 指定PDF文件服务器端口
+  python launcher.py start --msgCenter-transport asyncio     # 消息中心使用无头 asyncio 传输层
   python launcher.py stop                                     # 停止所有服务
   python launcher.py status                                   # 查看服务状态
+  python launcher.py backup                                   # 在线备份数据库（服务运行中亦可）
+  python launcher.py backup --status                          # 查看备份状态与快照列表
         """
     )
 
@@ -559,6 +575,8 @@ def parse_arguments() -> argparse.Namespace:
     start_parser = subparsers.add_parser('start', help='启动后端服务')
     start_parser.add_argument('--msgCenter-port', type=int, dest='msgCenter_port', help='消息中心服务器端口')
     start_parser.add_argument('--pdfFileServer-port', type=int, dest='pdfFileServer_port', help='PDF文件服务器端口')
+    start_parser.add_argument('--msgCenter-transport', choices=sorted(MSG_CENTER_TRANSPORTS), default='qt',
+                              dest='msgCenter_transport', help='消息中心传输层（默认 qt）')
 
     # stop 命令
     subparsers.add_parser('stop', help='停止后端服务')
@@ -566,18 +584,50 @@ def parse_arguments() -> argparse.Namespace:
     # status 命令
     subparsers.add_parser('status', help='查看服务状态')
 
+    # backup 命令
+    backup_parser = subparsers.add_parser('backup', help='在线备份数据库')
+    backup_parser.add_argument('--status', action='store_true', help='仅查看备份状态')
+    backup_parser.add_argument('--keep', type=int, default=5, help='保留的快照数量（默认 5）')
+    backup_parser.add_argument('--dest', type=str, help='快照目录（默认 data/backups）')
+
     return parser.parse_args()
 
 
+def run_backup(args: argparse.Namespace) -> int:
+    """执行 backup 子命令：创建在线快照或查看状态"""
+    from src.backend.database.backup import DatabaseBackupManager
+    from src.backend.database.exceptions import DatabaseError
+
+    manager = DatabaseBackupManager(backup_dir=args.dest, keep=args.keep)
+    if args.status:
+        print("\n--- 备份状态 ---")
+        print(json.dumps(manager.status(), ensure_ascii=False, indent=2))
+        print("-" * 15)
+        return 0
+
+    try:
+        info = manager.create_snapshot()
+    except DatabaseError as e:
+        logger.error(f"数据库备份失败: {e}")
+        return 1
+    print("\n--- 备份完成 ---")
+    print(json.dumps(info, ensure_ascii=False, indent=2))
+    print("-" * 15)
+    return 0
+
+
 def main():
     """主函数"""
     args = parse_arguments()
 
     if not args.command:
-        print("请指定命令: start, stop, 或 status")
+        print("请指定命令: start, stop, status, 或 backup")
         print("使用 --help 查看详细帮助")
         return 1
 
+    if args.command == 'backup':
+        return run_backup(args)
+
     launcher = BackendLauncher()
 
     try:
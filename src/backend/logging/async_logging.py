@@ -0,0 +1,246 @@
+"""
+后端服务共享的异步结构化日志配置
+
+msgCenter_server 与 pdfFile_server 的 setup_logging 都经由 configure_logging() 配置根 logger：
+
+- 根 logger 只挂一个 QueueHandler，调用方线程只把日志记录放入有界队列；
+  格式化与文件/控制台写入由 QueueListener 后台线程完成，事件循环不再被磁盘 I/O 阻塞
+- 日志文件为 JSON Lines（每行一个对象：ts/level/logger/msg，可选 category/exc），
+  控制台仍为人可读的文本格式
+- 高频事件通过 extra={"category": ...} 标记类别，按类别采样（每 N 条保留 1 条）；
+  WARNING 及以上级别从不采样。被级别或采样过滤掉的记录不会格式化参数，
+  热路径请使用 logger.info("... %s", value, extra=...) 形式的惰性格式化
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+# 高频事件类别
+CATEGORY_WS_MESSAGE = "ws.message"
+CATEGORY_HTTP_ACCESS = "http.access"
+
+# 默认采样率：每类保留的比例（1 表示全部保留，0 表示全部丢弃）
+DEFAULT_SAMPLING: Dict[str, float] = {
+    CATEGORY_WS_MESSAGE: 0.01,
+    CATEGORY_HTTP_ACCESS: 0.05,
+}
+
+DEFAULT_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_QUEUE_SIZE = 10000
+
+
+def category(name: str) -> Dict[str, str]:
+    """logger.info(..., extra=category(CATEGORY_WS_MESSAGE)) 的简写"""
+    return {"category": name}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条记录输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        record_category = getattr(record, "category", None)
+        if record_category:
+            payload["category"] = record_category
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    按类别确定性采样：采样率 r 时每 round(1/r) 条保留 1 条（每类的第一条总是保留）
+
+    未标记类别或未配置采样率的记录、WARNING 及以上级别的记录全部放行。
+    """
+
+    def __init__(self, rates: Optional[Mapping[str, float]] = None) -> None:
+        super().__init__()
+        self._every: Dict[str, int] = {}
+        for name, rate in (rates or {}).items():
+            rate = float(rate)
+            # 0 表示全部丢弃
+            self._every[name] = 0 if rate <= 0 else max(int(round(1 / min(rate, 1.0))), 1)
+        self._seen: Dict[str, int] = {}
+        self._kept: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = getattr(record, "category", None)
+        if name is None or record.levelno >= logging.WARNING:
+            return True
+        every = self._every.get(name)
+        if every is None:
+            return True
+        with self._lock:
+            seen = self._seen.get(name, 0)
+            self._seen[name] = seen + 1
+            keep = every > 0 and seen % every == 0
+            if keep:
+                self._kept[name] = self._kept.get(name, 0) + 1
+        return keep
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {"seen": self._seen.get(name, 0), "kept": self._kept.get(name, 0), "every": every}
+                for name, every in self._every.items()
+            }
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    只在入队前插值消息参数（保留调用时刻的值），格式化交给监听线程
+
+    标准 QueueHandler.prepare 会在调用方线程完成整条格式化并把异常堆栈拼进消息；
+    这里保留 exc_text 单独字段，供 JSON 格式化器输出。队列满时丢弃并计数，不阻塞调用方。
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.message = record.getMessage()
+        prepared.msg = prepared.message
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = record.exc_text or _EXC_FORMATTER.formatException(record.exc_info)
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AsyncLogging:
+    """configure_logging() 的返回值：持有队列、监听线程与采样过滤器"""
+
+    def __init__(self, handler: _LazyQueueHandler, listener: logging.handlers.QueueListener,
+                 sampler: SamplingFilter, log_file: Optional[str]) -> None:
+        self.handler = handler
+        self.listener = listener
+        self.sampler = sampler
+        self.log_file = log_file
+        self._stopped = False
+
+    def stop(self) -> None:
+        """写出队列中剩余的记录并关闭输出处理器（可重复调用）"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampling": self.sampler.stats(),
+        }
+
+
+_active: Optional[AsyncLogging] = None
+_active_lock = threading.Lock()
+
+
+def configure_logging(
+    log_file: Optional[str] = None,
+    *,
+    level: Any = logging.INFO,
+    console: bool = True,
+    file_mode: str = "w",
+    encoding: str = "utf-8",
+    text_format: str = DEFAULT_TEXT_FORMAT,
+    sampling: Optional[Mapping[str, float]] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> AsyncLogging:
+    """
+    把根 logger 配置为异步队列输出（再次调用会先停止上一次的配置）
+
+    Args:
+        log_file: JSON Lines 日志文件路径，None 时只输出到控制台
+        level: 根 logger 级别（logging 常量或 "INFO" 等名称）
+        console: 是否同时以文本格式输出到控制台
+        file_mode: 日志文件打开模式，默认 'w' 每次启动覆盖
+        sampling: {类别: 采样率}，None 时使用 DEFAULT_SAMPLING
+        queue_size: 队列容量，满时丢弃新记录并计入 stats()["dropped"]
+    """
+    global _active
+    if isinstance(level, str):
+        level = getattr(logging, level.upper())
+
+    outputs = []
+    if log_file is not None:
+        log_file = os.path.abspath(log_file)
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        file_handler = logging.FileHandler(log_file, mode=file_mode, encoding=encoding)
+        file_handler.setFormatter(JsonLinesFormatter())
+        outputs.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(text_format))
+        outputs.append(stream_handler)
+
+    handler = _LazyQueueHandler(queue.Queue(maxsize=max(int(queue_size), 1)))
+    sampler = SamplingFilter(DEFAULT_SAMPLING if sampling is None else sampling)
+    handler.addFilter(sampler)
+    listener = logging.handlers.QueueListener(handler.queue, *outputs, respect_handler_level=True)
+
+    with _active_lock:
+        previous, _active = _active, None
+        if previous is not None:
+            previous.stop()
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        # 移除所有现有的 handlers，避免重复记录
+        for existing in root_logger.handlers[:]:
+            root_logger.removeHandler(existing)
+        root_logger.addHandler(handler)
+        listener.start()
+        _active = AsyncLogging(handler, listener, sampler, log_file)
+        return _active
+
+
+def stop_logging() -> None:
+    """停止当前的异步日志配置并移除其 QueueHandler（进程退出时自动调用）"""
+    global _active
+    with _active_lock:
+        active, _active = _active, None
+        if active is None:
+            return
+        logging.getLogger().removeHandler(active.handler)
+        active.stop()
+
+
+def logging_stats() -> Optional[Dict[str, Any]]:
+    """当前配置的队列深度、丢弃数与各类别采样计数；未配置时返回 None"""
+    active = _active
+    return active.stats() if active is not None else None
+
+
+atexit.register(stop_logging)
@@ -98,3 +98,39 @@ def test_annotation_save_list_delete_roundtrip(server):
     })
     assert resp_list2["type"] == "annotation:list:completed"
     assert resp_list2["data"]["count"] == 0
+
+
+def test_annotation_list_pages_comments_of_one_annotation(server):
+    pdf_uuid = "0c251de0e2ad"
+    _ensure_pdf_record(server, pdf_uuid)
+    resp_save = server.handle_message({
+        "type": "annotation:save:requested",
+        "request_id": "req-ann-5",
+        "data": {
+            "pdf_uuid": pdf_uuid,
+            "annotation": {"type": "comment", "pageNumber": 1, "data": {
+                "position": {"x": 1, "y": 2}, "content": "note"}},
+        },
+    })
+    ann_id = resp_save["data"]["id"]
+    plugin = server.pdf_library_api._annotation_plugin
+    for index in range(5):
+        plugin.add_comment(ann_id, f"c{index}")
+
+    resp_page = server.handle_message({
+        "type": "annotation:list:requested",
+        "request_id": "req-ann-6",
+        "data": {"pdf_uuid": pdf_uuid, "ann_id": ann_id, "comments_limit": 2, "comments_offset": 2},
+    })
+    assert resp_page["data"]["count"] == 1 and resp_page["data"]["comments_offset"] == 2
+    item = resp_page["data"]["annotations"][0]
+    assert [c["content"] for c in item["comments"]] == ["c2", "c3"]
+    assert item["commentCount"] == 5
+
+    resp_bad = server.handle_message({
+        "type": "annotation:list:requested",
+        "request_id": "req-ann-7",
+        "data": {"pdf_uuid": pdf_uuid, "comments_offset": 2},
+    })
+    assert resp_bad["error"]["type"] == "INVALID_REQUEST"
+    plugin.delete(ann_id)
@@ -0,0 +1,89 @@
+import json
+import logging
+
+import pytest
+
+from src.backend.logging.async_logging import (
+    CATEGORY_HTTP_ACCESS, CATEGORY_WS_MESSAGE, SamplingFilter, category, configure_logging, logging_stats, stop_logging,
+)
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
+
+
+@pytest.fixture()
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class CountingArg:
+    def __init__(self):
+        self.rendered = 0
+
+    def __str__(self):
+        self.rendered += 1
+        return "rendered"
+
+
+def test_json_lines_written_by_listener_thread(tmp_path, restore_root_logger):
+    path = tmp_path / "logs" / "ws-server.log"
+    configure_logging(str(path), console=False, sampling={})
+    log = logging.getLogger("async-logging-test")
+
+    payload = {"n": 1}
+    log.info("值 %s", payload)
+    payload["n"] = 2  # 入队前已插值，之后的修改不影响日志内容
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("失败", extra=category("custom"))
+    stop_logging()
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r["msg"] for r in records] == ["值 {'n': 1}", "失败"]
+    assert records[0]["logger"] == "async-logging-test" and records[0]["level"] == "INFO"
+    assert records[1]["category"] == "custom"
+    assert "ValueError: boom" in records[1]["exc"]
+    assert logging_stats() is None
+
+
+def test_sampling_skips_formatting_of_dropped_records(tmp_path, restore_root_logger):
+    path = tmp_path / "pdf-server.log"
+    configure_logging(str(path), console=False, sampling={CATEGORY_HTTP_ACCESS: 0.25, "muted": 0})
+    log = logging.getLogger("async-logging-test")
+    arg = CountingArg()
+
+    for _ in range(8):
+        log.info("[GET] %s", arg, extra=category(CATEGORY_HTTP_ACCESS))
+    log.info("muted %s", arg, extra=category("muted"))
+    log.warning("muted warning %s", arg, extra=category("muted"))  # WARNING 及以上从不采样
+    log.debug("debug %s", arg)  # 低于根级别
+    stats = logging_stats()
+    stop_logging()
+
+    assert arg.rendered == 3
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["msg"] for line in lines] == ["[GET] rendered"] * 2 + ["muted warning rendered"]
+    assert stats["sampling"][CATEGORY_HTTP_ACCESS] == {"seen": 8, "kept": 2, "every": 4}
+    assert stats["sampling"]["muted"]["kept"] == 0
+
+
+def test_sampling_filter_rates():
+    sampler = SamplingFilter({CATEGORY_WS_MESSAGE: 0.01, "all": 1})
+    records = [logging.makeLogRecord({"levelno": logging.INFO, "category": CATEGORY_WS_MESSAGE}) for _ in range(250)]
+    assert sum(sampler.filter(r) for r in records) == 3
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.INFO, "category": "all"}))
+    assert sampler.filter(logging.makeLogRecord({"levelno": logging.INFO}))
+
+
+def test_metrics_report_logging_pipeline(tmp_path, restore_root_logger):
+    configure_logging(str(tmp_path / "ws-server.log"), console=False)
+    server = StandardWebSocketServer(pdf_library_api=None, max_workers=0)
+    server.handle_message({"type": "heartbeat", "request_id": "hb-1", "data": {}})
+    metrics = server.handle_system_metrics_request("m-1", {})
+    assert metrics["data"]["logging"]["sampling"][CATEGORY_WS_MESSAGE]["seen"] >= 1
+    assert metrics["data"]["logging"]["dropped"] == 0
+    server.release_resources()
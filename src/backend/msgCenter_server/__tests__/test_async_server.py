@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.backend.api.pdf_library_api import PDFLibraryAPI
+from src.backend.database.connection import DatabaseConnectionManager
+from src.backend.database.plugin.plugin_registry import TablePluginRegistry
+from src.backend.msgCenter_server.async_server import AsyncStandardServer, AsyncWebSocketClient, read_frame
+from src.backend.msgCenter_server.protocol import WebSocketProtocol
+
+
+@pytest.fixture()
+def library_api(tmp_path):
+    DatabaseConnectionManager._instance = None
+    TablePluginRegistry.reset_instance()
+    api = PDFLibraryAPI(db_path=str(tmp_path / "library.db"), pdf_manager=None)
+    yield api
+    TablePluginRegistry.reset_instance()
+    DatabaseConnectionManager._instance = None
+
+
+async def _recv_json(client):
+    return json.loads(await asyncio.wait_for(client.recv(), timeout=5))
+
+
+async def _send(client, message):
+    await client.send(json.dumps({"timestamp": int(time.time() * 1000), **message}))
+
+
+async def _request(client, message):
+    await _send(client, message)
+    while True:
+        reply = await _recv_json(client)
+        if reply.get("request_id") == message["request_id"]:
+            return reply
+
+
+def test_async_server_shares_handlers_and_contract(library_api):
+    async def scenario():
+        server = AsyncStandardServer(port=0, pdf_library_api=library_api, max_workers=2)
+        port = await server.start()
+        try:
+            client = await AsyncWebSocketClient.connect("127.0.0.1", port)
+            welcome = await _recv_json(client)
+            assert welcome["type"] == "system:status:updated"
+            assert welcome["data"]["status"] == "connected"
+
+            heartbeat = await _request(client, {"type": "heartbeat", "request_id": "hb-1"})
+            assert heartbeat["type"] == "system:heartbeat:completed"
+
+            listed = await _request(client, {"type": "pdf-library:list:requested", "request_id": "list-1", "data": {}})
+            assert listed["type"] == "pdf-library:list:completed"
+            assert listed["status"] == "success"
+
+            subscribed = await _request(client, {
+                "type": "subscription:subscribe:requested",
+                "request_id": "sub-1",
+                "data": {"topics": ["library"]},
+            })
+            assert subscribed["data"]["topics"] == ["library"]
+            assert server.handlers.subscriptions.topics_of(server.handlers.clients[0]) == ["library"]
+
+            invalid = await _request(client, {"type": "no-such:type:requested", "request_id": "bad-1"})
+            assert invalid["status"] == "error"
+
+            metrics = server.handlers.message_metrics.snapshot()
+            assert metrics["pdf-library:list:requested"]["count"] == 1
+            await client.close()
+        finally:
+            await server.stop()
+        assert server.handlers.clients == []
+
+    asyncio.run(scenario())
+
+
+def test_async_server_keeps_per_client_order_and_answers_ping(library_api):
+    async def scenario():
+        server = AsyncStandardServer(port=0, pdf_library_api=library_api, max_workers=2)
+        port = await server.start()
+        try:
+            client = await AsyncWebSocketClient.connect("127.0.0.1", port)
+            await _recv_json(client)
+            # 阻塞（线程池）与非阻塞消息交错发送，回复顺序与发送顺序一致
+            sent = []
+            for i in range(6):
+                message_type = "pdf-library:list:requested" if i % 2 == 0 else "heartbeat"
+                sent.append(f"req-{i}")
+                await _send(client, {"type": message_type, "request_id": f"req-{i}", "data": {}})
+            received = [(await _recv_json(client))["request_id"] for _ in sent]
+            assert received == sent
+
+            client._writer.write(WebSocketProtocol.build_ping_frame("x", masked=True))
+            await client._writer.drain()
+            opcode = None
+            while opcode != 0xA:
+                _fin, opcode, payload = await asyncio.wait_for(read_frame(client._reader, 1024), timeout=5)
+            assert payload == b"x"
+            await client.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_async_server_rejects_plain_http(library_api):
+    async def scenario():
+        server = AsyncStandardServer(port=0, pdf_library_api=library_api, max_workers=0)
+        port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            status = await asyncio.wait_for(reader.readline(), timeout=5)
+            assert b"400" in status
+            writer.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
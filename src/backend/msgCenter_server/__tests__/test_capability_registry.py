@@ -1,5 +1,6 @@
 import pytest
 
+from src.backend.msgCenter_server.capability_registry import CapabilityRegistry
 from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
 
 
@@ -37,3 +38,68 @@ def test_capability_describe_pdf_library(server):
     assert "pdf-library:search:requested" in event_types
     assert "pdf-library:search:completed" in event_types
 
+
+
+def test_capability_describe_database_backup_schemas(server):
+    discovered = server.handle_message({"type": "capability:discover:requested", "request_id": "req-cap-3", "data": {}})
+    database = next(d for d in discovered["data"]["domains"] if d["name"] == "database")
+    assert "database:backup-status:requested" in database["events"]
+
+    resp = server.handle_message({"type": "capability:describe:requested", "request_id": "req-cap-4", "data": {"domain": "database"}})
+    assert resp["type"] == "capability:describe:completed"
+    schemas = {e["type"]: e["schema"] for e in resp["data"]["events"]}
+    assert set(schemas) == {
+        "database:backup:requested", "database:backup:completed",
+        "database:backup-status:requested", "database:backup-status:completed",
+    }
+    # 契约文件均存在（schemaHash 为 None 表示文件缺失）
+    assert all(schema["schemaHash"] for schema in schemas.values())
+
+
+def test_capability_etags_allow_skipping_unchanged_descriptions(server):
+    discovered = server.handle_message({"type": "capability:discover:requested", "request_id": "d-1", "data": {}})
+    etag = discovered["data"]["etag"]
+    library = next(d for d in discovered["data"]["domains"] if d["name"] == "pdf-library")
+
+    described = server.handle_message({"type": "capability:describe:requested", "request_id": "d-2", "data": {"domain": "pdf-library"}})
+    assert described["data"]["etag"] == library["etag"]
+    computed = server.capabilities.schemas.computed
+
+    unchanged = server.handle_message({"type": "capability:discover:requested", "request_id": "d-3", "data": {"if_none_match": etag}})
+    assert unchanged["data"] == {"not_modified": True, "etag": etag}
+    again = server.handle_message({"type": "capability:describe:requested", "request_id": "d-4",
+                                   "data": {"domain": "pdf-library", "if_none_match": library["etag"]}})
+    assert again["data"] == {"domain": "pdf-library", "not_modified": True, "etag": library["etag"]}
+    # 缓存命中不重新读取 schema 文件
+    assert server.capabilities.schemas.computed == computed
+
+    missing = server.handle_message({"type": "capability:describe:requested", "request_id": "d-5", "data": {"domain": "nope"}})
+    assert missing["code"] == 404
+
+
+def test_registry_rebuilds_when_schema_file_changes(tmp_path):
+    schema = tmp_path / "demo" / "v1" / "messages" / "ping.request.schema.json"
+    schema.parent.mkdir(parents=True)
+    schema.write_text('{"title": "ping"}', encoding="utf-8")
+    builds = []
+
+    def build_description(domain, schema_info):
+        if domain != "demo":
+            return None
+        builds.append(domain)
+        return {"domain": domain, "events": [{"type": "demo:ping", "schema": schema_info("demo/v1/messages/ping.request.schema.json")}]}
+
+    registry = CapabilityRegistry(str(tmp_path), str(tmp_path), lambda: [{"name": "demo", "versions": ["1.0.0"], "events": []}],
+                                  build_description, check_interval=0)
+    registry.warm(["demo"])
+    described, etag = registry.describe("demo")
+    assert described["events"][0]["schema"]["path"] == "demo/v1/messages/ping.request.schema.json"
+    assert registry.describe("demo")[1] == etag and builds == ["demo"]
+
+    schema.write_text('{"title": "ping", "type": "object"}', encoding="utf-8")
+    changed, new_etag = registry.describe("demo")
+    assert new_etag != etag and builds == ["demo", "demo"]
+    assert changed["events"][0]["schema"]["schemaHash"] != described["events"][0]["schema"]["schemaHash"]
+    domains, _ = registry.discover()
+    assert domains[0]["etag"] == new_etag
+    assert registry.stats()["refreshes"] == 1
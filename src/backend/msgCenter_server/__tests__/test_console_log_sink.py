@@ -0,0 +1,89 @@
+import time
+
+from src.backend.msgCenter_server.console_log_sink import ConsoleLogSink
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
+
+
+def _entry(i, source="pdf-viewer"):
+    return {"source": source, "level": "warn", "timestamp": 1700000000000, "message": f"m{i}"}
+
+
+def test_rate_limit_is_per_source_and_drops_are_reported(tmp_path):
+    path = tmp_path / "console.log"
+    sink = ConsoleLogSink(str(path), rate_per_source=0.001, burst_per_source=3)
+
+    noisy = sink.submit([_entry(i) for i in range(5)])
+    quiet = sink.submit([_entry(0, source="pdf-home")])
+
+    assert noisy == {"accepted": 3, "dropped": 2, "dropped_by_source": {"pdf-viewer": 2}}
+    assert quiet["accepted"] == 1
+    sink.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [line.split("]", 2)[2] for line in lines[:4]] == [
+        "[pdf-viewer] m0", "[pdf-viewer] m1", "[pdf-viewer] m2", "[pdf-home] m0",
+    ]
+    assert "来源 pdf-viewer 超出速率限制，丢弃 2 条日志" in lines[4]
+    stats = sink.stats()
+    assert stats["rate_limited"] == {"pdf-viewer": 2}
+    assert stats["written"] == 5
+
+
+def test_ring_buffer_overflow_and_size_rotation(tmp_path):
+    path = tmp_path / "console.log"
+    sink = ConsoleLogSink(str(path), capacity=4, max_bytes=200, backup_count=2, rate_per_source=0)
+    # 不启动写线程：直接填满缓冲区
+    sink._closed = True
+
+    sink.submit([_entry(i) for i in range(6)])
+    assert sink.stats()["overflow_dropped"] == 2
+    assert sink.flush() == 4
+    assert path.read_text(encoding="utf-8").splitlines()[0].endswith("m2")
+
+    for round_ in range(3):
+        sink.submit([_entry(f"{round_}-{i}") for i in range(4)])
+        sink.flush()
+    assert (tmp_path / "console.log.1").exists()
+    assert (tmp_path / "console.log.2").exists()
+    assert not (tmp_path / "console.log.3").exists()
+    assert sink.stats()["rotations"] >= 2
+
+
+def test_background_writer_drains_buffer(tmp_path):
+    path = tmp_path / "console.log"
+    sink = ConsoleLogSink(str(path), flush_interval=0.01)
+    sink.submit([_entry(i) for i in range(3)])
+
+    deadline = time.monotonic() + 5
+    while not (path.exists() and len(path.read_text(encoding="utf-8").splitlines()) == 3):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert sink.stats()["buffered"] == 0
+    sink.close()
+
+
+def test_console_log_batch_message(tmp_path):
+    server = StandardWebSocketServer(pdf_library_api=None, max_workers=0)
+    server.console_log_sink.close()
+    server.console_log_sink = ConsoleLogSink(str(tmp_path / "console.log"), rate_per_source=0.001, burst_per_source=2)
+
+    response = server.handle_message({
+        "type": "console_log:batch",
+        "request_id": "logs-1",
+        "data": {"entries": [_entry(i) for i in range(3)]},
+    })
+    assert response["status"] == "success"
+    assert response["data"] == {"accepted": 2, "dropped": 1, "dropped_by_source": {"pdf-viewer": 1}}
+
+    single = server.handle_message({"type": "console_log", "request_id": "log-1", "data": _entry(9, source="pdf-home")})
+    assert single["data"]["logged"] is True
+
+    invalid = server.handle_message({"type": "console_log:batch", "request_id": "logs-2", "data": {"entries": "x"}})
+    assert invalid["status"] == "error"
+    too_many = server.handle_message({"type": "console_log:batch", "request_id": "logs-3", "data": {"entries": [{}] * 501}})
+    assert too_many["code"] == 413
+
+    metrics = server.handle_system_metrics_request("m-1", {})
+    assert metrics["data"]["console_log"]["rate_limited"] == {"pdf-viewer": 1}
+    server.release_resources()
+    assert len((tmp_path / "console.log").read_text(encoding="utf-8").splitlines()) == 4
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from src.backend.msgCenter_server.handler_executor import HandlerExecutor
+from src.qt.compat import QCoreApplication
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_until(app, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for queued results"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_per_client_order_and_concurrency_limit(qt_app):
+    executor = HandlerExecutor(max_workers=2)
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+    done = []
+
+    def slow(tag):
+        def run():
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return tag
+        return run
+
+    def collect(response, error):
+        done.append(response)
+
+    for client in ("a", "b", "c"):
+        executor.submit(client, slow(f"{client}1"), collect, blocking=True)
+        # 非阻塞消息排在同一客户端的阻塞消息之后
+        executor.submit(client, lambda c=client: f"{c}2", collect, blocking=False)
+        executor.submit(client, slow(f"{client}3"), collect, blocking=True)
+
+    wait_until(qt_app, lambda: len(done) == 9)
+    for client in ("a", "b", "c"):
+        assert [tag for tag in done if tag.startswith(client)] == [f"{client}1", f"{client}2", f"{client}3"]
+    assert active["peak"] <= 2
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["completed"] == 9
+    executor.shutdown()
+
+
+def test_errors_and_connection_scope(qt_app):
+    scopes = []
+
+    class Scope:
+        def __enter__(self):
+            scopes.append(threading.get_ident())
+
+        def __exit__(self, *exc):
+            return False
+
+    executor = HandlerExecutor(max_workers=1, connection_scope=Scope)
+    results = []
+
+    def boom():
+        raise ValueError("boom")
+
+    executor.submit("a", boom, lambda response, error: results.append(error), blocking=True)
+    executor.submit("a", lambda: "inline", lambda response, error: results.append(response), blocking=False)
+
+    wait_until(qt_app, lambda: len(results) == 2)
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "inline"
+    assert scopes and scopes[0] != threading.get_ident()
+    assert executor.stats()["failed"] == 1
+    executor.shutdown()
+
+
+def test_discard_drops_pending_messages(qt_app):
+    executor = HandlerExecutor(max_workers=1)
+    release = threading.Event()
+    results = []
+
+    executor.submit("a", lambda: release.wait(5) and "first", lambda r, e: results.append(r), blocking=True)
+    executor.submit("a", lambda: "second", lambda r, e: results.append(r), blocking=True)
+    assert executor.discard("a") == 1
+    release.set()
+
+    wait_until(qt_app, lambda: results == ["first"])
+    assert executor.stats()["clients"] == 0
+    executor.shutdown()
@@ -0,0 +1,92 @@
+import json
+import time
+
+import pytest
+
+from src.backend.msgCenter_server.kv_store import SQLiteKVStore
+
+
+@pytest.fixture()
+def store(tmp_path):
+    kv = SQLiteKVStore(tmp_path / "kv.db")
+    yield kv
+    kv.close()
+
+
+def test_set_get_delete_roundtrip(store):
+    store.set("ns", "k1", {"a": 1})
+    assert store.get("ns", "k1") == {"a": 1}
+    assert store.get("other", "k1") is None
+    assert store.delete("ns", "k1") is True
+    assert store.get("ns", "k1") is None
+    assert store.delete("ns", "k1") is False
+
+
+def test_batch_set_and_get(store):
+    assert store.set_many("ns", {"a": 1, "b": [2], "c": "三"}) == 3
+    assert store.get_many("ns", ["a", "c", "missing"]) == {"a": 1, "c": "三"}
+    assert store.delete_many("ns", ["a", "b"]) == 2
+    assert store.get_many("ns", ["a", "b", "c"]) == {"c": "三"}
+
+
+def test_ttl_expires(store):
+    store.set("ns", "short", 1, ttl_ms=20)
+    store.set("ns", "long", 2)
+    assert store.get("ns", "short") == 1
+    time.sleep(0.05)
+    assert store.get("ns", "short") is None
+    assert store.purge_expired() == 1
+    assert store.get("ns", "long") == 2
+
+
+def test_cached_values_are_not_shared(store):
+    store.set("ns", "obj", {"list": [1]})
+    first = store.get("ns", "obj")
+    first["list"].append(2)
+    assert store.get("ns", "obj") == {"list": [1]}
+
+
+def test_persists_across_instances(tmp_path):
+    kv = SQLiteKVStore(tmp_path / "kv.db")
+    kv.set("ns", "k", "v")
+    kv.close()
+    reopened = SQLiteKVStore(tmp_path / "kv.db")
+    assert reopened.get("ns", "k") == "v"
+    reopened.close()
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / "storage-kv.json"
+    legacy.write_text(json.dumps({"ns": {"k1": {"x": 1}, "k2": "中文"}}, ensure_ascii=False), encoding="utf-8")
+    kv = SQLiteKVStore(tmp_path / "kv.db", legacy_json_path=legacy)
+    assert kv.get_many("ns", ["k1", "k2"]) == {"k1": {"x": 1}, "k2": "中文"}
+    assert not legacy.exists()
+    assert (tmp_path / "storage-kv.json.migrated").exists()
+    kv.close()
+
+
+def test_non_dict_legacy_json_is_treated_as_empty(tmp_path):
+    legacy = tmp_path / "storage-kv.json"
+    legacy.write_text(json.dumps([1, 2, 3]), encoding="utf-8")
+    kv = SQLiteKVStore(tmp_path / "kv.db", legacy_json_path=legacy)
+    assert kv.get("ns", "k") is None
+    assert (tmp_path / "storage-kv.json.migrated").exists()
+    kv.close()
+
+
+def test_expired_entries_purged_on_open_and_periodically(tmp_path):
+    kv = SQLiteKVStore(tmp_path / "kv.db", purge_interval_s=0.03)
+    kv.set("ns", "short", 1, ttl_ms=10)
+    kv.close()
+    time.sleep(0.02)
+
+    kv = SQLiteKVStore(tmp_path / "kv.db", purge_interval_s=0.03)
+    count = lambda: kv._conn.execute("SELECT COUNT(*) FROM kv_store").fetchone()[0]
+    assert count() == 0
+
+    kv.set("ns", "short", 1, ttl_ms=10)
+    time.sleep(0.04)
+    kv.set("ns", "long", 2)
+    assert count() == 1
+    assert kv.get("ns", "long") == 2
+    kv.close()
@@ -0,0 +1,131 @@
+import json
+
+from src.backend.msgCenter_server.outbound_queue import OutboundQueues
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer, _merge_topic_delta
+from src.qt.compat import QAbstractSocket
+
+
+class FakeSignal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, value):
+        for slot in self.slots:
+            slot(value)
+
+
+class StalledClient:
+    """只在测试显式 emit 时回报写出字节，模拟停滞的对端"""
+
+    def __init__(self, port=1):
+        self.port = port
+        self.sent = []
+        self.aborted = False
+        self.bytesWritten = FakeSignal()
+
+    def state(self):
+        if self.aborted:
+            return QAbstractSocket.SocketState.UnconnectedState
+        return QAbstractSocket.SocketState.ConnectedState
+
+    def sendTextMessage(self, text):
+        self.sent.append(text)
+
+    def peerPort(self):
+        return self.port
+
+    def abort(self):
+        self.aborted = True
+
+
+def test_window_holds_back_messages_until_bytes_are_written():
+    queues = OutboundQueues(window_bytes=10)
+    client = StalledClient()
+    queues.register(client)
+
+    assert queues.send(client, "a" * 8)
+    assert queues.send(client, "b" * 8)
+    assert queues.send(client, "c" * 8)
+    # 第一条占满窗口后其余消息留在队列中
+    assert client.sent == ["a" * 8, "b" * 8]
+    assert queues.depth(client) == {"messages": 1, "bytes": 8, "in_flight_bytes": 16}
+
+    client.bytesWritten.emit(16)
+    assert client.sent[-1] == "c" * 8
+    assert queues.depth(client)["messages"] == 0
+
+
+def test_droppable_messages_are_merged_while_queued():
+    queues = OutboundQueues(window_bytes=1)
+    client = StalledClient()
+    queues.register(client)
+    queues.send(client, "first")  # 占满窗口
+
+    for i in range(5):
+        queues.send(client, f"ack-{i}", merge_key="console_log:ack")
+    first = {"type": "subscription:delta:updated", "data": {"topic": "t", "changes": [
+        {"op": "upsert", "id": "a1", "record": {"v": 1}}, {"op": "upsert", "id": "a2", "record": {"v": 1}},
+    ]}}
+    second = {"type": "subscription:delta:updated", "data": {"topic": "t", "changes": [
+        {"op": "delete", "id": "a1"},
+    ]}}
+    queues.send(client, json.dumps(first), merge_key="delta:t", message=first, merge=_merge_topic_delta)
+    queues.send(client, json.dumps(second), merge_key="delta:t", message=second, merge=_merge_topic_delta)
+
+    assert queues.depth(client)["messages"] == 2
+    assert queues.stats()["merged"] == 5
+    client.bytesWritten.emit(1000)
+    client.bytesWritten.emit(1000)
+    client.bytesWritten.emit(1000)
+    assert client.sent[1] == "ack-4"
+    delta = json.loads(client.sent[2])
+    assert delta["data"]["changes"] == [{"op": "upsert", "id": "a2", "record": {"v": 1}}, {"op": "delete", "id": "a1"}]
+
+
+def test_slow_consumer_is_evicted_when_limits_are_exceeded():
+    evicted = []
+    queues = OutboundQueues(window_bytes=1, max_messages=3, on_evict=lambda c, reason: evicted.append((c, reason)))
+    client, healthy = StalledClient(1), StalledClient(2)
+    queues.register(client)
+    queues.register(healthy)
+
+    results = [queues.send(client, f"m{i}") for i in range(5)]
+    assert results == [True, True, True, True, False]
+    assert [c for c, _ in evicted] == [client]
+    assert queues.send(client, "after") is False
+    assert queues.send(healthy, "ok") is True
+    stats = queues.stats()
+    assert stats["evicted"] == 1
+    assert [c["client"] for c in stats["clients"]] == ["client:2"]
+
+
+def test_server_routes_sends_through_queues_and_reports_depth(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # console_log 写入 logs/unified-console.log
+    server = StandardWebSocketServer(pdf_library_api=None, max_workers=0)
+    server.outbound.window_bytes = 1
+    client = StalledClient()
+    server.register_client(client)  # 欢迎消息占满窗口
+
+    for i in range(3):
+        server.dispatch_message(client, {
+            "type": "console_log", "request_id": f"log-{i}", "data": {"source": "test", "message": "x"},
+        })
+    server.dispatch_message(client, {"type": "heartbeat", "request_id": "hb"})
+    assert len(client.sent) == 1
+
+    metrics = server.handle_system_metrics_request("m-1", {})
+    outbound = metrics["data"]["outbound"]
+    assert outbound["queued_messages"] == 2
+    assert outbound["merged"] == 2
+    assert outbound["clients"][0]["messages"] == 2
+
+    server.outbound.max_messages = 2
+    server.dispatch_message(client, {"type": "heartbeat", "request_id": "hb-2"})
+    assert client.aborted is True
+
+    assert server.forget_client(client) is True
+    assert server.outbound.stats()["clients"] == []
+    server.release_resources()
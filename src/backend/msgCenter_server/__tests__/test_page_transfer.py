@@ -0,0 +1,148 @@
+import base64
+import io
+import os
+import time
+import zlib
+
+import pytest
+
+pypdf = pytest.importorskip("pypdf")
+
+from src.backend.pdf_manager import page_transfer_manager as ptm
+from src.backend.pdf_manager.page_transfer_manager import PageTransferError, PageTransferManager
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
+
+
+def _write_pdf(path, pages=5, base_width=100):
+    writer = pypdf.PdfWriter()
+    for index in range(pages):
+        writer.add_blank_page(width=base_width + index, height=200)
+    writer.write(str(path))
+    return str(path)
+
+
+def _decode(page_data):
+    raw = base64.b64decode(page_data["content"])
+    if page_data["encoding"] == "zlib_base64":
+        raw = zlib.decompress(raw)
+    return pypdf.PdfReader(io.BytesIO(raw))
+
+
+def test_get_page_returns_single_page_pdf_and_caches(tmp_path):
+    path = _write_pdf(tmp_path / "doc.pdf")
+    manager = PageTransferManager(lambda file_id: path if file_id == "doc" else None, preload_workers=0)
+
+    first = manager.get_page("doc", 3, "zlib_base64")
+    reader = _decode(first)
+    assert len(reader.pages) == 1 and float(reader.pages[0].mediabox.width) == 102
+    assert first["total_pages"] == 5 and first["cached"] is False
+
+    raw = manager.get_page("doc", 3, "raw")
+    assert raw["encoding"] == "none" and raw["cached"] is True
+    assert base64.b64decode(raw["content"]) == zlib.decompress(base64.b64decode(first["content"]))
+
+    for file_id, page, compression, code in [
+        ("doc", 6, "none", "PAGE_OUT_OF_RANGE"),
+        ("doc", 1, "gzip_base64", "UNSUPPORTED_COMPRESSION"),
+        ("missing", 1, "none", "FILE_NOT_FOUND"),
+    ]:
+        with pytest.raises(PageTransferError) as excinfo:
+            manager.get_page(file_id, page, compression)
+        assert excinfo.value.code == code
+
+    # 文件内容变化后旧缓存失效
+    time.sleep(0.01)
+    _write_pdf(tmp_path / "doc.pdf", pages=2, base_width=300)
+    os.utime(path, ns=(time.time_ns(), time.time_ns()))
+    assert float(_decode(manager.get_page("doc", 1, "none")).pages[0].mediabox.width) == 300
+    assert manager.stats()["pages"] == 1
+    manager.close()
+
+
+def test_lru_is_bounded_per_file_and_overall(tmp_path):
+    paths = {name: _write_pdf(tmp_path / f"{name}.pdf", pages=6) for name in ("a", "b")}
+    page_size = len(base64.b64decode(
+        PageTransferManager(paths.get, preload_workers=0).get_page("a", 1, "none")["content"]))
+    manager = PageTransferManager(paths.get, preload_workers=0,
+                                  max_file_bytes=page_size * 3 + 50, max_cache_bytes=page_size * 4 + 50)
+
+    for page in range(1, 6):
+        manager.get_page("a", page, "none")
+    stats = manager.stats()
+    assert stats["pages"] == 3 and stats["bytes"] <= manager.max_file_bytes
+    assert manager.get_page("a", 5, "none")["cached"] is True
+    assert manager.get_page("a", 1, "none")["cached"] is False
+
+    manager.get_page("a", 4, "none")  # a: 5, 1, 4 为最近使用
+    manager.get_page("b", 1, "none")
+    manager.get_page("b", 2, "none")
+    stats = manager.stats()
+    assert stats["bytes"] <= manager.max_cache_bytes and stats["pages"] == 4
+    # 总量超限时从最久未用的文件 a 淘汰其最旧页面
+    assert manager.get_page("b", 1, "none")["cached"] is True
+    assert manager.get_page("a", 5, "none")["cached"] is False
+    manager.close()
+
+
+def test_preload_runs_by_priority_and_cache_clear_cancels(tmp_path):
+    path = _write_pdf(tmp_path / "doc.pdf", pages=8)
+    manager = PageTransferManager(lambda file_id: path, preload_workers=0)
+    manager.get_page("doc", 1, "none")
+
+    assert manager.preload_pages("doc", 1, 4, "low") == {"queued": 3, "cached": 1, "total_pages": 8}
+    assert manager.preload_pages("doc", 6, 20, "high")["queued"] == 3
+    manager.preload_pages("doc", 4, 4, "high")  # 提升已排队页面的优先级
+    with pytest.raises(PageTransferError):
+        manager.preload_pages("doc", 1, 2, "urgent")
+
+    assert manager.process_pending(limit=4) == [("doc", 6), ("doc", 7), ("doc", 8), ("doc", 4)]
+    assert manager.clear_cache("doc", keep_pages=[1, 6]) == 3
+    assert manager.process_pending() == []  # 清理后剩余的预加载被取消
+    assert manager.stats()["pages"] == 2 and manager.stats()["preload_pending"] == 0
+    manager.close()
+
+
+def test_background_workers_fill_cache(tmp_path):
+    path = _write_pdf(tmp_path / "doc.pdf", pages=4)
+    manager = PageTransferManager(lambda file_id: path, preload_workers=2)
+    manager.preload_pages("doc", 1, 4, "normal")
+    deadline = time.monotonic() + 5
+    while manager.stats()["preloaded"] < 4:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert manager.get_page("doc", 2)["cached"] is True
+    manager.close()
+
+
+def test_server_page_messages(tmp_path, monkeypatch):
+    server = StandardWebSocketServer(pdf_library_api=None, max_workers=0)
+    server.pdf_manager.pdfs_dir = str(tmp_path)
+    _write_pdf(tmp_path / "0123456789ab.pdf", pages=3)
+
+    loaded = server.handle_message({
+        "type": "pdf-page:load:requested",
+        "request_id": "page-1",
+        "data": {"file_id": "0123456789ab", "page_number": 2, "compression": "zlib_base64"},
+    })
+    assert loaded["type"] == "pdf-page:load:completed"
+    assert loaded["data"]["total_pages"] == 3
+    assert len(_decode(loaded["data"]["page_data"]).pages) == 1
+
+    missing = server.handle_message({"type": "pdf_page_request", "request_id": "page-2",
+                                     "data": {"file_id": "ffffffffffff", "page_number": 1}})
+    assert missing["code"] == 404 and missing["error"]["type"] == "FILE_NOT_FOUND"
+
+    preload = server.handle_message({"type": "pdf-page:preload:requested", "request_id": "pre-1",
+                                     "data": {"file_id": "0123456789ab", "start_page": 1, "end_page": 3, "priority": "high"}})
+    assert preload["data"]["preloaded_count"] == 3 and preload["data"]["cached_count"] == 1
+
+    cleared = server.handle_message({"type": "pdf-page:cache-clear:requested", "request_id": "clr-1",
+                                     "data": {"file_id": "0123456789ab"}})
+    assert cleared["status"] == "success"
+
+    monkeypatch.setattr(ptm, "PdfReader", None)
+    unavailable = server.handle_message({"type": "pdf-page:load:requested", "request_id": "page-3",
+                                         "data": {"file_id": "0123456789ab", "page_number": 1}})
+    assert unavailable["error"]["type"] == "EXTRACTION_UNAVAILABLE" and unavailable["code"] == 501
+    assert server.handle_system_metrics_request("m-1", {})["data"]["page_transfer"]["extraction_available"] is False
+    server.release_resources()
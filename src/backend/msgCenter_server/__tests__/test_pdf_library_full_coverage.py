@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
@@ -58,3 +60,57 @@ def test_remove_batch(server):
     assert resp["type"] == "pdf-library:remove:completed"
     assert set(server.pdf_library_api.deleted) == {"id-1", "id-2"}
 
+
+
+def test_remove_batch_uses_bulk_delete(server):
+    calls = []
+
+    def delete_records(uuids):
+        calls.append(list(uuids))
+        return {"removed": ["id-1"], "not_found": ["id-3"], "failed": {"id-2": "FS: busy"}}
+
+    server.pdf_library_api.delete_records = delete_records
+    resp = server.handle_message({
+        "type": "pdf-library:remove:requested",
+        "request_id": "req-rm-bulk",
+        "data": {"file_ids": ["id-1", "id-2", "id-3"]}
+    })
+    assert resp["type"] == "pdf-library:remove:completed"
+    assert calls == [["id-1", "id-2", "id-3"]]
+    assert server.pdf_library_api.deleted == []
+    assert resp["data"]["removed_files"] == ["id-1", "id-3"]
+
+
+def test_remove_batch_through_server_pdf_manager(tmp_path, monkeypatch):
+    pypdf = pytest.importorskip("pypdf")
+    from src.backend.pdf_manager.manager import PDFManager
+
+    monkeypatch.chdir(tmp_path)
+    svc = StandardWebSocketServer(max_workers=0)
+    assert isinstance(svc.pdf_manager, PDFManager)
+    for name in ("a", "b"):
+        writer = pypdf.PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.write(str(tmp_path / f"{name}.pdf"))
+        assert svc.pdf_manager.add_file(str(tmp_path / f"{name}.pdf"))
+    ids = svc.pdf_manager.get_file_ids()
+    copies = [svc.pdf_manager.get_file_by_id(fid)["filepath"] for fid in ids]
+    assert len(ids) == 2 and all(svc.pdf_library_api.get_record(fid) for fid in ids)
+
+    events = []
+    monkeypatch.setattr(svc, "broadcast_message", lambda message, topic=None: events.append(message["data"]) or 0)
+    monkeypatch.setattr(svc.pdf_library_api, "delete_record", lambda uuid: pytest.fail("per-row delete_record called"))
+    resp = svc.handle_message({
+        "type": "pdf-library:remove:requested",
+        "request_id": "req-rm-real",
+        "data": {"file_ids": ids},
+    })
+
+    assert resp["type"] == "pdf-library:remove:completed"
+    assert sorted(resp["data"]["removed_files"]) == sorted(ids)
+    # 一次聚合广播，不再逐条 file_removed
+    assert [e["event"] for e in events] == ["files_removed"]
+    assert sorted(events[0]["file_ids"]) == sorted(ids) and events[0]["file_count"] == 0
+    assert not any(svc.pdf_library_api.get_record(fid) for fid in ids)
+    assert not any(os.path.exists(path) for path in copies)
+    svc.release_resources()
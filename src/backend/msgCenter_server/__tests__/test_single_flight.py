@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.backend.msgCenter_server.single_flight import SingleFlight, coalescing_key
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.002)
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flights.do, "k", slow) for _ in range(3)]
+        _wait_for(lambda: flights.stats()["coalesced"] == 2)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert calls == [1]
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert all(result == {"value": 42} for result, _ in results)
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "coalesced": 2, "invalidations": 0}
+
+
+def test_errors_reach_waiters_and_invalidate_stops_joining():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flights.do, "k", failing)
+        _wait_for(lambda: flights.stats()["in_flight"] == 1)
+        waiter = pool.submit(flights.do, "k", failing)
+        _wait_for(lambda: flights.stats()["coalesced"] == 1)
+        flights.invalidate()
+        # 失效后同键请求重新执行
+        fresh = pool.submit(flights.do, "k", lambda: "fresh")
+        assert fresh.result(timeout=5) == ("fresh", False)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+
+
+def test_coalescing_key_normalizes_data_order():
+    first = coalescing_key("pdf-library:list:requested", None, {"a": 1, "b": {"y": 2, "x": 1}})
+    second = coalescing_key("pdf-library:list:requested", None, {"b": {"x": 1, "y": 2}, "a": 1})
+    assert first == second
+    assert coalescing_key("pdf-library:list:requested", "get_pdf_list", {}) != coalescing_key("pdf-library:list:requested", None, {})
+    assert coalescing_key("x", None, {"bad": object()}) is None
+
+
+class CountingLibraryAPI:
+    def __init__(self):
+        self.list_calls = 0
+        self.release = threading.Event()
+
+    def list_records(self, limit=None, offset=None):
+        self.list_calls += 1
+        self.release.wait(5)
+        return []
+
+    def shutdown(self):
+        pass
+
+
+def test_server_coalesces_identical_reads_with_own_request_ids():
+    api = CountingLibraryAPI()
+    server = StandardWebSocketServer(pdf_library_api=api, max_workers=0)
+    add_calls = []
+    server.handle_pdf_upload_request = lambda rid, data, **kw: add_calls.append(rid) or {"request_id": rid, "status": "success"}
+
+    def list_request(rid, limit=10):
+        return server.handle_message({"type": "pdf-library:list:requested", "request_id": rid, "data": {"pagination": {"limit": limit}}})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(list_request, f"list-{i}") for i in range(3)]
+        other = pool.submit(list_request, "list-other", 20)  # data 不同，单独执行
+        _wait_for(lambda: server.single_flight.stats()["coalesced"] == 2 and api.list_calls == 2)
+        api.release.set()
+        responses = [f.result(timeout=5) for f in futures]
+        assert other.result(timeout=5)["request_id"] == "list-other"
+
+    assert api.list_calls == 2
+    assert [r["request_id"] for r in responses] == ["list-0", "list-1", "list-2"]
+    assert all(r["type"] == "pdf-library:list:completed" for r in responses)
+
+    # 写操作使进行中的读请求失效：写之后到达的相同请求重新执行
+    api.release.clear()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        before = pool.submit(list_request, "before-write")
+        _wait_for(lambda: api.list_calls == 3)
+        server.handle_message({"type": "pdf-library:add:requested", "request_id": "add-1", "data": {"filepath": "x.pdf"}})
+        after = pool.submit(list_request, "after-write")
+        _wait_for(lambda: api.list_calls == 4)
+        api.release.set()
+        assert before.result(timeout=5)["request_id"] == "before-write"
+        assert after.result(timeout=5)["request_id"] == "after-write"
+
+    assert add_calls == ["add-1"]
+    metrics = server.handle_system_metrics_request("m-1", {})
+    assert metrics["data"]["coalescing"]["coalesced"] == 2
+    assert metrics["data"]["coalescing"]["invalidations"] == 2
+    server.release_resources()
@@ -17,6 +17,9 @@ class FakePDFLibraryAPI:
         self.calls.append(filepath)
         return self.return_value
 
+    def shutdown(self):
+        pass
+
 
 class FakePDFManager:
     def __init__(self):
@@ -67,3 +70,262 @@ def test_handle_pdf_upload_request_uses_api_and_returns_new_type(server_with_fak
     assert response["data"]["file"]["id"] == "fake-uuid"
     assert response["data"]["file"]["filename"] == "demo.pdf"
     assert server_with_fakes.pdf_library_api.calls == ["C:/fake/path/sample.pdf"]
+
+
+def test_database_backup_and_status_messages(tmp_path):
+    import sqlite3
+
+    from src.backend.database.backup import DatabaseBackupManager
+
+    db_path = tmp_path / "library.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE t (id INTEGER)")
+    conn.commit()
+    conn.close()
+
+    server = StandardWebSocketServer(pdf_library_api=FakePDFLibraryAPI())
+    server.backup_manager = DatabaseBackupManager(db_path, tmp_path / "backups", step_sleep=0)
+
+    started = server.handle_message({"type": "database:backup:requested", "request_id": "bk-1", "data": {}})
+    assert started["type"] == "database:backup:completed"
+    server.backup_manager.wait(10)
+
+    status = server.handle_message({"type": "database:backup-status:requested", "request_id": "bk-2", "data": {}})
+    assert status["type"] == "database:backup-status:completed"
+    assert status["data"]["state"] == "completed"
+    assert len(status["data"]["snapshots"]) == 1
+
+
+def test_pdf_list_cursor_pagination():
+    class PagedLibraryAPI(FakePDFLibraryAPI):
+        def list_records_page(self, cursor, page_size):
+            if cursor is None:
+                return {"records": [{"id": "a"}, {"id": "b"}], "next_cursor": "c1", "has_more": True}
+            return {"records": [{"id": "c"}], "next_cursor": None, "has_more": False}
+
+        def count_records(self):
+            return 3
+
+    server = StandardWebSocketServer(pdf_library_api=PagedLibraryAPI())
+
+    first = server.handle_message({
+        "type": "pdf-library:list:requested",
+        "request_id": "list-1",
+        "data": {"pagination": {"cursor": None, "page_size": 2}},
+    })
+    assert first["type"] == "pdf-library:list:completed"
+    assert [f["id"] for f in first["data"]["files"]] == ["a", "b"]
+    assert first["data"]["pagination"]["next_cursor"] == "c1"
+    assert first["data"]["pagination"]["total"] == 3
+
+    second = server.handle_message({
+        "type": "pdf-library:list:requested",
+        "request_id": "list-2",
+        "data": {"pagination": {"cursor": "c1", "page_size": 2}},
+    })
+    assert [f["id"] for f in second["data"]["files"]] == ["c"]
+    assert second["data"]["pagination"]["has_more"] is False
+
+
+def test_sync_since_message_returns_deltas():
+    class SyncLibraryAPI(FakePDFLibraryAPI):
+        def sync_since(self, since, limit=None):
+            self.calls.append((since, limit))
+            return {
+                "changes": [{"seq": 7, "table": "pdf_info", "pk": "a", "op": "upsert"}],
+                "last_seq": 7,
+                "has_more": False,
+                "reset_required": False,
+            }
+
+    api = SyncLibraryAPI()
+    server = StandardWebSocketServer(pdf_library_api=api)
+
+    response = server.handle_message({"type": "sync:since", "request_id": "sync-1", "data": {"since": 3, "limit": 50}})
+    assert response["type"] == "sync:since:completed"
+    assert response["data"]["since"] == 3
+    assert response["data"]["last_seq"] == 7
+    assert response["data"]["changes"][0]["pk"] == "a"
+    assert api.calls == [(3, 50)]
+
+    invalid = server.handle_message({"type": "sync:since:requested", "request_id": "sync-2", "data": {"since": -1}})
+    assert invalid["type"] == "sync:since:failed"
+    assert invalid["code"] == 400
+
+
+def test_dispatch_table_covers_legacy_types_and_records_metrics():
+    server = StandardWebSocketServer(pdf_library_api=FakePDFLibraryAPI())
+
+    heartbeat = server.handle_message({"type": "heartbeat", "request_id": "hb-1"})
+    assert heartbeat["type"] == "system:heartbeat:completed"
+    unknown = server.handle_message({"type": "no:such:type", "request_id": "x-1"})
+    assert unknown["error"]["type"] == "unknown_message_type"
+    server.handle_message({"type": "sync:since:requested", "request_id": "sync-1", "data": {"since": -1}})
+
+    response = server.handle_message({"type": "system:metrics", "request_id": "m-1"})
+    assert response["type"] == "system:metrics:completed"
+    messages = response["data"]["messages"]
+    assert messages["heartbeat"]["count"] == 1
+    assert messages["heartbeat"]["errors"] == 0
+    assert messages["unknown"]["errors"] == 1
+    assert messages["sync:since:requested"]["errors"] == 1
+    assert sum(messages["heartbeat"]["buckets"].values()) == 1
+    assert messages["heartbeat"]["p99_ms"] <= messages["heartbeat"]["max_ms"]
+
+    filtered = server.handle_message({
+        "type": "system:metrics:requested",
+        "request_id": "m-2",
+        "data": {"type": "heartbeat", "reset": True},
+    })
+    assert list(filtered["data"]["messages"]) == ["heartbeat"]
+    after_reset = server.handle_message({"type": "system:metrics:requested", "request_id": "m-3"})
+    # 重置后只剩上一条 system:metrics 请求自身的记录
+    assert list(after_reset["data"]["messages"]) == ["system:metrics:requested"]
+
+
+def test_blocking_handler_runs_off_the_qt_thread():
+    import json
+    import threading
+    import time
+
+    from src.qt.compat import QAbstractSocket, QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    class FakeClient:
+        def __init__(self):
+            self.sent = []
+
+        def state(self):
+            return QAbstractSocket.SocketState.ConnectedState
+
+        def sendTextMessage(self, text):
+            self.sent.append(json.loads(text))
+
+        def peerPort(self):
+            return 0
+
+    server = StandardWebSocketServer(pdf_library_api=FakePDFLibraryAPI(), max_workers=2)
+    release = threading.Event()
+    handler_threads = []
+
+    def slow_list(request_id, data, *, original_type=None):
+        handler_threads.append(threading.get_ident())
+        release.wait(5)
+        return {"type": "pdf-library:list:completed", "request_id": request_id, "status": "success"}
+
+    server.handle_pdf_list_request = slow_list
+    slow_client, other_client = FakeClient(), FakeClient()
+
+    server.dispatch_message(slow_client, {"type": "pdf-library:list:requested", "request_id": "list-1"})
+    server.dispatch_message(slow_client, {"type": "heartbeat", "request_id": "hb-slow"})
+    server.dispatch_message(other_client, {"type": "heartbeat", "request_id": "hb-other"})
+
+    # 其他客户端的心跳不受慢请求影响；同一客户端的心跳排在慢请求之后
+    assert [m["request_id"] for m in other_client.sent] == ["hb-other"]
+    assert slow_client.sent == []
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(slow_client.sent) < 2:
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.005)
+    assert [m["request_id"] for m in slow_client.sent] == ["list-1", "hb-slow"]
+    assert handler_threads and handler_threads[0] != threading.get_ident()
+    server.handler_executor.shutdown()
+
+
+def test_batch_request_runs_blocking_items_concurrently_and_keeps_order():
+    import json
+    import threading
+    import time
+
+    from src.qt.compat import QAbstractSocket, QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    class FakeClient:
+        def __init__(self):
+            self.sent = []
+
+        def state(self):
+            return QAbstractSocket.SocketState.ConnectedState
+
+        def sendTextMessage(self, text):
+            self.sent.append(json.loads(text))
+
+        def peerPort(self):
+            return 0
+
+    server = StandardWebSocketServer(pdf_library_api=FakePDFLibraryAPI(), max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+    handler_threads = set()
+
+    def list_waiting_for_peer(request_id, data, *, original_type=None):
+        # 两个 list 子请求必须同时在执行才能越过屏障
+        handler_threads.add(threading.get_ident())
+        barrier.wait()
+        return {"type": "pdf-library:list:completed", "request_id": request_id, "status": "success", "data": {}}
+
+    server.handle_pdf_list_request = list_waiting_for_peer
+    client = FakeClient()
+    server.dispatch_message(client, {
+        "type": "batch",
+        "request_id": "batch-1",
+        "timestamp": 1,
+        "data": {"requests": [
+            # data 不同：相同的只读子请求会被合并执行
+            {"type": "pdf-library:list:requested", "request_id": "list-a", "data": {"pagination": {"limit": 1}}},
+            {"type": "heartbeat"},
+            {"type": "pdf-library:list:requested", "request_id": "list-b", "data": {"pagination": {"limit": 2}}},
+            {"type": "system:batch:requested", "data": {"requests": []}},
+            {"data": {}},
+        ]},
+    })
+
+    deadline = time.monotonic() + 5
+    while not client.sent:
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.005)
+
+    response = client.sent[0]
+    assert response["type"] == "system:batch:completed"
+    assert response["request_id"] == "batch-1"
+    responses = response["data"]["responses"]
+    assert [r["request_id"] for r in responses] == ["list-a", "batch-1:1", "list-b", "batch-1:3", "batch-1:4"]
+    assert [r["status"] for r in responses] == ["success", "success", "success", "error", "error"]
+    assert responses[1]["type"] == "system:heartbeat:completed"
+    assert response["data"]["failed"] == 2
+    assert len(handler_threads) == 2
+    assert server.message_metrics.snapshot()["pdf-library:list:requested"]["count"] == 2
+    server.release_resources()
+
+
+def test_batch_request_validation_and_capability_advertisement():
+    server = StandardWebSocketServer(pdf_library_api=FakePDFLibraryAPI(), max_workers=0)
+
+    empty = server.handle_message({"type": "system:batch:requested", "request_id": "b-0", "data": {"requests": []}})
+    assert empty["type"] == "system:batch:failed"
+    assert empty["code"] == 400
+
+    too_many = server.handle_message({
+        "type": "batch",
+        "request_id": "b-1",
+        "data": {"requests": [{"type": "heartbeat"}] * 51},
+    })
+    assert too_many["error"]["type"] == "BATCH_TOO_LARGE"
+
+    sequential = server.handle_message({
+        "type": "batch",
+        "request_id": "b-2",
+        "data": {"requests": [{"type": "heartbeat", "request_id": "h"}], "sequential": True},
+    })
+    assert sequential["data"]["responses"][0]["request_id"] == "h"
+
+    discovered = server.handle_message({"type": "capability:discover:requested", "request_id": "cap"})
+    system = next(d for d in discovered["data"]["domains"] if d["name"] == "system")
+    assert "system:batch:requested" in system["events"]
+    assert system["features"]["batch"] == {"max_requests": 50, "concurrent": False}
+    server.release_resources()
@@ -60,3 +60,105 @@ def test_storage_fs_write_read(server, tmp_path):
     assert resp_r["type"] == "storage-fs:read:completed"
     assert base64.b64decode(resp_r["data"]["content"].encode("utf-8")) == content
 
+
+
+def test_storage_kv_batch_and_ttl(tmp_path):
+    from src.backend.msgCenter_server.kv_store import SQLiteKVStore
+
+    server = StandardWebSocketServer(kv_store=SQLiteKVStore(tmp_path / "kv.db"))
+    resp_set = server.handle_message({
+        "type": "storage-kv:set:requested",
+        "request_id": "req-kv-b1",
+        "data": {"namespace": "batch", "entries": {"a": 1, "b": 2}, "ttl_ms": 60000}
+    })
+    assert resp_set["data"]["count"] == 2
+
+    resp_get = server.handle_message({
+        "type": "storage-kv:get:requested",
+        "request_id": "req-kv-b2",
+        "data": {"namespace": "batch", "keys": ["a", "b", "c"]}
+    })
+    assert resp_get["data"]["values"] == {"a": 1, "b": 2, "c": None}
+
+    resp_del = server.handle_message({
+        "type": "storage-kv:delete:requested",
+        "request_id": "req-kv-b3",
+        "data": {"namespace": "batch", "keys": ["a", "b"]}
+    })
+    assert resp_del["data"]["count"] == 2
+    server.kv_store.close()
+
+
+def test_storage_fs_chunked_write_and_read(server):
+    import hashlib
+
+    content = bytes(range(256)) * 20
+    chunks = [content[i:i + 2000] for i in range(0, len(content), 2000)]
+    session_id = None
+    offset = 0
+    for seq, chunk in enumerate(chunks):
+        final = seq == len(chunks) - 1
+        data = {
+            "path": "u/chunked.bin",
+            "content": base64.b64encode(chunk).decode("utf-8"),
+            "seq": seq,
+            "offset": offset,
+            "final": final,
+        }
+        if session_id:
+            data["session_id"] = session_id
+        if final:
+            data["checksum"] = hashlib.sha256(content).hexdigest()
+        resp = server.handle_message({
+            "type": "storage-fs:write:requested",
+            "request_id": f"req-fs-c{seq}",
+            "data": data,
+        })
+        assert resp["type"] == "storage-fs:write:completed"
+        session_id = resp["data"]["session_id"]
+        offset += len(chunk)
+    assert resp["data"]["committed"] is True
+    assert resp["data"]["bytes"] == len(content)
+
+    received = b""
+    offset = 0
+    while True:
+        resp = server.handle_message({
+            "type": "storage-fs:read:requested",
+            "request_id": "req-fs-r",
+            "data": {"path": "u/chunked.bin", "offset": offset, "length": 3000},
+        })
+        assert resp["type"] == "storage-fs:read:completed"
+        received += base64.b64decode(resp["data"]["content"])
+        offset += resp["data"]["length"]
+        if resp["data"]["eof"]:
+            break
+    assert received == content
+    assert resp["data"]["checksum"] == hashlib.sha256(content).hexdigest()
+
+
+def test_storage_fs_chunked_write_rejects_bad_sequence_and_checksum(server):
+    first = server.handle_message({
+        "type": "storage-fs:write:requested",
+        "request_id": "req-fs-s0",
+        "data": {"path": "u/bad.bin", "content": base64.b64encode(b"ab").decode(), "seq": 0, "offset": 0},
+    })
+    session_id = first["data"]["session_id"]
+
+    out_of_order = server.handle_message({
+        "type": "storage-fs:write:requested",
+        "request_id": "req-fs-s2",
+        "data": {"path": "u/bad.bin", "session_id": session_id,
+                 "content": base64.b64encode(b"cd").decode(), "seq": 2, "offset": 2},
+    })
+    assert out_of_order["type"] == "storage-fs:write:failed"
+
+    bad_checksum = server.handle_message({
+        "type": "storage-fs:write:requested",
+        "request_id": "req-fs-s1",
+        "data": {"path": "u/bad.bin", "session_id": session_id,
+                 "content": base64.b64encode(b"cd").decode(), "seq": 1, "offset": 2,
+                 "final": True, "checksum": "0" * 64},
+    })
+    assert bad_checksum["type"] == "storage-fs:write:failed"
+    assert server.fs_transfers.active_sessions() == 0
@@ -0,0 +1,134 @@
+import pytest
+
+from src.backend.api.pdf_library_api import PDFLibraryAPI
+from src.backend.database.connection import DatabaseConnectionManager
+from src.backend.database.plugin.plugin_registry import TablePluginRegistry
+from src.backend.database.plugins.__tests__.fixtures.pdf_info_samples import make_pdf_info_sample
+from src.backend.database.plugins.__tests__.fixtures.pdf_annotation_samples import make_annotation_sample
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer
+from src.backend.msgCenter_server.subscriptions import TopicSubscriptions
+from src.qt.compat import QAbstractSocket
+
+
+class FakeClient:
+    def __init__(self, port):
+        self.port = port
+        self.sent = []
+
+    def state(self):
+        return QAbstractSocket.SocketState.ConnectedState
+
+    def sendTextMessage(self, text):
+        import json
+        self.sent.append(json.loads(text))
+
+    def peerPort(self):
+        return self.port
+
+
+@pytest.fixture()
+def server(tmp_path):
+    DatabaseConnectionManager._instance = None
+    TablePluginRegistry.reset_instance()
+    api = PDFLibraryAPI(db_path=str(tmp_path / "library.db"), pdf_manager=None)
+    server = StandardWebSocketServer(pdf_library_api=api)
+    yield server
+    server._unregister_change_listeners()
+    api.shutdown()
+    TablePluginRegistry.reset_instance()
+    DatabaseConnectionManager._instance = None
+
+
+def test_topic_registry_validates_and_cleans_up():
+    registry = TopicSubscriptions()
+    client = object()
+    accepted, rejected = registry.subscribe(client, ["library", "pdf:abc:annotations", "pdf:abc", 3])
+    assert accepted == ["library", "pdf:abc:annotations"]
+    assert rejected == ["pdf:abc", 3]
+    assert registry.unsubscribe(client, ["library"]) == ["library"]
+    assert registry.has_subscribed(client)
+    registry.remove_client(client)
+    assert not registry.has_subscribed(client)
+    assert registry.subscribers("pdf:abc:annotations") == []
+
+
+def test_library_events_only_reach_library_and_legacy_clients(server):
+    library, viewer, legacy = FakeClient(1), FakeClient(2), FakeClient(3)
+    server.clients = [library, viewer, legacy]
+
+    assert server.handle_message(
+        {"type": "subscribe", "request_id": "s1", "data": {"topics": ["library"]}}, library
+    )["type"] == "subscription:subscribe:completed"
+    response = server.handle_message(
+        {"type": "subscription:subscribe:requested", "request_id": "s2", "data": {"topic": "pdf:p1:annotations"}}, viewer
+    )
+    assert response["data"]["topics"] == ["pdf:p1:annotations"]
+
+    server.on_pdf_files_removed({"file_ids": ["x"], "file_count": 0})
+
+    assert [m["data"]["event"] for m in library.sent] == ["files_removed"]
+    assert [m["data"]["event"] for m in legacy.sent] == ["files_removed"]
+    assert viewer.sent == []
+
+
+def test_record_update_pushes_record_delta(server):
+    library = FakeClient(1)
+    server.clients = [library]
+    server.handle_message({"type": "subscribe", "request_id": "s1", "data": {"topics": ["library"]}}, library)
+    sample = make_pdf_info_sample(uuid="777777777771")
+    server.pdf_library_api.create_record(sample)
+
+    response = server.handle_message({
+        "type": "pdf-library:record-update:requested",
+        "request_id": "u1",
+        "data": {"file_id": "777777777771", "updates": {"title": "Renamed"}},
+    })
+    assert response["status"] == "success"
+    pushed = library.sent[-1]["data"]
+    assert pushed["event"] == "record_updated"
+    assert pushed["record"]["title"] == "Renamed"
+
+
+def test_annotation_deltas_routed_to_pdf_topic(server):
+    viewer, other = FakeClient(1), FakeClient(2)
+    server.clients = [viewer, other]
+    api = server.pdf_library_api
+    for pdf_uuid in ("777777777781", "777777777782"):
+        api.create_record(make_pdf_info_sample(uuid=pdf_uuid))
+
+    registered = server.handle_message({
+        "type": "pdf-viewer:register:requested",
+        "request_id": "v1",
+        "data": {"viewer_id": "viewer-1", "pdf_uuid": "777777777781"},
+    }, viewer)
+    assert registered["data"]["topics"] == ["pdf:777777777781:annotations", "pdf:777777777781:bookmarks"]
+    server.handle_message({"type": "subscribe", "request_id": "s2", "data": {"topics": ["pdf:777777777782:annotations"]}}, other)
+
+    annotation = make_annotation_sample('comment', pdf_uuid="777777777781", ann_id="ann_172800000000_000081")
+    api._annotation_plugin.insert(annotation)
+    api._annotation_plugin.add_comment("ann_172800000000_000081", "hello")
+    assert server.flush_topic_deltas() == 1
+
+    assert other.sent == []
+    delta = viewer.sent[-1]
+    assert delta["type"] == "subscription:delta:updated"
+    assert delta["data"]["topic"] == "pdf:777777777781:annotations"
+    # 同一标注的多次变更合并为一条，并携带最新记录
+    assert len(delta["data"]["changes"]) == 1
+    change = delta["data"]["changes"][0]
+    assert change["op"] == "upsert"
+    assert change["record"]["id"] == "ann_172800000000_000081"
+    assert change["record"]["commentCount"] == 1
+
+    api._annotation_plugin.delete("ann_172800000000_000081")
+    server.flush_topic_deltas()
+    assert viewer.sent[-1]["data"]["changes"] == [{"op": "delete", "id": "ann_172800000000_000081"}]
+
+
+def test_subscribe_rejects_invalid_topics(server):
+    client = FakeClient(1)
+    server.clients = [client]
+    response = server.handle_message({"type": "subscribe", "request_id": "s1", "data": {"topics": ["everything"]}}, client)
+    assert response["type"] == "subscription:subscribe:failed"
+    missing_client = server.handle_message({"type": "subscribe", "request_id": "s2", "data": {"topics": ["library"]}})
+    assert missing_client["code"] == 400
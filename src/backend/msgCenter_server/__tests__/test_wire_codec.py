@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+import zlib
+
+import pytest
+
+from src.backend.api.pdf_library_api import PDFLibraryAPI
+from src.backend.database.connection import DatabaseConnectionManager
+from src.backend.database.plugin.plugin_registry import TablePluginRegistry
+from src.backend.msgCenter_server.async_server import AsyncStandardServer, AsyncWebSocketClient
+from src.backend.msgCenter_server.outbound_queue import OutboundQueues
+from src.backend.msgCenter_server.standard_server import _merge_topic_delta
+from src.backend.msgCenter_server.wire_codec import (
+    CODEC_DEFLATE, CODEC_JSON, CodecError, WireCodec, available_codecs, dumps, negotiate,
+)
+
+
+class BinaryClient:
+    def __init__(self):
+        self.text = []
+        self.binary = []
+
+    def sendTextMessage(self, text):
+        self.text.append(text)
+
+    def sendBinaryMessage(self, data):
+        self.binary.append(data)
+
+
+def test_deflate_compresses_only_above_threshold_and_round_trips():
+    codec = WireCodec(CODEC_DEFLATE, threshold=300)
+    small = {"type": "system:heartbeat:completed", "data": {}}
+    large = {"type": "pdf-library:list:completed", "data": {"files": [{"title": "标题" * 20}] * 20}}
+
+    assert codec.encode(dumps(small), small) == dumps(small)
+    payload = codec.encode(dumps(large), large)
+    assert isinstance(payload, bytes) and len(payload) < len(dumps(large).encode("utf-8"))
+    assert codec.decode(payload) == large
+
+    bomb = zlib.compress(b'{"a":"' + b"x" * 10000 + b'"}')
+    with pytest.raises(CodecError):
+        WireCodec(CODEC_DEFLATE, max_decoded_bytes=1000).decode(bomb)
+    with pytest.raises(CodecError):
+        codec.decode(b"not deflate")
+
+
+def test_negotiate_picks_first_available_codec():
+    assert negotiate(None) == CODEC_JSON
+    assert negotiate(["cbor", "DEFLATE", "json"]) == CODEC_DEFLATE
+    assert negotiate("cbor") is None
+    assert set(available_codecs()) >= {CODEC_JSON, CODEC_DEFLATE}
+
+
+def test_outbound_queue_sends_binary_and_reencodes_merged_messages():
+    codec = WireCodec(CODEC_DEFLATE, threshold=256)
+    queues = OutboundQueues(window_bytes=1, encoder=lambda client, message: codec.encode(dumps(message), message))
+    client = BinaryClient()
+    queues.send(client, b"\x01\x02")  # 未登记的连接直接发送
+    assert client.binary == [b"\x01\x02"]
+
+    class Stalled(BinaryClient):
+        def __init__(self):
+            super().__init__()
+            self.slots = []
+            self.bytesWritten = self
+
+        def connect(self, slot):
+            self.slots.append(slot)
+
+    stalled = Stalled()
+    queues.register(stalled)
+    queues.send(stalled, "first")  # 占满窗口
+    changes = [{"op": "upsert", "id": f"a{i}", "record": {"text": "批注" * 40}} for i in range(3)]
+    first = {"type": "subscription:delta:updated", "data": {"topic": "t", "changes": changes[:2]}}
+    second = {"type": "subscription:delta:updated", "data": {"topic": "t", "changes": changes[2:]}}
+    queues.send(stalled, dumps(first), merge_key="delta:t", message=first, merge=_merge_topic_delta)
+    queues.send(stalled, dumps(second), merge_key="delta:t", message=second, merge=_merge_topic_delta)
+    for slot in stalled.slots:
+        slot(10_000)
+
+    assert stalled.text == ["first"]
+    merged = codec.decode(stalled.binary[0])
+    assert [c["id"] for c in merged["data"]["changes"]] == ["a0", "a1", "a2"]
+
+
+@pytest.fixture()
+def library_api(tmp_path):
+    DatabaseConnectionManager._instance = None
+    TablePluginRegistry.reset_instance()
+    api = PDFLibraryAPI(db_path=str(tmp_path / "library.db"), pdf_manager=None)
+    yield api
+    TablePluginRegistry.reset_instance()
+    DatabaseConnectionManager._instance = None
+
+
+def _message(message_type, request_id, data):
+    return {"type": message_type, "request_id": request_id, "timestamp": int(time.time() * 1000), "data": data}
+
+
+def test_async_server_negotiates_deflate_per_connection(library_api):
+    async def scenario():
+        server = AsyncStandardServer(port=0, pdf_library_api=library_api, max_workers=0)
+        port = await server.start()
+        try:
+            client = await AsyncWebSocketClient.connect("127.0.0.1", port)
+            plain = await AsyncWebSocketClient.connect("127.0.0.1", port)
+            await client.recv()
+            await plain.recv()
+
+            await client.send(json.dumps(_message("system:encoding:requested", "enc-0", {"codec": "cbor"})))
+            rejected = json.loads(await client.recv())
+            assert rejected["type"] == "system:encoding:failed"
+            assert rejected["error"]["type"] == "UNSUPPORTED_CODEC"
+
+            await client.send(json.dumps(_message("system:encoding:requested", "enc-1", {"codec": ["cbor", "deflate"], "threshold": 256})))
+            accepted = await client.recv()
+            assert isinstance(accepted, str)  # 协商结果本身仍是 JSON 文本
+            assert json.loads(accepted)["data"]["codec"] == "deflate"
+
+            codec = WireCodec(CODEC_DEFLATE)
+            discover = _message("capability:discover:requested", "disc-1", {})
+            # 入站二进制帧按协商的编码解码
+            await client.send_binary(zlib.compress(json.dumps(discover).encode("utf-8")))
+            reply = await client.recv()
+            assert isinstance(reply, bytes)
+            discovered = codec.decode(reply)
+            system = next(d for d in discovered["data"]["domains"] if d["name"] == "system")
+            assert "deflate" in system["features"]["encoding"]["codecs"]
+
+            await client.send(json.dumps(_message("heartbeat", "hb-1", {})))
+            assert json.loads(await client.recv())["request_id"] == "hb-1"  # 小于阈值仍为文本帧
+
+            # 其他连接不受影响
+            await plain.send(json.dumps(discover))
+            assert isinstance(await plain.recv(), str)
+
+            await client.send_binary(b"garbage")
+            reply = await client.recv()
+            error = codec.decode(reply) if isinstance(reply, bytes) else json.loads(reply)
+            assert error["error"]["type"] == "INVALID_MESSAGE"
+            await client.close()
+            await plain.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
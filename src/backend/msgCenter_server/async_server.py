@@ -0,0 +1,471 @@
+"""
+无头 asyncio 消息中心服务器
+
+与 StandardWebSocketServer 共用同一套处理函数注册表与消息契约，但网络层由
+asyncio streams + WebSocketProtocol 帧代码实现：不需要 QCoreApplication、
+Qt 事件循环或 QWebSocketServer，适合压测、容器与大量并发客户端场景。
+
+- 每个连接一个读协程，消息按到达顺序逐条处理（客户端内有序）
+- 阻塞型消息交给有界线程池（max_workers 为并发上限），工作线程借用池化数据库连接
+- 出站消息经每连接的发送队列写出；工作线程中的广播经 call_soon_threadsafe 回到事件循环
+
+运行:
+    python -m src.backend.msgCenter_server.async_server --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import struct
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple, Union
+
+project_root = Path(__file__).resolve().parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.qt.compat import QAbstractSocket
+from src.backend.msgCenter_server.protocol import WebSocketProtocol
+from src.backend.msgCenter_server.standard_protocol import StandardMessageHandler
+from src.backend.msgCenter_server.standard_server import StandardWebSocketServer, get_port, setup_logging
+
+logger = logging.getLogger(__name__)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_MAX_HEADER_BYTES = 64 * 1024
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class WebSocketClosed(Exception):
+    """对端关闭或协议错误，连接应结束"""
+
+
+def accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+async def read_http_head(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+    """读取 HTTP 请求/状态行与头部（键小写）"""
+    try:
+        raw = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as exc:
+        raise WebSocketClosed(f"握手读取失败: {exc}") from exc
+    if len(raw) > _MAX_HEADER_BYTES:
+        raise WebSocketClosed("握手头部过大")
+    lines = raw.decode("latin-1").split("\r\n")
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int) -> Tuple[bool, int, bytes]:
+    """读取一帧，返回 (fin, opcode, 已去掩码的负载)"""
+    try:
+        head = await reader.readexactly(2)
+        fin = bool(head[0] & 0x80)
+        opcode = head[0] & 0x0F
+        masked = bool(head[1] & 0x80)
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", await reader.readexactly(8))[0]
+        if length > max_size:
+            raise WebSocketClosed(f"帧过大: {length} > {max_size}")
+        mask = await reader.readexactly(4) if masked else b""
+        payload = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError as exc:
+        raise WebSocketClosed("连接已断开") from exc
+    if masked:
+        payload = WebSocketProtocol.apply_mask(payload, mask)
+    return fin, opcode, payload
+
+
+class _WrittenSignal:
+    """bytesWritten 的最小替身：写出后在事件循环线程回调，供出站队列扣减在途字节"""
+
+    def __init__(self) -> None:
+        self._slots = []
+
+    def connect(self, slot) -> None:
+        self._slots.append(slot)
+
+    def emit(self, written: int) -> None:
+        for slot in list(self._slots):
+            slot(written)
+
+
+class AsyncClientConnection:
+    """
+    asyncio 连接适配器
+
+    提供处理函数用到的 QWebSocket 接口子集（state / sendTextMessage / sendBinaryMessage /
+    peerPort / close / abort / bytesWritten），使 StandardWebSocketServer 的发送、广播与出站队列逻辑无需
+    区分传输层。sendTextMessage / sendBinaryMessage 线程安全。
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop):
+        self._reader = reader
+        self._writer = writer
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._outbox: "asyncio.Queue[Optional[Union[str, bytes, Tuple[int, bytes]]]]" = asyncio.Queue()
+        self._open = True
+        peer = writer.get_extra_info("peername") or ("", 0)
+        self._peer = (peer[0], peer[1])
+        self.bytesWritten = _WrittenSignal()
+
+    def state(self):
+        if self._open:
+            return QAbstractSocket.SocketState.ConnectedState
+        return QAbstractSocket.SocketState.UnconnectedState
+
+    def peerPort(self) -> int:
+        return self._peer[1]
+
+    def sendTextMessage(self, text: str) -> None:
+        self._enqueue(text)
+
+    def sendBinaryMessage(self, data: bytes) -> None:
+        self._enqueue((OPCODE_BINARY, bytes(data)))
+
+    def send_frame(self, frame: bytes) -> None:
+        self._enqueue(frame)
+
+    def close(self) -> None:
+        if self._open:
+            self._open = False
+            self._enqueue(None, force=True)
+
+    def abort(self) -> None:
+        """立即断开（不等待排队数据写出），读协程随之结束"""
+        self.close()
+        if threading.get_ident() == self._loop_thread_id:
+            self._writer.transport.abort()
+        else:
+            self._loop.call_soon_threadsafe(self._writer.transport.abort)
+
+    def _enqueue(self, item: Optional[Union[str, bytes, Tuple[int, bytes]]], force: bool = False) -> None:
+        if not self._open and not force:
+            return
+        if threading.get_ident() == self._loop_thread_id:
+            self._outbox.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(self._outbox.put_nowait, item)
+
+    async def write_loop(self) -> None:
+        """按入队顺序写出：str 为文本消息，(opcode, bytes) 为二进制消息，bytes 为已编码的控制帧，None 结束"""
+        try:
+            while True:
+                item = await self._outbox.get()
+                if item is None:
+                    break
+                if isinstance(item, bytes):
+                    frame = item
+                elif isinstance(item, tuple):
+                    frame = WebSocketProtocol.build_frame(item[1], item[0])
+                else:
+                    frame = WebSocketProtocol.build_text_frame(item)
+                self._writer.write(frame)
+                await self._writer.drain()
+                if not isinstance(item, bytes):
+                    self.bytesWritten.emit(len(frame))
+        except (ConnectionError, RuntimeError) as exc:
+            logger.debug("写出失败，连接关闭: %s", exc)
+        finally:
+            self._open = False
+
+    async def messages(self, max_size: int) -> AsyncIterator[Union[str, bytes]]:
+        """逐条产出完整的消息：文本帧为 str，二进制帧为 bytes（处理分片、ping 与关闭帧）"""
+        fragments = []
+        total = 0
+        binary = False
+        while self._open:
+            fin, opcode, payload = await read_frame(self._reader, max_size)
+            if opcode == OPCODE_CLOSE:
+                self.send_frame(WebSocketProtocol.build_frame(payload[:2], OPCODE_CLOSE))
+                self.close()
+                return
+            if opcode == OPCODE_PING:
+                self.send_frame(WebSocketProtocol.build_pong_frame(payload))
+                continue
+            if opcode == OPCODE_PONG:
+                continue
+            if opcode in (OPCODE_TEXT, OPCODE_BINARY):
+                fragments, total = [], 0
+                binary = opcode == OPCODE_BINARY
+            elif opcode != OPCODE_CONTINUATION:
+                raise WebSocketClosed(f"未知操作码: {opcode}")
+            fragments.append(payload)
+            total += len(payload)
+            if total > max_size:
+                raise WebSocketClosed(f"消息过大: {total} > {max_size}")
+            if fin:
+                data = b"".join(fragments)
+                fragments, total = [], 0
+                yield data if binary else data.decode("utf-8", errors="replace")
+
+
+class AsyncStandardServer:
+    """
+    基于 asyncio 的消息中心服务器（处理函数来自 StandardWebSocketServer）
+
+    Example:
+        >>> server = AsyncStandardServer(port=8765, max_workers=4)
+        >>> asyncio.run(server.serve_forever())
+    """
+
+    DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        *,
+        pdf_library_api: Any = None,
+        handlers: Optional[StandardWebSocketServer] = None,
+        max_workers: int = 4,
+        db_path: Optional[str] = None,
+        max_message_bytes: int = DEFAULT_MAX_MESSAGE_BYTES,
+    ):
+        self.host = host
+        self.port = port
+        # 处理函数注册表：Qt 线程池不启用，阻塞消息由本服务器的线程池执行
+        self.handlers = handlers or StandardWebSocketServer(
+            host, port, pdf_library_api=pdf_library_api, max_workers=0, db_path=db_path,
+            batch_workers=max_workers,
+        )
+        self.max_workers = max(int(max_workers or 0), 0)
+        self.max_message_bytes = max_message_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    async def start(self) -> int:
+        """开始监听，返回实际端口（port=0 时由系统分配）"""
+        loop = asyncio.get_running_loop()
+        self.handlers.attach_event_loop(loop)
+        if self.max_workers:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ws-async-handler")
+        self._server = await asyncio.start_server(self._on_connection, self.host, self.port, limit=_MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.handlers.running = True
+        api = self.handlers.pdf_library_api
+        if api is not None and hasattr(api, "start_maintenance"):
+            try:
+                api.start_maintenance()
+            except Exception as exc:
+                logger.warning("启动数据库维护调度器失败: %s", exc)
+        logger.info(f"asyncio WebSocket服务器启动成功: ws://{self.host}:{self.port}")
+        return self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for client in list(self.handlers.clients):
+            client.close()
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self.handlers.clients.clear()
+        self.handlers.release_resources()
+        self.handlers.running = False
+        logger.info("asyncio WebSocket服务器已停止")
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self._serve_connection(reader, writer)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            _request_line, headers = await read_http_head(reader)
+        except WebSocketClosed as exc:
+            logger.debug("握手失败: %s", exc)
+            return
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+            ).encode("ascii")
+        )
+        await writer.drain()
+
+        client = AsyncClientConnection(reader, writer, asyncio.get_running_loop())
+        write_task = asyncio.create_task(client.write_loop())
+        logger.info(f"新客户端连接: {client._peer[0]}:{client.peerPort()}")
+        self.handlers.register_client(client)
+        try:
+            async for payload in client.messages(self.max_message_bytes):
+                await self._process(client, payload)
+        except WebSocketClosed as exc:
+            logger.debug("连接结束: %s", exc)
+        finally:
+            self.handlers.forget_client(client)
+            client.close()
+            await write_task
+            logger.info(f"客户端断开连接: {client.peerPort()}")
+
+    async def _process(self, client: AsyncClientConnection, payload: Union[str, bytes]) -> None:
+        if isinstance(payload, bytes):
+            parsed_message = self.handlers.decode_binary_message(client, payload)
+            if parsed_message is None:
+                return
+            error = None
+        else:
+            parsed_message, error = StandardMessageHandler.parse_message(payload)
+        if error:
+            logger.error(f"消息解析错误: {error}")
+            self.handlers.send_message(
+                client,
+                StandardMessageHandler.build_error_response("unknown", "INVALID_MESSAGE", f"消息格式错误: {error}"),
+            )
+            return
+
+        response, failure = None, None
+        try:
+            if self._executor is not None and self.handlers.is_blocking_message(parsed_message):
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(self._executor, self._run_blocking, parsed_message, client)
+            else:
+                response = self.handlers.handle_message(parsed_message, client)
+        except Exception as exc:
+            failure = exc
+        self.handlers.complete_message(client, parsed_message, response, failure)
+
+    def _run_blocking(self, message: Dict[str, Any], client: AsyncClientConnection) -> Optional[Dict[str, Any]]:
+        # batch 外层不占用连接，子请求各自借用
+        if self.handlers.is_batch_message(message):
+            return self.handlers.handle_message(message, client)
+        with self.handlers.worker_connection_scope():
+            return self.handlers.handle_message(message, client)
+
+
+class AsyncWebSocketClient:
+    """最小 asyncio WebSocket 客户端（测试与基准使用）"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str = "/") -> "AsyncWebSocketClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=_MAX_HEADER_BYTES)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        writer.write(
+            (
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Version: 13\r\n\r\n"
+            ).encode("ascii")
+        )
+        await writer.drain()
+        status, headers = await read_http_head(reader)
+        if " 101 " not in f"{status} " or headers.get("sec-websocket-accept") != accept_key(key):
+            writer.close()
+            raise WebSocketClosed(f"握手被拒绝: {status}")
+        return cls(reader, writer)
+
+    async def send(self, text: str) -> None:
+        self._writer.write(WebSocketProtocol.build_text_frame(text, masked=True))
+        await self._writer.drain()
+
+    async def send_binary(self, data: bytes) -> None:
+        self._writer.write(WebSocketProtocol.build_binary_frame(data, masked=True))
+        await self._writer.drain()
+
+    async def recv(self, max_size: int = AsyncStandardServer.DEFAULT_MAX_MESSAGE_BYTES) -> Union[str, bytes]:
+        """接收一条消息：文本帧返回 str，二进制帧返回 bytes"""
+        fragments = []
+        binary = False
+        while True:
+            fin, opcode, payload = await read_frame(self._reader, max_size)
+            if opcode == OPCODE_CLOSE:
+                raise WebSocketClosed("服务器关闭连接")
+            if opcode in (OPCODE_PING, OPCODE_PONG):
+                continue
+            if opcode != OPCODE_CONTINUATION:
+                binary = opcode == OPCODE_BINARY
+            fragments.append(payload)
+            if fin:
+                data = b"".join(fragments)
+                return data if binary else data.decode("utf-8")
+
+    async def close(self) -> None:
+        try:
+            self._writer.write(WebSocketProtocol.build_close_frame(masked=True))
+            await self._writer.drain()
+        except ConnectionError:
+            pass
+        self._writer.close()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Headless asyncio WebSocket Server")
+    parser.add_argument("--port", type=int, help="Port to run the server on")
+    parser.add_argument("--workers", type=int, default=4, help="Max concurrent blocking handlers (0 = run on the event loop)")
+    parser.add_argument("--db", help="Database file path (defaults to data/anki_linkmaster.db)")
+    args = parser.parse_args()
+
+    setup_logging()
+    port = get_port(args.port)
+
+    server = AsyncStandardServer(port=port, max_workers=args.workers, db_path=args.db)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，服务器退出")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+能力注册表缓存（capability:discover / capability:describe）
+
+客户端每次连接都会发现并描述能力；域列表与各域描述（含契约 schema 的路径与 sha256）
+在启动时预先构建并缓存，之后的请求直接返回缓存结果：
+
+- schema 摘要按文件 (mtime_ns, size) 缓存，文件未变化时不重新读取与计算哈希
+- 每次请求最多每 check_interval 秒检查一次已引用 schema 文件的 mtime，有变化时重建全部缓存
+- 每份缓存结果带 etag（内容的 sha256 前 16 位）；请求携带相同的 if_none_match 时
+  只返回未变化标记，客户端无需重新下载描述
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def compute_etag(payload: Any) -> str:
+    """规范化 JSON 的 sha256 前 16 位"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class SchemaDigests:
+    """schema 文件路径与 sha256 摘要，按文件签名缓存"""
+
+    def __init__(self, schema_root: str, project_root: str) -> None:
+        self.schema_root = schema_root
+        self.project_root = project_root
+        # rel_path -> (签名, 摘要)
+        self._entries: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+
+    def info(self, rel_path: str) -> Dict[str, Any]:
+        full = os.path.join(self.schema_root, rel_path)
+        signature = self._signature(full)
+        with self._lock:
+            entry = self._entries.get(rel_path)
+        if entry is None or entry[0] != signature:
+            digest = None
+            if signature is not None:
+                try:
+                    # 显式 UTF-8 读取并计算 sha256
+                    with open(full, "r", encoding="utf-8") as f:
+                        digest = hashlib.sha256(f.read().encode("utf-8")).hexdigest()
+                except (OSError, UnicodeDecodeError):
+                    digest = None
+            entry = (signature, digest)
+            with self._lock:
+                self._entries[rel_path] = entry
+                self.computed += 1
+        return {"path": os.path.relpath(full, self.project_root).replace("\\", "/"), "schemaHash": entry[1]}
+
+    def changed(self) -> bool:
+        """已引用的 schema 文件是否有增删改（按 mtime_ns 与大小判断）"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return any(self._signature(os.path.join(self.schema_root, rel)) != entry[0] for rel, entry in entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class CapabilityRegistry:
+    """
+    缓存域列表与各域描述，schema 文件变化时重建
+
+    Example:
+        >>> registry = CapabilityRegistry(schema_root, project_root, build_domains, build_description)
+        >>> registry.warm(["pdf-library", "system"])
+        >>> domains, etag = registry.discover()
+        >>> described, etag = registry.describe("pdf-library")
+    """
+
+    def __init__(
+        self,
+        schema_root: str,
+        project_root: str,
+        build_domains: Callable[[], List[Dict[str, Any]]],
+        build_description: Callable[[str, Callable[[str], Dict[str, Any]]], Optional[Dict[str, Any]]],
+        *,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+    ) -> None:
+        self.schemas = SchemaDigests(schema_root, project_root)
+        self._build_domains = build_domains
+        self._build_description = build_description
+        self.check_interval = float(check_interval)
+        self._lock = threading.RLock()
+        self._domains: Optional[Tuple[List[Dict[str, Any]], str]] = None
+        self._descriptions: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        self._last_check = time.monotonic()
+        self._refreshes = 0
+        self._hits = 0
+        self._builds = 0
+
+    def discover(self) -> Tuple[List[Dict[str, Any]], str]:
+        """(域列表副本, etag)；各域条目带该域描述的 etag（尚未描述过的域按需构建）"""
+        with self._lock:
+            self._check()
+            if self._domains is None:
+                domains = self._build_domains()
+                for domain in domains:
+                    described = self._describe_cached(domain["name"])
+                    if described is not None:
+                        domain["etag"] = described[1]
+                self._domains = (domains, compute_etag(domains))
+                self._builds += 1
+            else:
+                self._hits += 1
+            return copy.deepcopy(self._domains[0]), self._domains[1]
+
+    def describe(self, domain: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """(描述副本, etag)；未知域返回 None（不缓存）"""
+        with self._lock:
+            self._check()
+            cached = domain in self._descriptions
+            described = self._describe_cached(domain)
+            if described is None:
+                return None
+            if cached:
+                self._hits += 1
+            return copy.deepcopy(described[0]), described[1]
+
+    def warm(self, domains: List[str]) -> None:
+        """启动时预先构建域列表与给定域的描述"""
+        with self._lock:
+            for domain in domains:
+                self._describe_cached(domain)
+            self._domains = None
+            self.discover()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._domains = None
+            self._descriptions.clear()
+            self._refreshes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "domains_etag": self._domains[1] if self._domains is not None else None,
+                "descriptions": len(self._descriptions),
+                "schemas": len(self.schemas),
+                "schema_digests_computed": self.schemas.computed,
+                "hits": self._hits,
+                "builds": self._builds,
+                "refreshes": self._refreshes,
+            }
+
+    # ------------------------------------------------------------------
+    def _check(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self.schemas.changed():
+            self.invalidate()
+
+    def _describe_cached(self, domain: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        described = self._descriptions.get(domain)
+        if described is None:
+            payload = self._build_description(domain, self.schemas.info)
+            if payload is None:
+                return None
+            described = self._descriptions[domain] = (payload, compute_etag(payload))
+            self._builds += 1
+        return described
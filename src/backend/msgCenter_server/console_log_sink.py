@@ -0,0 +1,227 @@
+"""
+前端 console 日志写入管道
+
+console_log / console_log:batch 消息只把日志条目放入内存环形缓冲区，由后台写线程
+批量写入 logs/unified-console.log，处理函数不再逐条打开、写入、刷新、关闭文件：
+
+- 环形缓冲区有容量上限，写线程落后时丢弃最旧的条目（计入 overflow_dropped）
+- 每个来源（source）一个令牌桶限流，超出速率的条目被丢弃并按来源计数；
+  丢弃数量在下次写入时以一行汇总写入日志，并在回执与 system:metrics 中报告
+- 日志文件超过 max_bytes 时按 .1 ~ .N 轮转（与 RotatingFileHandler 相同的命名）
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATH = os.path.join("logs", "unified-console.log")
+
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    """[HH:MM:SS.mmm][LEVEL][source] message"""
+    source = entry.get("source", "unknown")
+    level = str(entry.get("level", "log"))
+    timestamp = entry.get("timestamp", "")
+    if timestamp:
+        try:
+            formatted_time = datetime.datetime.fromtimestamp(timestamp / 1000).strftime("%H:%M:%S.%f")[:-3]
+        except Exception:
+            formatted_time = str(timestamp)
+    else:
+        formatted_time = ""
+    return f"[{formatted_time}][{level.upper()}][{source}] {entry.get('message', '')}"
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens = capacity
+        self.updated = now
+
+
+class ConsoleLogSink:
+    """
+    console 日志的环形缓冲区 + 后台写线程
+
+    Example:
+        >>> sink = ConsoleLogSink("logs/unified-console.log")
+        >>> sink.submit([{"source": "pdf-viewer", "level": "warn", "message": "..."}])
+        {'accepted': 1, 'dropped': 0, 'dropped_by_source': {}}
+        >>> sink.close()
+    """
+
+    DEFAULT_CAPACITY = 10000
+    DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+    DEFAULT_BACKUP_COUNT = 3
+    DEFAULT_RATE_PER_SOURCE = 200.0
+    DEFAULT_BURST_PER_SOURCE = 1000
+    DEFAULT_FLUSH_INTERVAL = 0.25
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOG_PATH,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        rate_per_source: float = DEFAULT_RATE_PER_SOURCE,
+        burst_per_source: int = DEFAULT_BURST_PER_SOURCE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        # 构造时固定为绝对路径，写线程不受之后工作目录变化影响
+        self.path = os.path.abspath(path)
+        self.max_bytes = int(max_bytes)
+        self.backup_count = max(int(backup_count), 0)
+        self.rate_per_source = float(rate_per_source)
+        self.burst_per_source = float(burst_per_source)
+        self.flush_interval = float(flush_interval)
+        self._buffer: Deque[str] = deque(maxlen=max(int(capacity), 1))
+        self._buckets: Dict[str, _TokenBucket] = {}
+        # 自上次写入以来各来源被限流丢弃的条数（写入汇总行后清零）
+        self._pending_drops: Dict[str, int] = {}
+        self._dropped_total: Dict[str, int] = {}
+        self._accepted = 0
+        self._written = 0
+        self._overflow_dropped = 0
+        self._rotations = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    def submit(self, entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """按来源限流后放入缓冲区，返回本次接收/丢弃计数（不等待写入）"""
+        accepted = 0
+        dropped: Dict[str, int] = {}
+        now = time.monotonic()
+        with self._lock:
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                source = str(entry.get("source", "unknown"))
+                if not self._take_token(source, now):
+                    dropped[source] = dropped.get(source, 0) + 1
+                    continue
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._overflow_dropped += 1
+                self._buffer.append(format_entry(entry))
+                accepted += 1
+            for source, count in dropped.items():
+                self._pending_drops[source] = self._pending_drops.get(source, 0) + count
+                self._dropped_total[source] = self._dropped_total.get(source, 0) + count
+            self._accepted += accepted
+            if not self._closed:
+                self._ensure_writer()
+        self._wakeup.set()
+        return {"accepted": accepted, "dropped": sum(dropped.values()), "dropped_by_source": dropped}
+
+    def flush(self) -> int:
+        """立即把缓冲区写入文件（写线程与测试调用），返回写入行数"""
+        with self._lock:
+            lines = list(self._buffer)
+            self._buffer.clear()
+            drops, self._pending_drops = self._pending_drops, {}
+        if drops:
+            stamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            lines.extend(
+                f"[{stamp}][WARN][console-log] 来源 {source} 超出速率限制，丢弃 {count} 条日志"
+                for source, count in sorted(drops.items())
+            )
+        if not lines:
+            return 0
+        with self._write_lock:
+            try:
+                self._write_lines(lines)
+            except OSError as exc:
+                logger.error("写入 console 日志失败: %s", exc)
+                return 0
+        with self._lock:
+            self._written += len(lines)
+        return len(lines)
+
+    def close(self) -> None:
+        """停止写线程并写出剩余条目"""
+        with self._lock:
+            self._closed = True
+            writer = self._writer
+            self._writer = None
+        self._wakeup.set()
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "capacity": self._buffer.maxlen,
+                "accepted": self._accepted,
+                "written": self._written,
+                "overflow_dropped": self._overflow_dropped,
+                "rate_limited": dict(self._dropped_total),
+                "rotations": self._rotations,
+                "limits": {"rate_per_source": self.rate_per_source, "burst_per_source": self.burst_per_source},
+            }
+
+    # ------------------------------------------------------------------
+    def _take_token(self, source: str, now: float) -> bool:
+        if self.rate_per_source <= 0:
+            return True
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = _TokenBucket(self.burst_per_source, now)
+        else:
+            bucket.tokens = min(self.burst_per_source, bucket.tokens + (now - bucket.updated) * self.rate_per_source)
+            bucket.updated = now
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name="console-log-writer", daemon=True)
+            self._writer.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 攒一小段时间再写，合并突发日志
+            time.sleep(self.flush_interval)
+            self.flush()
+            with self._lock:
+                if self._closed:
+                    return
+
+    def _write_lines(self, lines: List[str]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = "\n".join(lines) + "\n"
+        if self.max_bytes > 0 and os.path.exists(self.path):
+            if os.path.getsize(self.path) + len(data.encode("utf-8")) > self.max_bytes:
+                self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        with self._lock:
+            self._rotations += 1
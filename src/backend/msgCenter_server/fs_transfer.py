@@ -0,0 +1,184 @@
+"""
+storage-fs 分块传输
+
+为 storage-fs:read/write 提供分块会话，避免整文件 base64 进出单条 JSON 消息：
+- 读取：按 offset/length 读取分片，最后一片附带整文件 sha256 校验和
+- 写入：会话按 seq 顺序追加分片到临时文件，final 分片校验 sha256 后原子替换目标文件
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 单个分片的最大字节数（base64 后约 1.33 倍）
+FS_CHUNK_MAX_BYTES = 1024 * 1024
+# 写入会话空闲超时（秒）
+FS_SESSION_IDLE_TIMEOUT = 300.0
+
+
+class ChunkTransferError(Exception):
+    """分块传输错误，携带协议错误码与 HTTP 风格状态码。"""
+
+    def __init__(self, error_code: str, message: str, code: int = 400) -> None:
+        super().__init__(message)
+        self.error_code = error_code
+        self.code = code
+
+
+def file_checksum(abs_path: str, block_size: int = FS_CHUNK_MAX_BYTES) -> str:
+    """流式计算文件 sha256（不整体载入内存）。"""
+    digest = hashlib.sha256()
+    with open(abs_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_chunk(abs_path: str, offset: int, length: Optional[int]) -> Tuple[bytes, int, bool]:
+    """读取 [offset, offset+length) 分片，返回 (数据, 文件总大小, 是否到达末尾)。"""
+    if offset < 0:
+        raise ChunkTransferError("INVALID_RANGE", "offset 不能为负数")
+    length = FS_CHUNK_MAX_BYTES if not length else min(int(length), FS_CHUNK_MAX_BYTES)
+    if length <= 0:
+        raise ChunkTransferError("INVALID_RANGE", "length 必须为正整数")
+    size = os.path.getsize(abs_path)
+    if offset > size:
+        raise ChunkTransferError("INVALID_RANGE", f"offset 超出文件大小: {offset} > {size}", 416)
+    with open(abs_path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(length)
+    return chunk, size, offset + len(chunk) >= size
+
+
+@dataclass
+class ChunkedWriteSession:
+    """单个分块写入会话（临时文件 + 增量校验和）。"""
+
+    session_id: str
+    target_path: str
+    temp_path: str
+    next_seq: int = 0
+    bytes_received: int = 0
+    last_active: float = field(default_factory=time.monotonic)
+    _digest: Any = field(default_factory=hashlib.sha256)
+
+    def append(self, seq: int, offset: int, chunk: bytes) -> None:
+        if seq != self.next_seq:
+            raise ChunkTransferError(
+                "SEQUENCE_MISMATCH", f"期望 seq={self.next_seq}，收到 seq={seq}", 409
+            )
+        if offset != self.bytes_received:
+            raise ChunkTransferError(
+                "OFFSET_MISMATCH", f"期望 offset={self.bytes_received}，收到 offset={offset}", 409
+            )
+        with open(self.temp_path, "ab") as f:
+            f.write(chunk)
+        self._digest.update(chunk)
+        self.bytes_received += len(chunk)
+        self.next_seq += 1
+        self.last_active = time.monotonic()
+
+    def checksum(self) -> str:
+        return self._digest.hexdigest()
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ChunkedTransferManager:
+    """管理进行中的分块写入会话。"""
+
+    def __init__(self, idle_timeout: float = FS_SESSION_IDLE_TIMEOUT) -> None:
+        self._sessions: Dict[str, ChunkedWriteSession] = {}
+        self._lock = threading.Lock()
+        self._idle_timeout = idle_timeout
+
+    def write_chunk(
+        self,
+        target_path: str,
+        *,
+        session_id: Optional[str],
+        seq: int,
+        offset: int,
+        chunk: bytes,
+        final: bool,
+        checksum: Optional[str],
+        overwrite: bool,
+    ) -> Dict[str, Any]:
+        """写入一个分片；final 分片校验通过后提交文件。返回会话进度。"""
+        self._expire_idle()
+        with self._lock:
+            if session_id:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    raise ChunkTransferError("SESSION_NOT_FOUND", f"写入会话不存在或已过期: {session_id}", 404)
+                if session.target_path != target_path:
+                    raise ChunkTransferError("SESSION_PATH_MISMATCH", "会话目标路径与请求不一致", 409)
+            else:
+                if seq != 0:
+                    raise ChunkTransferError("SEQUENCE_MISMATCH", "新会话必须从 seq=0 开始", 409)
+                if (not overwrite) and os.path.exists(target_path):
+                    raise ChunkTransferError("ALREADY_EXISTS", "文件已存在", 409)
+                os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+                new_id = uuid.uuid4().hex
+                session = ChunkedWriteSession(
+                    session_id=new_id,
+                    target_path=target_path,
+                    temp_path=f"{target_path}.part-{new_id}",
+                )
+                self._sessions[new_id] = session
+
+        session.append(seq, offset, chunk)
+        progress = {
+            "session_id": session.session_id,
+            "seq": seq,
+            "bytes_received": session.bytes_received,
+            "committed": False,
+        }
+        if not final:
+            return progress
+
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+        actual = session.checksum()
+        if not checksum or checksum.lower() != actual:
+            session.discard()
+            raise ChunkTransferError(
+                "CHECKSUM_MISMATCH", f"校验和不一致: expected={checksum}, actual={actual}", 422
+            )
+        os.replace(session.temp_path, target_path)
+        progress.update({"committed": True, "checksum": actual})
+        return progress
+
+    def abort(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.discard()
+        return True
+
+    def active_sessions(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire_idle(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                sid for sid, s in self._sessions.items()
+                if now - s.last_active > self._idle_timeout
+            ]
+            sessions = [self._sessions.pop(sid) for sid in expired]
+        for session in sessions:
+            logger.info("分块写入会话超时，已丢弃: %s", session.session_id)
+            session.discard()
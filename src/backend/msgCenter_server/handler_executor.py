@@ -0,0 +1,171 @@
+"""
+消息处理执行层
+
+阻塞型处理函数（SQLite 查询、文件复制、fs 读写、日志追加）提交到线程池执行，
+结果通过排队信号回到 Qt 线程再写入 socket，慢请求不再阻塞心跳与其他客户端。
+
+- 并发上限：线程池 max_workers（0 表示全部在调用线程内同步执行）
+- 连接隔离：每个工作任务在 connection_scope 作用域内运行（借用池化数据库连接）
+- 客户端内有序：同一客户端的消息按到达顺序逐条执行与回复；非阻塞消息排在
+  该客户端未完成的阻塞消息之后，在 Qt 线程内联执行
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Deque, Dict, Optional
+
+from src.qt.compat import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# on_done(response, error)：在 Qt 线程回调；error 为处理函数抛出的异常
+DoneCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class _Job:
+    __slots__ = ("key", "fn", "on_done", "blocking", "scoped", "started", "result", "error")
+
+    def __init__(self, key: Any, fn: Callable[[], Any], on_done: DoneCallback, blocking: bool, scoped: bool = True) -> None:
+        self.key = key
+        self.fn = fn
+        self.on_done = on_done
+        self.blocking = blocking
+        self.scoped = scoped
+        self.started = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class HandlerExecutor(QObject):
+    """按客户端排队、阻塞任务进线程池的消息执行器（仅在所属 Qt 线程调用 submit）"""
+
+    _job_finished = pyqtSignal(object)
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        *,
+        connection_scope: Optional[Callable[[], ContextManager[Any]]] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._max_workers = max(int(max_workers or 0), 0)
+        self._pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="ws-handler")
+            if self._max_workers else None
+        )
+        self._connection_scope = connection_scope
+        self._queues: Dict[Any, Deque[_Job]] = {}
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._job_finished.connect(self._on_job_finished)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def submit(self, client: Any, fn: Callable[[], Any], on_done: DoneCallback, *, blocking: bool, scoped: bool = True) -> None:
+        """
+        提交一条消息的处理
+
+        Args:
+            client: 发送方（排队键；None 视为同一匿名客户端）
+            fn: 处理函数，返回响应
+            on_done: 完成回调 (response, error)，总在 Qt 线程执行
+            blocking: 是否提交到线程池
+            scoped: 工作线程中是否在 connection_scope 内执行（自行借用连接的任务传 False）
+        """
+        queue = self._queues.setdefault(client, deque())
+        queue.append(_Job(client, fn, on_done, blocking, scoped))
+        if len(queue) == 1:
+            self._advance(client)
+
+    def discard(self, client: Any) -> int:
+        """客户端断开：丢弃其尚未开始的消息，返回丢弃条数（执行中的任务照常完成）"""
+        queue = self._queues.get(client)
+        if not queue:
+            return 0
+        running = [job for job in queue if job.started]
+        dropped = len(queue) - len(running)
+        if running:
+            self._queues[client] = deque(running)
+        else:
+            self._queues.pop(client, None)
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        queued = sum(len(q) for q in self._queues.values()) - self._in_flight
+        return {
+            "max_workers": self._max_workers,
+            "in_flight": self._in_flight,
+            "queued": max(queued, 0),
+            "clients": len(self._queues),
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._queues.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    # ------------------------------------------------------------------
+
+    def _advance(self, key: Any) -> None:
+        """执行队首：阻塞任务提交线程池后返回，非阻塞任务内联执行并继续"""
+        queue = self._queues.get(key)
+        while queue:
+            job = queue[0]
+            if job.started:
+                return
+            job.started = True
+            if job.blocking and self._pool is not None:
+                self._in_flight += 1
+                try:
+                    self._pool.submit(self._run_in_worker, job)
+                    return
+                except RuntimeError as exc:  # 线程池已关闭
+                    self._in_flight -= 1
+                    job.error = exc
+            else:
+                self._run(job)
+            queue.popleft()
+            self._deliver(job)
+        self._queues.pop(key, None)
+
+    def _run(self, job: _Job) -> None:
+        try:
+            job.result = job.fn()
+        except Exception as exc:
+            job.error = exc
+
+    def _run_in_worker(self, job: _Job) -> None:
+        try:
+            scope = self._connection_scope() if self._connection_scope and job.scoped else nullcontext()
+            with scope:
+                job.result = job.fn()
+        except Exception as exc:
+            job.error = exc
+        # 跨线程发射：排队到执行器所属线程的事件循环
+        self._job_finished.emit(job)
+
+    def _on_job_finished(self, job: _Job) -> None:
+        self._in_flight -= 1
+        queue = self._queues.get(job.key)
+        if queue and queue[0] is job:
+            queue.popleft()
+        self._deliver(job)
+        self._advance(job.key)
+
+    def _deliver(self, job: _Job) -> None:
+        self._completed += 1
+        if job.error is not None:
+            self._failed += 1
+        try:
+            job.on_done(job.result, job.error)
+        except Exception as exc:
+            logger.error("消息完成回调失败: %s", exc, exc_info=True)
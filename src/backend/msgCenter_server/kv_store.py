@@ -0,0 +1,249 @@
+"""
+storage-kv 能力的 SQLite 存储实现
+
+替代旧的 data/storage-kv.json 整文件读写：
+- 按 (namespace, key) 单行读写，写入成本与总量无关
+- 支持批量 get/set/delete 与可选 TTL（毫秒）
+- 进程内 LRU 读缓存（写入/删除时同步更新）
+- 首次启动时自动迁移旧 JSON 文件（迁移后重命名为 *.migrated）
+- 打开时以及写入时每隔 purge_interval_s 秒清理一次过期条目
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+DEFAULT_PURGE_INTERVAL_S = 300.0
+
+
+class SQLiteKVStore:
+    """基于 SQLite 的命名空间 KV 存储（线程安全）。"""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        *,
+        legacy_json_path: Optional[Union[str, Path]] = None,
+        cache_size: int = 1024,
+        purge_interval_s: float = DEFAULT_PURGE_INTERVAL_S,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[str, Optional[int]]]" = OrderedDict()
+        self._cache_size = max(0, int(cache_size))
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._purge_interval_s = max(0.0, float(purge_interval_s))
+        self._last_purge = 0.0
+        self._ensure_schema()
+        if legacy_json_path:
+            self._migrate_legacy_json(Path(legacy_json_path))
+        self.purge_expired()
+
+    # ==================== 表结构与迁移 ====================
+
+    def _ensure_schema(self) -> None:
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS kv_store (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at INTEGER,
+                updated_at INTEGER NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_kv_store_expires
+                ON kv_store(expires_at) WHERE expires_at IS NOT NULL;
+            """
+        )
+
+    def _migrate_legacy_json(self, json_path: Path) -> int:
+        """导入旧版 storage-kv.json（{namespace: {key: value}}），已存在的键不覆盖。"""
+        if not json_path.is_file():
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f) or {}
+        except Exception as exc:
+            logger.warning("读取旧 KV 文件失败，跳过迁移: %s", exc)
+            return 0
+        if not isinstance(legacy, dict):
+            logger.warning("旧 KV 文件顶层不是对象（%s），按空存储处理", type(legacy).__name__)
+            legacy = {}
+
+        now = self._now_ms()
+        rows = [
+            (str(ns), str(key), json.dumps(value, ensure_ascii=False), now)
+            for ns, bucket in legacy.items() if isinstance(bucket, dict)
+            for key, value in bucket.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO kv_store (namespace, key, value, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, NULL, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        try:
+            os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+        except OSError as exc:
+            logger.warning("重命名旧 KV 文件失败: %s", exc)
+        logger.info("已迁移旧 KV 文件 %s: %d 条", json_path, len(rows))
+        return len(rows)
+
+    # ==================== 读取 ====================
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量读取；不存在或已过期的键不出现在结果中。"""
+        now = self._now_ms()
+        result: Dict[str, Any] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                cached = self._cache_get((namespace, key), now)
+                if cached is _MISSING:
+                    missing.append(key)
+                elif cached is not None:
+                    result[key] = json.loads(cached)
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM kv_store "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    (namespace, *chunk),
+                ).fetchall()
+                found = set()
+                for key, value, expires_at in rows:
+                    if expires_at is not None and expires_at <= now:
+                        continue
+                    found.add(key)
+                    self._cache_put((namespace, key), value, expires_at)
+                    result[key] = json.loads(value)
+                for key in chunk:
+                    if key not in found:
+                        # 负缓存：避免对不存在的键重复查询
+                        self._cache_put((namespace, key), None, None)
+        return result
+
+    # ==================== 写入 ====================
+
+    def set(self, namespace: str, key: str, value: Any, ttl_ms: Optional[int] = None) -> None:
+        self.set_many(namespace, {key: value}, ttl_ms=ttl_ms)
+
+    def set_many(self, namespace: str, entries: Dict[str, Any], ttl_ms: Optional[int] = None) -> int:
+        """批量写入（单事务）；ttl_ms 为空表示永不过期。"""
+        now = self._now_ms()
+        expires_at = now + int(ttl_ms) if ttl_ms else None
+        rows = [
+            (namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now)
+            for key, value in entries.items()
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO kv_store (namespace, key, value, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET "
+                    "value = excluded.value, expires_at = excluded.expires_at, "
+                    "updated_at = excluded.updated_at",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._cache_clear_namespace(namespace)
+                raise
+            for _, key, value, exp, _ in rows:
+                self._cache_put((namespace, key), value, exp)
+            if self._purge_interval_s and time.monotonic() - self._last_purge >= self._purge_interval_s:
+                self.purge_expired()
+        return len(rows)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        return self.delete_many(namespace, [key]) > 0
+
+    def delete_many(self, namespace: str, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        with self._lock:
+            cursor = self._conn.executemany(
+                "DELETE FROM kv_store WHERE namespace = ? AND key = ?",
+                [(namespace, key) for key in keys],
+            )
+            for key in keys:
+                self._cache_put((namespace, key), None, None)
+            return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        """删除已过期条目，返回删除数量。"""
+        with self._lock:
+            self._last_purge = time.monotonic()
+            cursor = self._conn.execute(
+                "DELETE FROM kv_store WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (self._now_ms(),),
+            )
+            self._cache.clear()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    # ==================== 读缓存 ====================
+
+    def _cache_get(self, cache_key: Tuple[str, str], now: int) -> Any:
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._cache[cache_key]
+            return _MISSING
+        self._cache.move_to_end(cache_key)
+        return value
+
+    def _cache_put(self, cache_key: Tuple[str, str], value: Optional[str], expires_at: Optional[int]) -> None:
+        if self._cache_size <= 0:
+            return
+        self._cache[cache_key] = (value, expires_at)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_clear_namespace(self, namespace: str) -> None:
+        for cache_key in [k for k in self._cache if k[0] == namespace]:
+            del self._cache[cache_key]
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
@@ -0,0 +1,109 @@
+"""
+消息处理指标
+
+按消息类型累计处理次数、失败次数与耗时直方图（固定毫秒桶），供
+system:metrics 查询。分位数由桶上界估算，精度取决于桶划分，足以发现
+慢消息类型；记录与快照都在锁内完成，可被工作线程并发调用。
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+# 直方图桶上界（毫秒）；超出最后一个上界的样本计入 "+Inf"
+LATENCY_BUCKETS_MS: Sequence[float] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _TypeStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (bucket_count + 1)
+
+
+class MessageMetrics:
+    """
+    按消息类型统计的计数/错误/耗时直方图
+
+    Example:
+        >>> metrics = MessageMetrics()
+        >>> metrics.record("pdf-library:list:requested", 3.2)
+        >>> metrics.snapshot()["pdf-library:list:requested"]["count"]
+        1
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self._bounds: List[float] = sorted(float(b) for b in buckets_ms)
+        self._stats: Dict[str, _TypeStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, message_type: str, elapsed_ms: float, *, error: bool = False) -> None:
+        """记录一次处理结果"""
+        elapsed_ms = max(float(elapsed_ms), 0.0)
+        index = len(self._bounds)
+        for i, bound in enumerate(self._bounds):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            stats = self._stats.get(message_type)
+            if stats is None:
+                stats = self._stats[message_type] = _TypeStats(len(self._bounds))
+            stats.count += 1
+            if error:
+                stats.errors += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[index] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self, message_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        返回各消息类型的统计快照
+
+        Args:
+            message_type: 仅返回指定类型（可选）
+
+        Returns:
+            {type: {count, errors, avg_ms, max_ms, p50_ms, p95_ms, p99_ms, buckets}}；
+            buckets 为 {"<=上界": 次数, "+Inf": 次数}
+        """
+        with self._lock:
+            items = [
+                (name, stats.count, stats.errors, stats.total_ms, stats.max_ms, list(stats.buckets))
+                for name, stats in self._stats.items()
+                if message_type is None or name == message_type
+            ]
+        labels = [f"<={bound:g}" for bound in self._bounds] + ["+Inf"]
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, count, errors, total_ms, max_ms, buckets in sorted(items):
+            result[name] = {
+                "count": count,
+                "errors": errors,
+                "avg_ms": round(total_ms / count, 3) if count else 0.0,
+                "max_ms": round(max_ms, 3),
+                "p50_ms": self._estimate(buckets, count, 0.50, max_ms),
+                "p95_ms": self._estimate(buckets, count, 0.95, max_ms),
+                "p99_ms": self._estimate(buckets, count, 0.99, max_ms),
+                "buckets": dict(zip(labels, buckets)),
+            }
+        return result
+
+    def _estimate(self, buckets: List[int], count: int, quantile: float, max_ms: float) -> float:
+        """取累计数首次达到分位数的桶上界（不超过实测最大值）"""
+        if not count:
+            return 0.0
+        target = quantile * count
+        cumulative = 0
+        for i, n in enumerate(buckets):
+            cumulative += n
+            if cumulative >= target:
+                bound = self._bounds[i] if i < len(self._bounds) else max_ms
+                return round(min(bound, max_ms), 3)
+        return round(max_ms, 3)
@@ -0,0 +1,275 @@
+"""
+客户端出站队列
+
+每个连接一个发送队列：已交给 socket 但尚未写出的字节（在途字节，由 bytesWritten
+回报扣减）不超过发送窗口，超出窗口的消息在队列中等待。停滞的客户端（例如冻结的
+QtWebEngine 进程）不再让服务器内存无界增长：
+
+- 可合并消息（console 回执、记录更新、子表增量等）按 merge_key 合并，只保留最新内容
+- 队列超过字节或条数上限的慢消费者被断开
+- stats() 提供各客户端队列深度，供 system:metrics 查询
+
+不提供 bytesWritten 信号的客户端（测试替身等）不做在途统计，消息直接发送。
+消息负载为 str 时以文本帧发送，为 bytes（协商编码后的消息）时以二进制帧发送。
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# merge(queued_message, new_message) -> 合并后的消息
+MergeFunction = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+# on_evict(client, reason)：断开慢消费者
+EvictCallback = Callable[[Any, str], None]
+# encoder(client, message) -> 发往该客户端的负载（合并结果重新编码时使用）
+Encoder = Callable[[Any, Dict[str, Any]], Union[str, bytes]]
+Payload = Union[str, bytes]
+
+
+def _payload_size(payload: Payload) -> int:
+    return len(payload) if isinstance(payload, (bytes, bytearray)) else len(payload.encode("utf-8"))
+
+
+def _write(client: Any, payload: Payload) -> None:
+    if isinstance(payload, (bytes, bytearray)):
+        client.sendBinaryMessage(payload)
+    else:
+        client.sendTextMessage(payload)
+
+
+class _Entry:
+    __slots__ = ("text", "size", "merge_key", "message")
+
+    def __init__(self, text: Payload, merge_key: Optional[str], message: Optional[Dict[str, Any]]) -> None:
+        self.text = text
+        self.size = _payload_size(text)
+        self.merge_key = merge_key
+        self.message = message
+
+
+class _Outbox:
+    __slots__ = ("entries", "by_key", "queued_bytes", "in_flight", "tracked", "sent", "merged", "peak_messages", "peak_bytes")
+
+    def __init__(self, tracked: bool) -> None:
+        self.entries: Deque[_Entry] = deque()
+        self.by_key: Dict[str, _Entry] = {}
+        self.queued_bytes = 0
+        self.in_flight = 0
+        self.tracked = tracked
+        self.sent = 0
+        self.merged = 0
+        self.peak_messages = 0
+        self.peak_bytes = 0
+
+
+class OutboundQueues:
+    """
+    按客户端的出站队列（背压 + 合并 + 慢消费者驱逐）
+
+    Example:
+        >>> queues = OutboundQueues(on_evict=lambda client, reason: client.close())
+        >>> queues.register(socket)
+        >>> queues.send(socket, '{"type": "..."}', merge_key="console_log:ack")
+    """
+
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+    DEFAULT_MAX_MESSAGES = 2000
+    DEFAULT_WINDOW_BYTES = 4 * 1024 * 1024
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        window_bytes: int = DEFAULT_WINDOW_BYTES,
+        on_evict: Optional[EvictCallback] = None,
+        encoder: Optional[Encoder] = None,
+    ) -> None:
+        self.max_bytes = int(max_bytes)
+        self.max_messages = int(max_messages)
+        self.window_bytes = int(window_bytes)
+        self._on_evict = on_evict
+        self._encoder = encoder
+        self._outboxes: Dict[Any, _Outbox] = {}
+        self._lock = threading.RLock()
+        self._merged = 0
+        self._evicted = 0
+        self._evicted_clients: set = set()
+
+    def register(self, client: Any) -> None:
+        """登记连接；提供 bytesWritten 信号的客户端启用在途字节统计"""
+        signal = getattr(client, "bytesWritten", None)
+        tracked = signal is not None and hasattr(signal, "connect")
+        with self._lock:
+            if client in self._outboxes:
+                return
+            self._outboxes[client] = _Outbox(tracked)
+        if tracked:
+            signal.connect(lambda written, c=client: self.on_bytes_written(c, written))
+
+    def remove(self, client: Any) -> int:
+        """连接断开：丢弃尚未发送的消息，返回丢弃条数"""
+        with self._lock:
+            self._evicted_clients.discard(client)
+            outbox = self._outboxes.pop(client, None)
+        return len(outbox.entries) if outbox else 0
+
+    def send(
+        self,
+        client: Any,
+        text: Payload,
+        *,
+        merge_key: Optional[str] = None,
+        message: Optional[Dict[str, Any]] = None,
+        merge: Optional[MergeFunction] = None,
+    ) -> bool:
+        """
+        发送或排队一条已序列化的消息
+
+        Args:
+            text: JSON 文本，或按连接协商编码后的 bytes
+            merge_key: 同一客户端队列中尚未发送的同键消息被合并（默认以新内容替换）
+            message: 原始消息字典（提供 merge 时用于合并）
+            merge: 合并函数；合并结果经 encoder 重新编码（缺省为 JSON 文本）
+
+        Returns:
+            bool: 已发送或已排队返回 True；客户端因超限被断开返回 False
+        """
+        with self._lock:
+            if client in self._evicted_clients:
+                return False
+            outbox = self._outboxes.get(client)
+            if outbox is None:
+                # 未登记的连接不排队
+                _write(client, text)
+                return True
+            if merge_key is not None:
+                queued = outbox.by_key.get(merge_key)
+                if queued is not None:
+                    self._merge_into(client, outbox, queued, text, message, merge)
+                    return True
+            entry = _Entry(text, merge_key, message)
+            outbox.entries.append(entry)
+            outbox.queued_bytes += entry.size
+            if merge_key is not None:
+                outbox.by_key[merge_key] = entry
+            outbox.peak_messages = max(outbox.peak_messages, len(outbox.entries))
+            outbox.peak_bytes = max(outbox.peak_bytes, outbox.queued_bytes)
+            overflow = self._overflow_reason(outbox)
+            if overflow is None:
+                self._pump(client, outbox)
+                return True
+            self._outboxes.pop(client, None)
+            self._evicted_clients.add(client)
+            self._evicted += 1
+        logger.warning("慢消费者 %s 被断开: %s", self._describe(client), overflow)
+        if self._on_evict is not None:
+            try:
+                self._on_evict(client, overflow)
+            except Exception as exc:
+                logger.error("断开慢消费者失败: %s", exc)
+        return False
+
+    def on_bytes_written(self, client: Any, written: int) -> None:
+        """socket 回报写出字节：扣减在途字节并继续发送队列中的消息"""
+        with self._lock:
+            outbox = self._outboxes.get(client)
+            if outbox is None:
+                return
+            # bytesWritten 含帧头，按负载计的在途字节可能被多扣，下限为 0
+            outbox.in_flight = max(outbox.in_flight - int(written), 0)
+            self._pump(client, outbox)
+
+    def depth(self, client: Any) -> Dict[str, int]:
+        with self._lock:
+            outbox = self._outboxes.get(client)
+            if outbox is None:
+                return {"messages": 0, "bytes": 0, "in_flight_bytes": 0}
+            return {"messages": len(outbox.entries), "bytes": outbox.queued_bytes, "in_flight_bytes": outbox.in_flight}
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与合并/驱逐计数"""
+        with self._lock:
+            clients: List[Dict[str, Any]] = [
+                {
+                    "client": self._describe(client),
+                    "messages": len(outbox.entries),
+                    "bytes": outbox.queued_bytes,
+                    "in_flight_bytes": outbox.in_flight,
+                    "peak_messages": outbox.peak_messages,
+                    "peak_bytes": outbox.peak_bytes,
+                    "sent": outbox.sent,
+                    "merged": outbox.merged,
+                }
+                for client, outbox in self._outboxes.items()
+            ]
+            return {
+                "limits": {
+                    "max_bytes": self.max_bytes,
+                    "max_messages": self.max_messages,
+                    "window_bytes": self.window_bytes,
+                },
+                "queued_messages": sum(c["messages"] for c in clients),
+                "queued_bytes": sum(c["bytes"] for c in clients),
+                "max_depth": max((c["messages"] for c in clients), default=0),
+                "merged": self._merged,
+                "evicted": self._evicted,
+                "clients": clients,
+            }
+
+    # ------------------------------------------------------------------
+
+    def _merge_into(
+        self,
+        client: Any,
+        outbox: _Outbox,
+        queued: _Entry,
+        text: Payload,
+        message: Optional[Dict[str, Any]],
+        merge: Optional[MergeFunction],
+    ) -> None:
+        if merge is not None and queued.message is not None and message is not None:
+            combined = merge(queued.message, message)
+            if self._encoder is not None:
+                text = self._encoder(client, combined)
+            else:
+                text = json.dumps(combined, ensure_ascii=False, separators=(",", ":"))
+            message = combined
+        size = _payload_size(text)
+        outbox.queued_bytes += size - queued.size
+        queued.text, queued.size, queued.message = text, size, message
+        outbox.merged += 1
+        self._merged += 1
+
+    def _overflow_reason(self, outbox: _Outbox) -> Optional[str]:
+        if len(outbox.entries) > self.max_messages:
+            return f"出站队列超过 {self.max_messages} 条"
+        if outbox.queued_bytes > self.max_bytes:
+            return f"出站队列超过 {self.max_bytes} 字节"
+        return None
+
+    def _pump(self, client: Any, outbox: _Outbox) -> None:
+        """在发送窗口内把队首消息交给 socket"""
+        while outbox.entries and (not outbox.tracked or outbox.in_flight < self.window_bytes):
+            entry = outbox.entries.popleft()
+            outbox.queued_bytes -= entry.size
+            if entry.merge_key is not None and outbox.by_key.get(entry.merge_key) is entry:
+                del outbox.by_key[entry.merge_key]
+            if outbox.tracked:
+                outbox.in_flight += entry.size
+            outbox.sent += 1
+            try:
+                _write(client, entry.text)
+            except Exception as exc:
+                logger.error("发送消息失败: %s", exc)
+
+    @staticmethod
+    def _describe(client: Any) -> str:
+        try:
+            return f"client:{client.peerPort()}"
+        except Exception:
+            return f"client:{id(client):x}"
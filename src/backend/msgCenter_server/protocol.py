@@ -2,6 +2,7 @@
 WebSocket协议处理工具模块
 """
 import json
+import os
 import struct
 import logging
 
@@ -9,6 +10,15 @@ logger = logging.getLogger(__name__)
 
 class WebSocketProtocol:
     """WebSocket协议处理工具类"""
+
+    @staticmethod
+    def apply_mask(payload, mask):
+        """按 4 字节掩码异或负载（整数整体异或，避免逐字节循环）"""
+        length = len(payload)
+        if not length:
+            return b''
+        key = (mask * (length // 4 + 1))[:length]
+        return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
     
     @staticmethod
     def parse_frame(data):
@@ -60,7 +70,7 @@ class WebSocketProtocol:
         # 解码掩码负载
         if masked:
             mask = data[header_len:header_len + 4]
-            payload = bytes([payload[i] ^ mask[i % 4] for i in range(len(payload))])
+            payload = WebSocketProtocol.apply_mask(payload, mask)
         
         return {
             'fin': fin,
@@ -104,9 +114,9 @@ class WebSocketProtocol:
         
         # 掩码（客户端到服务器需要掩码）
         if masked:
-            mask_key = struct.pack('>I', 0x12345678)  # 应该使用随机数
+            mask_key = os.urandom(4)
             frame += mask_key
-            payload = bytes([payload[i] ^ mask_key[i % 4] for i in range(len(payload))])
+            payload = WebSocketProtocol.apply_mask(payload, mask_key)
         
         frame += payload
         return frame
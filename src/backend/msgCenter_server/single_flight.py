@@ -0,0 +1,104 @@
+"""
+进行中请求合并（single-flight）
+
+多个窗口同时打开时常在几毫秒内发出完全相同的只读请求（pdf-library:list、search、
+bookmark:list 等）。同一键的请求在首个请求执行期间到达时不再重复执行，而是等待并共享
+其结果；各调用方再按自己的 request_id 改写响应。
+
+写操作开始与结束时调用 invalidate()：此后到达的读请求不会加入写之前开始的执行，
+避免读到写入前的旧结果。
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def coalescing_key(message_type: str, original_type: Optional[str], data: Any) -> Optional[str]:
+    """
+    归一化类型 + 规范化 data 的合并键
+
+    原始类型一并计入：旧别名的响应结构可能不同。data 无法序列化时返回 None（不合并）。
+    """
+    try:
+        payload = json.dumps(data if data is not None else {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return f"{message_type}|{original_type or message_type}|{payload}"
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    同键并发调用只执行一次
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> result, shared = flights.do(key, lambda: api.list_records())
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+        self._invalidations = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行 fn，或等待同键正在进行的执行并共享其结果
+
+        Returns:
+            (结果, 是否为共享结果)；执行抛出的异常同样传给等待者
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executed += 1
+            else:
+                flight.waiters += 1
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def invalidate(self) -> None:
+        """之后到达的请求不再加入当前进行中的执行（已在等待的调用方不受影响）"""
+        with self._lock:
+            self._flights.clear()
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "invalidations": self._invalidations,
+            }
@@ -75,6 +75,18 @@ class MessageType(Enum):
     HEARTBEAT_REQUESTED = "system:heartbeat:requested"
     HEARTBEAT_COMPLETED = "system:heartbeat:completed"
 
+    SYSTEM_METRICS_REQUESTED = "system:metrics:requested"
+    SYSTEM_METRICS_COMPLETED = "system:metrics:completed"
+    SYSTEM_METRICS_FAILED = "system:metrics:failed"
+
+    SYSTEM_BATCH_REQUESTED = "system:batch:requested"
+    SYSTEM_BATCH_COMPLETED = "system:batch:completed"
+    SYSTEM_BATCH_FAILED = "system:batch:failed"
+
+    SYSTEM_ENCODING_REQUESTED = "system:encoding:requested"
+    SYSTEM_ENCODING_COMPLETED = "system:encoding:completed"
+    SYSTEM_ENCODING_FAILED = "system:encoding:failed"
+
     # === 能力注册中心（Capability Registry） ===
     CAPABILITY_DISCOVER_REQUESTED = "capability:discover:requested"
     CAPABILITY_DISCOVER_COMPLETED = "capability:discover:completed"
@@ -150,6 +162,31 @@ class MessageType(Enum):
     PDF_VIEWER_NAVIGATE_COMPLETED = "pdf-viewer:navigate:completed"
     PDF_VIEWER_NAVIGATE_FAILED = "pdf-viewer:navigate:failed"
 
+    # === 数据库维护（在线备份） ===
+    DATABASE_BACKUP_REQUESTED = "database:backup:requested"
+    DATABASE_BACKUP_COMPLETED = "database:backup:completed"
+    DATABASE_BACKUP_FAILED = "database:backup:failed"
+
+    DATABASE_BACKUP_STATUS_REQUESTED = "database:backup-status:requested"
+    DATABASE_BACKUP_STATUS_COMPLETED = "database:backup-status:completed"
+    DATABASE_BACKUP_STATUS_FAILED = "database:backup-status:failed"
+
+    # === 增量同步（变更日志） ===
+    SYNC_SINCE_REQUESTED = "sync:since:requested"
+    SYNC_SINCE_COMPLETED = "sync:since:completed"
+    SYNC_SINCE_FAILED = "sync:since:failed"
+
+    # === 主题订阅与增量推送 ===
+    SUBSCRIPTION_SUBSCRIBE_REQUESTED = "subscription:subscribe:requested"
+    SUBSCRIPTION_SUBSCRIBE_COMPLETED = "subscription:subscribe:completed"
+    SUBSCRIPTION_SUBSCRIBE_FAILED = "subscription:subscribe:failed"
+
+    SUBSCRIPTION_UNSUBSCRIBE_REQUESTED = "subscription:unsubscribe:requested"
+    SUBSCRIPTION_UNSUBSCRIBE_COMPLETED = "subscription:unsubscribe:completed"
+    SUBSCRIPTION_UNSUBSCRIBE_FAILED = "subscription:unsubscribe:failed"
+
+    SUBSCRIPTION_DELTA_UPDATED = "subscription:delta:updated"
+
     # === 兼容旧版消息（保留常量以便查询与降级） ===
     LEGACY_PDF_HOME_GET_PDF_LIST = "pdf-home:get:pdf-list"
     LEGACY_PDF_HOME_ADD_PDF_FILES = "pdf-home:add:pdf-files"
@@ -188,6 +225,11 @@ class StandardMessageHandler:
     def generate_request_id() -> str:
         """生成唯一的请求ID"""
         return str(uuid.uuid4())
+
+    @staticmethod
+    def get_timestamp() -> int:
+        """当前毫秒级时间戳"""
+        return int(time.time() * 1000)
     
     @staticmethod
     def validate_message_structure(message: Dict[str, Any]) -> tuple[bool, str]:
@@ -529,7 +571,8 @@ class PDFMessageBuilder:
         error_type: str,
         error_message: str,
         retryable: bool = False,
-        error_details: Optional[Dict[str, Any]] = None
+        error_details: Optional[Dict[str, Any]] = None,
+        code: int = 500
     ) -> Dict[str, Any]:
         """构建PDF页面错误响应"""
         error_data = {
@@ -550,7 +593,7 @@ class PDFMessageBuilder:
             error_message,
             message_type=MessageType.PDF_PAGE_LOAD_FAILED,
             error_details=error_data,
-            code=500
+            code=code
         )
 
     @staticmethod
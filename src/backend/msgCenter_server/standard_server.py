@@ -6,7 +6,10 @@ import json
 import time
 import subprocess
 import os
-from typing import Dict, Any, Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, Any, Optional, List
 
 # Add project root to Python path for standalone execution
 import sys
@@ -19,18 +22,85 @@ from src.qt.compat import (
     QObject, pyqtSignal, pyqtSlot,
     QWebSocketServer, QWebSocket,
     QHostAddress, QAbstractSocket,
-    QCoreApplication
+    QCoreApplication, QTimer, QtCore
 )
 import argparse
 import sys
 
+from src.backend.logging.async_logging import CATEGORY_WS_MESSAGE, category, configure_logging, logging_stats
 from src.backend.msgCenter_server.standard_protocol import StandardMessageHandler, PDFMessageBuilder, MessageType
+from src.backend.msgCenter_server.fs_transfer import (
+    ChunkTransferError, ChunkedTransferManager, file_checksum, read_chunk
+)
+from src.backend.msgCenter_server.capability_registry import CapabilityRegistry
+from src.backend.msgCenter_server.console_log_sink import ConsoleLogSink
+from src.backend.msgCenter_server.handler_executor import HandlerExecutor
+from src.backend.msgCenter_server.kv_store import SQLiteKVStore
+from src.backend.msgCenter_server.message_metrics import MessageMetrics
+from src.backend.msgCenter_server.outbound_queue import OutboundQueues
+from src.backend.msgCenter_server.single_flight import SingleFlight, coalescing_key
+from src.backend.msgCenter_server.subscriptions import LIBRARY_TOPIC, TopicSubscriptions, pdf_topic
+from src.backend.msgCenter_server.wire_codec import (
+    DEFAULT_COMPRESS_THRESHOLD, JSON_CODEC, CodecError, WireCodec, available_codecs, negotiate
+)
+from src.backend.database.backup import DatabaseBackupManager
+from src.backend.database.exceptions import DatabaseValidationError
 from src.backend.pdf_manager.manager import PDFManager
-# 移除传输优化模块的依赖
-# from src.backend.pdf_manager.page_transfer_manager import page_transfer_manager
+from src.backend.pdf_manager.page_transfer_manager import (
+    COMPRESSION_NONE, COMPRESSION_ZLIB_BASE64, PRIORITIES, PageTransferError, PageTransferManager, extraction_available,
+)
 
 logger = logging.getLogger(__name__)
 
+# 分发表中的处理函数：(request_id, data, message, client) -> 响应
+MessageHandler = Callable[[Optional[str], Dict[str, Any], Dict[str, Any], Optional[QWebSocket]], Optional[Dict[str, Any]]]
+
+# 会访问数据库或文件系统的消息类型：在工作线程池中执行，避免阻塞 Qt 事件循环
+BLOCKING_MESSAGE_TYPES = frozenset({
+    MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
+    MessageType.PDF_LIBRARY_ADD_REQUESTED.value,
+    MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value,
+    MessageType.PDF_LIBRARY_INFO_REQUESTED.value,
+    MessageType.PDF_LIBRARY_RECORD_UPDATE_REQUESTED.value,
+    MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
+    MessageType.PDF_LIBRARY_CONFIG_READ_REQUESTED.value,
+    MessageType.PDF_LIBRARY_CONFIG_WRITE_REQUESTED.value,
+    MessageType.BOOKMARK_LIST_REQUESTED.value,
+    MessageType.BOOKMARK_SAVE_REQUESTED.value,
+    MessageType.CAPABILITY_DESCRIBE_REQUESTED.value,
+    MessageType.STORAGE_KV_GET_REQUESTED.value,
+    MessageType.STORAGE_KV_SET_REQUESTED.value,
+    MessageType.STORAGE_KV_DELETE_REQUESTED.value,
+    MessageType.STORAGE_FS_READ_REQUESTED.value,
+    MessageType.STORAGE_FS_WRITE_REQUESTED.value,
+    MessageType.PDF_PAGE_LOAD_REQUESTED.value,
+    MessageType.LEGACY_PDF_PAGE_REQUEST.value,
+    MessageType.PDF_PAGE_PRELOAD_REQUESTED.value,
+    MessageType.LEGACY_PDF_PAGE_PRELOAD.value,
+    MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value,
+    MessageType.LEGACY_PDF_PAGE_CACHE_CLEAR.value,
+    MessageType.ANNOTATION_LIST_REQUESTED.value,
+    MessageType.ANNOTATION_SAVE_REQUESTED.value,
+    MessageType.ANNOTATION_DELETE_REQUESTED.value,
+    MessageType.ANCHOR_GET_REQUESTED.value,
+    MessageType.ANCHOR_LIST_REQUESTED.value,
+    MessageType.ANCHOR_CREATE_REQUESTED.value,
+    MessageType.ANCHOR_UPDATE_REQUESTED.value,
+    MessageType.ANCHOR_DELETE_REQUESTED.value,
+    MessageType.SYNC_SINCE_REQUESTED.value,
+})
+
+# 幂等只读消息：相同 (类型, data) 的并发请求共享一次执行（single-flight）
+COALESCED_READ_TYPES = frozenset({
+    MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
+    MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
+    MessageType.PDF_LIBRARY_INFO_REQUESTED.value,
+    MessageType.BOOKMARK_LIST_REQUESTED.value,
+    MessageType.ANNOTATION_LIST_REQUESTED.value,
+    MessageType.ANCHOR_GET_REQUESTED.value,
+    MessageType.ANCHOR_LIST_REQUESTED.value,
+})
+
 LEGACY_TYPE_MAPPING = {
     MessageType.LEGACY_PDF_LIBRARY_LIST.value: MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
     MessageType.LEGACY_PDF_HOME_GET_PDF_LIST.value: MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
@@ -57,33 +127,35 @@ LEGACY_TYPE_MAPPING = {
     "pdf-home:update:config": MessageType.PDF_LIBRARY_CONFIG_WRITE_REQUESTED.value,
     MessageType.LEGACY_BOOKMARK_LIST.value: MessageType.BOOKMARK_LIST_REQUESTED.value,
     MessageType.LEGACY_BOOKMARK_SAVE.value: MessageType.BOOKMARK_SAVE_REQUESTED.value,
+    "sync:since": MessageType.SYNC_SINCE_REQUESTED.value,
+    "subscribe": MessageType.SUBSCRIPTION_SUBSCRIBE_REQUESTED.value,
+    "unsubscribe": MessageType.SUBSCRIPTION_UNSUBSCRIBE_REQUESTED.value,
+    "system:metrics": MessageType.SYSTEM_METRICS_REQUESTED.value,
+    "batch": MessageType.SYSTEM_BATCH_REQUESTED.value,
+    "system:encoding": MessageType.SYSTEM_ENCODING_REQUESTED.value,
 }
 
+# console 日志消息：放入内存缓冲区后立即回执，由后台线程批量写文件
+CONSOLE_LOG_TYPES = frozenset({"console_log", "console_log:batch"})
+# 单条 console_log:batch 最多携带的日志条数
+CONSOLE_LOG_BATCH_MAX_ENTRIES = 500
 
-def setup_logging():
-    """配置日志记录"""
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "ws-server.log")
-
-    # 使用 'w' 模式覆盖写入，并确保 UTF-8 编码
-    handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-
-    # 配置根 logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    # 移除所有现有的 handlers，避免重复记录
-    if root_logger.hasHandlers():
-        root_logger.handlers.clear()
-    root_logger.addHandler(handler)
-
-    # 添加 StreamHandler 以便在控制台也看到输出
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    root_logger.addHandler(stream_handler)
+# 单个 batch 信封最多携带的子请求数
+BATCH_MAX_REQUESTS = 50
+
+# 契约 schema 位置（与 todo-and-doing 目录保持一致）
+CAPABILITY_SCHEMA_ROOT = project_root / "todo-and-doing" / "1 doing" / "20251006182000-bus-contract-capability-registry" / "schemas"
+# 启动时预先构建描述的域（annotation 可描述但不在 discover 列表中）
+CAPABILITY_DESCRIBED_DOMAINS = [
+    "capability", "pdf-library", "subscription", "sync", "storage-kv", "storage-fs",
+    "annotation", "bookmark", "pdf-page", "database", "system",
+]
 
+
+def setup_logging():
+    """配置日志记录：根 logger 经队列异步写入 logs/ws-server.log（JSON Lines）与控制台"""
+    # 'w' 模式覆盖写入，UTF-8 编码；高频的消息收发日志按类别采样
+    configure_logging(os.path.join("logs", "ws-server.log"), level=logging.INFO)
     logger.info("Logging setup complete.")
 
 def get_port(args_port=None):
@@ -115,6 +187,15 @@ except Exception:  # pragma: no cover - 提供最小桩
         pass
 
 
+def _merge_topic_delta(queued: Dict[str, Any], latest: Dict[str, Any]) -> Dict[str, Any]:
+    """合并同一主题的两条增量推送：按行 id 保留最后一次变更"""
+    changes: Dict[Any, Dict[str, Any]] = {}
+    for change in (queued.get("data") or {}).get("changes", []) + (latest.get("data") or {}).get("changes", []):
+        changes.pop(change.get("id"), None)
+        changes[change.get("id")] = change
+    return dict(latest, data=dict(latest.get("data") or {}, changes=list(changes.values())))
+
+
 class StandardWebSocketServer(QObject):
     """标准WebSocket服务器 - 支持JSON通信标准"""
     
@@ -122,9 +203,18 @@ class StandardWebSocketServer(QObject):
     client_connected = pyqtSignal(QWebSocket)
     client_disconnected = pyqtSignal(QWebSocket)
     message_received = pyqtSignal(QWebSocket, dict)
+    # 工作线程中的回调（如广播）排队回所属线程执行
+    _call_in_owner_thread = pyqtSignal(object, object)
+
+    # pdf-library:list 键集分页的默认页大小
+    PDF_LIST_DEFAULT_PAGE_SIZE = 200
     
-    def __init__(self, host="127.0.0.1", port=8765, app=None, *, pdf_library_api: Optional[PDFLibraryAPI] = None, service_registry: Optional[ServiceRegistry] = None):
+    def __init__(self, host="127.0.0.1", port=8765, app=None, *, pdf_library_api: Optional[PDFLibraryAPI] = None, service_registry: Optional[ServiceRegistry] = None, kv_store: Optional[SQLiteKVStore] = None, max_workers: int = 4, db_path: Optional[str] = None, outbound_max_bytes: int = OutboundQueues.DEFAULT_MAX_BYTES, outbound_max_messages: int = OutboundQueues.DEFAULT_MAX_MESSAGES, batch_workers: Optional[int] = None):
         super().__init__()
+        # 所属线程与调度钩子：默认由 Qt 事件循环驱动，无头模式下 attach_event_loop 改为 asyncio
+        self._owner_thread_id = threading.get_ident()
+        self._post: Callable[..., Any] = lambda fn, *args: self._call_in_owner_thread.emit(fn, args)
+        self._defer: Callable[[Callable[[], Any]], Any] = lambda fn: QTimer.singleShot(0, fn)
         self.host = host
         self.port = port
         self.app = app  # 存储应用实例引用
@@ -133,16 +223,51 @@ class StandardWebSocketServer(QObject):
         # 客户端列表
         self.clients = []
         self.running = False
+
+        # 每客户端出站队列：发送窗口背压、可合并事件合并、超限断开慢消费者
+        self.outbound = OutboundQueues(
+            max_bytes=outbound_max_bytes,
+            max_messages=outbound_max_messages,
+            on_evict=self._evict_slow_consumer,
+            encoder=self.encode_for_client,
+        )
+        # 各连接协商的线路编码（未协商的连接为 JSON 文本帧）
+        self._codecs: Dict[Any, WireCodec] = {}
+
+        # 主题订阅：事件只推送给对应主题的订阅者；子表变更按主题合并后推送
+        self.subscriptions = TopicSubscriptions()
+        self._pending_deltas: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._delta_lock = threading.Lock()
+        self._delta_flush_scheduled = False
+        self._change_subscriptions: List[tuple] = []
+
+        # 前端 console 日志：环形缓冲区 + 后台写线程（按来源限流）
+        self.console_log_sink = ConsoleLogSink()
+
+        # storage-kv 存储（可注入；默认首次使用时懒加载）
+        self.kv_store = kv_store
+        self._kv_store_lock = threading.Lock()
+        # 库写操作（PDFManager 文件增删与记录更新）在工作线程间串行
+        self._library_write_lock = threading.RLock()
+
+        # storage-fs 分块写入会话
+        self.fs_transfers = ChunkedTransferManager()
+
+        # 数据库在线备份（首次使用时懒加载）
+        self.backup_manager: Optional[DatabaseBackupManager] = None
         
         # PDF管理器
         self.pdf_manager = PDFManager()
 
+        # 单页传输（pdf-page:*）：按文件的页面 LRU 缓存 + 后台优先级预加载
+        self.page_transfer = PageTransferManager(self._resolve_pdf_file_path)
+
         # API 门面/服务注册表（可注入）
         self.pdf_library_api = pdf_library_api
         if self.pdf_library_api is None:
             try:
                 reg = service_registry if service_registry is not None else ServiceRegistry()
-                self.pdf_library_api = PDFLibraryAPI(service_registry=reg, pdf_manager=self.pdf_manager)
+                self.pdf_library_api = PDFLibraryAPI(db_path=db_path, service_registry=reg, pdf_manager=self.pdf_manager)
             except Exception as exc:
                 logger.warning("创建 PDFLibraryAPI 失败: %s", exc)
         
@@ -150,8 +275,38 @@ class StandardWebSocketServer(QObject):
         self.server.newConnection.connect(self.on_new_connection)
         
         # 连接PDF管理器信号
-        self.pdf_manager.file_added.connect(self.on_pdf_file_added)
-        self.pdf_manager.file_removed.connect(self.on_pdf_file_removed)
+        # 直连：文件增删信号多由工作线程中的处理函数发出，槽内的广播自行排队回所属线程，
+        # 无需依赖 Qt 事件循环（无头模式同样适用）
+        direct = QtCore.Qt.ConnectionType.DirectConnection
+        self.pdf_manager.file_added.connect(self.on_pdf_file_added, direct)
+        self.pdf_manager.file_removed.connect(self.on_pdf_file_removed, direct)
+        if hasattr(self.pdf_manager, "files_removed"):
+            self.pdf_manager.files_removed.connect(self.on_pdf_files_removed, direct)
+
+        self._register_change_listeners()
+
+        # 消息分发表与按类型的处理指标
+        self.message_metrics = MessageMetrics()
+        # 并发的相同只读请求合并执行
+        self.single_flight = SingleFlight()
+        self._dispatch = self._build_dispatch_table()
+
+        # 阻塞型处理函数的线程池（max_workers 为并发上限，0 表示在 Qt 线程同步执行）
+        self.handler_executor = HandlerExecutor(max_workers, connection_scope=self.worker_connection_scope, parent=self)
+        # batch 子请求的并发线程池（与处理线程池分开，避免外层任务等待子任务时占满线程）
+        self._batch_workers = max(int(max_workers if batch_workers is None else batch_workers) or 0, 0)
+        self._batch_pool: Optional[ThreadPoolExecutor] = None
+        self._batch_pool_lock = threading.Lock()
+        self._call_in_owner_thread.connect(self._invoke_posted)
+
+        # 能力注册表：启动时预先构建域列表与各域描述，schema 文件变化时重建
+        self.capabilities = CapabilityRegistry(
+            str(CAPABILITY_SCHEMA_ROOT),
+            str(project_root),
+            self._build_capability_domains,
+            self._build_capability_description,
+        )
+        self.capabilities.warm(CAPABILITY_DESCRIBED_DOMAINS)
 
     def _normalize_message_type(self, message_type: Optional[str]) -> str:
         if not message_type:
@@ -166,6 +321,11 @@ class StandardWebSocketServer(QObject):
         
         if self.server.listen(QHostAddress.SpecialAddress.LocalHost, self.port):
             self.running = True
+            if self.pdf_library_api and hasattr(self.pdf_library_api, "start_maintenance"):
+                try:
+                    self.pdf_library_api.start_maintenance()
+                except Exception as exc:
+                    logger.warning("启动数据库维护调度器失败: %s", exc)
             logger.info(f"标准WebSocket服务器启动成功: ws://{self.host}:{self.port}")
             return True
         else:
@@ -181,11 +341,66 @@ class StandardWebSocketServer(QObject):
         for client in self.clients:
             client.close()
         self.clients.clear()
-        if hasattr(self, "pdf_library_api") and self.pdf_library_api:
-            self.pdf_library_api.shutdown()
+        self.release_resources()
         self.running = False
         logger.info("标准WebSocket服务器已停止")
-        
+
+    def release_resources(self) -> None:
+        """释放处理函数占用的资源（线程池、数据库、KV 存储），与传输层无关"""
+        self._unregister_change_listeners()
+        self.handler_executor.shutdown(wait=True)
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown(wait=True, cancel_futures=True)
+            self._batch_pool = None
+        if hasattr(self, "pdf_library_api") and self.pdf_library_api:
+            self.pdf_library_api.shutdown()
+        if self.kv_store is not None:
+            self.kv_store.close()
+            self.kv_store = None
+        self.console_log_sink.close()
+        self.page_transfer.close()
+
+    def attach_event_loop(self, loop) -> None:
+        """
+        改由 asyncio 事件循环驱动（无头模式，须在该循环所在线程调用）
+
+        工作线程中的广播经 loop.call_soon_threadsafe 回到循环线程，
+        子表增量的延迟推送改用 loop.call_soon，不再依赖 Qt 事件循环。
+        """
+        self._owner_thread_id = threading.get_ident()
+        self._post = loop.call_soon_threadsafe
+        self._defer = loop.call_soon
+
+    def _invoke_posted(self, fn: Callable[..., Any], args: tuple) -> None:
+        fn(*args)
+
+    def register_client(self, client: Any) -> None:
+        """登记新连接并发送欢迎消息（Qt 与 asyncio 传输共用）"""
+        self.clients.append(client)
+        self.outbound.register(client)
+        if isinstance(client, QWebSocket):
+            self.client_connected.emit(client)
+        welcome_msg = StandardMessageHandler.build_base_message(
+            MessageType.SYSTEM_STATUS_UPDATED.value,
+            data={
+                "status": "connected",
+                "server_version": "1.0.0",
+                "client_count": len(self.clients)
+            }
+        )
+        self.send_message(client, welcome_msg)
+
+    def forget_client(self, client: Any) -> bool:
+        """连接断开：清理订阅与排队中的消息，返回该连接此前是否在列表中"""
+        self.subscriptions.remove_client(client)
+        self.handler_executor.discard(client)
+        self.outbound.remove(client)
+        self._codecs.pop(client, None)
+        if client in self.clients:
+            self.clients.remove(client)
+            return True
+        return False
+
     @pyqtSlot()
     def on_new_connection(self):
         """处理新客户端连接"""
@@ -196,30 +411,24 @@ class StandardWebSocketServer(QObject):
         
         logger.info(f"新客户端连接: {socket.peerAddress().toString()}:{socket.peerPort()}")
         
+        # nextPendingConnection 返回的对象归 Python 所有，引用释放时会在信号分发中途析构；
+        # 交给服务器对象持有，断开后 deleteLater 释放
+        socket.setParent(self)
+
         # 连接信号
         socket.textMessageReceived.connect(self.on_message_received)
+        socket.binaryMessageReceived.connect(self.on_binary_message_received)
         socket.disconnected.connect(self.on_client_disconnected)
         socket.errorOccurred.connect(self.on_socket_error)
-        
-        self.clients.append(socket)
-        self.client_connected.emit(socket)
-        
-        # 发送欢迎消息
-        welcome_msg = StandardMessageHandler.build_base_message(
-            MessageType.SYSTEM_STATUS_UPDATED.value,
-            data={
-                "status": "connected",
-                "server_version": "1.0.0",
-                "client_count": len(self.clients)
-            }
-        )
-        self.send_message(socket, welcome_msg)
+
+        self.register_client(socket)
         
     @pyqtSlot(str)
     def on_message_received(self, message):
         """处理收到的消息"""
         client_socket = self.sender()
-        logger.info(f"收到消息: {message[:200]}...")
+        # 惰性格式化 + 采样：未被采样的消息不做截断与插值
+        logger.info("收到消息: %.200s", message, extra=category(CATEGORY_WS_MESSAGE))
         
         # 解析消息
         parsed_message, error = StandardMessageHandler.parse_message(message)
@@ -233,138 +442,400 @@ class StandardWebSocketServer(QObject):
             self.send_message(client_socket, error_response)
             return
         
-        # 处理消息
+        self.dispatch_message(client_socket, parsed_message)
+
+    @pyqtSlot(bytes)
+    def on_binary_message_received(self, payload):
+        """处理收到的二进制帧（按该连接协商的编码解码）"""
+        client_socket = self.sender()
+        parsed_message = self.decode_binary_message(client_socket, bytes(payload))
+        if parsed_message is not None:
+            self.dispatch_message(client_socket, parsed_message)
+
+    def decode_binary_message(self, client: Any, payload: bytes) -> Optional[Dict[str, Any]]:
+        """按连接协商的编码解码二进制帧并校验结构；失败时回复错误并返回 None"""
         try:
-            response = self.handle_message(parsed_message)
-            if response:
-                self.send_message(client_socket, response)
-            
-            # 发出原始消息信号
-            self.message_received.emit(client_socket, parsed_message)
-            
-        except Exception as e:
-            logger.error(f"处理消息时出错: {e}")
-            request_id = parsed_message.get("request_id", "unknown")
-            error_response = StandardMessageHandler.build_error_response(
-                request_id,
+            message = self.codec_for(client).decode(payload)
+            is_valid, error = StandardMessageHandler.validate_message_structure(message)
+        except CodecError as exc:
+            is_valid, error = False, str(exc)
+        if is_valid:
+            return message
+        logger.error(f"二进制消息解析错误: {error}")
+        self.send_message(
+            client,
+            StandardMessageHandler.build_error_response("unknown", "INVALID_MESSAGE", f"消息格式错误: {error}"),
+        )
+        return None
+
+    def dispatch_message(self, client: Optional[QWebSocket], message: Dict[str, Any]) -> None:
+        """按客户端顺序执行消息：阻塞型交给线程池，完成后在 Qt 线程回复"""
+        self.handler_executor.submit(
+            client,
+            lambda: self.handle_message(message, client),
+            lambda response, error: self.complete_message(client, message, response, error),
+            blocking=self.is_blocking_message(message),
+            # batch 外层不占用连接，子请求各自借用
+            scoped=not self.is_batch_message(message),
+        )
+
+    def is_blocking_message(self, message: Dict[str, Any]) -> bool:
+        """该消息的处理函数是否访问数据库/文件系统（应交给工作线程）；batch 取决于其子请求"""
+        original_type = message.get("type")
+        if self.is_batch_message(message):
+            items = (message.get("data") or {}).get("requests") if isinstance(message.get("data"), dict) else None
+            return isinstance(items, list) and any(
+                isinstance(item, dict) and not self.is_batch_message(item) and self.is_blocking_message(item)
+                for item in items
+            )
+        return (
+            self._normalize_message_type(original_type) in BLOCKING_MESSAGE_TYPES
+            or original_type in BLOCKING_MESSAGE_TYPES
+        )
+
+    def is_batch_message(self, message: Dict[str, Any]) -> bool:
+        return self._normalize_message_type(message.get("type")) == MessageType.SYSTEM_BATCH_REQUESTED.value
+
+    def complete_message(self, client: Optional[QWebSocket], message: Dict[str, Any], response: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+        if error is not None:
+            logger.error(f"处理消息时出错: {error}")
+            response = StandardMessageHandler.build_error_response(
+                message.get("request_id", "unknown"),
                 "PROCESSING_ERROR",
-                str(e)
-            )
-            self.send_message(client_socket, error_response)
-            
-    def handle_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """处理具体消息"""
+                str(error)
+            )
+        if response and client is not None:
+            # console_log 回执无人等待，积压时只保留最新一条
+            merge_key = "console_log:ack" if message.get("type") in CONSOLE_LOG_TYPES else None
+            self.send_message(client, response, merge_key=merge_key)
+        # 处理过程中产生的子表增量紧跟响应推送
+        self.flush_topic_deltas()
+        if error is None and isinstance(client, QWebSocket):
+            # 发出原始消息信号
+            self.message_received.emit(client, message)
+
+    def worker_connection_scope(self):
+        """工作线程任务的数据库连接作用域（借用池化连接）"""
+        api = self.pdf_library_api
+        if api is not None and hasattr(api, "worker_connection"):
+            return api.worker_connection()
+        return nullcontext()
+
+    def _serialized(self, handler: MessageHandler) -> MessageHandler:
+        def run(rid, data, msg, client):
+            with self._library_write_lock:
+                return handler(rid, data, msg, client)
+        return run
+
+    def _build_dispatch_table(self) -> Dict[str, MessageHandler]:
+        """
+        构建消息类型 → 处理函数表（启动时构建一次）
+
+        键为归一化后的类型；LEGACY_TYPE_MAPPING 之外仍按原始类型识别的旧消息
+        （页面传输、console_log、心跳）以原始类型为键。处理函数统一签名
+        (request_id, data, message, client)。
+        """
+        page_load = lambda rid, data, msg, client: self.handle_pdf_page_request(rid, data)
+        page_preload = lambda rid, data, msg, client: self.handle_pdf_page_preload_request(rid, data)
+        page_cache_clear = lambda rid, data, msg, client: self.handle_pdf_page_cache_clear_request(rid, data)
+        heartbeat = lambda rid, data, msg, client: self.handle_heartbeat_request(rid)
+        return {
+            # PDF 库
+            MessageType.PDF_LIBRARY_LIST_REQUESTED.value: lambda rid, data, msg, client: self.handle_pdf_list_request(rid, data, original_type=msg.get("type")),
+            MessageType.PDF_LIBRARY_ADD_REQUESTED.value: self._serialized(lambda rid, data, msg, client: self.handle_pdf_upload_request(rid, data, original_type=msg.get("type"))),
+            MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value: self._serialized(lambda rid, data, msg, client: self.handle_batch_pdf_remove_request(rid, data, original_type=msg.get("type"))),
+            MessageType.PDF_LIBRARY_VIEWER_REQUESTED.value: lambda rid, data, msg, client: self.handle_open_pdf_request(rid, data),
+            MessageType.PDF_LIBRARY_INFO_REQUESTED.value: lambda rid, data, msg, client: self.handle_pdf_detail_request(rid, data),
+            MessageType.PDF_LIBRARY_RECORD_UPDATE_REQUESTED.value: self._serialized(lambda rid, data, msg, client: self.handle_pdf_update_request(rid, data)),
+            MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value: lambda rid, data, msg, client: self.handle_pdf_search_request(rid, data, msg),
+            MessageType.PDF_LIBRARY_CONFIG_READ_REQUESTED.value: lambda rid, data, msg, client: self.handle_pdf_home_get_config(rid),
+            MessageType.PDF_LIBRARY_CONFIG_WRITE_REQUESTED.value: self._serialized(lambda rid, data, msg, client: self.handle_pdf_home_update_config(rid, data)),
+            # 书签
+            MessageType.BOOKMARK_LIST_REQUESTED.value: lambda rid, data, msg, client: self.handle_bookmark_list_request(rid, data),
+            MessageType.BOOKMARK_SAVE_REQUESTED.value: lambda rid, data, msg, client: self.handle_bookmark_save_request(rid, data),
+            # 能力注册中心
+            MessageType.CAPABILITY_DISCOVER_REQUESTED.value: lambda rid, data, msg, client: self.handle_capability_discover_request(rid, data),
+            MessageType.CAPABILITY_DESCRIBE_REQUESTED.value: lambda rid, data, msg, client: self.handle_capability_describe_request(rid, data),
+            # 存储服务（KV / FS）
+            MessageType.STORAGE_KV_GET_REQUESTED.value: lambda rid, data, msg, client: self.handle_storage_kv_get_request(rid, data),
+            MessageType.STORAGE_KV_SET_REQUESTED.value: lambda rid, data, msg, client: self.handle_storage_kv_set_request(rid, data),
+            MessageType.STORAGE_KV_DELETE_REQUESTED.value: lambda rid, data, msg, client: self.handle_storage_kv_delete_request(rid, data),
+            MessageType.STORAGE_FS_READ_REQUESTED.value: lambda rid, data, msg, client: self.handle_storage_fs_read_request(rid, data),
+            MessageType.STORAGE_FS_WRITE_REQUESTED.value: lambda rid, data, msg, client: self.handle_storage_fs_write_request(rid, data),
+            # PDF 页面传输（含旧版原始类型）
+            MessageType.PDF_PAGE_LOAD_REQUESTED.value: page_load,
+            MessageType.LEGACY_PDF_PAGE_REQUEST.value: page_load,
+            MessageType.PDF_PAGE_PRELOAD_REQUESTED.value: page_preload,
+            MessageType.LEGACY_PDF_PAGE_PRELOAD.value: page_preload,
+            MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value: page_cache_clear,
+            MessageType.LEGACY_PDF_PAGE_CACHE_CLEAR.value: page_cache_clear,
+            # Annotation domain
+            MessageType.ANNOTATION_LIST_REQUESTED.value: lambda rid, data, msg, client: self.handle_annotation_list_request(rid, data),
+            MessageType.ANNOTATION_SAVE_REQUESTED.value: lambda rid, data, msg, client: self.handle_annotation_save_request(rid, data),
+            MessageType.ANNOTATION_DELETE_REQUESTED.value: lambda rid, data, msg, client: self.handle_annotation_delete_request(rid, data),
+            # Anchor domain
+            MessageType.ANCHOR_GET_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_get_request(rid, data),
+            MessageType.ANCHOR_LIST_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_list_request(rid, data),
+            MessageType.ANCHOR_CREATE_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_create_request(rid, data),
+            MessageType.ANCHOR_UPDATE_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_update_request(rid, data),
+            MessageType.ANCHOR_DELETE_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_delete_request(rid, data),
+            MessageType.ANCHOR_ACTIVATE_REQUESTED.value: lambda rid, data, msg, client: self.handle_anchor_activate_request(rid, data),
+            # PDF-Viewer 实例注册与导航
+            MessageType.PDF_VIEWER_REGISTER_REQUESTED.value: lambda rid, data, msg, client: self.handle_viewer_register_request(rid, data, client=client),
+            MessageType.PDF_VIEWER_NAVIGATE_REQUESTED.value: lambda rid, data, msg, client: self.handle_viewer_navigate_request(rid, data),
+            # 数据库在线备份
+            MessageType.DATABASE_BACKUP_REQUESTED.value: lambda rid, data, msg, client: self.handle_database_backup_request(rid, data),
+            MessageType.DATABASE_BACKUP_STATUS_REQUESTED.value: lambda rid, data, msg, client: self.handle_database_backup_status_request(rid, data),
+            # 增量同步
+            MessageType.SYNC_SINCE_REQUESTED.value: lambda rid, data, msg, client: self.handle_sync_since_request(rid, data),
+            # 主题订阅
+            MessageType.SUBSCRIPTION_SUBSCRIBE_REQUESTED.value: lambda rid, data, msg, client: self.handle_subscribe_request(rid, data, client),
+            MessageType.SUBSCRIPTION_UNSUBSCRIBE_REQUESTED.value: lambda rid, data, msg, client: self.handle_unsubscribe_request(rid, data, client),
+            # 系统
+            MessageType.SYSTEM_METRICS_REQUESTED.value: lambda rid, data, msg, client: self.handle_system_metrics_request(rid, data),
+            MessageType.SYSTEM_BATCH_REQUESTED.value: lambda rid, data, msg, client: self.handle_batch_request(rid, data, msg, client),
+            MessageType.SYSTEM_ENCODING_REQUESTED.value: lambda rid, data, msg, client: self.handle_encoding_request(rid, data, client),
+            "console_log": lambda rid, data, msg, client: self.handle_console_log_request(rid, data),
+            "console_log:batch": lambda rid, data, msg, client: self.handle_console_log_batch_request(rid, data),
+            MessageType.LEGACY_HEARTBEAT.value: heartbeat,
+            MessageType.HEARTBEAT_REQUESTED.value: heartbeat,
+        }
+
+    def handle_message(self, message: Dict[str, Any], client: Optional[QWebSocket] = None) -> Optional[Dict[str, Any]]:
+        """处理具体消息（client 为发送方连接，订阅类消息需要）"""
         original_type = message.get("type")
         request_id = message.get("request_id")
         data = message.get("data", {})
         normalized_type = self._normalize_message_type(original_type)
 
         # 降低 console_log 的日志量
-        if original_type == "console_log":
+        if original_type in CONSOLE_LOG_TYPES:
             logger.debug("处理消息类型: %s（归一化: %s）, 请求ID: %s", original_type, normalized_type, request_id)
         else:
-            logger.info("处理消息类型: %s（归一化: %s）, 请求ID: %s", original_type, normalized_type, request_id)
-
-        if normalized_type == MessageType.PDF_LIBRARY_LIST_REQUESTED.value:
-            return self.handle_pdf_list_request(request_id, data, original_type=original_type)
-        if normalized_type == MessageType.BOOKMARK_LIST_REQUESTED.value:
-            return self.handle_bookmark_list_request(request_id, data)
-        if normalized_type == MessageType.BOOKMARK_SAVE_REQUESTED.value:
-            return self.handle_bookmark_save_request(request_id, data)
-        if normalized_type == MessageType.PDF_LIBRARY_ADD_REQUESTED.value:
-            return self.handle_pdf_upload_request(request_id, data, original_type=original_type)
-        if normalized_type == MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value:
-            return self.handle_batch_pdf_remove_request(request_id, data, original_type=original_type)
-        if normalized_type == MessageType.PDF_LIBRARY_VIEWER_REQUESTED.value:
-            return self.handle_open_pdf_request(request_id, data)
-        if normalized_type == MessageType.PDF_LIBRARY_INFO_REQUESTED.value:
-            return self.handle_pdf_detail_request(request_id, data)
-        if normalized_type == MessageType.PDF_LIBRARY_RECORD_UPDATE_REQUESTED.value:
-            return self.handle_pdf_update_request(request_id, data)
-        if normalized_type == MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value:
-            return self.handle_pdf_search_request(request_id, data, message)
-        if normalized_type == MessageType.PDF_LIBRARY_CONFIG_READ_REQUESTED.value:
-            return self.handle_pdf_home_get_config(request_id)
-        if normalized_type == MessageType.PDF_LIBRARY_CONFIG_WRITE_REQUESTED.value:
-            return self.handle_pdf_home_update_config(request_id, data)
-        # 能力注册中心
-        if normalized_type == MessageType.CAPABILITY_DISCOVER_REQUESTED.value:
-            return self.handle_capability_discover_request(request_id)
-        if normalized_type == MessageType.CAPABILITY_DESCRIBE_REQUESTED.value:
-            return self.handle_capability_describe_request(request_id, data)
-        # 存储服务（KV）
-        if normalized_type == MessageType.STORAGE_KV_GET_REQUESTED.value:
-            return self.handle_storage_kv_get_request(request_id, data)
-        if normalized_type == MessageType.STORAGE_KV_SET_REQUESTED.value:
-            return self.handle_storage_kv_set_request(request_id, data)
-        if normalized_type == MessageType.STORAGE_KV_DELETE_REQUESTED.value:
-            return self.handle_storage_kv_delete_request(request_id, data)
-        # 存储服务（FS）
-        if normalized_type == MessageType.STORAGE_FS_READ_REQUESTED.value:
-            return self.handle_storage_fs_read_request(request_id, data)
-        if normalized_type == MessageType.STORAGE_FS_WRITE_REQUESTED.value:
-            return self.handle_storage_fs_write_request(request_id, data)
-        if normalized_type == MessageType.PDF_PAGE_LOAD_REQUESTED.value or original_type == MessageType.LEGACY_PDF_PAGE_REQUEST.value:
-            return self.handle_pdf_page_request(request_id, data)
-        if normalized_type == MessageType.PDF_PAGE_PRELOAD_REQUESTED.value or original_type == MessageType.LEGACY_PDF_PAGE_PRELOAD.value:
-            return self.handle_pdf_page_preload_request(request_id, data)
-        if normalized_type == MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value or original_type == MessageType.LEGACY_PDF_PAGE_CACHE_CLEAR.value:
-            return self.handle_pdf_page_cache_clear_request(request_id, data)
-
-        # Annotation domain
-        if normalized_type == MessageType.ANNOTATION_LIST_REQUESTED.value:
-            return self.handle_annotation_list_request(request_id, data)
-        if normalized_type == MessageType.ANNOTATION_SAVE_REQUESTED.value:
-            return self.handle_annotation_save_request(request_id, data)
-        if normalized_type == MessageType.ANNOTATION_DELETE_REQUESTED.value:
-            return self.handle_annotation_delete_request(request_id, data)
-
-        # Anchor domain
-        if normalized_type == MessageType.ANCHOR_GET_REQUESTED.value:
-            return self.handle_anchor_get_request(request_id, data)
-        if normalized_type == MessageType.ANCHOR_LIST_REQUESTED.value:
-            return self.handle_anchor_list_request(request_id, data)
-        if normalized_type == MessageType.ANCHOR_CREATE_REQUESTED.value:
-            return self.handle_anchor_create_request(request_id, data)
-        if normalized_type == MessageType.ANCHOR_UPDATE_REQUESTED.value:
-            return self.handle_anchor_update_request(request_id, data)
-        if normalized_type == MessageType.ANCHOR_DELETE_REQUESTED.value:
-            return self.handle_anchor_delete_request(request_id, data)
-        if normalized_type == MessageType.ANCHOR_ACTIVATE_REQUESTED.value:
-            return self.handle_anchor_activate_request(request_id, data)
-
-        # PDF-Viewer 实例注册与导航
-        if normalized_type == MessageType.PDF_VIEWER_REGISTER_REQUESTED.value:
-            return self.handle_viewer_register_request(request_id, data)
-        if normalized_type == MessageType.PDF_VIEWER_NAVIGATE_REQUESTED.value:
-            return self.handle_viewer_navigate_request(request_id, data)
-
-        if original_type == "console_log":
-            return self.handle_console_log_request(request_id, data)
-
-        if original_type in {MessageType.LEGACY_HEARTBEAT.value, MessageType.HEARTBEAT_REQUESTED.value, "heartbeat"}:
-            return StandardMessageHandler.build_response(
-                MessageType.HEARTBEAT_COMPLETED,
-                request_id or StandardMessageHandler.generate_request_id(),
-                status="success",
-                code=200,
-                message="心跳响应",
-                data={"timestamp": int(time.time())}
+            logger.info("处理消息类型: %s（归一化: %s）, 请求ID: %s", original_type, normalized_type, request_id,
+                        extra=category(CATEGORY_WS_MESSAGE))
+
+        handler = self._dispatch.get(normalized_type)
+        metric_type = normalized_type
+        if handler is None and original_type:
+            handler = self._dispatch.get(original_type)
+            metric_type = original_type
+        if handler is None:
+            self.message_metrics.record("unknown", 0.0, error=True)
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "unknown_message_type",
+                f"未知的消息类型: {original_type}",
+                message_type=MessageType.LEGACY_ERROR,
+                code=400
+            )
+
+        started = time.perf_counter()
+        failed = True
+        invalidates = self._invalidates_reads(normalized_type)
+        if invalidates:
+            self.single_flight.invalidate()
+        try:
+            key = coalescing_key(normalized_type, original_type, data) if normalized_type in COALESCED_READ_TYPES else None
+            if key is None:
+                response = handler(request_id, data, message, client)
+            else:
+                response, shared = self.single_flight.do(key, lambda: handler(request_id, data, message, client))
+                if shared and isinstance(response, dict):
+                    # 共享结果改写为本请求的 request_id
+                    response = {**response, "request_id": request_id or StandardMessageHandler.generate_request_id()}
+            failed = isinstance(response, dict) and response.get("status") == "error"
+            return response
+        finally:
+            if invalidates:
+                # 写入完成后到达的读请求不能加入写入期间开始的执行
+                self.single_flight.invalidate()
+            self.message_metrics.record(metric_type, (time.perf_counter() - started) * 1000.0, error=failed)
+
+    @staticmethod
+    def _invalidates_reads(message_type: str) -> bool:
+        """会修改数据的消息（阻塞型中除只读外的类型）"""
+        return message_type in BLOCKING_MESSAGE_TYPES and message_type not in COALESCED_READ_TYPES
+
+    def handle_heartbeat_request(self, request_id: Optional[str]) -> Dict[str, Any]:
+        return StandardMessageHandler.build_response(
+            MessageType.HEARTBEAT_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message="心跳响应",
+            data={"timestamp": int(time.time())}
+        )
+
+    def handle_system_metrics_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        """按消息类型返回处理计数/错误/耗时直方图；data.type 过滤单一类型，data.reset 为真时读取后清零"""
+        options = data if isinstance(data, dict) else {}
+        message_type = options.get("type")
+        if message_type is not None and not isinstance(message_type, str):
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                "type 必须为字符串",
+                message_type=MessageType.SYSTEM_METRICS_FAILED,
+                code=400,
+            )
+        messages = self.message_metrics.snapshot(message_type)
+        if options.get("reset"):
+            self.message_metrics.reset()
+        return StandardMessageHandler.build_response(
+            MessageType.SYSTEM_METRICS_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message="指标获取成功",
+            data={
+                "messages": messages,
+                "clients": len(self.clients),
+                "subscriptions": self.subscriptions.stats(),
+                "executor": self.handler_executor.stats(),
+                "outbound": self.outbound.stats(),
+                "coalescing": self.single_flight.stats(),
+                "console_log": self.console_log_sink.stats(),
+                "logging": logging_stats(),
+                "page_transfer": self.page_transfer.stats(),
+                "capabilities": self.capabilities.stats(),
+            },
+        )
+
+    def handle_batch_request(self, request_id: Optional[str], data: Dict[str, Any], message: Dict[str, Any], client: Optional[QWebSocket]) -> Dict[str, Any]:
+        """
+        批量请求：data.requests 为标准请求数组，按原顺序返回各自的响应
+
+        访问数据库/文件系统的子请求在 batch 线程池中并发执行（各自借用池化连接），
+        其余子请求在当前线程依次执行；data.sequential 为真时全部按顺序执行（子请求间有依赖时使用）。
+        """
+        rid = request_id or StandardMessageHandler.generate_request_id()
+        options = data if isinstance(data, dict) else {}
+        items = options.get("requests")
+        if not isinstance(items, list) or not items:
+            return StandardMessageHandler.build_error_response(
+                rid, "INVALID_REQUEST", "requests 必须为非空数组",
+                message_type=MessageType.SYSTEM_BATCH_FAILED, code=400,
             )
+        if len(items) > BATCH_MAX_REQUESTS:
+            return StandardMessageHandler.build_error_response(
+                rid, "BATCH_TOO_LARGE", f"单个 batch 最多 {BATCH_MAX_REQUESTS} 个子请求",
+                message_type=MessageType.SYSTEM_BATCH_FAILED, code=413,
+            )
+
+        pool = None if options.get("sequential") else self._get_batch_pool()
+        on_worker = threading.get_ident() != self._owner_thread_id
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        futures = {}
+        for index, item in enumerate(items):
+            sub_message, error = self._prepare_batch_item(rid, index, item, message)
+            if error is not None:
+                responses[index] = error
+            elif pool is not None and self.is_blocking_message(sub_message):
+                futures[index] = pool.submit(self._run_batch_item, sub_message, client, True)
+            else:
+                responses[index] = self._run_batch_item(sub_message, client, on_worker and self.is_blocking_message(sub_message))
+        for index, future in futures.items():
+            responses[index] = future.result()
+
+        failed = sum(1 for r in responses if not isinstance(r, dict) or r.get("status") == "error")
+        return StandardMessageHandler.build_response(
+            MessageType.SYSTEM_BATCH_COMPLETED,
+            rid,
+            status="success",
+            code=200,
+            message="批量请求完成",
+            data={"responses": responses, "count": len(responses), "failed": failed},
+        )
 
-        return StandardMessageHandler.build_error_response(
-            request_id or "unknown",
-            "unknown_message_type",
-            f"未知的消息类型: {original_type}",
-            message_type=MessageType.LEGACY_ERROR,
-            code=400
+    def handle_encoding_request(self, request_id: Optional[str], data: Dict[str, Any], client: Optional[QWebSocket]) -> Dict[str, Any]:
+        """
+        协商本连接的线路编码（system:encoding:requested）
+
+        data.codec 为编码名或按偏好排序的列表；data.threshold 为 deflate 压缩阈值（字符数）。
+        本响应仍以 JSON 文本帧发送，之后发往该连接的消息按新编码发送。
+        """
+        data = data or {}
+        name = negotiate(data.get("codec"))
+        if name is None:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown", "UNSUPPORTED_CODEC",
+                f"不支持的编码: {data.get('codec')}（可选 {', '.join(available_codecs())}）",
+                message_type=MessageType.SYSTEM_ENCODING_FAILED, code=400,
+            )
+        threshold = data.get("threshold", DEFAULT_COMPRESS_THRESHOLD)
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold <= 0:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown", "INVALID_THRESHOLD", "threshold 必须是正整数",
+                message_type=MessageType.SYSTEM_ENCODING_FAILED, code=400,
+            )
+        codec = WireCodec(name, threshold=threshold)
+        if client is not None:
+            if codec.name == JSON_CODEC.name:
+                self._codecs.pop(client, None)
+            else:
+                self._codecs[client] = codec
+        return StandardMessageHandler.build_response(
+            MessageType.SYSTEM_ENCODING_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success", code=200, message="encoding negotiated",
+            data={**codec.describe(), "available": available_codecs()},
         )
+
+    def codec_for(self, client: Any) -> WireCodec:
+        return self._codecs.get(client, JSON_CODEC)
+
+    def encode_for_client(self, client: Any, message: Dict[str, Any], text: Optional[str] = None):
+        """按连接协商的编码编码消息：str 走文本帧，bytes 走二进制帧"""
+        if text is None:
+            text = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+        # 协商结果本身始终是 JSON 文本，客户端据此切换解码方式
+        if message.get("type") == MessageType.SYSTEM_ENCODING_COMPLETED.value:
+            return text
+        return self.codec_for(client).encode(text, message)
+
+    def _prepare_batch_item(self, batch_id: str, index: int, item: Any, envelope: Dict[str, Any]):
+        """补全子请求的 request_id / timestamp，返回 (子请求, 错误响应)"""
+        item_id = item.get("request_id") if isinstance(item, dict) and item.get("request_id") else f"{batch_id}:{index}"
+        if not isinstance(item, dict) or not isinstance(item.get("type"), str) or not item["type"]:
+            return None, StandardMessageHandler.build_error_response(item_id, "INVALID_REQUEST", "子请求缺少 type", code=400)
+        if self.is_batch_message(item):
+            return None, StandardMessageHandler.build_error_response(item_id, "INVALID_REQUEST", "batch 不允许嵌套", code=400)
+        sub_message = dict(item)
+        sub_message["request_id"] = item_id
+        sub_message.setdefault("timestamp", envelope.get("timestamp"))
+        if not isinstance(sub_message.get("data"), dict):
+            sub_message["data"] = {}
+        return sub_message, None
+
+    def _run_batch_item(self, message: Dict[str, Any], client: Optional[QWebSocket], scoped: bool) -> Dict[str, Any]:
+        try:
+            with self.worker_connection_scope() if scoped else nullcontext():
+                response = self.handle_message(message, client)
+        except Exception as exc:
+            logger.error("batch 子请求 %s 失败: %s", message.get("type"), exc, exc_info=True)
+            response = StandardMessageHandler.build_error_response(message["request_id"], "PROCESSING_ERROR", str(exc))
+        if response is None:
+            response = StandardMessageHandler.build_error_response(message["request_id"], "NO_RESPONSE", "子请求没有响应")
+        return response
+
+    def _get_batch_pool(self) -> Optional[ThreadPoolExecutor]:
+        if not self._batch_workers:
+            return None
+        with self._batch_pool_lock:
+            if self._batch_pool is None:
+                self._batch_pool = ThreadPoolExecutor(max_workers=self._batch_workers, thread_name_prefix="ws-batch")
+            return self._batch_pool
+
     def handle_pdf_list_request(self, request_id: Optional[str], data: Dict[str, Any], *, original_type: Optional[str] = None) -> Dict[str, Any]:
         try:
             limit = None
             offset = None
             if isinstance(data, dict):
                 pg = data.get("pagination") or {}
+                # 键集分页：携带 cursor（首页为 null）或 page_size 时按 (updated_at, uuid) 返回单页与 next_cursor
+                if ("cursor" in pg or "page_size" in pg) and hasattr(self, "pdf_library_api") and self.pdf_library_api:
+                    return self._handle_pdf_list_page(request_id, pg)
                 try:
                     limit = int(pg.get("limit")) if pg.get("limit") is not None else None
                 except Exception:
@@ -392,6 +863,43 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
 
+    def _handle_pdf_list_page(self, request_id: Optional[str], pg: Dict[str, Any]) -> Dict[str, Any]:
+        cursor = pg.get("cursor") or None
+        try:
+            page_size = int(pg.get("page_size") or self.PDF_LIST_DEFAULT_PAGE_SIZE)
+        except (TypeError, ValueError):
+            page_size = 0
+        if page_size <= 0:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                "pagination.page_size 必须为正整数",
+                message_type=MessageType.PDF_LIBRARY_LIST_FAILED,
+                code=400,
+            )
+        try:
+            page = self.pdf_library_api.list_records_page(cursor, page_size)
+        except DatabaseValidationError as exc:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_CURSOR",
+                str(exc),
+                message_type=MessageType.PDF_LIBRARY_LIST_FAILED,
+                code=400,
+            )
+        pagination = {
+            "cursor": cursor,
+            "page_size": page_size,
+            "next_cursor": page["next_cursor"],
+            "has_more": page["has_more"],
+        }
+        return PDFMessageBuilder.build_pdf_list_response(
+            request_id or StandardMessageHandler.generate_request_id(),
+            page["records"],
+            total_count=self.pdf_library_api.count_records(),
+            pagination=pagination,
+        )
+
     def handle_pdf_detail_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             pdf_id = None
@@ -436,6 +944,19 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
 
+    def _handle_bulk_pdf_remove(self, request_id: Optional[str], api: Any, file_ids: List[Any]) -> Dict[str, Any]:
+        """批量删除走 PDFLibraryAPI.delete_records：单事务删除 + 线程池删除副本 + 一次聚合广播。"""
+        ids = [str(fid) for fid in file_ids]
+        outcome = api.delete_records(ids)
+        failed = {str(k): str(v) for k, v in (outcome.get("failed") or {}).items()}
+        # 不存在的记录按幂等成功处理（与逐条删除路径一致）
+        removed = [fid for fid in dict.fromkeys(ids) if fid not in failed]
+        return PDFMessageBuilder.build_batch_pdf_remove_response(
+            request_id or StandardMessageHandler.generate_request_id(),
+            removed,
+            failed_files=failed or None,
+        )
+
     def handle_batch_pdf_remove_request(self, request_id: Optional[str], data: Dict[str, Any], *, original_type: Optional[str] = None) -> Dict[str, Any]:
         try:
             file_ids = []
@@ -449,6 +970,9 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.PDF_LIBRARY_REMOVE_FAILED,
                     code=400,
                 )
+            api = getattr(self, "pdf_library_api", None)
+            if api is not None and hasattr(api, "delete_records"):
+                return self._handle_bulk_pdf_remove(request_id, api, file_ids)
             removed = []
             failed = {}
             for fid in file_ids:
@@ -553,25 +1077,37 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
 
-    def _kv_store_load(self) -> Dict[str, Any]:
-        store_dir = os.path.join(project_root, "data")
-        os.makedirs(store_dir, exist_ok=True)
-        store_path = os.path.join(store_dir, "storage-kv.json")
-        store: Dict[str, Any] = {}
-        if os.path.exists(store_path):
-            with open(store_path, "r", encoding="utf-8") as f:
-                try:
-                    store = json.load(f) or {}
-                except Exception:
-                    store = {}
-        return store
-
-    def _kv_store_save(self, store: Dict[str, Any]) -> None:
-        store_dir = os.path.join(project_root, "data")
-        os.makedirs(store_dir, exist_ok=True)
-        store_path = os.path.join(store_dir, "storage-kv.json")
-        with open(store_path, "w", encoding="utf-8", newline='\n') as f:
-            json.dump(store, f, ensure_ascii=False, indent=2)
+    def _get_kv_store(self) -> SQLiteKVStore:
+        """懒加载 storage-kv 存储（data/storage-kv.db），首次创建时迁移旧 storage-kv.json。"""
+        with self._kv_store_lock:
+            if self.kv_store is None:
+                store_dir = os.path.join(project_root, "data")
+                self.kv_store = SQLiteKVStore(
+                    os.path.join(store_dir, "storage-kv.db"),
+                    legacy_json_path=os.path.join(store_dir, "storage-kv.json"),
+                )
+            return self.kv_store
+
+    @staticmethod
+    def _kv_parse_keys(data: Dict[str, Any]) -> Optional[List[str]]:
+        """解析 key（单个）或 keys（批量）参数；均缺失或格式错误时返回 None。"""
+        keys = data.get("keys")
+        if keys is not None:
+            if not isinstance(keys, list) or not keys or not all(isinstance(k, str) and k for k in keys):
+                return None
+            return keys
+        key = data.get("key")
+        return [key] if key else None
+
+    @staticmethod
+    def _kv_parse_ttl(data: Dict[str, Any]) -> Optional[int]:
+        ttl_ms = data.get("ttl_ms")
+        if ttl_ms is None:
+            return None
+        ttl_ms = int(ttl_ms)
+        if ttl_ms <= 0:
+            raise ValueError("ttl_ms 必须为正整数")
+        return ttl_ms
     def handle_pdf_upload_request(self, request_id: Optional[str], data: Dict[str, Any], *, original_type: Optional[str] = None) -> Dict[str, Any]:
         """处理 PDF 添加请求（兼容门面）。"""
         try:
@@ -706,110 +1242,177 @@ class StandardWebSocketServer(QObject):
                 message_type=MessageType.PDF_LIBRARY_SEARCH_FAILED,
                 code=500,
             )
-    def handle_capability_discover_request(self, request_id: Optional[str]) -> Dict[str, Any]:
-        try:
-            domains = [
-                {
-                    "name": "capability",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.CAPABILITY_DISCOVER_REQUESTED.value,
-                        MessageType.CAPABILITY_DISCOVER_COMPLETED.value,
-                        MessageType.CAPABILITY_DISCOVER_FAILED.value,
-                        MessageType.CAPABILITY_DESCRIBE_REQUESTED.value,
-                        MessageType.CAPABILITY_DESCRIBE_COMPLETED.value,
-                        MessageType.CAPABILITY_DESCRIBE_FAILED.value,
-                    ],
-                },
-                {
-                    "name": "pdf-library",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
-                        MessageType.PDF_LIBRARY_LIST_COMPLETED.value,
-                        MessageType.PDF_LIBRARY_LIST_FAILED.value,
-                        MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
-                        MessageType.PDF_LIBRARY_SEARCH_COMPLETED.value,
-                        MessageType.PDF_LIBRARY_SEARCH_FAILED.value,
-                        MessageType.PDF_LIBRARY_ADD_REQUESTED.value,
-                        MessageType.PDF_LIBRARY_ADD_COMPLETED.value,
-                        MessageType.PDF_LIBRARY_ADD_FAILED.value,
-                        MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value,
-                        MessageType.PDF_LIBRARY_REMOVE_COMPLETED.value,
-                        MessageType.PDF_LIBRARY_REMOVE_FAILED.value,
-                        MessageType.PDF_LIBRARY_INFO_REQUESTED.value,
-                        MessageType.PDF_LIBRARY_INFO_COMPLETED.value,
-                        MessageType.PDF_LIBRARY_INFO_FAILED.value,
-                    ],
-                },
-                {
-                    "name": "storage-kv",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.STORAGE_KV_GET_REQUESTED.value,
-                        MessageType.STORAGE_KV_GET_COMPLETED.value,
-                        MessageType.STORAGE_KV_GET_FAILED.value,
-                        MessageType.STORAGE_KV_SET_REQUESTED.value,
-                        MessageType.STORAGE_KV_SET_COMPLETED.value,
-                        MessageType.STORAGE_KV_SET_FAILED.value,
-                        MessageType.STORAGE_KV_DELETE_REQUESTED.value,
-                        MessageType.STORAGE_KV_DELETE_COMPLETED.value,
-                        MessageType.STORAGE_KV_DELETE_FAILED.value,
-                    ],
-                },
-                {
-                    "name": "storage-fs",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.STORAGE_FS_READ_REQUESTED.value,
-                        MessageType.STORAGE_FS_READ_COMPLETED.value,
-                        MessageType.STORAGE_FS_READ_FAILED.value,
-                        MessageType.STORAGE_FS_WRITE_REQUESTED.value,
-                        MessageType.STORAGE_FS_WRITE_COMPLETED.value,
-                        MessageType.STORAGE_FS_WRITE_FAILED.value,
-                    ],
-                },
-                {
-                    "name": "bookmark",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.BOOKMARK_LIST_REQUESTED.value,
-                        MessageType.BOOKMARK_LIST_COMPLETED.value,
-                        MessageType.BOOKMARK_LIST_FAILED.value,
-                        MessageType.BOOKMARK_SAVE_REQUESTED.value,
-                        MessageType.BOOKMARK_SAVE_COMPLETED.value,
-                        MessageType.BOOKMARK_SAVE_FAILED.value,
-                    ],
-                },
-                {
-                    "name": "pdf-page",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.PDF_PAGE_LOAD_REQUESTED.value,
-                        MessageType.PDF_PAGE_LOAD_COMPLETED.value,
-                        MessageType.PDF_PAGE_LOAD_FAILED.value,
-                        MessageType.PDF_PAGE_PRELOAD_REQUESTED.value,
-                        MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value,
-                    ],
+    def _build_capability_domains(self) -> List[Dict[str, Any]]:
+        """capability:discover 的域列表（由能力注册表缓存）"""
+        return [
+            {
+                "name": "capability",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.CAPABILITY_DISCOVER_REQUESTED.value,
+                    MessageType.CAPABILITY_DISCOVER_COMPLETED.value,
+                    MessageType.CAPABILITY_DISCOVER_FAILED.value,
+                    MessageType.CAPABILITY_DESCRIBE_REQUESTED.value,
+                    MessageType.CAPABILITY_DESCRIBE_COMPLETED.value,
+                    MessageType.CAPABILITY_DESCRIBE_FAILED.value,
+                ],
+            },
+            {
+                "name": "pdf-library",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.PDF_LIBRARY_LIST_REQUESTED.value,
+                    MessageType.PDF_LIBRARY_LIST_COMPLETED.value,
+                    MessageType.PDF_LIBRARY_LIST_FAILED.value,
+                    MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
+                    MessageType.PDF_LIBRARY_SEARCH_COMPLETED.value,
+                    MessageType.PDF_LIBRARY_SEARCH_FAILED.value,
+                    MessageType.PDF_LIBRARY_ADD_REQUESTED.value,
+                    MessageType.PDF_LIBRARY_ADD_COMPLETED.value,
+                    MessageType.PDF_LIBRARY_ADD_FAILED.value,
+                    MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value,
+                    MessageType.PDF_LIBRARY_REMOVE_COMPLETED.value,
+                    MessageType.PDF_LIBRARY_REMOVE_FAILED.value,
+                    MessageType.PDF_LIBRARY_INFO_REQUESTED.value,
+                    MessageType.PDF_LIBRARY_INFO_COMPLETED.value,
+                    MessageType.PDF_LIBRARY_INFO_FAILED.value,
+                ],
+            },
+            {
+                "name": "subscription",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.SUBSCRIPTION_SUBSCRIBE_REQUESTED.value,
+                    MessageType.SUBSCRIPTION_SUBSCRIBE_COMPLETED.value,
+                    MessageType.SUBSCRIPTION_SUBSCRIBE_FAILED.value,
+                    MessageType.SUBSCRIPTION_UNSUBSCRIBE_REQUESTED.value,
+                    MessageType.SUBSCRIPTION_UNSUBSCRIBE_COMPLETED.value,
+                    MessageType.SUBSCRIPTION_UNSUBSCRIBE_FAILED.value,
+                    MessageType.SUBSCRIPTION_DELTA_UPDATED.value,
+                ],
+            },
+            {
+                "name": "sync",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.SYNC_SINCE_REQUESTED.value,
+                    MessageType.SYNC_SINCE_COMPLETED.value,
+                    MessageType.SYNC_SINCE_FAILED.value,
+                ],
+            },
+            {
+                "name": "storage-kv",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.STORAGE_KV_GET_REQUESTED.value,
+                    MessageType.STORAGE_KV_GET_COMPLETED.value,
+                    MessageType.STORAGE_KV_GET_FAILED.value,
+                    MessageType.STORAGE_KV_SET_REQUESTED.value,
+                    MessageType.STORAGE_KV_SET_COMPLETED.value,
+                    MessageType.STORAGE_KV_SET_FAILED.value,
+                    MessageType.STORAGE_KV_DELETE_REQUESTED.value,
+                    MessageType.STORAGE_KV_DELETE_COMPLETED.value,
+                    MessageType.STORAGE_KV_DELETE_FAILED.value,
+                ],
+            },
+            {
+                "name": "storage-fs",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.STORAGE_FS_READ_REQUESTED.value,
+                    MessageType.STORAGE_FS_READ_COMPLETED.value,
+                    MessageType.STORAGE_FS_READ_FAILED.value,
+                    MessageType.STORAGE_FS_WRITE_REQUESTED.value,
+                    MessageType.STORAGE_FS_WRITE_COMPLETED.value,
+                    MessageType.STORAGE_FS_WRITE_FAILED.value,
+                ],
+            },
+            {
+                "name": "bookmark",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.BOOKMARK_LIST_REQUESTED.value,
+                    MessageType.BOOKMARK_LIST_COMPLETED.value,
+                    MessageType.BOOKMARK_LIST_FAILED.value,
+                    MessageType.BOOKMARK_SAVE_REQUESTED.value,
+                    MessageType.BOOKMARK_SAVE_COMPLETED.value,
+                    MessageType.BOOKMARK_SAVE_FAILED.value,
+                ],
+            },
+            {
+                "name": "pdf-page",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.PDF_PAGE_LOAD_REQUESTED.value,
+                    MessageType.PDF_PAGE_LOAD_COMPLETED.value,
+                    MessageType.PDF_PAGE_LOAD_FAILED.value,
+                    MessageType.PDF_PAGE_PRELOAD_REQUESTED.value,
+                    MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value,
+                ],
+                "features": {
+                    "extraction": extraction_available(),
+                    "compression": [COMPRESSION_ZLIB_BASE64, COMPRESSION_NONE],
+                    "priorities": list(PRIORITIES),
+                    "max_preload_pages": self.page_transfer.max_preload_pages,
                 },
-                {
-                    "name": "system",
-                    "versions": ["1.0.0"],
-                    "events": [
-                        MessageType.HEARTBEAT_REQUESTED.value,
-                        MessageType.HEARTBEAT_COMPLETED.value,
-                        MessageType.SYSTEM_STATUS_UPDATED.value,
-                        MessageType.SYSTEM_ERROR_OCCURRED.value,
-                    ],
+            },
+            {
+                "name": "database",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.DATABASE_BACKUP_REQUESTED.value,
+                    MessageType.DATABASE_BACKUP_COMPLETED.value,
+                    MessageType.DATABASE_BACKUP_FAILED.value,
+                    MessageType.DATABASE_BACKUP_STATUS_REQUESTED.value,
+                    MessageType.DATABASE_BACKUP_STATUS_COMPLETED.value,
+                    MessageType.DATABASE_BACKUP_STATUS_FAILED.value,
+                ],
+            },
+            {
+                "name": "system",
+                "versions": ["1.0.0"],
+                "events": [
+                    MessageType.HEARTBEAT_REQUESTED.value,
+                    MessageType.HEARTBEAT_COMPLETED.value,
+                    MessageType.SYSTEM_METRICS_REQUESTED.value,
+                    MessageType.SYSTEM_METRICS_COMPLETED.value,
+                    MessageType.SYSTEM_METRICS_FAILED.value,
+                    MessageType.SYSTEM_BATCH_REQUESTED.value,
+                    MessageType.SYSTEM_BATCH_COMPLETED.value,
+                    MessageType.SYSTEM_BATCH_FAILED.value,
+                    MessageType.SYSTEM_ENCODING_REQUESTED.value,
+                    MessageType.SYSTEM_ENCODING_COMPLETED.value,
+                    MessageType.SYSTEM_ENCODING_FAILED.value,
+                    MessageType.SYSTEM_STATUS_UPDATED.value,
+                    MessageType.SYSTEM_ERROR_OCCURRED.value,
+                ],
+                "features": {
+                    "batch": {"max_requests": BATCH_MAX_REQUESTS, "concurrent": self._batch_workers > 0},
+                    "encoding": {
+                        "codecs": available_codecs(),
+                        "default": JSON_CODEC.name,
+                        "compress_threshold": DEFAULT_COMPRESS_THRESHOLD,
+                    },
                 },
-            ]
+            },
+        ]
+
+    def handle_capability_discover_request(self, request_id: Optional[str], data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """返回缓存的域列表与 etag；data.if_none_match 与当前 etag 相同时只返回 not_modified"""
+        try:
+            domains, etag = self.capabilities.discover()
+            if_none_match = (data or {}).get("if_none_match") if isinstance(data, dict) else None
+            if if_none_match == etag:
+                payload = {"not_modified": True, "etag": etag}
+            else:
+                payload = {"domains": domains, "etag": etag}
             return StandardMessageHandler.build_response(
                 MessageType.CAPABILITY_DISCOVER_COMPLETED,
                 request_id or StandardMessageHandler.generate_request_id(),
                 status="success",
                 code=200,
                 message="capability discovered",
-                data={"domains": domains},
+                data=payload,
             )
         except Exception as exc:
             logger.error("能力发现失败: %s", exc, exc_info=True)
@@ -821,7 +1424,133 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
 
+    def _build_capability_description(self, domain: str, schema_info: Callable[[str], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """capability:describe 的单域描述；schema_info(rel_path) 返回契约 schema 的路径与 sha256，未知域返回 None"""
+        described = {"domain": domain, "version": "1.0.0", "events": []}
+
+        if domain == "capability":
+            described["events"] = [
+                {
+                    "type": MessageType.CAPABILITY_DISCOVER_REQUESTED.value,
+                    "schema": schema_info("capability/v1/messages/discover.request.schema.json"),
+                },
+                {
+                    "type": MessageType.CAPABILITY_DISCOVER_COMPLETED.value,
+                    "schema": schema_info("capability/v1/messages/discover.completed.schema.json"),
+                },
+            ]
+        elif domain == "pdf-library":
+            described["events"] = [
+                {"type": MessageType.PDF_LIBRARY_LIST_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/list.request.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_LIST_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/list.completed.schema.json")},
+                {
+                    "type": MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
+                    "schema": schema_info("pdf-library/v1/messages/search.request.schema.json"),
+                },
+                {
+                    "type": MessageType.PDF_LIBRARY_SEARCH_COMPLETED.value,
+                    "schema": schema_info("pdf-library/v1/messages/search.completed.schema.json"),
+                },
+                {"type": MessageType.PDF_LIBRARY_ADD_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/add.request.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_ADD_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/add.completed.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/remove.request.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_REMOVE_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/remove.completed.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_INFO_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/info.request.schema.json")},
+                {"type": MessageType.PDF_LIBRARY_INFO_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/info.completed.schema.json")},
+            ]
+        elif domain == "subscription":
+            described["events"] = [
+                {"type": MessageType.SUBSCRIPTION_SUBSCRIBE_REQUESTED.value},
+                {"type": MessageType.SUBSCRIPTION_SUBSCRIBE_COMPLETED.value},
+                {"type": MessageType.SUBSCRIPTION_UNSUBSCRIBE_REQUESTED.value},
+                {"type": MessageType.SUBSCRIPTION_UNSUBSCRIBE_COMPLETED.value},
+                {"type": MessageType.SUBSCRIPTION_DELTA_UPDATED.value},
+            ]
+        elif domain == "sync":
+            described["events"] = [
+                {"type": MessageType.SYNC_SINCE_REQUESTED.value, "schema": schema_info("sync/v1/messages/since.request.schema.json")},
+                {"type": MessageType.SYNC_SINCE_COMPLETED.value, "schema": schema_info("sync/v1/messages/since.completed.schema.json")},
+            ]
+        elif domain == "storage-kv":
+            described["events"] = [
+                {
+                    "type": MessageType.STORAGE_KV_GET_REQUESTED.value,
+                    "schema": schema_info("storage-kv/v1/messages/get.request.schema.json"),
+                },
+                {
+                    "type": MessageType.STORAGE_KV_GET_COMPLETED.value,
+                    "schema": schema_info("storage-kv/v1/messages/get.completed.schema.json"),
+                },
+                {"type": MessageType.STORAGE_KV_SET_REQUESTED.value, "schema": schema_info("storage-kv/v1/messages/set.request.schema.json")},
+                {"type": MessageType.STORAGE_KV_SET_COMPLETED.value, "schema": schema_info("storage-kv/v1/messages/set.completed.schema.json")},
+                {"type": MessageType.STORAGE_KV_DELETE_REQUESTED.value, "schema": schema_info("storage-kv/v1/messages/delete.request.schema.json")},
+                {"type": MessageType.STORAGE_KV_DELETE_COMPLETED.value, "schema": schema_info("storage-kv/v1/messages/delete.completed.schema.json")},
+            ]
+        elif domain == "storage-fs":
+            described["events"] = [
+                {"type": MessageType.STORAGE_FS_READ_REQUESTED.value, "schema": schema_info("storage-fs/v1/messages/read.request.schema.json")},
+                {"type": MessageType.STORAGE_FS_READ_COMPLETED.value, "schema": schema_info("storage-fs/v1/messages/read.completed.schema.json")},
+                {"type": MessageType.STORAGE_FS_WRITE_REQUESTED.value, "schema": schema_info("storage-fs/v1/messages/write.request.schema.json")},
+                {"type": MessageType.STORAGE_FS_WRITE_COMPLETED.value, "schema": schema_info("storage-fs/v1/messages/write.completed.schema.json")},
+            ]
+        elif domain == "annotation":
+            described["events"] = [
+                {"type": MessageType.ANNOTATION_LIST_REQUESTED.value, "schema": schema_info("annotation/v1/messages/list.request.schema.json")},
+                {"type": MessageType.ANNOTATION_LIST_COMPLETED.value, "schema": schema_info("annotation/v1/messages/list.completed.schema.json")},
+                {"type": MessageType.ANNOTATION_SAVE_REQUESTED.value, "schema": schema_info("annotation/v1/messages/save.request.schema.json")},
+                {"type": MessageType.ANNOTATION_SAVE_COMPLETED.value, "schema": schema_info("annotation/v1/messages/save.completed.schema.json")},
+                {"type": MessageType.ANNOTATION_DELETE_REQUESTED.value, "schema": schema_info("annotation/v1/messages/delete.request.schema.json")},
+                {"type": MessageType.ANNOTATION_DELETE_COMPLETED.value, "schema": schema_info("annotation/v1/messages/delete.completed.schema.json")},
+            ]
+        elif domain == "bookmark":
+            described["events"] = [
+                {"type": MessageType.BOOKMARK_LIST_REQUESTED.value},
+                {"type": MessageType.BOOKMARK_LIST_COMPLETED.value},
+                {"type": MessageType.BOOKMARK_LIST_FAILED.value},
+                {"type": MessageType.BOOKMARK_SAVE_REQUESTED.value},
+                {"type": MessageType.BOOKMARK_SAVE_COMPLETED.value},
+                {"type": MessageType.BOOKMARK_SAVE_FAILED.value},
+            ]
+        elif domain == "pdf-page":
+            described["events"] = [
+                {"type": MessageType.PDF_PAGE_LOAD_REQUESTED.value},
+                {"type": MessageType.PDF_PAGE_LOAD_COMPLETED.value},
+                {"type": MessageType.PDF_PAGE_LOAD_FAILED.value},
+                {"type": MessageType.PDF_PAGE_PRELOAD_REQUESTED.value},
+                {"type": MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value},
+            ]
+        elif domain == "database":
+            described["events"] = [
+                {"type": MessageType.DATABASE_BACKUP_REQUESTED.value, "schema": schema_info("database/v1/messages/backup.request.schema.json")},
+                {"type": MessageType.DATABASE_BACKUP_COMPLETED.value, "schema": schema_info("database/v1/messages/backup.completed.schema.json")},
+                {
+                    "type": MessageType.DATABASE_BACKUP_STATUS_REQUESTED.value,
+                    "schema": schema_info("database/v1/messages/backup-status.request.schema.json"),
+                },
+                {
+                    "type": MessageType.DATABASE_BACKUP_STATUS_COMPLETED.value,
+                    "schema": schema_info("database/v1/messages/backup-status.completed.schema.json"),
+                },
+            ]
+        elif domain == "system":
+            described["events"] = [
+                {"type": MessageType.HEARTBEAT_REQUESTED.value},
+                {"type": MessageType.HEARTBEAT_COMPLETED.value},
+                {"type": MessageType.SYSTEM_METRICS_REQUESTED.value, "schema": schema_info("system/v1/messages/metrics.request.schema.json")},
+                {"type": MessageType.SYSTEM_METRICS_COMPLETED.value, "schema": schema_info("system/v1/messages/metrics.completed.schema.json")},
+                {"type": MessageType.SYSTEM_BATCH_REQUESTED.value, "schema": schema_info("system/v1/messages/batch.request.schema.json")},
+                {"type": MessageType.SYSTEM_BATCH_COMPLETED.value, "schema": schema_info("system/v1/messages/batch.completed.schema.json")},
+                {"type": MessageType.SYSTEM_ENCODING_REQUESTED.value, "schema": schema_info("system/v1/messages/encoding.request.schema.json")},
+                {"type": MessageType.SYSTEM_ENCODING_COMPLETED.value, "schema": schema_info("system/v1/messages/encoding.completed.schema.json")},
+                {"type": MessageType.SYSTEM_STATUS_UPDATED.value},
+                {"type": MessageType.SYSTEM_ERROR_OCCURRED.value},
+            ]
+        else:
+            return None
+        return described
+
     def handle_capability_describe_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        """返回缓存的域描述与 etag；data.if_none_match 与当前 etag 相同时只返回 not_modified"""
         try:
             domain = (data or {}).get("domain")
             if not domain:
@@ -833,115 +1562,8 @@ class StandardWebSocketServer(QObject):
                     code=400,
                 )
 
-            # 契约样例位置（与 todo-and-doing 目录保持一致）
-            schema_root = os.path.join(
-                project_root,
-                "todo-and-doing",
-                "1 doing",
-                "20251006182000-bus-contract-capability-registry",
-                "schemas",
-            )
-
-            def schema_info(rel_path: str) -> Dict[str, Any]:
-                full = os.path.join(schema_root, rel_path)
-                try:
-                    # 显式 UTF-8 读取并计算 sha256
-                    import hashlib
-                    with open(full, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
-                except Exception:
-                    sha = None
-                return {"path": os.path.relpath(full, project_root).replace("\\", "/"), "schemaHash": sha}
-
-            described = {"domain": domain, "version": "1.0.0", "events": []}
-
-            if domain == "capability":
-                described["events"] = [
-                    {
-                        "type": MessageType.CAPABILITY_DISCOVER_REQUESTED.value,
-                        "schema": schema_info("capability/v1/messages/discover.request.schema.json"),
-                    },
-                    {
-                        "type": MessageType.CAPABILITY_DISCOVER_COMPLETED.value,
-                        "schema": schema_info("capability/v1/messages/discover.completed.schema.json"),
-                    },
-                ]
-            elif domain == "pdf-library":
-                described["events"] = [
-                    {"type": MessageType.PDF_LIBRARY_LIST_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/list.request.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_LIST_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/list.completed.schema.json")},
-                    {
-                        "type": MessageType.PDF_LIBRARY_SEARCH_REQUESTED.value,
-                        "schema": schema_info("pdf-library/v1/messages/search.request.schema.json"),
-                    },
-                    {
-                        "type": MessageType.PDF_LIBRARY_SEARCH_COMPLETED.value,
-                        "schema": schema_info("pdf-library/v1/messages/search.completed.schema.json"),
-                    },
-                    {"type": MessageType.PDF_LIBRARY_ADD_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/add.request.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_ADD_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/add.completed.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_REMOVE_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/remove.request.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_REMOVE_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/remove.completed.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_INFO_REQUESTED.value, "schema": schema_info("pdf-library/v1/messages/info.request.schema.json")},
-                    {"type": MessageType.PDF_LIBRARY_INFO_COMPLETED.value, "schema": schema_info("pdf-library/v1/messages/info.completed.schema.json")},
-                ]
-            elif domain == "storage-kv":
-                described["events"] = [
-                    {
-                        "type": MessageType.STORAGE_KV_GET_REQUESTED.value,
-                        "schema": schema_info("storage-kv/v1/messages/get.request.schema.json"),
-                    },
-                    {
-                        "type": MessageType.STORAGE_KV_GET_COMPLETED.value,
-                        "schema": schema_info("storage-kv/v1/messages/get.completed.schema.json"),
-                    },
-                    {"type": MessageType.STORAGE_KV_SET_REQUESTED.value, "schema": schema_info("storage-kv/v1/messages/set.request.schema.json")},
-                    {"type": MessageType.STORAGE_KV_SET_COMPLETED.value, "schema": schema_info("storage-kv/v1/messages/set.completed.schema.json")},
-                    {"type": MessageType.STORAGE_KV_DELETE_REQUESTED.value, "schema": schema_info("storage-kv/v1/messages/delete.request.schema.json")},
-                    {"type": MessageType.STORAGE_KV_DELETE_COMPLETED.value, "schema": schema_info("storage-kv/v1/messages/delete.completed.schema.json")},
-                ]
-            elif domain == "storage-fs":
-                described["events"] = [
-                    {"type": MessageType.STORAGE_FS_READ_REQUESTED.value, "schema": schema_info("storage-fs/v1/messages/read.request.schema.json")},
-                    {"type": MessageType.STORAGE_FS_READ_COMPLETED.value, "schema": schema_info("storage-fs/v1/messages/read.completed.schema.json")},
-                    {"type": MessageType.STORAGE_FS_WRITE_REQUESTED.value, "schema": schema_info("storage-fs/v1/messages/write.request.schema.json")},
-                    {"type": MessageType.STORAGE_FS_WRITE_COMPLETED.value, "schema": schema_info("storage-fs/v1/messages/write.completed.schema.json")},
-                ]
-            elif domain == "annotation":
-                described["events"] = [
-                    {"type": MessageType.ANNOTATION_LIST_REQUESTED.value, "schema": schema_info("annotation/v1/messages/list.request.schema.json")},
-                    {"type": MessageType.ANNOTATION_LIST_COMPLETED.value, "schema": schema_info("annotation/v1/messages/list.completed.schema.json")},
-                    {"type": MessageType.ANNOTATION_SAVE_REQUESTED.value, "schema": schema_info("annotation/v1/messages/save.request.schema.json")},
-                    {"type": MessageType.ANNOTATION_SAVE_COMPLETED.value, "schema": schema_info("annotation/v1/messages/save.completed.schema.json")},
-                    {"type": MessageType.ANNOTATION_DELETE_REQUESTED.value, "schema": schema_info("annotation/v1/messages/delete.request.schema.json")},
-                    {"type": MessageType.ANNOTATION_DELETE_COMPLETED.value, "schema": schema_info("annotation/v1/messages/delete.completed.schema.json")},
-                ]
-            elif domain == "bookmark":
-                described["events"] = [
-                    {"type": MessageType.BOOKMARK_LIST_REQUESTED.value},
-                    {"type": MessageType.BOOKMARK_LIST_COMPLETED.value},
-                    {"type": MessageType.BOOKMARK_LIST_FAILED.value},
-                    {"type": MessageType.BOOKMARK_SAVE_REQUESTED.value},
-                    {"type": MessageType.BOOKMARK_SAVE_COMPLETED.value},
-                    {"type": MessageType.BOOKMARK_SAVE_FAILED.value},
-                ]
-            elif domain == "pdf-page":
-                described["events"] = [
-                    {"type": MessageType.PDF_PAGE_LOAD_REQUESTED.value},
-                    {"type": MessageType.PDF_PAGE_LOAD_COMPLETED.value},
-                    {"type": MessageType.PDF_PAGE_LOAD_FAILED.value},
-                    {"type": MessageType.PDF_PAGE_PRELOAD_REQUESTED.value},
-                    {"type": MessageType.PDF_PAGE_CACHE_CLEAR_REQUESTED.value},
-                ]
-            elif domain == "system":
-                described["events"] = [
-                    {"type": MessageType.HEARTBEAT_REQUESTED.value},
-                    {"type": MessageType.HEARTBEAT_COMPLETED.value},
-                    {"type": MessageType.SYSTEM_STATUS_UPDATED.value},
-                    {"type": MessageType.SYSTEM_ERROR_OCCURRED.value},
-                ]
-            else:
+            cached = self.capabilities.describe(domain)
+            if cached is None:
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
                     "DOMAIN_NOT_FOUND",
@@ -949,6 +1571,10 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.CAPABILITY_DESCRIBE_FAILED,
                     code=404,
                 )
+            described, etag = cached
+            if data.get("if_none_match") == etag:
+                described = {"domain": domain, "not_modified": True}
+            described["etag"] = etag
 
             return StandardMessageHandler.build_response(
                 MessageType.CAPABILITY_DESCRIBE_COMPLETED,
@@ -971,8 +1597,8 @@ class StandardWebSocketServer(QObject):
     def handle_storage_kv_get_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             ns = (data or {}).get("namespace")
-            key = (data or {}).get("key")
-            if not ns or not key:
+            keys = self._kv_parse_keys(data or {})
+            if not ns or not keys:
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
                     "INVALID_REQUEST",
@@ -980,15 +1606,18 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.STORAGE_KV_GET_FAILED,
                     code=400,
                 )
-            store = self._kv_store_load()
-            value = (store.get(ns) or {}).get(key)
+            values = self._get_kv_store().get_many(ns, keys)
+            if "keys" in (data or {}):
+                payload = {"values": {key: values.get(key) for key in keys}}
+            else:
+                payload = {"value": values.get(keys[0])}
             return StandardMessageHandler.build_response(
                 MessageType.STORAGE_KV_GET_COMPLETED,
                 request_id or StandardMessageHandler.generate_request_id(),
                 status="success",
                 code=200,
                 message="kv get",
-                data={"value": value},
+                data=payload,
             )
         except Exception as exc:
             logger.error("KV读取失败: %s", exc, exc_info=True)
@@ -1003,9 +1632,10 @@ class StandardWebSocketServer(QObject):
     def handle_storage_kv_set_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             ns = (data or {}).get("namespace")
-            key = (data or {}).get("key")
-            value = (data or {}).get("value")
-            if not ns or not key:
+            entries = (data or {}).get("entries")
+            if entries is None and (data or {}).get("key"):
+                entries = {data["key"]: data.get("value")}
+            if not ns or not isinstance(entries, dict) or not entries:
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
                     "INVALID_REQUEST",
@@ -1013,18 +1643,24 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.STORAGE_KV_SET_FAILED,
                     code=400,
                 )
-            store = self._kv_store_load()
-            bucket = store.get(ns) or {}
-            bucket[key] = value
-            store[ns] = bucket
-            self._kv_store_save(store)
+            try:
+                ttl_ms = self._kv_parse_ttl(data)
+            except (TypeError, ValueError) as exc:
+                return StandardMessageHandler.build_error_response(
+                    request_id or "unknown",
+                    "INVALID_REQUEST",
+                    f"ttl_ms 参数无效: {exc}",
+                    message_type=MessageType.STORAGE_KV_SET_FAILED,
+                    code=400,
+                )
+            written = self._get_kv_store().set_many(ns, entries, ttl_ms=ttl_ms)
             return StandardMessageHandler.build_response(
                 MessageType.STORAGE_KV_SET_COMPLETED,
                 request_id or StandardMessageHandler.generate_request_id(),
                 status="success",
                 code=200,
                 message="kv set",
-                data={"ok": True},
+                data={"ok": True, "count": written},
             )
         except Exception as exc:
             logger.error("KV写入失败: %s", exc, exc_info=True)
@@ -1039,8 +1675,8 @@ class StandardWebSocketServer(QObject):
     def handle_storage_kv_delete_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             ns = (data or {}).get("namespace")
-            key = (data or {}).get("key")
-            if not ns or not key:
+            keys = self._kv_parse_keys(data or {})
+            if not ns or not keys:
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
                     "INVALID_REQUEST",
@@ -1048,19 +1684,14 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.STORAGE_KV_DELETE_FAILED,
                     code=400,
                 )
-            store = self._kv_store_load()
-            if ns in store and isinstance(store[ns], dict) and key in store[ns]:
-                del store[ns][key]
-                if not store[ns]:
-                    del store[ns]
-                self._kv_store_save(store)
+            deleted = self._get_kv_store().delete_many(ns, keys)
             return StandardMessageHandler.build_response(
                 MessageType.STORAGE_KV_DELETE_COMPLETED,
                 request_id or StandardMessageHandler.generate_request_id(),
                 status="success",
                 code=200,
                 message="kv delete",
-                data={"ok": True},
+                data={"ok": True, "count": deleted},
             )
         except Exception as exc:
             logger.error("KV删除失败: %s", exc, exc_info=True)
@@ -1104,6 +1735,8 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.STORAGE_FS_READ_FAILED,
                     code=404,
                 )
+            if "offset" in (data or {}) or "length" in (data or {}):
+                return self._storage_fs_read_chunk(request_id, data, norm, abs_path)
             with open(abs_path, "rb") as f:
                 content = f.read()
             b64 = base64.b64encode(content).decode("utf-8")
@@ -1125,13 +1758,107 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
 
+    def _storage_fs_read_chunk(self, request_id: Optional[str], data: Dict[str, Any], norm: str, abs_path: str) -> Dict[str, Any]:
+        """分块读取：返回 [offset, offset+length) 分片；最后一片附带整文件 sha256。"""
+        import base64
+        try:
+            offset = int(data.get("offset") or 0)
+            chunk, size, eof = read_chunk(abs_path, offset, data.get("length"))
+        except (TypeError, ValueError):
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_RANGE",
+                "offset/length 参数无效",
+                message_type=MessageType.STORAGE_FS_READ_FAILED,
+                code=400,
+            )
+        except ChunkTransferError as exc:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                exc.error_code,
+                str(exc),
+                message_type=MessageType.STORAGE_FS_READ_FAILED,
+                code=exc.code,
+            )
+        payload = {
+            "path": norm,
+            "content": base64.b64encode(chunk).decode("utf-8"),
+            "offset": offset,
+            "length": len(chunk),
+            "size": size,
+            "eof": eof,
+            # 同一文件也可经 pdfFile_server 以 HTTP Range 读取
+            "http_path": "/fs/" + norm,
+        }
+        if "seq" in data:
+            payload["seq"] = data.get("seq")
+        if eof:
+            payload["checksum"] = file_checksum(abs_path)
+        return StandardMessageHandler.build_response(
+            MessageType.STORAGE_FS_READ_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message="fs read chunk",
+            data=payload,
+        )
+
+    def _storage_fs_write_chunk(self, request_id: Optional[str], data: Dict[str, Any], norm: str, abs_path: str) -> Dict[str, Any]:
+        """分块写入：按 seq 顺序追加到会话临时文件，final 分片校验 sha256 后提交。"""
+        import base64
+        try:
+            session_id = data.get("session_id")
+            if data.get("abort"):
+                aborted = self.fs_transfers.abort(session_id) if session_id else False
+                progress = {"session_id": session_id, "aborted": aborted}
+            else:
+                chunk = base64.b64decode((data.get("content") or "").encode("utf-8"))
+                progress = self.fs_transfers.write_chunk(
+                    abs_path,
+                    session_id=session_id,
+                    seq=int(data.get("seq") or 0),
+                    offset=int(data.get("offset") or 0),
+                    chunk=chunk,
+                    final=bool(data.get("final")),
+                    checksum=data.get("checksum"),
+                    overwrite=bool(data.get("overwrite", True)),
+                )
+        except ChunkTransferError as exc:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                exc.error_code,
+                str(exc),
+                message_type=MessageType.STORAGE_FS_WRITE_FAILED,
+                code=exc.code,
+            )
+        except (TypeError, ValueError) as exc:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                f"分块参数无效: {exc}",
+                message_type=MessageType.STORAGE_FS_WRITE_FAILED,
+                code=400,
+            )
+        progress["path"] = norm
+        if progress.get("committed"):
+            progress["bytes"] = progress["bytes_received"]
+        return StandardMessageHandler.build_response(
+            MessageType.STORAGE_FS_WRITE_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message="fs write chunk",
+            data=progress,
+        )
+
     def handle_storage_fs_write_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             import base64
             rel_path = (data or {}).get("path")
             content_b64 = (data or {}).get("content")
             overwrite = bool((data or {}).get("overwrite", True))
-            if not rel_path or content_b64 is None:
+            chunked = "seq" in (data or {}) or "session_id" in (data or {})
+            if not rel_path or (content_b64 is None and not chunked):
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
                     "INVALID_REQUEST",
@@ -1151,6 +1878,8 @@ class StandardWebSocketServer(QObject):
                     code=400,
                 )
             abs_path = os.path.join(base_dir, norm)
+            if chunked:
+                return self._storage_fs_write_chunk(request_id, data, norm, abs_path)
             if (not overwrite) and os.path.exists(abs_path):
                 return StandardMessageHandler.build_error_response(
                     request_id or "unknown",
@@ -1326,6 +2055,29 @@ class StandardWebSocketServer(QObject):
         except Exception:
             return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
 
+    def _annotation_to_frontend(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': row.get('ann_id'),
+            'pdfId': row.get('pdf_uuid'),
+            'type': row.get('type'),
+            'pageNumber': row.get('page_number'),
+            'data': row.get('data') or {},
+            'comments': row.get('comments') or [],
+            'commentCount': row.get('comment_count', len(row.get('comments') or [])),
+            'createdAt': self._ms_to_iso(row.get('created_at')),
+            'updatedAt': self._ms_to_iso(row.get('updated_at')),
+        }
+
+    @staticmethod
+    def _optional_non_negative_int(value: Any) -> Optional[int]:
+        """解析可选的非负整数参数；缺省或无法解析时为 None"""
+        if value is None:
+            return None
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            return None
+
     def handle_annotation_list_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             if not hasattr(self, "pdf_library_api") or not self.pdf_library_api:
@@ -1345,26 +2097,38 @@ class StandardWebSocketServer(QObject):
                     message_type=MessageType.ANNOTATION_LIST_FAILED,
                     code=400,
                 )
-            rows = self.pdf_library_api._annotation_plugin.query_by_pdf(pdf_uuid)
-            annotations = []
-            for row in rows:
-                annotations.append({
-                    'id': row.get('ann_id'),
-                    'pdfId': row.get('pdf_uuid'),
-                    'type': row.get('type'),
-                    'pageNumber': row.get('page_number'),
-                    'data': row.get('data') or {},
-                    'comments': row.get('comments') or [],
-                    'createdAt': self._ms_to_iso(row.get('created_at')),
-                    'updatedAt': self._ms_to_iso(row.get('updated_at')),
-                })
+            # comments_limit：每条标注最多返回的评论数（评论总数见 commentCount）
+            # ann_id + comments_offset：只返回该标注，评论按 offset/limit 分页（加载更多评论）
+            comments_limit = self._optional_non_negative_int((data or {}).get('comments_limit'))
+            comments_offset = self._optional_non_negative_int((data or {}).get('comments_offset'))
+            ann_id = (data or {}).get('ann_id')
+            if comments_offset is not None and not ann_id:
+                return StandardMessageHandler.build_error_response(
+                    request_id or "unknown",
+                    "INVALID_REQUEST",
+                    "comments_offset 需要同时提供 ann_id",
+                    message_type=MessageType.ANNOTATION_LIST_FAILED,
+                    code=400,
+                )
+            plugin = self.pdf_library_api._annotation_plugin
+            result: Dict[str, Any] = {}
+            if ann_id:
+                row = plugin.query_by_id(ann_id, comments_limit=0)
+                rows = [row] if row and row['pdf_uuid'] == pdf_uuid else []
+                for row in rows:
+                    row['comments'] = plugin.query_comments(ann_id, comments_limit, comments_offset)
+                result['comments_offset'] = comments_offset or 0
+            else:
+                rows = plugin.query_by_pdf(pdf_uuid, comments_limit=comments_limit)
+            annotations = [self._annotation_to_frontend(row) for row in rows]
+            result.update({'annotations': annotations, 'count': len(annotations)})
             return StandardMessageHandler.build_response(
                 MessageType.ANNOTATION_LIST_COMPLETED,
                 request_id or StandardMessageHandler.generate_request_id(),
                 status='success',
                 code=200,
                 message='标注列表获取成功',
-                data={'annotations': annotations, 'count': len(annotations)}
+                data=result
             )
         except Exception as exc:
             logger.error("获取标注失败: %s", exc, exc_info=True)
@@ -1671,8 +2435,9 @@ class StandardWebSocketServer(QObject):
                     error_msg = f"文件管理器更新失败: {exc}"
 
             if success:
-                # 广播列表变更（数据库优先）
-                self.on_pdf_list_changed()
+                # 推送变更记录本身（数据库优先），拿不到记录时回退为整表推送
+                if not self.on_pdf_record_updated(str(file_id)):
+                    self.on_pdf_list_changed()
                 return StandardMessageHandler.build_response(
                     MessageType.PDF_LIBRARY_RECORD_UPDATE_COMPLETED,
                     request_id or StandardMessageHandler.generate_request_id(),
@@ -1700,47 +2465,59 @@ class StandardWebSocketServer(QObject):
                 code=500,
             )
     def handle_pdf_page_request(self, request_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """处理PDF页面请求"""
+        """处理PDF页面请求：返回单页 PDF（zlib_base64 或 none 编码），结果进入页面缓存"""
+        file_id = data.get("file_id")
+        page_number = data.get("page_number")
+        compression = data.get("compression", COMPRESSION_ZLIB_BASE64)
         try:
-            file_id = data.get("file_id")
-            page_number = data.get("page_number")
-            compression = data.get("compression", "zlib_base64")
-            
-            if not file_id or not page_number:
+            if not file_id or not isinstance(page_number, int) or isinstance(page_number, bool) or page_number < 1:
                 return StandardMessageHandler.build_error_response(
                     request_id,
                     "INVALID_REQUEST",
-                    "缺少必需的file_id或page_number参数"
+                    "缺少必需的file_id或page_number参数",
+                    message_type=MessageType.PDF_PAGE_LOAD_FAILED,
+                    code=400,
                 )
-            
-            # 获取页面数据
-            page_data = page_transfer_manager.get_page(file_id, page_number, compression)
-            
+
+            page_data = self.page_transfer.get_page(file_id, page_number, compression)
+
             return PDFMessageBuilder.build_pdf_page_response(
                 request_id,
                 file_id,
                 page_number,
                 page_data,
-                compression
+                page_data["encoding"],
+                total_pages=page_data["total_pages"],
+                page_size=page_data["size"],
+            )
+
+        except PageTransferError as e:
+            return PDFMessageBuilder.build_pdf_page_error_response(
+                request_id,
+                file_id or "unknown",
+                page_number or 0,
+                e.code,
+                str(e),
+                retryable=False,
+                code=e.status,
             )
-            
         except Exception as e:
             logger.error(f"获取PDF页面失败: {e}")
             return PDFMessageBuilder.build_pdf_page_error_response(
                 request_id,
-                data.get("file_id", "unknown"),
-                data.get("page_number", 0),
+                file_id or "unknown",
+                page_number or 0,
                 "PAGE_EXTRACTION_ERROR",
                 f"提取页面失败: {str(e)}",
                 retryable=True
             )
     
     def handle_pdf_page_preload_request(self, request_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """处理PDF页面预加载请求"""
+        """处理PDF页面预加载请求：页面范围按优先级进入后台预加载队列，立即返回排队结果"""
         try:
             file_id = data.get("file_id")
             start_page = data.get("start_page", 1)
-            end_page = data.get("end_page", 1)
+            end_page = data.get("end_page", start_page)
             priority = data.get("priority", "low")
             
             if not file_id:
@@ -1751,22 +2528,33 @@ class StandardWebSocketServer(QObject):
                 )
             
             # 预加载页面
-            preloaded_count = page_transfer_manager.preload_pages(file_id, start_page, end_page, priority)
+            result = self.page_transfer.preload_pages(file_id, start_page, end_page, priority)
+            preloaded_count = result["queued"] + result["cached"]
             
             return StandardMessageHandler.build_response(
                 "response",
                 request_id,
                 status="success",
                 code=200,
-                message=f"预加载完成，成功加载 {preloaded_count} 个页面",
+                message=f"预加载已排队，共 {preloaded_count} 个页面",
                 data={
                     "file_id": file_id,
                     "preloaded_count": preloaded_count,
+                    "queued_count": result["queued"],
+                    "cached_count": result["cached"],
+                    "total_pages": result["total_pages"],
                     "start_page": start_page,
                     "end_page": end_page
                 }
             )
             
+        except PageTransferError as e:
+            return StandardMessageHandler.build_error_response(
+                request_id,
+                e.code,
+                f"预加载页面失败: {str(e)}",
+                code=e.status,
+            )
         except Exception as e:
             logger.error(f"预加载PDF页面失败: {e}")
             return StandardMessageHandler.build_error_response(
@@ -1776,7 +2564,7 @@ class StandardWebSocketServer(QObject):
             )
     
     def handle_pdf_page_cache_clear_request(self, request_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """处理PDF页面缓存清理请求"""
+        """处理PDF页面缓存清理请求（同时取消该文件尚未执行的预加载）"""
         try:
             file_id = data.get("file_id")
             keep_pages = data.get("keep_pages")
@@ -1789,7 +2577,7 @@ class StandardWebSocketServer(QObject):
                 )
             
             # 清理缓存
-            cleared_count = page_transfer_manager.clear_cache(file_id, keep_pages)
+            cleared_count = self.page_transfer.clear_cache(file_id, keep_pages)
             
             return StandardMessageHandler.build_response(
                 "response",
@@ -1812,6 +2600,17 @@ class StandardWebSocketServer(QObject):
                 f"清理缓存失败: {str(e)}"
             )
 
+    def _resolve_pdf_file_path(self, file_id: str) -> Optional[str]:
+        """file_id（uuid 或文件名/标题）→ PDF 副本路径；找不到时返回 None"""
+        uuid = self._resolve_pdf_uuid(file_id)
+        if not uuid:
+            return None
+        pdf_file = self.pdf_manager.file_list.get_file(uuid)
+        if pdf_file is not None and getattr(pdf_file, "filepath", None):
+            return pdf_file.filepath
+        candidate = os.path.join(self.pdf_manager.pdfs_dir, f"{uuid}.pdf")
+        return candidate if os.path.isfile(candidate) else None
+
     # ----------------------------- helpers ---------------------------------
     def _resolve_pdf_uuid(self, value: Optional[str]) -> Optional[str]:
         """尝试将前端传入的 pdf_id 映射为数据库的 uuid。
@@ -1847,50 +2646,21 @@ class StandardWebSocketServer(QObject):
         return value
 
     def handle_console_log_request(self, request_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """处理前端console日志消息"""
+        """处理前端console日志消息（放入写入缓冲区，不等待落盘）"""
         try:
-            # 从数据中提取console日志信息
+            data = data if isinstance(data, dict) else {}
             source = data.get('source', 'unknown')
             level = data.get('level', 'log')
-            timestamp = data.get('timestamp', '')
-            log_message = data.get('message', '')
-
-            # 格式化时间戳
-            if timestamp:
-                try:
-                    import datetime
-                    dt = datetime.datetime.fromtimestamp(timestamp / 1000)
-                    formatted_time = dt.strftime('%H:%M:%S.%f')[:-3]
-                except:
-                    formatted_time = str(timestamp)
-            else:
-                formatted_time = ''
-
-            # 格式化日志条目
-            log_entry = f"[{formatted_time}][{level.upper()}][{source}] {log_message}"
-
-            # 写入统一日志文件
-            log_file_path = "logs/unified-console.log"
-
-            # 确保日志目录存在
-            os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-
-            # 追加写入日志文件
-            with open(log_file_path, 'a', encoding='utf-8') as f:
-                f.write(log_entry + '\n')
-                f.flush()  # 确保立即写入磁盘
-
-            # 同时输出到后端日志（简化格式）
-            logger.debug(f"[Console-{source}] {log_message}")
+            result = self.console_log_sink.submit([data])
+            logger.debug("[Console-%s] %s", source, data.get('message', ''))
 
-            # 返回成功响应
             return StandardMessageHandler.build_response(
                 "response",
                 request_id,
                 status="success",
                 code=200,
                 message="Console log recorded successfully",
-                data={"logged": True, "source": source, "level": level}
+                data={"logged": result["accepted"] == 1, "source": source, "level": level, "dropped": result["dropped"]}
             )
 
         except Exception as e:
@@ -1901,42 +2671,65 @@ class StandardWebSocketServer(QObject):
                 f"处理console日志失败: {str(e)}"
             )
 
-
+    def handle_console_log_batch_request(self, request_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """console_log:batch：data.entries 为 console_log 数据数组，按来源限流后一次放入缓冲区"""
+        entries = (data or {}).get("entries") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown", "INVALID_REQUEST", "entries 必须为数组", code=400,
+            )
+        if len(entries) > CONSOLE_LOG_BATCH_MAX_ENTRIES:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown", "BATCH_TOO_LARGE",
+                f"单批最多 {CONSOLE_LOG_BATCH_MAX_ENTRIES} 条日志（收到 {len(entries)} 条）", code=413,
+            )
+        result = self.console_log_sink.submit(entries)
+        return StandardMessageHandler.build_response(
+            "response",
+            request_id,
+            status="success",
+            code=200,
+            message="Console log recorded successfully",
+            data=result,
+        )
 
     @pyqtSlot()
     def on_client_disconnected(self):
         """处理客户端断开连接"""
         client_socket = self.sender()
-        if client_socket in self.clients:
-            self.clients.remove(client_socket)
+        if self.forget_client(client_socket):
             logger.info(f"客户端断开连接: {client_socket.peerPort()}")
             self.client_disconnected.emit(client_socket)
+        client_socket.deleteLater()
     
     def on_socket_error(self, error):
         """处理WebSocket错误"""
         client_socket = self.sender()
         logger.error(f"WebSocket错误 from {client_socket.peerPort()}: {error}")
-        if client_socket in self.clients:
-            self.clients.remove(client_socket)
+        self.forget_client(client_socket)
     
     # PDF管理器事件处理
     def on_pdf_file_added(self, file_info: Dict[str, Any]):
         """处理PDF文件添加事件"""
         logger.info(f"PDF文件添加事件: {file_info}")
+        record = None
         if hasattr(self, "pdf_library_api") and self.pdf_library_api:
             try:
-                self.pdf_library_api.register_file_info(file_info)
+                file_id = self.pdf_library_api.register_file_info(file_info)
+                record = self.pdf_library_api.get_record(file_id)
             except Exception as exc:
                 logger.error("同步文件信息到数据库失败: %s", exc)
-        # 可以广播给所有客户端
+        # 携带新增记录本身，订阅 library 的客户端增量插入即可
         message = StandardMessageHandler.build_base_message(
             MessageType.SYSTEM_STATUS_UPDATED,
             data={
                 "event": "file_added",
-                "file_info": file_info,
+                "topic": LIBRARY_TOPIC,
+                "file_info": record or file_info,
                 "file_count": self.pdf_manager.get_file_count()
             }
         )
+        self.broadcast_message(message, topic=LIBRARY_TOPIC)
 
     # ---------------- Anchor handlers ----------------
     def _ensure_api(self, request_id: Optional[str], failed_type: MessageType):
@@ -2044,9 +2837,8 @@ class StandardWebSocketServer(QObject):
         except Exception as exc:
             logger.error("锚点激活更新失败: %s", exc, exc_info=True)
             return StandardMessageHandler.build_error_response(request_id or "unknown", "ANCHOR_ACTIVATE_ERROR", f"锚点激活更新失败: {exc}", message_type=MessageType.ANCHOR_ACTIVATE_FAILED, code=500)
-        self.broadcast_message(message)
 
-    def handle_viewer_register_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_viewer_register_request(self, request_id: Optional[str], data: Dict[str, Any], *, client: Optional[QWebSocket] = None) -> Dict[str, Any]:
         """处理 PDF Viewer 实例注册请求
 
         当 PDF Viewer 实例启动并建立 WebSocket 连接时，会发送此请求来注册自己。
@@ -2067,8 +2859,12 @@ class StandardWebSocketServer(QObject):
 
             logger.info(f"PDF Viewer 实例注册: viewer_id={viewer_id}, pdf_uuid={pdf_uuid}, url={url}")
 
-            # TODO: 如果需要，可以在这里存储 viewer_id 到 pdf_uuid 的映射关系
-            # 目前只需要确认注册即可
+            # viewer 只关心自己打开的 PDF：自动订阅其标注/书签主题，不再接收 library 事件
+            topics: List[str] = []
+            if client is not None and pdf_uuid:
+                topics, _ = self.subscriptions.subscribe(
+                    client, [pdf_topic(pdf_uuid, "annotations"), pdf_topic(pdf_uuid, "bookmarks")]
+                )
 
             return StandardMessageHandler.build_response(
                 MessageType.PDF_VIEWER_REGISTER_COMPLETED,
@@ -2079,6 +2875,7 @@ class StandardWebSocketServer(QObject):
                 data={
                     "viewer_id": viewer_id,
                     "pdf_uuid": pdf_uuid,
+                    "topics": topics,
                     "registered_at": StandardMessageHandler.get_timestamp()
                 }
             )
@@ -2137,9 +2934,114 @@ class StandardWebSocketServer(QObject):
                 code=500
             )
 
+    def _get_backup_manager(self) -> DatabaseBackupManager:
+        if self.backup_manager is None:
+            db_path = getattr(self.pdf_library_api, "_db_path", None) if self.pdf_library_api else None
+            self.backup_manager = DatabaseBackupManager(db_path)
+        return self.backup_manager
+
+    def handle_database_backup_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        """在后台线程启动一次在线快照（分步复制，不阻塞 Qt 线程）。"""
+        try:
+            manager = self._get_backup_manager()
+            if not manager.start_snapshot():
+                return StandardMessageHandler.build_error_response(
+                    request_id or "unknown",
+                    "BACKUP_IN_PROGRESS",
+                    "已有备份任务正在进行",
+                    message_type=MessageType.DATABASE_BACKUP_FAILED,
+                    code=409,
+                )
+            return StandardMessageHandler.build_response(
+                MessageType.DATABASE_BACKUP_COMPLETED,
+                request_id or StandardMessageHandler.generate_request_id(),
+                status="success",
+                code=202,
+                message="备份已启动",
+                data={"started": True, "status": manager.status()},
+            )
+        except Exception as exc:
+            logger.error("启动数据库备份失败: %s", exc, exc_info=True)
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "DATABASE_BACKUP_ERROR",
+                f"启动数据库备份失败: {exc}",
+                message_type=MessageType.DATABASE_BACKUP_FAILED,
+                code=500,
+            )
+
+    def handle_database_backup_status_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return StandardMessageHandler.build_response(
+                MessageType.DATABASE_BACKUP_STATUS_COMPLETED,
+                request_id or StandardMessageHandler.generate_request_id(),
+                status="success",
+                code=200,
+                message="备份状态",
+                data=self._get_backup_manager().status(),
+            )
+        except Exception as exc:
+            logger.error("获取数据库备份状态失败: %s", exc, exc_info=True)
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "DATABASE_BACKUP_ERROR",
+                f"获取数据库备份状态失败: {exc}",
+                message_type=MessageType.DATABASE_BACKUP_STATUS_FAILED,
+                code=500,
+            )
+
+    def handle_sync_since_request(self, request_id: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        """返回 since 之后的合并增量（按 seq 升序，同一行只保留最后一次变更）。"""
+        if not self.pdf_library_api or not hasattr(self.pdf_library_api, "sync_since"):
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "SERVICE_UNAVAILABLE",
+                "PDF库服务不可用",
+                message_type=MessageType.SYNC_SINCE_FAILED,
+                code=503,
+            )
+        try:
+            payload = data if isinstance(data, dict) else {}
+            since = payload.get("since", 0)
+            limit = payload.get("limit")
+            if since is None:
+                since = 0
+            if isinstance(since, bool) or not isinstance(since, int) or since < 0:
+                raise ValueError("since 必须为非负整数")
+            if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0):
+                raise ValueError("limit 必须为正整数")
+        except ValueError as exc:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                str(exc),
+                message_type=MessageType.SYNC_SINCE_FAILED,
+                code=400,
+            )
+        try:
+            delta = self.pdf_library_api.sync_since(since, limit)
+            return StandardMessageHandler.build_response(
+                MessageType.SYNC_SINCE_COMPLETED,
+                request_id or StandardMessageHandler.generate_request_id(),
+                status="success",
+                code=200,
+                message=f"{len(delta.get('changes', []))} 条变更",
+                data={"since": since, **delta},
+            )
+        except Exception as exc:
+            logger.error("获取增量变更失败: %s", exc, exc_info=True)
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "SYNC_SINCE_ERROR",
+                f"获取增量变更失败: {exc}",
+                message_type=MessageType.SYNC_SINCE_FAILED,
+                code=500,
+            )
+
     def on_pdf_file_removed(self, file_id: str):
         """处理PDF文件删除事件"""
         logger.info(f"PDF文件删除事件: {file_id}")
+        self.page_transfer.clear_cache(file_id)
         if hasattr(self, "pdf_library_api") and self.pdf_library_api:
             try:
                 self.pdf_library_api.delete_record(file_id)
@@ -2149,16 +3051,56 @@ class StandardWebSocketServer(QObject):
             MessageType.SYSTEM_STATUS_UPDATED,
             data={
                 "event": "file_removed",
+                "topic": LIBRARY_TOPIC,
                 "file_id": file_id,
                 "file_count": self.pdf_manager.get_file_count()
             }
         )
-        self.broadcast_message(message)
+        self.broadcast_message(message, topic=LIBRARY_TOPIC)
     
+    def on_pdf_files_removed(self, payload: Dict[str, Any]):
+        """处理批量删除完成事件：数据库记录已由 delete_records 删除，这里只广播一次"""
+        file_ids = list(payload.get("file_ids") or [])
+        logger.info(f"PDF文件批量删除事件: {len(file_ids)} 个")
+        for file_id in file_ids:
+            self.page_transfer.clear_cache(file_id)
+        message = StandardMessageHandler.build_base_message(
+            MessageType.SYSTEM_STATUS_UPDATED,
+            data={
+                "event": "files_removed",
+                "topic": LIBRARY_TOPIC,
+                "file_ids": file_ids,
+                "file_count": payload.get("file_count", self.pdf_manager.get_file_count()),
+            }
+        )
+        self.broadcast_message(message, topic=LIBRARY_TOPIC)
+
+    def on_pdf_record_updated(self, file_id: str) -> bool:
+        """向 library 订阅者推送单条记录的最新内容；记录不可用时返回 False"""
+        record = None
+        if hasattr(self, "pdf_library_api") and self.pdf_library_api and hasattr(self.pdf_library_api, "get_record"):
+            try:
+                record = self.pdf_library_api.get_record(file_id)
+            except Exception as exc:
+                logger.error("读取更新后的记录失败: %s", exc)
+        if not record:
+            return False
+        message = StandardMessageHandler.build_base_message(
+            MessageType.SYSTEM_STATUS_UPDATED,
+            data={
+                "event": "record_updated",
+                "topic": LIBRARY_TOPIC,
+                "file_id": file_id,
+                "record": record,
+            }
+        )
+        self.broadcast_message(message, topic=LIBRARY_TOPIC)
+        return True
+
     def on_pdf_list_changed(self):
-        """处理PDF列表变更事件"""
+        """处理PDF列表变更事件（无法定位单条记录时的回退：推送完整列表）"""
         logger.info("PDF列表变更事件")
-        # 广播列表更新消息，让所有客户端重新获取列表
+        # 仅推送给 library 订阅者，让其重新加载列表
         try:
             if hasattr(self, "pdf_library_api") and self.pdf_library_api:
                 files = self.pdf_library_api.list_records()
@@ -2168,19 +3110,21 @@ class StandardWebSocketServer(QObject):
                 request_id=None,
                 files=files
             )
-            self.broadcast_message(message)
+            self.broadcast_message(message, topic=LIBRARY_TOPIC)
             logger.info(f"已广播PDF列表更新消息，共 {len(files)} 个文件")
         except Exception as e:
             logger.error(f"广播列表更新失败: {e}")
     
-    def send_message(self, client: QWebSocket, message: Dict[str, Any]) -> bool:
-        """发送消息给指定客户端"""
+    def send_message(self, client: QWebSocket, message: Dict[str, Any], *, merge_key: Optional[str] = None) -> bool:
+        """发送消息给指定客户端（经出站队列；merge_key 相同的待发消息只保留最新）"""
         try:
-            json_message = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+            payload = self.encode_for_client(client, message)
             
             if client.state() == QAbstractSocket.SocketState.ConnectedState:
-                client.sendTextMessage(json_message)
-                logger.info(f"向客户端 {client.peerPort()} 发送消息: {message.get('type')}")
+                if not self.outbound.send(client, payload, merge_key=merge_key):
+                    return False
+                logger.info("向客户端 %s 发送消息: %s", client.peerPort(), message.get('type'),
+                            extra=category(CATEGORY_WS_MESSAGE))
                 return True
             else:
                 logger.warning(f"客户端 {client.peerPort()} 未连接，无法发送消息")
@@ -2190,29 +3134,233 @@ class StandardWebSocketServer(QObject):
             logger.error(f"发送消息失败: {e}")
             return False
     
-    def broadcast_message(self, message: Dict[str, Any]):
-        """广播消息给所有客户端"""
+    def broadcast_message(self, message: Dict[str, Any], topic: Optional[str] = None) -> int:
+        """广播消息；指定 topic 时只发送给该主题的订阅者
+
+        library 主题额外包含从未订阅过任何主题的旧客户端。返回成功发送的客户端数；
+        在工作线程中调用时排队回 Qt 线程发送并返回 0。
+        """
         if not isinstance(message, dict):
-            return
-        
+            return 0
+        if threading.get_ident() != self._owner_thread_id:
+            self._post(self.broadcast_message, message, topic)
+            return 0
+
+        if topic is None:
+            targets = list(self.clients)
+        else:
+            targets = [c for c in self.subscriptions.subscribers(topic) if c in self.clients]
+            if topic == LIBRARY_TOPIC:
+                targets.extend(
+                    c for c in self.clients
+                    if not self.subscriptions.has_subscribed(c) and c not in targets
+                )
+        if not targets:
+            logger.debug("主题 %s 无订阅者，跳过推送", topic)
+            return 0
+
         json_message = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
-        
-        valid_clients = []
+        merge_key, merge = self._outbound_merge_rule(message, topic)
+        # 同一编码配置的客户端共用一次编码（压缩）结果
+        encoded: Dict[tuple, Any] = {}
         sent_count = 0
-        
-        for client in self.clients:
+        for client in targets:
             if client.state() == QAbstractSocket.SocketState.ConnectedState:
                 try:
-                    client.sendTextMessage(json_message)
-                    valid_clients.append(client)
-                    sent_count += 1
+                    codec = self.codec_for(client)
+                    if codec.key not in encoded:
+                        encoded[codec.key] = codec.encode(json_message, message)
+                    if self.outbound.send(client, encoded[codec.key], merge_key=merge_key, message=message, merge=merge):
+                        sent_count += 1
                 except Exception as e:
                     logger.error(f"广播消息失败: {e}")
             else:
                 logger.warning(f"客户端已断开，从列表中移除")
-        
-        self.clients = valid_clients
-        logger.info(f"广播消息完成：成功发送给 {sent_count}/{len(self.clients)} 个客户端")
+                self.subscriptions.remove_client(client)
+                self.outbound.remove(client)
+                if client in self.clients:
+                    self.clients.remove(client)
+
+        logger.info("广播消息完成（主题: %s）：成功发送给 %s/%s 个客户端", topic or '*', sent_count, len(targets),
+                    extra=category(CATEGORY_WS_MESSAGE))
+        return sent_count
+
+    @staticmethod
+    def _outbound_merge_rule(message: Dict[str, Any], topic: Optional[str]):
+        """可合并推送的 (merge_key, merge)：同一客户端尚未发出的同键消息只保留最新状态"""
+        data = message.get("data") if isinstance(message.get("data"), dict) else {}
+        message_type = message.get("type")
+        if message_type == MessageType.SUBSCRIPTION_DELTA_UPDATED.value and topic:
+            return f"delta:{topic}", _merge_topic_delta
+        if data.get("event") == "record_updated" and data.get("file_id"):
+            return f"library:record:{data['file_id']}", None
+        if message_type == MessageType.PDF_LIBRARY_LIST_COMPLETED.value and topic == LIBRARY_TOPIC:
+            return "library:list", None
+        return None, None
+
+    def _evict_slow_consumer(self, client: Any, reason: str) -> None:
+        """出站队列超限：立即断开（停滞的对端不会完成关闭握手）"""
+        abort = getattr(client, "abort", None)
+        if callable(abort):
+            abort()
+        else:
+            client.close()
+
+    # ---------------- 主题订阅 ----------------
+    def _parse_topics(self, data: Dict[str, Any]) -> List[Any]:
+        topics = (data or {}).get("topics")
+        if topics is None and (data or {}).get("topic") is not None:
+            topics = [data.get("topic")]
+        if isinstance(topics, str):
+            topics = [topics]
+        return list(topics) if isinstance(topics, list) else []
+
+    def handle_subscribe_request(self, request_id: Optional[str], data: Dict[str, Any], client: Optional[QWebSocket]) -> Dict[str, Any]:
+        topics = self._parse_topics(data)
+        if client is None or not topics:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                "缺少 topics 参数" if client is not None else "订阅需要客户端连接",
+                message_type=MessageType.SUBSCRIPTION_SUBSCRIBE_FAILED,
+                code=400,
+            )
+        accepted, rejected = self.subscriptions.subscribe(client, topics)
+        if not accepted:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_TOPIC",
+                f"无效的主题: {rejected}",
+                message_type=MessageType.SUBSCRIPTION_SUBSCRIBE_FAILED,
+                code=400,
+            )
+        return StandardMessageHandler.build_response(
+            MessageType.SUBSCRIPTION_SUBSCRIBE_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message=f"已订阅 {len(accepted)} 个主题",
+            data={"subscribed": accepted, "rejected": rejected, "topics": self.subscriptions.topics_of(client)},
+        )
+
+    def handle_unsubscribe_request(self, request_id: Optional[str], data: Dict[str, Any], client: Optional[QWebSocket]) -> Dict[str, Any]:
+        if client is None:
+            return StandardMessageHandler.build_error_response(
+                request_id or "unknown",
+                "INVALID_REQUEST",
+                "退订需要客户端连接",
+                message_type=MessageType.SUBSCRIPTION_UNSUBSCRIBE_FAILED,
+                code=400,
+            )
+        topics = self._parse_topics(data)
+        # 未指定 topics 时退订全部
+        removed = self.subscriptions.unsubscribe(client, topics or None)
+        return StandardMessageHandler.build_response(
+            MessageType.SUBSCRIPTION_UNSUBSCRIBE_COMPLETED,
+            request_id or StandardMessageHandler.generate_request_id(),
+            status="success",
+            code=200,
+            message=f"已退订 {len(removed)} 个主题",
+            data={"unsubscribed": removed, "topics": self.subscriptions.topics_of(client)},
+        )
+
+    def _register_change_listeners(self) -> None:
+        """监听标注/书签插件事件，转换为 pdf:<uuid>:<kind> 主题增量"""
+        event_bus = getattr(self.pdf_library_api, "event_bus", None) if self.pdf_library_api else None
+        if event_bus is None:
+            return
+        subscriber_id = f"standard-server-topics-{id(self)}"
+        for table, kind in (("pdf-annotation", "annotations"), ("pdf-bookmark", "bookmarks")):
+            for action in ("create", "update", "delete"):
+                def handler(data: Any, _kind: str = kind, _action: str = action) -> None:
+                    self._on_child_changed(_kind, _action, data)
+                event_name = f"table:{table}:{action}:completed"
+                event_bus.on(event_name, handler, subscriber_id)
+                self._change_subscriptions.append((event_bus, event_name, handler, subscriber_id))
+
+    def _unregister_change_listeners(self) -> None:
+        for event_bus, event_name, handler, subscriber_id in self._change_subscriptions:
+            try:
+                event_bus.off(event_name, handler, subscriber_id)
+            except Exception:  # pragma: no cover - defensive
+                pass
+        self._change_subscriptions = []
+
+    def _on_child_changed(self, kind: str, action: str, data: Any) -> None:
+        if not isinstance(data, dict):
+            return
+        # 没有任何连接订阅该类主题时不做额外查询
+        if not any(topic.endswith(f":{kind}") for topic in self.subscriptions.stats()):
+            return
+        id_key = "ann_id" if kind == "annotations" else "bookmark_id"
+        row_id = data.get(id_key)
+        pdf_uuid = data.get("pdf_uuid")
+        if not pdf_uuid:
+            return
+
+        if data.get("previous_pdf_uuid"):
+            self._queue_delta(pdf_topic(data["previous_pdf_uuid"], kind), {"op": "delete", "id": row_id})
+        topic = pdf_topic(pdf_uuid, kind)
+        if not self.subscriptions.subscribers(topic):
+            return
+        if not row_id:
+            # delete_by_pdf：整批清空，订阅方整体重载
+            self._queue_delta(topic, {"op": "reset", "count": data.get("count")})
+        elif action == "delete":
+            self._queue_delta(topic, {"op": "delete", "id": row_id})
+        else:
+            self._queue_delta(topic, {"op": "upsert", "id": row_id})
+
+    def _queue_delta(self, topic: str, change: Dict[str, Any]) -> None:
+        if not self.subscriptions.subscribers(topic):
+            return
+        with self._delta_lock:
+            pending = self._pending_deltas.setdefault(topic, {})
+            key = change.get("id") or "__reset__"
+            if change["op"] == "reset":
+                pending.clear()
+            pending.pop(key, None)
+            pending[key] = change
+            # 工作线程产生的变更由消息完成回调推送；其余（如后台任务）在下一轮事件循环统一推送
+            schedule = not self._delta_flush_scheduled and threading.get_ident() == self._owner_thread_id
+            if schedule:
+                self._delta_flush_scheduled = True
+        if schedule:
+            self._defer(self.flush_topic_deltas)
+
+    def _delta_record(self, kind: str, row_id: str) -> Optional[Dict[str, Any]]:
+        api = self.pdf_library_api
+        if kind == "annotations":
+            row = api._annotation_plugin.query_by_id(row_id)
+            return self._annotation_to_frontend(row) if row else None
+        return api._bookmark_plugin.query_by_id(row_id)
+
+    def flush_topic_deltas(self) -> int:
+        """把合并后的子表增量推送给各主题订阅者，返回推送的消息数"""
+        with self._delta_lock:
+            self._delta_flush_scheduled = False
+            pending, self._pending_deltas = self._pending_deltas, {}
+        pushed = 0
+        for topic, changes in pending.items():
+            kind = topic.rsplit(":", 1)[-1]
+            items: List[Dict[str, Any]] = []
+            for change in changes.values():
+                if change["op"] == "upsert":
+                    try:
+                        record = self._delta_record(kind, change["id"])
+                    except Exception as exc:
+                        logger.error("读取增量记录失败: %s", exc)
+                        record = None
+                    # 合并窗口内被删除的行按删除推送
+                    change = dict(change, record=record) if record else {"op": "delete", "id": change["id"]}
+                items.append(change)
+            message = StandardMessageHandler.build_base_message(
+                MessageType.SUBSCRIPTION_DELTA_UPDATED,
+                data={"topic": topic, "changes": items},
+            )
+            if self.broadcast_message(message, topic=topic):
+                pushed += 1
+        return pushed
     
     def get_client_count(self):
         """获取当前连接的客户端数量"""
@@ -2226,6 +3374,8 @@ def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="Standard WebSocket Server")
     parser.add_argument("--port", type=int, help="Port to run the server on")
+    parser.add_argument("--workers", type=int, default=4, help="Max concurrent blocking handlers (0 = run on the Qt thread)")
+    parser.add_argument("--db", help="Database file path (defaults to data/anki_linkmaster.db)")
     args = parser.parse_args()
 
     # 必须先创建 QCoreApplication 实例
@@ -2234,7 +3384,7 @@ def main():
     setup_logging()
     port = get_port(args.port)
 
-    server = StandardWebSocketServer(port=port, app=app)
+    server = StandardWebSocketServer(port=port, app=app, max_workers=args.workers, db_path=args.db)
     if server.start():
         logger.info("Starting Qt event loop.")
         sys.exit(app.exec())
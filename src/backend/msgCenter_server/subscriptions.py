@@ -0,0 +1,90 @@
+"""
+主题订阅注册表
+
+客户端通过 subscription:subscribe / subscription:unsubscribe 声明关心的主题，
+服务器只把事件推送给对应主题的订阅者，避免每次变更唤醒所有连接。
+
+主题:
+- library: PDF 库记录的增删改（pdf-home 列表）
+- pdf:<uuid>:annotations: 某个 PDF 的标注变更
+- pdf:<uuid>:bookmarks: 某个 PDF 的书签变更
+
+兼容：从未发送过订阅请求的客户端视为旧客户端，仍会收到 library 主题的事件；
+一旦订阅过（哪怕随后全部退订），就只收到已订阅主题的事件。
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+LIBRARY_TOPIC = "library"
+
+_TOPIC_PATTERN = re.compile(r"^(library|pdf:[A-Za-z0-9_-]{1,64}:(annotations|bookmarks))$")
+
+
+def pdf_topic(pdf_uuid: str, kind: str) -> str:
+    """构造 PDF 级主题名，kind 为 annotations / bookmarks"""
+    return f"pdf:{pdf_uuid}:{kind}"
+
+
+class TopicSubscriptions:
+    """客户端 ↔ 主题的双向索引（订阅变更在 Qt 线程，工作线程中的子表事件只读查询）"""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[Any]] = {}
+        self._topics: Dict[Any, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def is_valid(topic: Any) -> bool:
+        return isinstance(topic, str) and bool(_TOPIC_PATTERN.match(topic))
+
+    def subscribe(self, client: Any, topics: Iterable[Any]) -> Tuple[List[str], List[Any]]:
+        """订阅主题，返回 (已订阅, 被拒绝的非法主题)"""
+        accepted: List[str] = []
+        rejected: List[Any] = []
+        with self._lock:
+            owned = self._topics.setdefault(client, set())
+            for topic in topics:
+                if not self.is_valid(topic):
+                    rejected.append(topic)
+                    continue
+                owned.add(topic)
+                self._subscribers.setdefault(topic, set()).add(client)
+                accepted.append(topic)
+        return accepted, rejected
+
+    def unsubscribe(self, client: Any, topics: Optional[Iterable[str]] = None) -> List[str]:
+        """退订指定主题（None 表示全部），返回实际退订的主题"""
+        with self._lock:
+            owned = self._topics.setdefault(client, set())
+            targets = list(owned) if topics is None else [t for t in topics if t in owned]
+            for topic in targets:
+                owned.discard(topic)
+                members = self._subscribers.get(topic)
+                if members is not None:
+                    members.discard(client)
+                    if not members:
+                        del self._subscribers[topic]
+        return targets
+
+    def remove_client(self, client: Any) -> None:
+        """连接断开时清理该客户端的全部订阅"""
+        with self._lock:
+            self.unsubscribe(client)
+            self._topics.pop(client, None)
+
+    def has_subscribed(self, client: Any) -> bool:
+        return client in self._topics
+
+    def topics_of(self, client: Any) -> List[str]:
+        with self._lock:
+            return sorted(self._topics.get(client, ()))
+
+    def subscribers(self, topic: str) -> List[Any]:
+        with self._lock:
+            return list(self._subscribers.get(topic, ()))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {topic: len(members) for topic, members in self._subscribers.items()}
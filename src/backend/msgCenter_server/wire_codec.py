@@ -0,0 +1,145 @@
+"""
+线路编码协商
+
+默认所有消息以 JSON 文本帧收发。客户端可经 system:encoding:requested 为自己的连接
+协商更紧凑的编码，之后服务器发往该连接的消息按协商结果编码：
+
+- json：文本帧（默认）
+- deflate：超过阈值（按字符数）的消息以 zlib 压缩后走二进制帧，较小的消息仍为文本帧；
+  浏览器端可用原生 DecompressionStream('deflate') 解码，无需额外依赖
+- msgpack：所有消息以 MessagePack 走二进制帧（需安装可选依赖 msgpack）
+
+入站二进制帧按同一连接的编码解码；文本帧始终按 JSON 解析。
+"""
+
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:  # 可选依赖：未安装时不提供 msgpack 编码
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - 取决于运行环境
+    msgpack = None
+
+CODEC_JSON = "json"
+CODEC_DEFLATE = "deflate"
+CODEC_MSGPACK = "msgpack"
+
+DEFAULT_COMPRESS_THRESHOLD = 8 * 1024
+MIN_COMPRESS_THRESHOLD = 256
+DEFAULT_COMPRESS_LEVEL = 6
+# 入站解压上限，防止压缩炸弹
+DEFAULT_MAX_DECODED_BYTES = 64 * 1024 * 1024
+
+Payload = Union[str, bytes]
+
+
+class CodecError(ValueError):
+    """二进制帧无法按协商的编码解码"""
+
+
+def available_codecs() -> List[str]:
+    """当前环境可协商的编码"""
+    codecs = [CODEC_JSON, CODEC_DEFLATE]
+    if msgpack is not None:
+        codecs.append(CODEC_MSGPACK)
+    return codecs
+
+
+def negotiate(requested: Union[str, Sequence[str], None]) -> Optional[str]:
+    """按客户端偏好顺序选出第一个可用编码；均不可用时返回 None"""
+    if requested is None:
+        return CODEC_JSON
+    candidates = [requested] if isinstance(requested, str) else list(requested)
+    available = available_codecs()
+    for name in candidates:
+        if isinstance(name, str) and name.lower() in available:
+            return name.lower()
+    return None
+
+
+def dumps(message: Dict[str, Any]) -> str:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class WireCodec:
+    """
+    一个连接的消息编码
+
+    Example:
+        >>> codec = WireCodec(CODEC_DEFLATE, threshold=4096)
+        >>> payload = codec.encode(dumps(message), message)  # str 走文本帧，bytes 走二进制帧
+        >>> codec.decode(payload_bytes)
+    """
+
+    __slots__ = ("name", "threshold", "level", "max_decoded_bytes")
+
+    def __init__(
+        self,
+        name: str = CODEC_JSON,
+        *,
+        threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        level: int = DEFAULT_COMPRESS_LEVEL,
+        max_decoded_bytes: int = DEFAULT_MAX_DECODED_BYTES,
+    ) -> None:
+        if name not in available_codecs():
+            raise CodecError(f"不支持的编码: {name}")
+        self.name = name
+        self.threshold = max(int(threshold), MIN_COMPRESS_THRESHOLD)
+        self.level = int(level)
+        self.max_decoded_bytes = int(max_decoded_bytes)
+
+    @property
+    def key(self) -> tuple:
+        """编码结果只取决于 (name, threshold, level)，广播时按此键复用编码结果"""
+        return (self.name, self.threshold, self.level)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "codec": self.name,
+            "threshold": self.threshold if self.name == CODEC_DEFLATE else None,
+            "binary": self.name != CODEC_JSON,
+        }
+
+    def encode(self, text: str, message: Optional[Dict[str, Any]] = None) -> Payload:
+        """
+        编码一条消息
+
+        Args:
+            text: 消息的 JSON 文本（json/deflate 直接使用）
+            message: 原始消息字典（msgpack 使用；缺省时由 text 解析）
+
+        Returns:
+            str 以文本帧发送；bytes 以二进制帧发送
+        """
+        if self.name == CODEC_DEFLATE:
+            if len(text) < self.threshold:
+                return text
+            return zlib.compress(text.encode("utf-8"), self.level)
+        if self.name == CODEC_MSGPACK:
+            return msgpack.packb(message if message is not None else json.loads(text), use_bin_type=True)
+        return text
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        """解码一条二进制帧消息"""
+        try:
+            if self.name == CODEC_MSGPACK:
+                message = msgpack.unpackb(payload, raw=False)
+            elif self.name == CODEC_DEFLATE:
+                inflater = zlib.decompressobj()
+                raw = inflater.decompress(payload, self.max_decoded_bytes)
+                if inflater.unconsumed_tail:
+                    raise CodecError(f"解压后超过 {self.max_decoded_bytes} 字节")
+                message = json.loads(raw.decode("utf-8"))
+            else:
+                message = json.loads(payload.decode("utf-8"))
+        except CodecError:
+            raise
+        except Exception as exc:
+            raise CodecError(f"{self.name} 解码失败: {exc}") from exc
+        if not isinstance(message, dict):
+            raise CodecError("消息必须是对象")
+        return message
+
+
+JSON_CODEC = WireCodec(CODEC_JSON)
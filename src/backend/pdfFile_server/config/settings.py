@@ -27,6 +27,10 @@ else:
 
 # 数据目录始终指向仓库根的 data/pdfs
 DEFAULT_DATA_DIR = REPO_ROOT / "data" / "pdfs"
+# 截图 blob 目录（内容寻址：<md5>.<ext>，由标注插件维护引用计数与回收）
+DEFAULT_SCREENSHOT_DIR = REPO_ROOT / "data" / "screenshots"
+# storage-fs 能力的文件根目录（只读暴露，支持 Range 分段读取）
+DEFAULT_FS_DIR = REPO_ROOT / "data" / "fs"
 DEFAULT_LOG_DIR = PROJECT_ROOT / "logs"  # 日志可以放在 dist/latest/logs 或 <repo>/logs
 
 # 动态探测 dist 根目录（显式 UTF-8 无关，此处仅路径判断）：
@@ -65,6 +69,11 @@ CORS_HEADERS = ['Content-Type', 'Range']
 # 路由配置
 HEALTH_CHECK_PATH = '/health'
 PDF_BASE_PATH = '/pdfs/'
+SCREENSHOT_BASE_PATH = '/data/screenshots/'
+FS_BASE_PATH = '/fs/'
+
+# 截图按内容寻址，文件内容永不变化，可长期缓存
+SCREENSHOT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 
 # MIME类型配置
 PDF_MIME_TYPE = 'application/pdf'
@@ -6,15 +6,20 @@ PDF文件HTTP请求处理器
 """
 
 import http.server
+import logging
 import os
+import re
 import mimetypes
 from pathlib import Path
 from ..config.settings import (
     HEALTH_CHECK_PATH, PDF_BASE_PATH, CORS_ENABLED,
     CORS_ORIGINS, CORS_METHODS, CORS_HEADERS,
-    DEFAULT_DATA_DIR, DEFAULT_DIST_DIR, STATIC_ROUTE_PREFIXES, SERVER_NAME
+    DEFAULT_DATA_DIR, DEFAULT_DIST_DIR, STATIC_ROUTE_PREFIXES, SERVER_NAME,
+    DEFAULT_SCREENSHOT_DIR, SCREENSHOT_BASE_PATH, SCREENSHOT_CACHE_CONTROL,
+    DEFAULT_FS_DIR, FS_BASE_PATH
 )
 from ..utils.logging_config import get_logger
+from src.backend.logging.async_logging import CATEGORY_HTTP_ACCESS, category
 
 
 class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
@@ -27,10 +32,16 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
     - Range请求支持（继承自SimpleHTTPRequestHandler）
     - 健康检查端点
     - 预检请求处理
+    - 截图 blob 访问（内容寻址，带缓存头）
+    - storage-fs 文件的 Range 分段读取
     """
 
     # 类级别的基础目录设置
     base_dir = DEFAULT_DATA_DIR
+    screenshot_dir = DEFAULT_SCREENSHOT_DIR
+    fs_dir = DEFAULT_FS_DIR
+
+    _SCREENSHOT_NAME_PATTERN = re.compile(r'^([a-f0-9]{32})\.(png|jpg|webp|gif)$')
 
     def __init__(self, *args, **kwargs):
         """
@@ -54,6 +65,26 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
         """
         cls.base_dir = Path(directory)
 
+    @classmethod
+    def set_screenshot_directory(cls, directory):
+        """
+        设置截图 blob 目录
+
+        Args:
+            directory (str|Path): 截图目录路径
+        """
+        cls.screenshot_dir = Path(directory)
+
+    @classmethod
+    def set_fs_directory(cls, directory):
+        """
+        设置 storage-fs 文件根目录
+
+        Args:
+            directory (str|Path): 目录路径
+        """
+        cls.fs_dir = Path(directory)
+
     def do_OPTIONS(self):
         """
         处理HTTP OPTIONS预检请求
@@ -72,10 +103,12 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
         根据请求路径分发到不同的处理方法：
         - /health: 健康检查
         - /pdfs/: PDF文件访问
+        - /data/screenshots/: 截图 blob 访问
+        - /fs/: storage-fs 文件访问（支持 Range）
         - 其他: 404错误
         """
         try:
-            self.logger.info(f"[GET] {self.path}")
+            self.logger.info("[GET] %s", self.path, extra=category(CATEGORY_HTTP_ACCESS))
         except Exception:
             pass
 
@@ -90,6 +123,10 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
             self.handle_health_check()
         elif self.path.startswith(PDF_BASE_PATH):
             self.handle_pdf_request()
+        elif self.path.startswith(SCREENSHOT_BASE_PATH):
+            self.handle_screenshot_request()
+        elif self.path.startswith(FS_BASE_PATH):
+            self.handle_fs_request()
         elif self.path.startswith("/pdf-files/"):
             # 兼容前端使用 /pdf-files/ 路径的请求（Vite dev proxy 使用）
             self.handle_pdf_request_alternative()
@@ -136,6 +173,136 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
             self.logger.error(f"错误堆栈: {error_traceback}")
             self.send_error(500, "Internal Server Error")
 
+    def handle_screenshot_request(self):
+        """
+        处理截图 blob 请求
+
+        文件名即内容哈希，以哈希作为强 ETag，命中 If-None-Match 时返回 304；
+        响应附带长期缓存头，前端按需懒加载图片。
+        """
+        name = self.path[len(SCREENSHOT_BASE_PATH):].split('?', 1)[0]
+        match = self._SCREENSHOT_NAME_PATTERN.match(name)
+        if not match:
+            self.send_error(404, "Not Found")
+            return
+
+        file_path = Path(self.screenshot_dir) / name
+        if not file_path.is_file():
+            self.send_error(404, "Not Found")
+            return
+
+        etag = f'"{match.group(1)}"'
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', SCREENSHOT_CACHE_CONTROL)
+            self.end_headers()
+            return
+
+        self.send_file_with_range(file_path, {
+            'ETag': etag,
+            'Cache-Control': SCREENSHOT_CACHE_CONTROL,
+        })
+
+    def handle_fs_request(self):
+        """
+        处理 storage-fs 文件读取请求
+
+        作为 storage-fs:read 分块消息的 HTTP 替代通道，支持 Range 分段读取。
+        """
+        import urllib.parse as _url
+        rel = _url.unquote(_url.urlsplit(self.path).path[len(FS_BASE_PATH):])
+        base = Path(self.fs_dir).resolve()
+        try:
+            file_path = (base / rel).resolve()
+            file_path.relative_to(base)
+        except (ValueError, OSError):
+            self.send_error(403, "Forbidden")
+            return
+        if not rel or not file_path.is_file():
+            self.send_error(404, "Not Found")
+            return
+        self.send_file_with_range(file_path, {'Cache-Control': 'no-cache'})
+
+    def send_file_with_range(self, file_path, extra_headers=None):
+        """
+        发送文件内容，支持单段 Range 请求（bytes=start-end / start- / -suffix）
+
+        Args:
+            file_path (Path): 文件路径
+            extra_headers (dict): 额外响应头
+        """
+        try:
+            with open(file_path, 'rb') as fh:
+                fs = os.fstat(fh.fileno())
+                size = fs.st_size
+                byte_range = self._parse_range(self.headers.get('Range'), size)
+                if byte_range is False:
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{size}')
+                    self.end_headers()
+                    return
+
+                if byte_range is None:
+                    start, end = 0, size - 1
+                    self.send_response(200)
+                else:
+                    start, end = byte_range
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                length = max(0, end - start + 1)
+                self.send_header('Content-Type', self.guess_type(str(file_path)))
+                self.send_header('Content-Length', str(length))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Last-Modified', self.date_time_string(fs.st_mtime))
+                self.send_header('Access-Control-Expose-Headers', 'Content-Range, Content-Length, Accept-Ranges, ETag')
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+
+                fh.seek(start)
+                remaining = length
+                while remaining > 0:
+                    block = fh.read(min(64 * 1024, remaining))
+                    if not block:
+                        break
+                    self.wfile.write(block)
+                    remaining -= len(block)
+        except OSError as e:
+            self.logger.error(f"读取文件失败: {file_path}: {e}")
+            self.send_error(500, "Internal Server Error")
+
+    @staticmethod
+    def _parse_range(header, size):
+        """
+        解析 Range 头
+
+        Returns:
+            None: 无 Range 或不支持的格式（多段），按完整内容返回
+            False: 范围不可满足（416）
+            tuple: (start, end) 闭区间
+        """
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None
+        spec = header[len('bytes='):].strip()
+        start_s, sep, end_s = spec.partition('-')
+        if not sep:
+            return None
+        try:
+            if start_s == '':
+                suffix = int(end_s)
+                if suffix <= 0:
+                    return False
+                return (max(0, size - suffix), size - 1) if size else False
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return False
+        return start, min(end, size - 1)
+
     def handle_pdf_request_alternative(self):
         """
         处理 /pdf-files/ 路径的PDF文件请求（Vite代理使用）
@@ -192,7 +359,8 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
 
             # 记录映射后的目录与路径，便于调试
             try:
-                self.logger.info(f"[STATIC] directory={self.directory} path={self.path}")
+                self.logger.info("[STATIC] directory=%s path=%s", self.directory, self.path,
+                                 extra=category(CATEGORY_HTTP_ACCESS))
             except Exception:
                 pass
 
@@ -251,7 +419,9 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
             format (str): 日志格式字符串
             *args: 格式化参数
         """
-        message = format % args
+        # 访问日志按 http.access 类别采样，消息在通过级别与采样过滤后才格式化
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         # 安全获取客户端地址，避免解包错误
         try:
             client_address = self.address_string()
@@ -261,7 +431,7 @@ class PDFFileHandler(http.server.SimpleHTTPRequestHandler):
                 client_address = f"{self.client_address[0]}:{self.client_address[1]}"
             except (AttributeError, IndexError, TypeError):
                 client_address = "unknown"
-        self.logger.info(f"[{client_address}] {message}")
+        self.logger.info("[%s] " + format, client_address, *args, extra=category(CATEGORY_HTTP_ACCESS))
 
     def guess_type(self, path):
         """
@@ -2,11 +2,14 @@
 PDF文件服务器日志配置工具
 
 提供统一的日志配置功能，支持文件和控制台输出。
-遵循项目的UTF-8编码和覆盖模式要求。
+遵循项目的UTF-8编码和覆盖模式要求；实际配置由 src.backend.logging.async_logging 完成
+（QueueHandler/QueueListener 异步写入、JSON Lines 文件格式、按类别采样）。
 """
 
 import logging
 from pathlib import Path
+
+from src.backend.logging.async_logging import configure_logging
 from ..config.settings import (
     LOG_LEVEL, LOG_FORMAT, LOG_ENCODING,
     LOG_FILE_MODE, DEFAULT_LOG_DIR
@@ -38,37 +41,22 @@ def setup_logging(log_file_path=None, console_output=True, log_level=None):
     if log_level is None:
         log_level = LOG_LEVEL
 
-    # 配置根日志记录器
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level.upper()))
-
-    # 清除现有的处理器
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-
-    # 创建格式化器
-    formatter = logging.Formatter(LOG_FORMAT)
-
-    # 添加文件处理器
-    file_handler = logging.FileHandler(
-        log_file_path,
-        mode=LOG_FILE_MODE,
-        encoding=LOG_ENCODING
+    # 根日志记录器经队列异步输出：文件为 JSON Lines，控制台为 LOG_FORMAT 文本；
+    # 访问日志等高频类别按采样率记录
+    configure_logging(
+        str(log_file_path),
+        level=log_level,
+        console=console_output,
+        file_mode=LOG_FILE_MODE,
+        encoding=LOG_ENCODING,
+        text_format=LOG_FORMAT,
     )
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
-
-    # 添加控制台处理器
-    if console_output:
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
 
     # 获取模块特定的日志记录器
     logger = logging.getLogger('pdfFile_server')
     logger.info("日志系统初始化完成")
-    logger.info(f"日志文件: {log_file_path}")
-    logger.info(f"日志级别: {log_level}")
+    logger.info("日志文件: %s", log_file_path)
+    logger.info("日志级别: %s", log_level)
 
     return logger
 
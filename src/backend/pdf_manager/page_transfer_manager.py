@@ -0,0 +1,440 @@
+"""
+PDF 页面传输服务
+
+pdf-page:load / preload / cache-clear 消息的后端实现：
+
+- 把 PDF 拆成单页 PDF 字节（每页一个独立的 PDF 文档），前端可逐页交给 PDF.js 渲染
+- 页面字节缓存在按文件分组的 LRU 中：总字节数与单文件字节数各有上限，
+  超出时先淘汰最久未使用的页面；文件 mtime/大小变化后旧缓存自动失效
+- 预加载请求按优先级（high/normal/low）进入优先级队列，由后台线程提取并写入缓存；
+  cache-clear 会取消该文件尚未执行的预加载
+- 传输编码：zlib_base64（zlib 压缩后 base64）与 none/raw（未压缩字节的 base64）
+
+拆页依赖可选的 pypdf（Anki 插件环境不保证安装）；未安装时请求返回 EXTRACTION_UNAVAILABLE。
+"""
+
+import base64
+import heapq
+import io
+import itertools
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:  # 可选依赖
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pragma: no cover - 取决于运行环境
+    PdfReader = None
+    PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_ZLIB_BASE64 = "zlib_base64"
+COMPRESSION_NONE = "none"
+# 旧客户端使用的别名
+COMPRESSION_ALIASES = {"raw": COMPRESSION_NONE, "base64": COMPRESSION_NONE}
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_FILE_BYTES = 32 * 1024 * 1024
+DEFAULT_PRELOAD_WORKERS = 2
+DEFAULT_MAX_PRELOAD_PAGES = 50
+# 同时保持解析状态的文档数（PdfReader 会把整个文件读入内存）
+DEFAULT_MAX_OPEN_DOCUMENTS = 2
+
+
+class PageTransferError(Exception):
+    """页面传输错误；code 为协议中的错误类型，status 为响应码"""
+
+    def __init__(self, code: str, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def normalize_compression(compression: Optional[str]) -> str:
+    value = (compression or COMPRESSION_ZLIB_BASE64).lower()
+    value = COMPRESSION_ALIASES.get(value, value)
+    if value not in (COMPRESSION_ZLIB_BASE64, COMPRESSION_NONE):
+        raise PageTransferError("UNSUPPORTED_COMPRESSION", f"不支持的压缩方式: {compression}")
+    return value
+
+
+def extraction_available() -> bool:
+    return PdfReader is not None
+
+
+class _Document:
+    """已解析的 PDF（按文件签名区分版本）"""
+
+    __slots__ = ("signature", "reader", "lock")
+
+    def __init__(self, signature: Tuple[str, int, int], reader: Any) -> None:
+        self.signature = signature
+        self.reader = reader
+        self.lock = threading.Lock()
+
+
+class _CachedPage:
+    __slots__ = ("raw", "deflated", "width", "height", "total_pages")
+
+    def __init__(self, raw: bytes, width: float, height: float, total_pages: int) -> None:
+        self.raw = raw
+        self.deflated: Optional[bytes] = None
+        self.width = width
+        self.height = height
+        self.total_pages = total_pages
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + (len(self.deflated) if self.deflated is not None else 0)
+
+
+class PageTransferManager:
+    """
+    单页提取 + 按文件的 LRU 缓存 + 优先级预加载
+
+    Example:
+        >>> manager = PageTransferManager(resolve_path=lambda file_id: f"data/pdfs/{file_id}.pdf")
+        >>> page = manager.get_page("abc123def456", 1, "zlib_base64")
+        >>> manager.preload_pages("abc123def456", 2, 5, "high")
+        {'queued': 4, 'cached': 0, 'total_pages': 12}
+        >>> manager.close()
+    """
+
+    def __init__(
+        self,
+        resolve_path: Callable[[str], Optional[str]],
+        *,
+        max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        preload_workers: int = DEFAULT_PRELOAD_WORKERS,
+        max_preload_pages: int = DEFAULT_MAX_PRELOAD_PAGES,
+        max_open_documents: int = DEFAULT_MAX_OPEN_DOCUMENTS,
+        compress_level: int = 6,
+    ) -> None:
+        self._resolve_path = resolve_path
+        self.max_cache_bytes = int(max_cache_bytes)
+        self.max_file_bytes = min(int(max_file_bytes), self.max_cache_bytes)
+        self.preload_workers = max(int(preload_workers), 0)
+        self.max_preload_pages = max(int(max_preload_pages), 1)
+        self.max_open_documents = max(int(max_open_documents), 1)
+        self.compress_level = compress_level
+
+        self._lock = threading.Lock()
+        # file_id -> OrderedDict[page_number, _CachedPage]（每个文件内部按最近使用排序）
+        self._pages: Dict[str, "OrderedDict[int, _CachedPage]"] = {}
+        # 文件级最近使用顺序，总字节超限时从最久未用的文件淘汰
+        self._file_order: "OrderedDict[str, None]" = OrderedDict()
+        self._file_bytes: Dict[str, int] = {}
+        self._signatures: Dict[str, Tuple[str, int, int]] = {}
+        self._total_bytes = 0
+        self._documents: "OrderedDict[str, _Document]" = OrderedDict()
+
+        # 预加载队列：(优先级, 序号, file_id, page_number, generation)
+        self._queue: List[Tuple[int, int, str, int, int]] = []
+        self._queued: Dict[Tuple[str, int], int] = {}
+        self._generations: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._queue_ready = threading.Condition(self._lock)
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._preloaded = 0
+        self._preload_errors = 0
+
+    # ------------------------------------------------------------------
+    def get_page(self, file_id: str, page_number: int, compression: Optional[str] = COMPRESSION_ZLIB_BASE64) -> Dict[str, Any]:
+        """
+        返回单页数据（page_data）
+
+        Returns:
+            {"content", "encoding", "mime_type", "size", "encoded_size", "width", "height", "total_pages", "cached"}
+        """
+        mode = normalize_compression(compression)
+        page, cached = self._load(file_id, page_number)
+        if mode == COMPRESSION_ZLIB_BASE64:
+            payload = page.deflated
+            if payload is None:
+                payload = zlib.compress(page.raw, self.compress_level)
+                with self._lock:
+                    # 仅当页面仍在缓存中时保存压缩结果（已淘汰的页面不再计入字节数）
+                    if page.deflated is None and self._pages.get(file_id, {}).get(int(page_number)) is page:
+                        page.deflated = payload
+                        self._account(file_id, len(payload))
+        else:
+            payload = page.raw
+        content = base64.b64encode(payload).decode("ascii")
+        return {
+            "content": content,
+            "encoding": mode,
+            "mime_type": "application/pdf",
+            "size": len(page.raw),
+            "encoded_size": len(content),
+            "width": page.width,
+            "height": page.height,
+            "total_pages": page.total_pages,
+            "cached": cached,
+        }
+
+    def preload_pages(self, file_id: str, start_page: int, end_page: int, priority: str = "low") -> Dict[str, int]:
+        """把页面范围放入预加载队列（已缓存或已排队的页面跳过），不等待提取完成"""
+        rank = PRIORITIES.get(str(priority).lower())
+        if rank is None:
+            raise PageTransferError("INVALID_PRIORITY", f"未知优先级: {priority}")
+        document = self._document(file_id)
+        total_pages = len(document.reader.pages)
+        start = max(int(start_page), 1)
+        end = min(int(end_page), total_pages, start + self.max_preload_pages - 1)
+        if start > total_pages or end < start:
+            raise PageTransferError("PAGE_OUT_OF_RANGE", f"页码范围无效: {start_page}-{end_page}（共 {total_pages} 页）")
+
+        queued = cached = 0
+        with self._lock:
+            generation = self._generations.get(file_id, 0)
+            pages = self._pages.get(file_id, {})
+            for page_number in range(start, end + 1):
+                key = (file_id, page_number)
+                if page_number in pages:
+                    cached += 1
+                    continue
+                if key in self._queued and self._queued[key] <= rank:
+                    queued += 1
+                    continue
+                # 新任务或提升优先级：旧条目在出队时因优先级不匹配被跳过
+                self._queued[key] = rank
+                heapq.heappush(self._queue, (rank, next(self._sequence), file_id, page_number, generation))
+                queued += 1
+            if queued and not self._closed:
+                self._ensure_workers()
+                self._queue_ready.notify_all()
+        return {"queued": queued, "cached": cached, "total_pages": total_pages}
+
+    def clear_cache(self, file_id: str, keep_pages: Optional[Iterable[int]] = None) -> int:
+        """清除文件的缓存页面（keep_pages 中的页码保留）并取消其待执行的预加载，返回清除页数"""
+        keep = {int(p) for p in keep_pages or []}
+        with self._lock:
+            self._generations[file_id] = self._generations.get(file_id, 0) + 1
+            for key in [k for k in self._queued if k[0] == file_id]:
+                del self._queued[key]
+            pages = self._pages.get(file_id)
+            if not pages:
+                return 0
+            removed = [p for p in pages if p not in keep]
+            for page_number in removed:
+                self._drop(file_id, page_number)
+            return len(removed)
+
+    def process_pending(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """在当前线程执行排队的预加载（preload_workers=0 时使用），返回已处理的 (file_id, 页码)"""
+        processed = []
+        while limit is None or len(processed) < limit:
+            with self._lock:
+                task = self._next_task()
+            if task is None:
+                break
+            self._run_task(*task)
+            processed.append(task[:2])
+        return processed
+
+    def close(self) -> None:
+        """停止预加载线程并释放缓存"""
+        with self._lock:
+            self._closed = True
+            self._queue.clear()
+            self._queued.clear()
+            self._queue_ready.notify_all()
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.join(timeout=5)
+        with self._lock:
+            self._pages.clear()
+            self._file_order.clear()
+            self._file_bytes.clear()
+            self._total_bytes = 0
+            self._documents.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "extraction_available": extraction_available(),
+                "files": len(self._pages),
+                "pages": sum(len(p) for p in self._pages.values()),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_cache_bytes,
+                "max_file_bytes": self.max_file_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "preload_pending": len(self._queued),
+                "preloaded": self._preloaded,
+                "preload_errors": self._preload_errors,
+            }
+
+    # ------------------------------------------------------------------
+    def _load(self, file_id: str, page_number: int) -> Tuple[_CachedPage, bool]:
+        try:
+            page_number = int(page_number)
+        except (TypeError, ValueError):
+            raise PageTransferError("INVALID_REQUEST", f"页码无效: {page_number}")
+        document = self._document(file_id)
+        with self._lock:
+            page = self._cached(file_id, page_number, document.signature)
+            if page is not None:
+                self._hits += 1
+                return page, True
+
+        with document.lock:
+            # 等待锁期间可能已被其他线程（或预加载）提取
+            with self._lock:
+                page = self._cached(file_id, page_number, document.signature)
+                if page is not None:
+                    self._hits += 1
+                    return page, True
+                self._misses += 1
+            page = self._extract(document, page_number)
+        with self._lock:
+            self._store(file_id, page_number, page, document.signature)
+        return page, False
+
+    def _document(self, file_id: str) -> _Document:
+        if not extraction_available():
+            raise PageTransferError("EXTRACTION_UNAVAILABLE", "未安装 pypdf，无法拆分 PDF 页面", status=501)
+        if not file_id:
+            raise PageTransferError("INVALID_REQUEST", "缺少 file_id")
+        path = self._resolve_path(file_id)
+        if not path or not os.path.isfile(path):
+            raise PageTransferError("FILE_NOT_FOUND", f"PDF 文件不存在: {file_id}", status=404)
+        stat = os.stat(path)
+        signature = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            document = self._documents.get(file_id)
+            if document is not None and document.signature == signature:
+                self._documents.move_to_end(file_id)
+                return document
+        try:
+            reader = PdfReader(path)
+            len(reader.pages)
+        except Exception as exc:
+            raise PageTransferError("INVALID_PDF", f"无法解析 PDF: {exc}", status=422)
+        document = _Document(signature, reader)
+        with self._lock:
+            self._documents[file_id] = document
+            self._documents.move_to_end(file_id)
+            while len(self._documents) > self.max_open_documents:
+                self._documents.popitem(last=False)
+        return document
+
+    def _extract(self, document: _Document, page_number: int) -> _CachedPage:
+        total_pages = len(document.reader.pages)
+        if not 1 <= page_number <= total_pages:
+            raise PageTransferError("PAGE_OUT_OF_RANGE", f"页码 {page_number} 超出范围（共 {total_pages} 页）", status=404)
+        source = document.reader.pages[page_number - 1]
+        writer = PdfWriter()
+        writer.add_page(source)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        box = source.mediabox
+        return _CachedPage(buffer.getvalue(), float(box.width), float(box.height), total_pages)
+
+    # 以下方法均在持有 self._lock 时调用
+    def _cached(self, file_id: str, page_number: int, signature: Tuple[str, int, int]) -> Optional[_CachedPage]:
+        if self._signatures.get(file_id) != signature:
+            # 文件已变化：丢弃旧版本的全部页面
+            for stale in list(self._pages.get(file_id, {})):
+                self._drop(file_id, stale)
+            self._signatures[file_id] = signature
+            return None
+        pages = self._pages.get(file_id)
+        page = pages.get(page_number) if pages else None
+        if page is not None:
+            pages.move_to_end(page_number)
+            self._file_order.move_to_end(file_id)
+        return page
+
+    def _store(self, file_id: str, page_number: int, page: _CachedPage, signature: Tuple[str, int, int]) -> None:
+        if self._signatures.get(file_id) != signature or page.size > self.max_file_bytes:
+            return
+        pages = self._pages.setdefault(file_id, OrderedDict())
+        if page_number in pages:
+            return
+        pages[page_number] = page
+        self._account(file_id, page.size)
+
+    def _account(self, file_id: str, size: int) -> None:
+        if file_id not in self._pages:
+            return
+        self._file_bytes[file_id] = self._file_bytes.get(file_id, 0) + size
+        self._total_bytes += size
+        self._file_order[file_id] = None
+        self._file_order.move_to_end(file_id)
+        # 先按单文件上限淘汰该文件最久未用的页面，再按总上限淘汰最久未用文件的页面
+        pages = self._pages[file_id]
+        while self._file_bytes[file_id] > self.max_file_bytes and len(pages) > 1:
+            self._drop(file_id, next(iter(pages)), evicted=True)
+        while self._total_bytes > self.max_cache_bytes and self._file_order:
+            victim = next(iter(self._file_order))
+            if victim == file_id and len(self._pages[file_id]) <= 1:
+                break
+            self._drop(victim, next(iter(self._pages[victim])), evicted=True)
+
+    def _drop(self, file_id: str, page_number: int, evicted: bool = False) -> None:
+        pages = self._pages[file_id]
+        page = pages.pop(page_number)
+        self._file_bytes[file_id] -= page.size
+        self._total_bytes -= page.size
+        if evicted:
+            self._evictions += 1
+        if not pages:
+            del self._pages[file_id]
+            del self._file_bytes[file_id]
+            self._file_order.pop(file_id, None)
+
+    def _next_task(self) -> Optional[Tuple[str, int, int]]:
+        while self._queue:
+            rank, _, file_id, page_number, generation = heapq.heappop(self._queue)
+            key = (file_id, page_number)
+            # 已取消、已被更高优先级条目替代或所属缓存已清理的任务直接丢弃
+            if self._queued.get(key) != rank or generation != self._generations.get(file_id, 0):
+                continue
+            del self._queued[key]
+            return file_id, page_number, generation
+        return None
+
+    # ------------------------------------------------------------------
+    def _ensure_workers(self) -> None:
+        while len(self._workers) < self.preload_workers:
+            worker = threading.Thread(target=self._worker, name=f"page-preload-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                task = self._next_task()
+                while task is None and not self._closed:
+                    self._queue_ready.wait()
+                    task = self._next_task()
+                if self._closed:
+                    return
+            self._run_task(*task)
+
+    def _run_task(self, file_id: str, page_number: int, generation: int) -> None:
+        try:
+            with self._lock:
+                if generation != self._generations.get(file_id, 0):
+                    return
+            self._load(file_id, page_number)
+            with self._lock:
+                self._preloaded += 1
+        except Exception as exc:
+            with self._lock:
+                self._preload_errors += 1
+            logger.warning("预加载页面失败: %s 第 %s 页: %s", file_id, page_number, exc)
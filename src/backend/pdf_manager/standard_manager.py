@@ -6,6 +6,7 @@ import json
 import logging
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
 from src.qt.compat import QObject, pyqtSignal
 
@@ -21,6 +22,7 @@ class StandardPDFManager(QObject):
     # 定义信号（使用标准格式）
     file_added = pyqtSignal(dict)      # 文件添加成功（标准格式）
     file_removed = pyqtSignal(dict)    # 文件移除成功（标准格式）
+    files_removed = pyqtSignal(dict)   # 批量移除完成（聚合，一次批量仅发一次）
     file_list_changed = pyqtSignal()   # 文件列表变更
     error_occurred = pyqtSignal(dict)  # 错误发生（标准格式）
     
@@ -222,6 +224,70 @@ class StandardPDFManager(QObject):
             self.error_occurred.emit(error_response)
             return False, error_response
     
+    def remove_files(self, file_ids: List[str], max_workers: int = 4) -> Dict[str, Any]:
+        """
+        批量删除PDF文件（聚合模式）
+
+        与 batch_remove_files 不同：副本文件在线程池中并行删除，文件列表只保存一次，
+        不逐条发出 file_removed，而是发出一次 files_removed 与一次 file_list_changed。
+
+        Args:
+            file_ids: 文件ID列表
+            max_workers: 删除副本的线程数
+
+        Returns:
+            Dict: {"removed": [...], "not_found": [...], "failed": {id: 原因}, "file_count": int}
+        """
+        removed: List[str] = []
+        not_found: List[str] = []
+        failed: Dict[str, str] = {}
+
+        targets = []
+        for file_id in dict.fromkeys(file_ids):
+            pdf_file = self.file_list.get_file(file_id)
+            if pdf_file is None:
+                not_found.append(file_id)
+            else:
+                targets.append((file_id, pdf_file.filepath))
+
+        def remove_copy(target: Tuple[str, str]) -> Optional[str]:
+            _, copy_path = target
+            try:
+                if copy_path and os.path.exists(copy_path):
+                    os.remove(copy_path)
+                return None
+            except OSError as e:
+                return ErrorHandler.get_error_message(e)
+
+        if targets:
+            workers = max(1, min(max_workers, len(targets)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-remove") as pool:
+                errors = list(pool.map(remove_copy, targets))
+            for (file_id, _), error in zip(targets, errors):
+                if error:
+                    failed[file_id] = error
+                elif self.file_list.remove_file(file_id):
+                    removed.append(file_id)
+                else:
+                    failed[file_id] = "文件移除失败"
+
+        result = {
+            "removed": removed,
+            "not_found": not_found,
+            "failed": failed,
+            "file_count": self.file_list.count(),
+        }
+        if removed:
+            self.save_files()
+            self.files_removed.emit({
+                "file_ids": removed,
+                "remove_time": int(time.time() * 1000),
+                "file_count": result["file_count"],
+            })
+            self.file_list_changed.emit()
+        logger.info(f"批量移除完成：成功 {len(removed)} 个，不存在 {len(not_found)} 个，失败 {len(failed)} 个")
+        return result
+
     def get_files(self) -> List[Dict[str, Any]]:
         """
         获取所有PDF文件列表（新标准格式）
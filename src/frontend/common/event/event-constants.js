@@ -110,6 +110,8 @@ export const WEBSOCKET_MESSAGE_EVENTS = {
   SYSTEM_STATUS: 'websocket:message:system-status',
   BOOKMARK_LIST: 'websocket:message:bookmark-list',
   BOOKMARK_SAVE: 'websocket:message:bookmark-save',
+  // 订阅主题的增量推送（subscription:delta:updated）
+  SUBSCRIPTION_DELTA: 'websocket:message:subscription-delta',
   UNKNOWN: 'websocket:message:unknown'
 };
 
@@ -138,6 +140,17 @@ export const WEBSOCKET_MESSAGE_TYPES = {
   STORAGE_KV_DELETE: 'storage-kv:delete:requested',
   STORAGE_FS_READ: 'storage-fs:read:requested',
   STORAGE_FS_WRITE: 'storage-fs:write:requested',
+  // 增量同步：拉取 since 之后的合并变更
+  SYNC_SINCE: 'sync:since:requested',
+  // 主题订阅：library / pdf:<uuid>:annotations / pdf:<uuid>:bookmarks
+  SUBSCRIPTION_SUBSCRIBE: 'subscription:subscribe:requested',
+  SUBSCRIPTION_UNSUBSCRIBE: 'subscription:unsubscribe:requested',
+  // 服务端按消息类型的处理指标（计数/错误/耗时直方图）
+  SYSTEM_METRICS: 'system:metrics:requested',
+  // 批量请求：一个信封携带多个标准请求，按顺序返回各自的响应
+  SYSTEM_BATCH: 'system:batch:requested',
+  // 线路编码协商：本连接后续的大消息改为压缩二进制帧
+  SYSTEM_ENCODING: 'system:encoding:requested',
 
   // Annotation (标注) 消息
   ANNOTATION_LIST: 'annotation:list:requested',
@@ -208,6 +221,20 @@ export const WEBSOCKET_MESSAGE_TYPES = {
   ANCHOR_DELETE_FAILED: 'anchor:delete:failed',
   ANCHOR_ACTIVATE_COMPLETED: 'anchor:activate:completed',
   ANCHOR_ACTIVATE_FAILED: 'anchor:activate:failed',
+  SYNC_SINCE_COMPLETED: 'sync:since:completed',
+  SYNC_SINCE_FAILED: 'sync:since:failed',
+  SUBSCRIPTION_SUBSCRIBE_COMPLETED: 'subscription:subscribe:completed',
+  SUBSCRIPTION_SUBSCRIBE_FAILED: 'subscription:subscribe:failed',
+  SUBSCRIPTION_UNSUBSCRIBE_COMPLETED: 'subscription:unsubscribe:completed',
+  SUBSCRIPTION_UNSUBSCRIBE_FAILED: 'subscription:unsubscribe:failed',
+  SUBSCRIPTION_DELTA_UPDATED: 'subscription:delta:updated',
+  SYSTEM_STATUS_UPDATED: 'system:status:updated',
+  SYSTEM_METRICS_COMPLETED: 'system:metrics:completed',
+  SYSTEM_METRICS_FAILED: 'system:metrics:failed',
+  SYSTEM_BATCH_COMPLETED: 'system:batch:completed',
+  SYSTEM_BATCH_FAILED: 'system:batch:failed',
+  SYSTEM_ENCODING_COMPLETED: 'system:encoding:completed',
+  SYSTEM_ENCODING_FAILED: 'system:encoding:failed',
 
   // ====== PDF-Viewer 实例注册与导航（新增）======
   // 前端→后端：PDF-Viewer 实例注册（包含 viewer_id 与 pdf_uuid 绑定）
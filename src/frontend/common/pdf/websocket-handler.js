@@ -116,7 +116,7 @@ export class WebSocketHandler {
   }
 
   /**
-   * 处理系统状态消息（包括 file_added、file_removed 等广播事件）
+   * 处理系统状态消息（包括 file_added、file_removed、record_updated 等 library 主题推送）
    * @param {Object} data - system_status 消息对象
    * @returns {void}
    */
@@ -185,6 +185,47 @@ export class WebSocketHandler {
           this.#manager.logger.warn("[删除-阶段4] 在列表中未找到要删除的文件:", fileId);
         }
       }
+    } else if (eventType === "record_updated") {
+      // 单条记录变更：推送中携带最新记录，原地替换即可
+      const record = data?.data?.record;
+      if (!record) {
+        return;
+      }
+      const updatedPdf = this.#manager.mapBackendToFrontend(record);
+      const index = this.#manager.pdfs.findIndex(pdf => pdf.id === updatedPdf.id);
+      if (index === -1) {
+        this.#manager.pdfs.unshift(updatedPdf);
+      } else {
+        this.#manager.pdfs[index] = updatedPdf;
+      }
+      this.#manager.eventBus.emit(PDF_MANAGEMENT_EVENTS.LIST.UPDATED, this.#manager.getPDFs(), { actorId: "PDFManager" });
+    } else if (eventType === "files_removed") {
+      // 批量删除的聚合广播：一次性移除多条
+      const fileIds = new Set(data?.data?.file_ids || []);
+      this.#manager.logger.info("[删除-阶段4] 检测到批量删除事件:", fileIds.size);
+      if (fileIds.size === 0) {
+        return;
+      }
+
+      this.#manager.eventBus.emit(
+        "ui:success:show",
+        `已删除 ${fileIds.size} 个文件`,
+        { actorId: "PDFManager" }
+      );
+
+      const remaining = [];
+      for (const pdf of this.#manager.pdfs) {
+        if (fileIds.has(pdf.id)) {
+          this.#manager.eventBus.emit(
+            "pdf:file:removed",
+            pdf,
+            { actorId: "PDFManager" }
+          );
+        } else {
+          remaining.push(pdf);
+        }
+      }
+      this.#manager.pdfs.splice(0, this.#manager.pdfs.length, ...remaining);
     }
   }
 
@@ -5,9 +5,22 @@
  */
 
 export class ConsoleWebSocketBridge {
-  constructor(source, websocketSender) {
+  /**
+   * @param {string} source - 来源标识
+   * @param {Function} websocketSender - 逐条发送函数（message）
+   * @param {Object} [options]
+   * @param {Function} [options.batchSender] - 批量发送函数（entries），提供时日志攒批后以 console_log:batch 发送
+   * @param {number} [options.flushInterval=250] - 攒批最长等待（毫秒）
+   * @param {number} [options.maxBatchSize=50] - 单批最多条数，达到后立即发送
+   */
+  constructor(source, websocketSender, options = {}) {
     this.source = source; // 'pdf-home' or 'pdf-viewer'
     this.websocketSender = websocketSender; // WebSocket消息发送函数
+    this.batchSender = typeof options.batchSender === 'function' ? options.batchSender : null;
+    this.flushInterval = options.flushInterval ?? 250;
+    this.maxBatchSize = options.maxBatchSize ?? 50;
+    this._pending = [];
+    this._flushTimer = null;
     this.originalConsole = {};
     this.enabled = false;
     this.skipPatterns = []; // 自定义过滤规则
@@ -47,6 +60,7 @@ export class ConsoleWebSocketBridge {
     if (!this.enabled) return;
 
     this.enabled = false;
+    this.flush();
 
     // 恢复原始console方法
     console.log = this.originalConsole.log;
@@ -168,10 +182,7 @@ export class ConsoleWebSocketBridge {
         args: serializedArgs
       };
 
-      // 通过WebSocket发送
-      if (this.websocketSender && typeof this.websocketSender === 'function') {
-        this.websocketSender(message);
-      }
+      this._dispatch(message);
     } catch (error) {
       // 避免递归错误，直接用原始console输出
       this.originalConsole.error(`[${this.source}] Failed to send log to WebSocket:`, error);
@@ -222,8 +233,39 @@ export class ConsoleWebSocketBridge {
       data: data
     };
 
+    this._dispatch(logMessage);
+  }
+
+  /**
+   * 立即发送攒批中的日志
+   */
+  flush() {
+    if (this._flushTimer) {
+      clearTimeout(this._flushTimer);
+      this._flushTimer = null;
+    }
+    if (this._pending.length === 0 || !this.batchSender) return;
+    const entries = this._pending;
+    this._pending = [];
+    try {
+      this.batchSender(entries);
+    } catch (error) {
+      this.originalConsole.error(`[${this.source}] Failed to send log batch to WebSocket:`, error);
+    }
+  }
+
+  _dispatch(message) {
+    if (this.batchSender) {
+      this._pending.push(message);
+      if (this._pending.length >= this.maxBatchSize) {
+        this.flush();
+      } else if (!this._flushTimer) {
+        this._flushTimer = setTimeout(() => this.flush(), this.flushInterval);
+      }
+      return;
+    }
     if (this.websocketSender && typeof this.websocketSender === 'function') {
-      this.websocketSender(logMessage);
+      this.websocketSender(message);
     }
   }
 
@@ -241,8 +283,9 @@ export class ConsoleWebSocketBridge {
  * 创建console桥接器的工厂函数
  * @param {string} source - 来源标识
  * @param {Function} websocketSender - WebSocket发送函数
+ * @param {Object} [options] - 攒批选项（batchSender / flushInterval / maxBatchSize）
  * @returns {ConsoleWebSocketBridge} 桥接器实例
  */
-export function createConsoleWebSocketBridge(source, websocketSender) {
-  return new ConsoleWebSocketBridge(source, websocketSender);
+export function createConsoleWebSocketBridge(source, websocketSender, options = {}) {
+  return new ConsoleWebSocketBridge(source, websocketSender, options);
 }
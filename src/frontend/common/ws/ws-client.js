@@ -27,6 +27,9 @@ export class WSClient {
   #requestRetries = new Map();
   #lastError = null;
   #connectionHistory = [];
+  #subscriptions = new Set();
+  #encoding = null;
+  #inbound = null;
 
   static VALID_MESSAGE_TYPES = [
     "pdf_list_updated",
@@ -115,6 +118,8 @@ export class WSClient {
       try {
         this.#logger.info(`Connecting to WebSocket server: ${this.#url}`);
         this.#socket = new WebSocket(this.#url);
+        // 协商压缩编码后，大消息以二进制帧到达
+        this.#socket.binaryType = "arraybuffer";
 
         const onOpen = () => {
           cleanup();
@@ -237,10 +242,13 @@ export class WSClient {
       this.#eventBus.emit(WEBSOCKET_EVENTS.CONNECTION.ESTABLISHED, connectionInfo, {
         actorId: "WSClient",
       });
+      // 服务端的订阅随连接释放，重连后重新声明
+      this.#resubscribe();
+      this.#renegotiateEncoding();
       this.#flushMessageQueue();
     };
 
-    this.#socket.onmessage = (event) => this.#handleMessage(event.data);
+    this.#socket.onmessage = (event) => this.#receive(event.data);
 
     this.#socket.onclose = (event) => {
       const closeInfo = {
@@ -292,6 +300,30 @@ export class WSClient {
     };
   }
 
+  /**
+   * 文本帧直接处理；二进制帧（deflate 压缩的 JSON）异步解压。
+   * 解压进行中到达的消息排在其后，保证处理顺序与到达顺序一致。
+   */
+  #receive(data) {
+    if (typeof data === "string" && !this.#inbound) {
+      this.#handleMessage(data);
+      return;
+    }
+    const next = (this.#inbound || Promise.resolve())
+      .then(() => (typeof data === "string" ? data : WSClient.#inflate(data)))
+      .then((text) => this.#handleMessage(text))
+      .catch((error) => this.#logger.error("❌ 二进制消息解码失败", error));
+    this.#inbound = next;
+    next.finally(() => {
+      if (this.#inbound === next) {this.#inbound = null;}
+    });
+  }
+
+  static async #inflate(buffer) {
+    const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream("deflate"));
+    return new Response(stream).text();
+  }
+
   #handleMessage(rawData) {
     try {
       const message = JSON.parse(rawData);
@@ -466,8 +498,12 @@ export class WSClient {
         targetEvent = WEBSOCKET_MESSAGE_EVENTS.RESPONSE;
         break;
       case "system_status":
+      case "system:status:updated":
         targetEvent = WEBSOCKET_MESSAGE_EVENTS.SYSTEM_STATUS;
         break;
+      case "subscription:delta:updated":
+        targetEvent = WEBSOCKET_MESSAGE_EVENTS.SUBSCRIPTION_DELTA;
+        break;
         default:
           targetEvent = WEBSOCKET_MESSAGE_EVENTS.UNKNOWN;
       }
@@ -651,6 +687,82 @@ export class WSClient {
       { timeout, maxRetries }
     );
   }
+
+  /**
+   * 批量请求：把多个标准请求装进一个 system:batch:requested 信封，一次往返取回
+   * @param {Array<{type: string, data?: object, request_id?: string}>} requests - 子请求（类型须在白名单中）
+   * @param {object} options - { timeout, sequential }；sequential 为真时服务端按顺序执行
+   * @returns {Promise<object[]>} 与 requests 一一对应的完整响应（各自带 status）
+   */
+  async requestBatch(requests, options = {}) {
+    const rejected = (requests || []).filter((r) => !WSClient.ALLOWED_OUTBOUND_TYPES.has(r?.type));
+    if (rejected.length > 0) {
+      throw new Error(`未注册的请求消息类型：${rejected.map((r) => r?.type).join(", ")}`);
+    }
+    const { timeout = 10000, sequential = false } = options;
+    const data = await this.request(
+      WEBSOCKET_MESSAGE_TYPES.SYSTEM_BATCH,
+      { requests: requests.map(({ type, data: payload = {}, request_id }) => ({ type, data: payload, ...(request_id ? { request_id } : {}) })), sequential },
+      { timeout }
+    );
+    return data?.responses || [];
+  }
+  /**
+   * 订阅服务端主题（library / pdf:<uuid>:annotations / pdf:<uuid>:bookmarks）
+   * 订阅后只会收到已订阅主题的推送；重连时自动重新订阅
+   * @param {string[]} topics - 主题列表
+   */
+  subscribe(topics) {
+    const added = (topics || []).filter((t) => typeof t === "string" && !this.#subscriptions.has(t));
+    if (added.length === 0) {return;}
+    added.forEach((t) => this.#subscriptions.add(t));
+    if (this.isConnected()) {
+      this.send({ type: WEBSOCKET_MESSAGE_TYPES.SUBSCRIPTION_SUBSCRIBE, data: { topics: added } });
+    }
+  }
+
+  /**
+   * 退订服务端主题
+   * @param {string[]} topics - 主题列表
+   */
+  unsubscribe(topics) {
+    const removed = (topics || []).filter((t) => this.#subscriptions.delete(t));
+    if (removed.length === 0) {return;}
+    if (this.isConnected()) {
+      this.send({ type: WEBSOCKET_MESSAGE_TYPES.SUBSCRIPTION_UNSUBSCRIBE, data: { topics: removed } });
+    }
+  }
+
+  getSubscriptions() {
+    return [...this.#subscriptions];
+  }
+
+  /**
+   * 协商本连接的线路编码：超过阈值的消息改为 deflate 压缩的二进制帧（浏览器原生解压）
+   * 协商结果随连接释放，重连时自动重新协商；运行环境不支持 DecompressionStream 时保持 JSON
+   * @param {object} options - { threshold }：压缩阈值（字符数），默认由服务端决定
+   * @returns {Promise<object|null>} 服务端确认的编码（codec / threshold / available），不支持时为 null
+   */
+  async negotiateEncoding(options = {}) {
+    if (typeof DecompressionStream === "undefined") {
+      this.#logger.warn("当前环境不支持 DecompressionStream，保持 JSON 文本帧");
+      return null;
+    }
+    const { threshold, timeout = 5000 } = options;
+    this.#encoding = { codec: "deflate", ...(threshold ? { threshold } : {}) };
+    return this.request(WEBSOCKET_MESSAGE_TYPES.SYSTEM_ENCODING, this.#encoding, { timeout });
+  }
+
+  #renegotiateEncoding() {
+    if (!this.#encoding) {return;}
+    this.send({ type: WEBSOCKET_MESSAGE_TYPES.SYSTEM_ENCODING, data: this.#encoding });
+  }
+
+  #resubscribe() {
+    if (this.#subscriptions.size === 0) {return;}
+    this.send({ type: WEBSOCKET_MESSAGE_TYPES.SUBSCRIPTION_SUBSCRIBE, data: { topics: [...this.#subscriptions] } });
+  }
+
   #attemptReconnect() {
     if (this.#reconnectAttempts >= this.#maxReconnectAttempts) {
       const failureInfo = {
@@ -153,6 +153,8 @@ export function createPDFHomeContainer({ root, wsUrl, logger, enableValidation =
       try {
         const eventBus = diContainer.get('eventBus');
         const wsClient = new WSClient(state.wsUrl, eventBus);
+        // pdf-home 只关心库级记录变更
+        wsClient.subscribe(['library']);
         diContainer.register('wsClient', wsClient);
         logger.debug('WSClient created and registered');
       } catch (e) {
@@ -176,6 +176,8 @@ export class PDFHomeAppV2 {
     // 创建并注册 WebSocket 客户端（如果提供了 URL）
     if (options.wsUrl) {
       this.#wsClient = new WSClient(options.wsUrl, this.#eventBus);
+      // pdf-home 只关心库级记录变更
+      this.#wsClient.subscribe(['library']);
       this.#container.register('wsClient', this.#wsClient, {
         scope: 'singleton'
       });
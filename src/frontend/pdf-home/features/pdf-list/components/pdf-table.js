@@ -710,6 +710,15 @@ export class PDFTable {
     return await this.#dataService.setData(data);
   }
 
+  /**
+   * 追加数据（同 id 的行就地更新）
+   * @param {Array<Object>} data - 数据数组
+   * @returns {Promise<void>}
+   */
+  async appendData(data) {
+    return await this.#dataService.appendData(data);
+  }
+
   /**
    * 加载数据（兼容性API）
    * @param {Array<Object>} data - 数据数组
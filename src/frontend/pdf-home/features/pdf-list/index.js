@@ -23,6 +23,9 @@ import { WEBSOCKET_EVENTS, WEBSOCKET_MESSAGE_TYPES } from '../../../common/event
 import { showSuccess, showError } from '../../../common/utils/notification.js';
 import { pending as toastPending, success as toastSuccess, warning as toastWarning, error as toastError, dismissById as toastDismiss } from '../../../common/utils/thirdparty-toast.js';
 
+// 列表按页流式加载时每页条数
+const PDF_LIST_PAGE_SIZE = 200;
+
 /**
  * PDF List 功能域类
  * @class PDFListFeature
@@ -100,6 +103,12 @@ export class PDFListFeature {
 
   // 删除流程的 pending 记录（一次仅允许一个批量删除在途）
   
+  // 键集分页流式加载：当前正在拉取的游标序列（null 表示未在加载）
+  #listStreamCursor = null;
+
+  // 后续页待追加到表格的行：items 订阅据此追加而非整表 setData
+  #pendingAppendRows = null;
+
   #pendingDeleteToast = null; // { removedCount:number, failedCount:number, failedMap?:object }
   #pendingDeleteError = null; // { rid:string, message:string }
   #pendingDeleteErrorTimer = null;
@@ -335,8 +344,13 @@ export class PDFListFeature {
     this.#state.subscribe('items', (newItems, oldItems) => {
       this.#logger.debug(`List items changed: ${oldItems?.length || 0} -> ${newItems?.length || 0}`);
 
-      // 更新表格显示
-      if (this.#uiManager && newItems) {
+      // 更新表格显示（分页加载的后续页只追加本页行）
+      const appendRows = this.#pendingAppendRows;
+      this.#pendingAppendRows = null;
+      if (this.#uiManager && appendRows) {
+        this.#logger.debug('Appending page rows to table:', appendRows.length);
+        this.#uiManager.appendData(appendRows);
+      } else if (this.#uiManager && newItems) {
         this.#logger.debug('Updating table with new items:', newItems.length);
         this.#uiManager.setData(newItems);
       }
@@ -762,17 +776,41 @@ export class PDFListFeature {
       ) {
         this.#logger.info(`Received PDF list from WebSocket: ${data.data.files.length} files`);
 
+        // 键集分页：首页（cursor 为 null）替换，后续页追加，并继续请求下一页。
+        // 分页顺序为 updated_at DESC（最近更新在前），不再是旧全量列表的 title COLLATE NOCASE ASC；
+        // 需要按标题排序时由 pdf-sorter 携带 sort 规则走 search 请求
+        const pagination = data.data.pagination || {};
+        const isCursorPage = Object.prototype.hasOwnProperty.call(pagination, 'next_cursor');
+        const isContinuation = isCursorPage && !!pagination.cursor;
+        if (isContinuation && pagination.cursor !== this.#listStreamCursor) {
+          // 过期页（列表已被重新请求），丢弃
+          this.#logger.debug('Ignoring stale PDF list page', { cursor: pagination.cursor });
+          return;
+        }
+
         // 更新状态中的items (直接设置属性，而不是调用set方法)
         if (this.#state) {
-          this.#state.items = data.data.files;
+          const items = isContinuation
+            ? this.#mergeListPage(this.#state.items || [], data.data.files)
+            : data.data.files;
+          if (isContinuation) {
+            this.#pendingAppendRows = data.data.files;
+          }
+          this.#state.items = items;
           this.#state.isLoading = false;
 
           // 发出数据加载完成事件
           this.#scopedEventBus?.emit(
             PDF_LIST_EVENTS.DATA_LOAD_COMPLETED,
-            EventDataFactory.createDataLoadedData(data.data.files, data.data.files.length)
+            EventDataFactory.createDataLoadedData(items, pagination.total ?? items.length)
           );
         }
+
+        if (isCursorPage && pagination.has_more && pagination.next_cursor) {
+          this.#sendListPageRequest(pagination.next_cursor);
+        } else if (isCursorPage) {
+          this.#listStreamCursor = null;
+        }
       }
 
       // 处理单个文件添加响应（后端返回 data.file 对象）
@@ -1101,14 +1139,47 @@ export class PDFListFeature {
       this.#state.isLoading = true;
     }
 
-    // 发送WebSocket消息请求PDF列表
-    this.#scopedEventBus.emitGlobal(WEBSOCKET_EVENTS.MESSAGE.SEND, {
-      type: WEBSOCKET_MESSAGE_TYPES.GET_PDF_LIST
-    });
+    // 发送WebSocket消息请求PDF列表（按页流式加载）
+    this.#sendListPageRequest(null);
 
     this.#logger.debug('PDF list request sent');
   }
 
+  /**
+   * 合并后续页：已有 id 的行就地替换（翻页期间记录被更新而再次出现），其余追加到末尾
+   * @param {Array<Object>} items - 当前列表
+   * @param {Array<Object>} page - 新到达的一页
+   * @returns {Array<Object>} 合并后的列表
+   * @private
+   */
+  #mergeListPage(items, page) {
+    const merged = items.slice();
+    const positions = new Map(merged.map((item, index) => [item.id, index]));
+    for (const row of page) {
+      const index = positions.get(row.id);
+      if (index === undefined) {
+        positions.set(row.id, merged.length);
+        merged.push(row);
+      } else {
+        merged[index] = row;
+      }
+    }
+    return merged;
+  }
+
+  /**
+   * 请求一页 PDF 列表（键集分页，按 updated_at DESC 排列）
+   * @param {string|null} cursor - 上一页返回的 next_cursor，首页为 null
+   * @private
+   */
+  #sendListPageRequest(cursor) {
+    this.#listStreamCursor = cursor;
+    this.#scopedEventBus?.emitGlobal(WEBSOCKET_EVENTS.MESSAGE.SEND, {
+      type: WEBSOCKET_MESSAGE_TYPES.GET_PDF_LIST,
+      data: { pagination: { cursor, page_size: PDF_LIST_PAGE_SIZE } }
+    });
+  }
+
   // ==================== 公开方法（供外部调用） ====================
 
   /**
@@ -1170,10 +1241,8 @@ export class PDFListFeature {
     } catch (e) {
       this.#logger.warn('Search refresh after deletion failed, fallback to list reload', e);
     }
-    // 兜底：请求完整列表
-    this.#scopedEventBus?.emitGlobal(WEBSOCKET_EVENTS.MESSAGE.SEND, {
-      type: WEBSOCKET_MESSAGE_TYPES.GET_PDF_LIST
-    });
+    // 兜底：重新流式加载完整列表
+    this.#sendListPageRequest(null);
   }
 
   /**
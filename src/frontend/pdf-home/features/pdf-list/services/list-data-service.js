@@ -110,6 +110,37 @@ export class ListDataService {
     return Promise.resolve();
   }
 
+  /**
+   * 追加表格数据（分页加载的后续页），同 id 的行就地更新，不重建整表
+   * @param {Array<Object>} data - 要追加的行对象数组
+   * @returns {Promise<void>} Promise对象
+   */
+  async appendData(data) {
+    const rows = Array.isArray(data) ? [...data] : [];
+
+    if (this.#fallbackMode) {
+      // state.items 已由调用方（WebSocket响应）更新，这里只记录
+      logger.info('Appending data in fallback mode:', rows.length, 'rows');
+      return Promise.resolve();
+    }
+
+    if (!this.#tabulator) {
+      logger.warn('No tabulator instance available for appendData');
+      return Promise.reject(new Error('Tabulator instance not available'));
+    }
+
+    logger.info('Appending data in Tabulator:', rows.length, 'rows');
+
+    try {
+      await this.#tabulator.updateOrAddData(rows);
+    } catch (error) {
+      logger.warn('Failed to append data, falling back to setData:', error);
+      await this.setData(this.#state?.items || rows);
+    }
+
+    return Promise.resolve();
+  }
+
   /**
    * 兼容性API：loadData
    * @param {Array<Object>} data - 数据
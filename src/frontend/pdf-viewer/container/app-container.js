@@ -72,11 +72,17 @@ export function createPDFViewerContainer({
       }
     });
 
-    // 创建主Console桥接器
+    // 创建主Console桥接器：日志攒批后以 console_log:batch 发送，后端按来源限流
     consoleBridge = createConsoleWebSocketBridge('pdf-viewer', (message) => {
       if (wsClient && wsClient.isConnected()) {
         wsClient.send({ type: 'console_log', data: message });
       }
+    }, {
+      batchSender: (entries) => {
+        if (wsClient && wsClient.isConnected()) {
+          wsClient.send({ type: 'console_log:batch', data: { entries } });
+        }
+      }
     });
 
     // 设置PDF-Viewer特定的过滤规则